@@ -1,26 +1,30 @@
 ﻿import sys
 import os
-import re
-import fnmatch
-import tempfile
 import math
 import json
+
+# 命令行批处理模式（--batch）不需要图形界面，在导入tkinter之前分派
+if __name__ == "__main__" and "--batch" in sys.argv[1:]:
+    import loganalyzer_batch
+    sys.exit(loganalyzer_batch.main(sys.argv[1:]))
+
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import pandas as pd
-import matplotlib.pyplot as plt
-# 配置matplotlib中文字体支持
-import matplotlib
-import matplotlib.pyplot as plt
-plt.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'Arial Unicode MS']  # 设置支持中文的字体
-plt.rcParams['axes.unicode_minus'] = False  # 解决保存图像时负号'-'显示为方块的问题
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+# matplotlib和openpyxl在第一次使用时才导入（见configure_matplotlib），以缩短启动时间
 import time
 import logging
 import datetime
+import functools
+import queue
+import threading
+import loganalyzer_core
 
 # 配置全局日志记录
 class LogConfig:
+    # 当前日志文件路径（性能分析结果保存在同一目录）
+    log_filepath = None
+    
     @staticmethod
     def _create_log_directory():
         logs_dir = os.path.join(os.getcwd(), 'logs')
@@ -57,6 +61,7 @@ class LogConfig:
         
         for handler in LogConfig._create_handlers(log_filepath):
             logger.addHandler(handler)
+        LogConfig.log_filepath = log_filepath
         
         logger.info(f"Log file created: {log_filepath}")
         return logger
@@ -75,9 +80,314 @@ except Exception as e:
 logging.getLogger('matplotlib.font_manager').setLevel(logging.ERROR)
 logging.getLogger('matplotlib').setLevel(logging.WARNING)
 
-# 设置matplotlib中文字体
-plt.rcParams["font.family"] = ["SimHei", "WenQuanYi Micro Hei", "Heiti TC", "Arial Unicode MS", "Microsoft YaHei"]
-plt.rcParams["axes.unicode_minus"] = False  # 解决负号显示问题
+# 文件预览中点击"More rows"时每次继续读取的行数
+PREVIEW_MORE_ROWS = 50
+
+# Color Bins图中最多绘制的色点数（超过时均匀抽样，Bin分布表仍统计全部单元）
+COLOR_BIN_CHART_POINTS = 50000
+
+# 第一次绘图前导入matplotlib并设置中文字体，之后直接返回已配置的模块
+_matplotlib_configured = False
+
+def configure_matplotlib():
+    global _matplotlib_configured
+    import matplotlib
+    if not _matplotlib_configured:
+        matplotlib.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'Arial Unicode MS']  # 设置支持中文的字体
+        matplotlib.rcParams["font.family"] = ["SimHei", "WenQuanYi Micro Hei", "Heiti TC", "Arial Unicode MS", "Microsoft YaHei"]
+        matplotlib.rcParams["axes.unicode_minus"] = False  # 解决负号显示问题
+        _matplotlib_configured = True
+    return matplotlib
+
+# 图表管理器：每个选项卡只保留一个Figure和画布，刷新时只更新受影响的图元
+class ChartManager:
+    def __init__(self):
+        # {key: {"figure": Figure, "canvas": FigureCanvasTkAgg, "artists": {name: artist}}}
+        self._charts = {}
+        # 颜色背景缓存 {(xlim, ylim, resolution): rgb_array}
+        self._background_cache = {}
+    
+    def get_chart(self, key, master, nrows=1, ncols=1, figsize=(6, 5), dpi=100):
+        """获取指定选项卡的图表，画布仍然存在时直接复用
+        
+        Returns:
+            (figure, axes列表, canvas, 是否新建)
+        """
+        chart = self._charts.get(key)
+        if chart is not None:
+            widget = chart["canvas"].get_tk_widget()
+            try:
+                alive = bool(widget.winfo_exists())
+            except tk.TclError:
+                alive = False
+            if alive:
+                return chart["figure"], chart["figure"].axes, chart["canvas"], False
+            self._charts.pop(key, None)
+        
+        # 使用独立的Figure对象，不注册到pyplot，避免被plt.close('all')回收
+        configure_matplotlib()
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        
+        figure = Figure(figsize=figsize, dpi=dpi)
+        figure.subplots(nrows, ncols, squeeze=False)
+        canvas = FigureCanvasTkAgg(figure, master=master)
+        self._charts[key] = {"figure": figure, "canvas": canvas, "artists": {}}
+        return figure, figure.axes, canvas, True
+    
+    def has_chart(self, key):
+        chart = self._charts.get(key)
+        if chart is None:
+            return False
+        try:
+            return bool(chart["canvas"].get_tk_widget().winfo_exists())
+        except tk.TclError:
+            return False
+    
+    def get_canvas(self, key):
+        chart = self._charts.get(key)
+        return chart["canvas"] if chart else None
+    
+    def get_artist(self, key, name):
+        chart = self._charts.get(key)
+        if chart is None:
+            return None
+        return chart["artists"].get(name)
+    
+    def set_artist(self, key, name, artist):
+        chart = self._charts.get(key)
+        if chart is not None:
+            chart["artists"][name] = artist
+        return artist
+    
+    def update_polygon(self, key, name, points):
+        """只更新多边形图元的顶点，少于3个点时隐藏多边形"""
+        polygon = self.get_artist(key, name)
+        if polygon is None:
+            return False
+        if len(points) >= 3:
+            polygon.set_xy(points)
+            polygon.set_visible(True)
+        else:
+            polygon.set_visible(False)
+        return True
+    
+    def update_scatter(self, key, name, points):
+        """只更新散点图元的坐标"""
+        import numpy as np
+        scatter = self.get_artist(key, name)
+        if scatter is None:
+            return False
+        offsets = np.asarray(points, dtype=float).reshape(-1, 2)
+        scatter.set_offsets(offsets)
+        return True
+    
+    def update_background(self, key, name, ax, xlim, ylim, resolution=100):
+        """按坐标范围更新u'v'颜色背景，范围未变化时不重新计算"""
+        image = self.get_artist(key, name)
+        extent = [xlim[0], xlim[1], ylim[0], ylim[1]]
+        if image is not None and list(image.get_extent()) == extent:
+            return image
+        rgb_array = self.uv_background(xlim, ylim, resolution)
+        if image is None:
+            image = ax.imshow(rgb_array, extent=extent, origin='lower', aspect='auto', alpha=0.8)
+            self.set_artist(key, name, image)
+        else:
+            image.set_data(rgb_array)
+            image.set_extent(extent)
+        return image
+    
+    def uv_background(self, xlim, ylim, resolution=100):
+        """向量化计算u'v'坐标对应的RGB颜色背景（100nit亮度，D65，sRGB）"""
+        import numpy as np
+        cache_key = (tuple(xlim), tuple(ylim), resolution)
+        cached = self._background_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        u = np.linspace(xlim[0], xlim[1], resolution)
+        v = np.linspace(ylim[0], ylim[1], resolution)
+        u_grid, v_grid = np.meshgrid(u, v)
+        
+        Y = 1.0
+        positive = v_grid > 0
+        safe_v = np.where(positive, v_grid, 1.0)
+        X = np.where(positive, Y * 9 * u_grid / (4 * safe_v), 0.0)
+        Z = np.where(positive, Y * (12 - 3 * u_grid - 20 * v_grid) / (4 * safe_v), 0.0)
+        
+        rgb = np.stack([
+            X * 3.2406 + Y * -1.5372 + Z * -0.4986,
+            X * -0.9689 + Y * 1.8758 + Z * 0.0415,
+            X * 0.0557 + Y * -0.2040 + Z * 1.0570,
+        ], axis=-1)
+        
+        # gamma校正
+        linear = rgb <= 0.0031308
+        rgb = np.where(linear, 12.92 * rgb, 1.055 * np.power(np.maximum(rgb, 0.0031308), 1 / 2.4) - 0.055)
+        rgb = np.clip(rgb, 0, 1)
+        
+        # 只保留少量最近使用的背景，避免缓存无限增长
+        if len(self._background_cache) >= 16:
+            self._background_cache.pop(next(iter(self._background_cache)))
+        self._background_cache[cache_key] = rgb
+        return rgb
+    
+    def redraw(self, key, blit_axes=None):
+        """请求重绘；指定blit_axes时只重绘对应子图区域"""
+        chart = self._charts.get(key)
+        if chart is None:
+            return
+        canvas = chart["canvas"]
+        if blit_axes is not None and getattr(canvas, "supports_blit", False):
+            try:
+                for ax in blit_axes:
+                    ax.draw_artist(ax.patch)
+                    for artist in ax.get_children():
+                        if artist.get_visible() and artist is not ax.patch:
+                            ax.draw_artist(artist)
+                    canvas.blit(ax.bbox)
+                return
+            except Exception:
+                # 还没有完成首次绘制时无法blit，退回到draw_idle
+                pass
+        canvas.draw_idle()
+    
+    def release(self, key):
+        """释放指定选项卡的图表"""
+        chart = self._charts.pop(key, None)
+        if chart is None:
+            return
+        try:
+            chart["canvas"].get_tk_widget().destroy()
+        except tk.TclError:
+            pass
+        chart["figure"].clear()
+    
+    def release_all(self):
+        for key in list(self._charts.keys()):
+            self.release(key)
+        self._background_cache.clear()
+
+# 虚拟化文件列表：Treeview只保留可见行数的条目，滚动和勾选时只更新可见行，数据保存在FileListModel中
+class VirtualFileList:
+    COLUMNS = (("check", "", 30), ("number", "No.", 50), ("file", "File", 420), ("station", "Station", 100),
+               ("date", "Date", 90))
+    
+    def __init__(self, master, model, on_toggle=None, row_height=20, display_root=None):
+        self.model = model
+        self.on_toggle = on_toggle
+        # 设置时文件列显示相对于该目录的路径，否则只显示文件名
+        self.display_root = display_root
+        self.row_height = int(ttk.Style().lookup("Treeview", "rowheight") or row_height)
+        self.view = []
+        self.offset = 0
+        self.frame = tk.Frame(master)
+        self.tree = ttk.Treeview(self.frame, columns=[name for name, _, _ in self.COLUMNS], show="headings",
+                                 height=4, selectmode="none")
+        for name, text, width in self.COLUMNS:
+            self.tree.heading(name, text=text)
+            self.tree.column(name, width=width, minwidth=width if name == "check" else 40,
+                             stretch=name == "file", anchor="center" if name != "file" else "w")
+        self.scrollbar = ttk.Scrollbar(self.frame, orient="vertical", command=self._on_scroll)
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+        self._items = []
+        self.tree.bind("<Configure>", self._on_configure)
+        self.tree.bind("<Button-1>", self._on_click)
+        self.tree.bind("<MouseWheel>", lambda event: self.scroll(int(-1 * (event.delta / 120))))
+        self.tree.bind("<Button-4>", lambda event: self.scroll(-1))
+        self.tree.bind("<Button-5>", lambda event: self.scroll(1))
+        self._resize_rows(4)
+    
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+    
+    def refresh(self, view=None):
+        """更新显示的文件（view为筛选后的文件路径列表，None表示全部文件）并重绘可见行"""
+        self.view = self.model.paths() if view is None else view
+        self.offset = max(0, min(self.offset, len(self.view) - len(self._items)))
+        self.render()
+    
+    def render(self):
+        """只重绘可见的行，测试站和日期只读取可见文件的开头"""
+        for i, item in enumerate(self._items):
+            index = self.offset + i
+            if index >= len(self.view):
+                self.tree.item(item, values=("",) * len(self.COLUMNS))
+                continue
+            file_path = self.view[index]
+            info = self.model.metadata(file_path)
+            self.tree.item(item, values=(
+                "☑" if self.model.is_checked(file_path) else "☐",
+                f"{self.model.number(file_path)}.",
+                os.path.relpath(file_path, self.display_root) if self.display_root else os.path.basename(file_path),
+                info['station'] or "",
+                info['date'].isoformat() if info['date'] else "",
+            ))
+        total = len(self.view)
+        if total <= len(self._items):
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self.offset / total, (self.offset + len(self._items)) / total)
+    
+    def scroll(self, rows):
+        self._scroll_to(self.offset + rows)
+        return "break"
+    
+    def _scroll_to(self, offset):
+        offset = max(0, min(int(offset), len(self.view) - len(self._items)))
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
+    
+    def _on_scroll(self, *args):
+        if args[0] == "moveto":
+            self._scroll_to(round(float(args[1]) * len(self.view)))
+        elif args[0] == "scroll":
+            step = len(self._items) if args[2] == "pages" else 1
+            self._scroll_to(self.offset + int(args[1]) * step)
+    
+    def _resize_rows(self, rows):
+        """按Treeview的高度调整条目数量"""
+        while len(self._items) < rows:
+            self._items.append(self.tree.insert("", "end", values=("",) * len(self.COLUMNS)))
+        while len(self._items) > rows:
+            self.tree.delete(self._items.pop())
+        self.tree.configure(height=rows)
+    
+    def _on_configure(self, event):
+        # 减去标题行的高度
+        rows = max(1, (event.height - self.row_height - 4) // self.row_height)
+        if rows != len(self._items):
+            self._resize_rows(rows)
+            self.refresh(self.view)
+    
+    def _on_click(self, event):
+        """点击任意列切换该行文件的勾选状态"""
+        if self.tree.identify_region(event.x, event.y) != "cell":
+            return None
+        item = self.tree.identify_row(event.y)
+        if item not in self._items:
+            return "break"
+        index = self.offset + self._items.index(item)
+        if index < len(self.view):
+            file_path = self.view[index]
+            self.model.toggle(file_path)
+            self.render()
+            if self.on_toggle is not None:
+                self.on_toggle(file_path)
+        return "break"
+
+# 流水线操作装饰器：开启性能分析模式时，用性能分析器包装下一次调用
+def profiled_action(label):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            if getattr(self, '_profiling_active', False) or not self._profiling_requested():
+                return func(self, *args, **kwargs)
+            return self._run_profiled_action(label, func, args, kwargs)
+        return wrapper
+    return decorator
 
 class TestLogAnalyzer:
     def __init__(self, root):
@@ -108,6 +418,38 @@ class TestLogAnalyzer:
         self.selected_files = []
         self.processed_data = None
         self.spec_data = None  # 规格数据
+        self.attempt_history = None  # 每个SN的测试历史（测试次数、首次/最终结果、时间跨度）
+        self.chunked_report = None  # 分块处理模式的汇总结果
+        self.chunked_threshold_bytes = 1024 * 1024 * 1024  # 选中文件总大小超过该值时建议使用分块处理
+        
+        # 图表管理器：复用各选项卡的Figure和画布
+        self.chart_manager = ChartManager()
+        
+        # 按内容哈希缓存的分析节点（读取的文件、各规格的不良mask、判定结果和下游统计）
+        self.analysis_graph = loganalyzer_core.AnalysisGraph()
+        self.processed_data_key = None  # processed_data的数据版本（由读取的文件签名计算）
+        self.reprocessed_data_key = None  # reprocessed_data对应的数据版本和判定结果
+        # 文件预览缓存 {文件路径: LogPreview} 和"More rows"追加的行数 {文件路径: 行数}
+        self._preview_cache = {}
+        self.preview_extra_rows = {}
+        
+        # Review Criteria规格数据（内存中保存，version作为缓存键，内容改变时才写入TestLogAnalyzer_Criteria.json）
+        self.criteria_store = loganalyzer_core.CriteriaStore()
+        
+        # Find File的目录扫描索引（TestLogAnalyzer_ScanIndex.json，第一次扫描时读取）
+        self.scan_index = loganalyzer_core.DirectoryIndex()
+        
+        # 增量判定: 编辑Review Criteria或拖动色点多边形顶点时只重新计算对应项目的mask，估算良率和Top Defects
+        self.incremental_evaluator = None
+        self._what_if_after_id = None
+        self._pending_criteria_changes = set()  # 等待增量估算的规格 {(窗口类型, 标准类型), ...}
+        self.criteria_store.subscribe(self._on_criteria_changed)
+        
+        # 自动分析流水线：工作线程的回调通过队列交给Tk主线程执行
+        self.pipeline_scheduler = None
+        self._pipeline_results = {}  # {阶段名称: (计算时使用的数据, 结果)}，界面刷新时只使用一次
+        self._main_thread_calls = queue.Queue()
+        self.root.after(20, self._pump_main_thread_calls)
         
         # 创建菜单栏
         self.menu_bar = tk.Menu(root)
@@ -116,6 +458,10 @@ class TestLogAnalyzer:
         self.file_menu = tk.Menu(self.menu_bar, tearoff=0)
         self.file_menu.add_command(label="Load Files", command=self.add_files)
         self.file_menu.add_command(label="Find File", command=self.find_file)
+        # 文件预览只读取表头和开头若干行，勾选后改为在整个文件中均匀随机抽样
+        self.preview_sample_var = tk.BooleanVar(value=False)
+        self.file_menu.add_checkbutton(label="Preview Random Sample", variable=self.preview_sample_var,
+                                       command=self.refresh_data)
         self.file_menu.add_separator()
         self.file_menu.add_command(label="Clear All", command=self.clear_all)
         self.file_menu.add_separator()
@@ -126,6 +472,10 @@ class TestLogAnalyzer:
         self.process_menu = tk.Menu(self.menu_bar, tearoff=0)
         self.process_menu.add_command(label="Data Processing", command=self.data_processing_function)
         self.process_menu.add_command(label="Data Re-Processing", command=self.data_reprocessing_function)
+        self.process_menu.add_command(label="Chunked Processing (Large Files)", command=self.chunked_processing_function)
+        self.process_menu.add_command(label="Watch Folder...", command=self.show_watch_folder)
+        self.process_menu.add_separator()
+        self.process_menu.add_command(label="Run Full Analysis", command=self._post_file_loading_sequence)
         self.menu_bar.add_cascade(label="Data Processing", menu=self.process_menu)
         
         # 数据分析菜单
@@ -135,6 +485,8 @@ class TestLogAnalyzer:
         self.analysis_menu.add_command(label="Cpk", command=self.show_help)
         self.analysis_menu.add_command(label="Criteria", command=self.show_help)
         self.analysis_menu.add_command(label="Color Point Chart", command=self.show_help)
+        self.analysis_menu.add_command(label="Limit Sweep", command=self.show_limit_sweep)
+        self.analysis_menu.add_command(label="Color Bins", command=self.show_color_bins)
         self.menu_bar.add_cascade(label="Data Analysis", menu=self.analysis_menu)
         
         # 保存菜单
@@ -142,10 +494,21 @@ class TestLogAnalyzer:
         self.save_menu.add_command(label="Save as CSV", command=self.save_processed_data)
         self.menu_bar.add_cascade(label="Save", menu=self.save_menu)
         
+        # 性能分析模式：Help菜单或环境变量TESTLOGANALYZER_PROFILE开启后包装下一次处理操作（值为all时包装每次操作），
+        # TESTLOGANALYZER_PROFILER=pyinstrument时使用pyinstrument（需已安装）
+        profile_env = os.environ.get("TESTLOGANALYZER_PROFILE", "").strip().lower()
+        self.profile_all_actions = profile_env == "all"
+        self.profile_next_var = tk.BooleanVar(value=profile_env not in ("", "0", "false", "no", "off"))
+        self.profiler_name = os.environ.get("TESTLOGANALYZER_PROFILER", "cprofile").strip().lower()
+        self._profiling_active = False
+        
         # 帮助菜单
         self.help_menu = tk.Menu(self.menu_bar, tearoff=0)
         self.help_menu.add_command(label="About", command=self.show_about)
         self.help_menu.add_command(label="Help", command=self.show_help)
+        self.help_menu.add_separator()
+        self.help_menu.add_checkbutton(label="Profile Next Action", variable=self.profile_next_var,
+                                       command=self._toggle_profiling)
         self.menu_bar.add_cascade(label="Help", menu=self.help_menu)
         
         # 设置菜单栏到主窗口
@@ -186,38 +549,24 @@ class TestLogAnalyzer:
         self.select_all_button.pack(side="left")
         self.add_hover_effect(self.select_all_button)
         
-        # 文件列表显示区域
-        self.file_list_frame = tk.Frame(self.file_frame)
-        self.file_list_frame.pack(fill="both", expand=True)
-        
-        # 创建Canvas和Scrollbar用于文件列表
-        self.file_list_canvas = tk.Canvas(self.file_list_frame, height=100)
-        self.file_list_canvas.pack(side="left", fill="both", expand=True)
-        
-        self.file_list_scrollbar = tk.Scrollbar(self.file_list_frame, orient="vertical", command=self.file_list_canvas.yview)
-        self.file_list_scrollbar.pack(side="right", fill="y")
-        
-        self.file_list_canvas.configure(yscrollcommand=self.file_list_scrollbar.set)
-        
-        # 创建文件列表容器框架
-        self.file_list_container = tk.Frame(self.file_list_canvas)
-        self.file_list_window = self.file_list_canvas.create_window((0, 0), window=self.file_list_container, anchor="nw", width=self.file_list_canvas.winfo_width())
-        
-        # 绑定事件，确保Canvas窗口正确调整宽度
-        def on_configure(event):
-            self.file_list_canvas.itemconfig(self.file_list_window, width=event.width)
-        self.file_list_canvas.bind("<Configure>", on_configure)
-        
-        # 绑定事件，当内部容器大小改变时更新滚动区域
-        def on_container_configure(event):
-            self.file_list_canvas.configure(scrollregion=self.file_list_canvas.bbox("all"))
-        self.file_list_container.bind("<Configure>", on_container_configure)
-        
-        # 文件选择变量
-        self.file_vars = {}
-        self.file_checks = {}
-        self.file_labels = {}
-        self.file_count = 0  # 用于文件编号计数
+        # 文件筛选区域：按文件名通配符、测试站和日期（YYYY-MM-DD）筛选显示的文件，Select All只作用于显示的文件
+        self.file_filter_frame = tk.Frame(self.file_frame)
+        self.file_filter_frame.pack(fill="x", pady=(5, 0))
+        self.file_filter_vars = {}
+        for key, text, width in (("pattern", "Filter:", 20), ("station", "Station:", 12),
+                                 ("date_from", "Date from:", 11), ("date_to", "to:", 11)):
+            tk.Label(self.file_filter_frame, text=text).pack(side="left", padx=(5, 2))
+            var = tk.StringVar()
+            tk.Entry(self.file_filter_frame, textvariable=var, width=width).pack(side="left")
+            var.trace_add("write", lambda *args: self._apply_file_filter())
+            self.file_filter_vars[key] = var
+        self.file_filter_status_var = tk.StringVar()
+        tk.Label(self.file_filter_frame, textvariable=self.file_filter_status_var, fg="gray").pack(side="left", padx=10)
+        
+        # 文件列表显示区域（数据保存在FileListModel中，界面只绘制可见的行）
+        self.file_model = loganalyzer_core.FileListModel()
+        self.file_list = VirtualFileList(self.file_frame, self.file_model, on_toggle=self.on_checkbox_change)
+        self.file_list.pack(fill="both", expand=True)
         
         # 数据处理区域
         self.process_frame = tk.LabelFrame(self.main_frame, text="Data Processing", padx=5, pady=5)
@@ -322,7 +671,8 @@ class TestLogAnalyzer:
         # 重置按钮状态
         self.color_point_chart_button.config(state=tk.DISABLED)
         
-        # 创建选项卡控件
+        # 创建选项卡控件，除Data Preview外的选项卡内容在第一次选中时才创建 {选项卡路径: 创建函数}
+        self._deferred_tab_builders = {}
         self.tab_control = ttk.Notebook(self.result_frame)
         self.tab_control.pack(fill="both", expand=True)
         
@@ -353,22 +703,22 @@ class TestLogAnalyzer:
         self.yield_analysis_tab = ttk.Frame(self.tab_control)
         self.tab_control.add(self.yield_analysis_tab, text="Yield Analysis")
         
-        # 创建不良率分析图表
-        self.create_yield_analysis_chart()
+        # 创建不良率分析图表（第一次选中时创建）
+        self._defer_tab(self.yield_analysis_tab, self.create_yield_analysis_chart)
         
         # Top 10选项卡
         self.top10_tab = ttk.Frame(self.tab_control)
         self.tab_control.add(self.top10_tab, text="Top Defects")
         
-        # 创建Top 10内容
-        self.create_top10_content()
+        # 创建Top 10内容（第一次选中时创建）
+        self._defer_tab(self.top10_tab, self.create_top10_content)
         
         # Cpk选项卡
         self.cpk_tab = ttk.Frame(self.tab_control)
         self.tab_control.add(self.cpk_tab, text="Cpk")
         
-        # 创建Cpk内容
-        self.create_cpk_content()
+        # 创建Cpk内容（第一次选中时创建）
+        self._defer_tab(self.cpk_tab, self.create_cpk_content)
         
         # 合并的Criteria选项卡
 
@@ -377,8 +727,15 @@ class TestLogAnalyzer:
         self.color_point_chart_tab = ttk.Frame(self.tab_control)
         self.tab_control.add(self.color_point_chart_tab, text="Color Point Chart")
         
-        # 创建Color Point Chart内容
-        self.create_color_point_chart_content()
+        # 创建Color Point Chart内容（第一次选中时创建）
+        self._defer_tab(self.color_point_chart_tab, self.create_color_point_chart_content)
+        
+        # Performance选项卡（各处理阶段的耗时、CPU时间和峰值内存）
+        self.performance_tab = ttk.Frame(self.tab_control)
+        self.tab_control.add(self.performance_tab, text="Performance")
+        
+        # 创建Performance内容（第一次选中时创建，阶段记录在此之前同样会保留）
+        self._defer_tab(self.performance_tab, self.create_performance_content)
         
         # 绑定选项卡选择事件
         self.tab_control.bind("<<NotebookTabChanged>>", self.on_tab_selected)
@@ -688,8 +1045,8 @@ class TestLogAnalyzer:
             criteria_dict: 规格标准字典，用于实际数值超限检查
         """
         try:
-            # 将重新处理的数据存储在类变量中，供Top Defect功能使用
-            self.reprocessed_data = df.copy()
+            # 将重新处理的数据存储在类变量中，供Top Defect功能使用（数据不会再被修改，无需复制）
+            self.reprocessed_data = df
             
             # 清除表格内容
             for widget in self.reprocessing_table_frame.winfo_children():
@@ -710,9 +1067,9 @@ class TestLogAnalyzer:
             # 更新选项卡状态
             self.update_tab_status("Data Re-Processing")
             
-            # 限制显示的行数，最多显示17行
+            # 限制显示的行数，最多显示17行（Date/Time按原始格式显示）
             max_display_rows = 17
-            display_df = df.head(max_display_rows)
+            display_df = loganalyzer_core.format_datetime_columns(df.head(max_display_rows))
             
             # 创建行号表头
             row_num_header = tk.Label(self.reprocessing_table_frame, 
@@ -882,6 +1239,8 @@ class TestLogAnalyzer:
         
         return inside
     
+    @profiled_action("Data Re-Processing")
+    @loganalyzer_core.timed_stage("reprocessing", rows_from='reprocessed_data')
     def data_reprocessing_function(self):
         """
         数据重新处理函数
@@ -905,11 +1264,11 @@ class TestLogAnalyzer:
         坐标数据于2025-10-28从ColorPointSpec选项卡提取，确保了多边形区域判定的准确性和完整性。
         """
         try:
+            import numpy as np
             import pandas as pd  # 确保导入pandas
             import tkinter as tk  # 确保导入tkinter
             import time
             import logging
-            import math  # 确保导入math模块
             global logger
             
             # 添加详细日志记录
@@ -937,7 +1296,6 @@ class TestLogAnalyzer:
                     logger.info("Review Criteria设置已自动保存")
                 if hasattr(self, 'reprocessing_status_var'):
                     self.reprocessing_status_var.set("Review Criteria设置保存完成")
-                time.sleep(0.3)  # 短暂延迟
             
             # 创建进度窗口
             progress_window = tk.Toplevel(self.root)  # 创建独立的顶级窗口
@@ -967,8 +1325,8 @@ class TestLogAnalyzer:
             status_var.set("复制数据进行重新处理...")
             progress_window.update_idletasks()
             
-            # 创建数据副本进行重新处理
-            reprocess_df = self.processed_data.copy()
+            # 创建数据浅副本进行重新处理（只替换Pass/Fail和Fail_Reason列，其他列与processed_data共享）
+            reprocess_df = self.processed_data.copy(deep=False)
             
             # 更新进度条
             progress_var.set(30)
@@ -1106,289 +1464,32 @@ class TestLogAnalyzer:
             else:
                 self.logger.info(f"使用从ColorPointSpec_Current.json文件加载的Mixed多边形({len(cafl24_polygon)}个点)进行CAFL24检查")
             
-            # 初始化Pass/Fail和Fail_Reason列
-            if 'Pass/Fail' not in reprocess_df.columns:
-                reprocess_df['Pass/Fail'] = 'Pass'  # 默认设为Pass
-            else:
-                reprocess_df['Pass/Fail'] = 'Pass'  # 默认设为Pass
-                
-            if 'Fail_Reason' not in reprocess_df.columns:
-                reprocess_df['Fail_Reason'] = ''
-            else:
-                reprocess_df['Fail_Reason'] = ''
-            
-            # 保存原始format_cells字典
             # 注意：不再为'Avg'列继承数据处理阶段的填色逻辑，仅当坐标点不在多边形区域内时才添加淡黄色填充
-            original_format_cells = getattr(self, 'format_cells', {}).copy()
+            # 3. 匹配规格和数据（每条标准只匹配一次列），按列向量化判定
+            # 每条标准和每个多边形的不良mask由analysis_graph按数据版本和标准内容缓存，只修改一条标准时其余mask直接复用
+            limits = loganalyzer_core.resolve_criteria_columns(criteria_dict, list(reprocess_df.columns))
+            polygons = {'White': cafl0_polygon, 'Mixed': cafl24_polygon}
+            if hasattr(self, 'status_bar'):
+                self.status_bar.config(text="使用最新的ColorPointSpec多边形配置进行CAFL0/CAFL24检查")
+            verdict = self.analysis_graph.verdict(reprocess_df, self._processed_data_version(), limits, polygons)
+                
+            # 在所有检测完成后，根据行判定结果更新Pass/Fail和Fail_Reason列（无不良时Fail_Reason为空）
+            reprocess_df['Pass/Fail'] = np.where(verdict.row_fail, 'Fail', 'Pass')
+            reprocess_df['Fail_Reason'] = verdict.reasons.copy()
+            
+            progress_var.set(90)
+            progress_window.update_idletasks()
             
-            # 重置format_cells字典，准备新的格式设置
-            self.format_cells = {}
+            # 记录超限单元格（淡黄色填充）和值为Fail的Pass/Fail类单元格位置，供显示和Top Defects使用
+            self.format_cells = loganalyzer_core.format_cells_from_verdict(reprocess_df, verdict)
             
             # 记录处理结果统计
-            fail_count = 0
             total_count = len(reprocess_df)
-            
-            # 3. 匹配规格和数据，遍历所有单元格
-            for idx, record in reprocess_df.iterrows():
-                # 更新进度条
-                progress_var.set(50 + (idx + 1) / total_count * 40)
-                progress_window.update_idletasks()
-                
-                row_has_fail = False
-                row_failed_criteria = []
-                matched_columns_set = set()  # 用于跟踪当前行已匹配的列
-                
-                try:
-                    # 遍历所有标准
-                    for std_type, limits in criteria_dict.items():
-                        # 确保limits是包含两个元素的元组或列表
-                        try:
-                            # 如果是列表或元组，取前两个元素作为上下限
-                            if isinstance(limits, (list, tuple)) and len(limits) >= 2:
-                                lower_str, upper_str = limits[0], limits[1]
-                            else:
-                                continue
-                        except:
-                            continue
-                            
-                        # 获取标准类型信息
-                        std_info = self._standardize_criteria_type(std_type)
-                        
-                        # 查找匹配的列
-                        column_name = None
-                        if hasattr(self, '_get_best_matching_column'):
-                            column_name = self._get_best_matching_column(std_info, record.index)
-                            if column_name is None:
-                                column_name = self._get_best_matching_column(std_type, record.index)
-                        
-                        # 如果找到匹配列
-                        if column_name is not None and column_name in reprocess_df.columns:
-                            matched_columns_set.add(column_name)
-                            
-                            # 获取记录值
-                            value = record[column_name]
-                            
-                            # 跳过空值
-                            if pd.isna(value):
-                                continue
-                            
-                            # 尝试转换为数值
-                            try:
-                                value_float = float(value)
-                            except:
-                                continue
-                            
-                            # 判断是否超限
-                            is_out_of_range = False
-                            fail_description = None
-                            
-                            # math模块已在文件顶部导入
-                            
-                            # 检查下限
-                            if lower_str:
-                                try:
-                                    lower_limit = float(lower_str)
-                                    # 使用近似比较，但保持严格小于的判断逻辑
-                                    # 如果value_float明显小于lower_limit，则认为超出范围
-                                    if not math.isclose(value_float, lower_limit) and value_float < lower_limit:
-                                        is_out_of_range = True
-                                        fail_description = column_name  # 仅保留列名（不良项目名称）
-                                except:
-                                    pass
-                            
-                            # 检查上限
-                            if upper_str and not is_out_of_range:
-                                try:
-                                    upper_limit = float(upper_str)
-                                    # 使用近似比较，但保持严格大于的判断逻辑
-                                    # 如果value_float明显大于upper_limit，则认为超出范围
-                                    if not math.isclose(value_float, upper_limit) and value_float > upper_limit:
-                                        is_out_of_range = True
-                                        fail_description = column_name  # 仅保留列名（不良项目名称）
-                                except:
-                                    pass
-                            
-                            # 3.1 如果超限，设置单元格填充色为淡黄色，并标记行为Fail
-                            if is_out_of_range:
-                                row_has_fail = True
-                                col_index = reprocess_df.columns.get_loc(column_name)
-                                # 初始化该行的格式列表
-                                if idx not in self.format_cells:
-                                    self.format_cells[idx] = []
-                                # 记录需要淡黄色填充的单元格位置
-                                if col_index not in self.format_cells[idx]:
-                                    self.format_cells[idx].append(col_index)
-                                
-                                # 记录失败原因（保持现有逻辑）
-                                if fail_description:
-                                    row_failed_criteria.append(fail_description)
-                    
-                    # 标准逻辑检查完成，继续进行多边形区域检测
-                    
-                    # 3.2 添加CAFL0和CAFL24多边形区域判定逻辑
-                    # 检查"White u Avg"和"White v Avg"列是否存在
-                    if 'White u Avg' in reprocess_df.columns and 'White v Avg' in reprocess_df.columns:
-                        try:
-                            # 获取当前行的White u/v值
-                            white_u = record['White u Avg']
-                            white_v = record['White v Avg']
-                            
-                            # 检查是否为有效数值
-                            if pd.notna(white_u) and pd.notna(white_v):
-                                white_u = float(white_u)
-                                white_v = float(white_v)
-                                
-                                # 优化版：直接从ColorPointSpec_Current.json文件获取CAFL0多边形顶点坐标
-                                # 优化：直接使用循环外已加载的cafl0_polygon数据
-                                self.logger.info("使用循环外预加载的White多边形数据进行CAFL0检查")
-                                # 记录使用的多边形数据来源，明确标识是从ColorPointSpec_Current.json加载还是使用默认值
-                                if cafl0_polygon and len(cafl0_polygon) >= 3 and len(cafl0_polygon) != 6:
-                                    # 如果有3个以上的点且不是默认的6个点，则认为是从文件加载的
-                                    self.logger.info(f"使用从ColorPointSpec_Current.json文件加载的White多边形({len(cafl0_polygon)}个点)进行CAFL0检查")
-                                    # 更新状态栏，提供实时反馈
-                                    if hasattr(self, 'status_bar'):
-                                        self.status_bar.config(text=f"使用最新的White多边形配置进行CAFL0检查")
-                                else:
-                                    # 使用默认多边形时的日志
-                                    self.logger.info(f"使用默认的White多边形({len(cafl0_polygon)}个点)进行CAFL0检查")
-                                    # 更新状态栏，提示用户使用了默认配置
-                                    if hasattr(self, 'status_bar'):
-                                        self.status_bar.config(text=f"未找到有效的White多边形配置，使用默认值进行CAFL0检查")
-                            
-                            # 判断点是否在CAFL0多边形内
-                            try:
-                                polygon_valid = cafl0_polygon and len(cafl0_polygon) >= 3
-                                
-                                if polygon_valid and not self.is_point_in_polygon((white_u, white_v), cafl0_polygon):
-                                    # 点不在多边形内，需要标记单元格
-                                    row_has_fail = True
-                                    
-                                    # 标记White u Avg列
-                                    white_u_col_idx = reprocess_df.columns.get_loc('White u Avg')
-                                    if idx not in self.format_cells:
-                                        self.format_cells[idx] = []
-                                    if white_u_col_idx not in self.format_cells[idx]:
-                                        self.format_cells[idx].append(white_u_col_idx)
-                                    
-                                    # 标记White v Avg列
-                                    white_v_col_idx = reprocess_df.columns.get_loc('White v Avg')
-                                    if white_v_col_idx not in self.format_cells[idx]:
-                                        self.format_cells[idx].append(white_v_col_idx)
-                                    
-                                    # 添加失败原因 - 仅保留不良项目名称
-                                    fail_reason = "White u Avg; White v Avg"  # White点坐标不良
-                                    if fail_reason not in row_failed_criteria:
-                                        row_failed_criteria.append(fail_reason)
-                                elif not polygon_valid:
-                                    self.logger.warning(f"无效的CAFL0多边形数据，跳过对记录{idx}的White区域检查")
-                            except Exception as polygon_error:
-                                self.logger.error(f"执行CAFL0多边形区域检查时出错: {str(polygon_error)}")
-                                # 出错时不影响整体处理流程，继续下一步
-                        except Exception as e:
-                            # 处理异常，记录日志
-                            if logger:
-                                logger.error(f"处理White u/v Avg数据时出错: {str(e)}")
-                    
-                    # 检查"Mixed u Avg"和"Mixed v Avg"列是否存在
-                    if 'Mixed u Avg' in reprocess_df.columns and 'Mixed v Avg' in reprocess_df.columns:
-                        try:
-                            # 获取当前行的Mixed u/v值
-                            mixed_u = record['Mixed u Avg']
-                            mixed_v = record['Mixed v Avg']
-                            
-                            # 检查是否为有效数值
-                            if pd.notna(mixed_u) and pd.notna(mixed_v):
-                                mixed_u = float(mixed_u)
-                                mixed_v = float(mixed_v)
-                                
-                                # 优化：直接使用循环外已加载的cafl24_polygon数据
-                                self.logger.info("使用循环外预加载的Mixed多边形数据进行CAFL24检查")
-                                # 记录使用的多边形数据来源，明确标识是从ColorPointSpec_Current.json加载还是使用默认值
-                                if cafl24_polygon and len(cafl24_polygon) >= 3:
-                                    self.logger.info(f"使用从ColorPointSpec_Current.json文件加载的Mixed多边形({len(cafl24_polygon)}个点)进行CAFL24检查")
-                                    # 更新状态栏，提供实时反馈
-                                    if hasattr(self, 'status_bar'):
-                                        self.status_bar.config(text=f"使用最新的Mixed多边形配置进行CAFL24检查")
-                                else:
-                                    self.logger.info(f"使用默认的Mixed多边形({len(cafl24_polygon)}个点)进行CAFL24检查")
-                                    # 更新状态栏，提示用户使用了默认配置
-                                    if hasattr(self, 'status_bar'):
-                                        self.status_bar.config(text=f"未找到有效的Mixed多边形配置，使用默认值进行CAFL24检查")
-                                
-                                # 判断点是否在CAFL24多边形内
-                                try:
-                                    polygon_valid = cafl24_polygon and len(cafl24_polygon) >= 3
-                                    
-                                    if polygon_valid and not self.is_point_in_polygon((mixed_u, mixed_v), cafl24_polygon):
-                                        # 点不在多边形内，需要标记单元格
-                                        row_has_fail = True
-                                        
-                                        # 标记Mixed u Avg列
-                                        mixed_u_col_idx = reprocess_df.columns.get_loc('Mixed u Avg')
-                                        if idx not in self.format_cells:
-                                            self.format_cells[idx] = []
-                                        if mixed_u_col_idx not in self.format_cells[idx]:
-                                            self.format_cells[idx].append(mixed_u_col_idx)
-                                        
-                                        # 标记Mixed v Avg列
-                                        mixed_v_col_idx = reprocess_df.columns.get_loc('Mixed v Avg')
-                                        if mixed_v_col_idx not in self.format_cells[idx]:
-                                            self.format_cells[idx].append(mixed_v_col_idx)
-                                        
-                                        # 添加失败原因 - 仅保留不良项目名称
-                                        fail_reason = "Mixed u Avg; Mixed v Avg"  # Mixed点坐标不良
-                                        if fail_reason not in row_failed_criteria:
-                                            row_failed_criteria.append(fail_reason)
-                                    elif not polygon_valid:
-                                        self.logger.warning(f"无效的CAFL24多边形数据，跳过对记录{idx}的Mixed区域检查")
-                                except Exception as polygon_error:
-                                    self.logger.error(f"执行CAFL24多边形区域检查时出错: {str(polygon_error)}")
-                                    # 出错时不影响整体处理流程，继续下一步
-                        except Exception as e:
-                            # 处理异常，记录日志
-                            if logger:
-                                logger.error(f"处理Mixed u/v Avg数据时出错: {str(e)}")
-                    
-                    # 3.3 其它未匹配的单元格，保持白色填充（不做任何处理，默认就是白色）
-                    
-                    # 在所有检测完成后，根据row_has_fail状态更新Pass/Fail列
-                    reprocess_df.at[idx, 'Pass/Fail'] = 'Fail' if row_has_fail else 'Pass'
-                    
-                    # 更新失败计数
-                    if row_has_fail:
-                        if reprocess_df.at[idx, 'Pass/Fail'] == 'Fail' and idx not in [i for i, r in reprocess_df.iterrows() if r['Pass/Fail'] == 'Fail' and i < idx]:
-                            fail_count += 1
-                    
-                    # 更新失败原因列 - 仅当有失败原因时才写入，否则保持为空
-                    if row_failed_criteria:
-                        reprocess_df.at[idx, 'Fail_Reason'] = '; '.join(row_failed_criteria)
-                    # 无不良情况时，Fail_Reason列保持为空（不写入任何内容）
-                    
-                    # 记录Pass/Fail列的位置，用于show_reprocessing_result函数中特殊处理
-                    for col_idx, col_name in enumerate(reprocess_df.columns):
-                        if 'Pass/Fail' in str(col_name):
-                            # 只有当值为'Fail'时才记录单元格位置，确保仅Fail值单元格被着色
-                            if str(reprocess_df.at[idx, col_name]).strip().lower() == 'fail':
-                                if idx not in self.format_cells:
-                                    self.format_cells[idx] = []
-                                if col_idx not in self.format_cells[idx]:
-                                    self.format_cells[idx].append(col_idx)
-                                
-                except Exception as eval_error:
-                    # 处理单个记录评估失败的情况
-                    logging.error(f"评估记录 {idx} 时出错: {str(eval_error)}")
-                    reprocess_df.at[idx, 'Pass/Fail'] = 'Fail'
-                    # 评估失败时仅标记项目名称，不写入详细错误信息
-                    reprocess_df.at[idx, 'Fail_Reason'] = '数据评估'  # 仅保留不良项目名称
-                    fail_count += 1
-            
-            # 更新进度条
-            progress_var.set(95)
-            status_var.set("处理完成，准备显示结果...")
-            progress_window.update_idletasks()
-            
-            # 延迟以确保用户看到完成状态
-            time.sleep(0.3)
+            fail_count = int(verdict.row_fail.sum())
+            self.reprocessed_data_key = self.analysis_graph.key('reprocessed', self._processed_data_version(), verdict.key)
+            # 保存各项目的mask（已缓存，不重新计算），之后修改一条规格或一个多边形时增量估算
+            self.incremental_evaluator = loganalyzer_core.IncrementalEvaluator(
+                self.processed_data, self._processed_data_version(), limits, polygons, graph=self.analysis_graph)
             
             # 更新进度条
             progress_var.set(100)
@@ -1404,6 +1505,7 @@ class TestLogAnalyzer:
                 self.reprocessing_status_var.set(f"Review Criteria判断完成 - 通过: {pass_count}, 失败: {fail_count}")
             
             # 保存重新处理后的数据
+            reprocess_df = self._optimize_memory_dtypes(reprocess_df, "reprocessed data")
             self.reprocessed_data = reprocess_df
             
             # 显示重新处理后的结果
@@ -1436,14 +1538,119 @@ class TestLogAnalyzer:
                         logger.info(f"通过记录数: {pass_count}")
                         logger.info(f"未通过记录数: {fail_count}")
                         
-                        # 记录使用的规格数据来源
-                        if hasattr(self, '_white_criteria_file') and hasattr(self, '_mixed_criteria_file'):
-                            logger.info(f"使用临时文件处理规格数据:")
-                            logger.info(f"  White窗口规格文件: {self._white_criteria_file}")
-                            logger.info(f"  Mixed窗口规格文件: {self._mixed_criteria_file}")
+                        # 记录使用的规格数据版本
+                        logger.info(f"使用的规格数据版本: {self.criteria_store.version}")
                 except Exception:
                     pass
     
+    def _processed_data_version(self):
+        """processed_data的数据版本（analysis_graph节点的输入），不是由Data Processing生成的数据使用一次性的版本"""
+        if self.processed_data_key is None:
+            self.processed_data_key = loganalyzer_core.content_hash('unversioned', id(self.processed_data), time.time_ns())
+        return self.processed_data_key
+    
+    def _reprocessed_data_version(self, data):
+        """data为当前reprocessed_data时返回其数据版本（下游节点的输入），否则返回None（不缓存）"""
+        if self.reprocessed_data_key is None or data is None or data is not getattr(self, 'reprocessed_data', None):
+            return None
+        return self.reprocessed_data_key
+    
+    def _cached_fail_counts(self, data):
+        """Top Defects节点: 按重新处理结果缓存format_cell_fail_counts"""
+        format_cells = getattr(self, 'format_cells', None) or {}
+        version = self._reprocessed_data_version(data)
+        if version is None:
+            return loganalyzer_core.format_cell_fail_counts(format_cells, data)
+        return self.analysis_graph.get('top_defects', self.analysis_graph.key('top_defects', version),
+                                       lambda: loganalyzer_core.format_cell_fail_counts(format_cells, data))
+    
+    def _cached_cpk_data(self, data_type):
+        """Cpk节点: 按重新处理结果、数据类型和规格数据版本缓存_calculate_cpk_data的结果"""
+        version = self._reprocessed_data_version(getattr(self, 'reprocessed_data', None))
+        if version is None:
+            return self._calculate_cpk_data(data_type)
+        key = self.analysis_graph.key('cpk', version, data_type, self.criteria_store.version)
+        return list(self.analysis_graph.get('cpk', key, lambda: self._calculate_cpk_data(data_type)))
+    
+    def _cached_color_point_series(self, data):
+        """Color Point Chart节点: 按processed_data的数据版本缓存u'v'数据点"""
+        if data is None or data is not self.processed_data:
+            return self._extract_color_point_series(data)
+        key = self.analysis_graph.key('color_point_series', self._processed_data_version())
+        return self.analysis_graph.get('color_point_series', key, lambda: self._extract_color_point_series(data))
+    
+    def _schedule_what_if(self, update):
+        """编辑规格或多边形后延迟执行增量估算，连续输入时只执行最后一次（改变的规格在_pending_criteria_changes中累积）"""
+        if self.incremental_evaluator is None:
+            return
+        if self._what_if_after_id is not None:
+            try:
+                self.root.after_cancel(self._what_if_after_id)
+            except tk.TclError:
+                pass
+        
+        def run():
+            self._what_if_after_id = None
+            try:
+                update()
+                # 被多边形修改取消的规格估算一起执行
+                if self._pending_criteria_changes:
+                    self._what_if_criteria()
+            except Exception as e:
+                # 估算失败不影响编辑
+                self.logger.debug(f"What-if update error: {str(e)}")
+        
+        self._what_if_after_id = self.root.after(150, run)
+    
+    def _on_criteria_changed(self, version, changes):
+        """criteria_store的改变事件: 记录改变的规格，延迟后只重新计算这些规格的mask"""
+        if self.incremental_evaluator is None:
+            return
+        self._pending_criteria_changes.update(changes)
+        self._schedule_what_if(self._what_if_criteria)
+    
+    def _what_if_criteria(self):
+        """Review Criteria中的规格修改后，只重新计算改变的规格的mask并显示估算的良率"""
+        evaluator = self.incremental_evaluator
+        changes, self._pending_criteria_changes = self._pending_criteria_changes, set()
+        changed = 0
+        descriptions = []
+        for type_name, std_type in sorted(changes):
+            item = f"{type_name} {std_type}"
+            column = evaluator.column_of(item)
+            if column is None:
+                continue
+            lower_text, upper_text = self.criteria_store.window(type_name).get(std_type, (None, None))
+            # 与保存后重新处理的解析规则一致: 空值或0不判定
+            lower, upper = (float(text) if text else None for text in (lower_text, upper_text))
+            changed += evaluator.set_limit(item, column, lower or None, upper or None)
+            descriptions.append(f"{item} [{lower_text or ''}, {upper_text or ''}]")
+        if descriptions:
+            self._show_what_if_result(", ".join(descriptions), changed)
+    
+    def _what_if_polygon(self, type_name, points):
+        """色点多边形顶点修改后，只重新计算该多边形的mask并显示估算的良率"""
+        if self.incremental_evaluator is None:
+            return
+        changed = self.incremental_evaluator.set_polygon(type_name, points)
+        self._show_what_if_result(f"{type_name} polygon", changed)
+    
+    def _show_what_if_result(self, description, changed):
+        """在状态栏和Data Re-Processing状态中显示估算的良率（总体和各Config）和前3个不良项目"""
+        evaluator = self.incremental_evaluator
+        summary = evaluator.yield_summary()
+        groups = ", ".join(f"{group} {value:.2f}%" for group, value in
+                           zip(summary['Group'].iloc[:-1], summary['Yield (%)'].iloc[:-1]))
+        overall = summary.iloc[-1]
+        top = evaluator.pareto(top=3)
+        top_text = ", ".join(f"{row.Item} ({row.Fail})" for row in top.itertuples() if row.Fail > 0)
+        message = (f"What-if {description}: yield {overall['Yield (%)']:.2f}% "
+                   f"(fail {overall['Fail']}/{overall['Total']}, {changed} rows changed)"
+                   + (f" | {groups}" if groups else "") + (f" | Top: {top_text}" if top_text else ""))
+        self.update_status(message)
+        if hasattr(self, 'reprocessing_status_var'):
+            self.reprocessing_status_var.set(message + " - 运行Data Re-Processing应用修改")
+    
     def show_processing_result(self, df, message=None, is_reprocessing=False):
         """在数据处理选项卡中显示处理结果
         
@@ -1471,9 +1678,9 @@ class TestLogAnalyzer:
         # 更新选项卡状态
         self.update_tab_status("Data Processing")
         
-        # 限制显示的行数，最多显示50行
+        # 限制显示的行数，最多显示50行（Date/Time按原始格式显示）
         max_display_rows = 15
-        display_df = df.head(max_display_rows)
+        display_df = loganalyzer_core.format_datetime_columns(df.head(max_display_rows))
         
         # 创建行号表头
         row_num_header = tk.Label(self.processing_table_frame, 
@@ -1610,11 +1817,29 @@ class TestLogAnalyzer:
         button.bind('<Enter>', on_enter)
         button.bind('<Leave>', on_leave)
 
+    def _defer_tab(self, tab, builder):
+        """登记选项卡内容的创建函数，第一次选中该选项卡时才调用"""
+        self._deferred_tab_builders[str(tab)] = builder
+    
+    def _build_deferred_tab(self, tab):
+        # 选项卡已被其它功能填充内容时不再创建占位内容
+        builder = self._deferred_tab_builders.pop(str(tab), None)
+        if builder is None:
+            return
+        try:
+            if not self.root.nametowidget(str(tab)).winfo_children():
+                builder()
+        except Exception as e:
+            self.logger.warning(f"Deferred tab construction failed: {str(e)}")
+    
     def on_tab_selected(self, event):
         """选项卡选中事件处理"""
         notebook = event.widget
         tab_idx = notebook.index(notebook.select())
         
+        # 第一次选中时创建选项卡内容
+        self._build_deferred_tab(notebook.select())
+        
         # 移除选项卡样式设置，避免不支持style属性的错误
         # 只记录选中状态，不修改样式
         pass
@@ -1630,7 +1855,11 @@ class TestLogAnalyzer:
             pass
     
     def update_status(self, message):
-        """更新状态栏信息并记录日志"""
+        """更新状态栏信息并记录日志（可在工作线程中调用，此时交给主线程更新）"""
+        if threading.current_thread() is not threading.main_thread():
+            self._call_on_main_thread(self.update_status, message)
+            return
+        
         timestamped_message = f"[{time.strftime('%H:%M:%S')}] {message}"
         self.status_var.set(timestamped_message)
         
@@ -1650,7 +1879,7 @@ class TestLogAnalyzer:
         self.root.update_idletasks()
         
     def add_files(self):
-        """添加CSV文件"""
+        """添加CSV文件（也可以选择.gz/.bz2/.xz压缩日志和zip归档，归档展开为其中的CSV成员）"""
         try:
             if logger:
                 logger.info("Start adding CSV files")
@@ -1660,8 +1889,11 @@ class TestLogAnalyzer:
         # 打开文件选择对话框，允许选择多个CSV文件
         file_paths = tk.filedialog.askopenfilenames(
             title="Add CSV Files",
-            filetypes=[("CSV Files", "*.csv"), ("All Files", "*.*")]
+            filetypes=[("CSV Files", "*.csv"), ("Compressed Logs", "*.csv.gz *.csv.bz2 *.csv.xz *.zip"),
+                       ("All Files", "*.*")]
         )
+        # zip归档展开为其中的CSV成员，不需要先解压到磁盘
+        file_paths = loganalyzer_core.expand_log_paths(file_paths)
         
         try:
             if logger:
@@ -1672,187 +1904,205 @@ class TestLogAnalyzer:
         if not file_paths:
             return
         
-        # 为新添加的文件创建复选框和标签
-        first_file_path = None
-        # 计算当前已有文件数量
-        current_count = len(self.file_vars)
-        
-        for file_path in file_paths:
-            # 只获取文件名（不含路径）
-            file_name = os.path.basename(file_path)
-            
-            # 如果文件已存在，跳过
-            if file_path in self.file_vars:
-                continue
-            
-            # 记录第一个文件路径用于预览和保存目录
-            if first_file_path is None:
-                first_file_path = file_path
-                # 保存为实例变量，供保存功能使用
-                self.first_file_path = file_path
-            
-            # 增加文件计数
-            self.file_count += 1
-            
-            # 创建变量存储复选框状态
-            var = tk.BooleanVar(value=True)
-            self.file_vars[file_path] = var
-            
-            # 计算网格位置（每行4个文件）
-            total_files = len(self.file_vars)
-            row = (total_files - 1) // 4
-            col = (total_files - 1) % 4
-            
-            # 创建文件框架
-            file_frame = tk.Frame(self.file_list_container)
-            file_frame.grid(row=row, column=col, padx=5, pady=5, sticky="w")
-            
-            # 创建复选框
-            check = tk.Checkbutton(file_frame, variable=var, 
-                                  command=lambda p=file_path: self.on_checkbox_change(p))
-            check.pack(side="left", padx=2)
-            self.file_checks[file_path] = check
-            
-            # 创建编号标签
-            number_label = tk.Label(file_frame, text=f"{self.file_count}.", width=4, anchor="w")
-            number_label.pack(side="left")
-            
-            # 创建文件名标签
-            label = tk.Label(file_frame, text=file_name, anchor="w")
-            label.pack(side="left")
-            self.file_labels[file_path] = label
-            
-            # 更新状态栏信息
-            self.update_status(f"Successfully added file: {file_name}")
-        
-        # 重新配置滚动区域
-        self.file_list_container.update_idletasks()
-        self.file_list_canvas.configure(scrollregion=self.file_list_canvas.bbox("all"))
-        
-        # 保存选中文件列表，供Save as CSV功能使用
-        self.selected_files = file_paths
+        self._add_loaded_files(file_paths)
         
         # 使用统一的方法更新所有菜单和按钮的状态
         self.update_menu_status(has_files=True, has_selected_files=True)
         
         # 不再自动触发任何其他按钮功能，等待用户手动操作
+    
+    def _add_loaded_files(self, file_paths):
+        """把文件加入文件列表（已在列表中的跳过）并刷新可见的行
+        
+        Returns:
+            新加入的文件路径列表
+        """
+        added = self.file_model.add(file_paths)
+        if added:
+            # 保存第一个新文件的路径，供保存功能使用
+            self.first_file_path = added[0]
+        self._apply_file_filter()
+        
+        # 保存选中文件列表，供Save as CSV功能使用
+        self.selected_files = self.file_model.selected_paths()
+        
+        if len(added) == 1:
+            self.update_status(f"Successfully added file: {os.path.basename(added[0])}")
+        else:
+            self.update_status(f"Successfully added {len(added)} files")
+        return added
+    
+    def _filter_date(self, key):
+        """筛选日期输入框的日期，为空或还不是有效日期时为None"""
+        text = self.file_filter_vars[key].get().strip()
+        if not text:
+            return None
+        value = pd.to_datetime(text, errors='coerce')
+        return None if pd.isna(value) else value.date()
+    
+    def _apply_file_filter(self):
+        """按筛选条件更新文件列表显示的文件（只重绘可见的行）"""
+        pattern = self.file_filter_vars["pattern"].get().strip()
+        station = self.file_filter_vars["station"].get().strip()
+        date_from = self._filter_date("date_from")
+        date_to = self._filter_date("date_to")
+        if not (pattern or station or date_from or date_to):
+            self.file_list.refresh()
+            self.file_filter_status_var.set("")
+            return
+        view = self.file_model.match(pattern, station, date_from, date_to)
+        self.file_list.refresh(view)
+        self.file_filter_status_var.set(f"{len(view)} of {len(self.file_model)} files shown")
+    
+    def _preview_file_var(self, file_path):
+        """数据预览中与文件列表勾选状态联动的变量，文件不在列表中时为None"""
+        if file_path not in self.file_model:
+            return None
+        var = tk.BooleanVar(value=self.file_model.is_checked(file_path))
         
+        def on_write(*args):
+            self.file_model.set_checked([file_path], bool(var.get()))
+            self.file_list.render()
+        var.trace_add("write", on_write)
+        return var
+    
     def _post_file_loading_sequence(self):
-        """文件加载后的自动化处理序列"""
+        """文件加载后的自动化处理序列
+        
+        各阶段按依赖关系执行，依赖的阶段完成后立即开始（不再使用固定的1秒延时）:
+        Data Processing -> Data Re-Processing -> Yield Analysis / Top Defects / Cpk / Color Point Chart。
+        Top Defects、Cpk和Color Point Chart的计算在工作线程中并行执行，结果交回主线程显示；
+        某个分析阶段出错不影响其它分析阶段。
+        """
+        if self.pipeline_scheduler is not None and not self.pipeline_scheduler.finished:
+            self.update_status("自动化分析流程正在执行")
+            return
+        
         try:
-            # 1. 切换到Data Process选项卡
-            if hasattr(self, 'tab_control') and hasattr(self, 'data_processing_tab'):
-                self.tab_control.select(self.data_processing_tab)
-                self.update_status("切换到Data Processing选项卡")
-                
-            # 2. 执行Data Processing功能
-            self.update_status("开始执行Data Processing功能")
-            self.data_processing_function()
-            
-            # 3. 添加延迟，确保数据处理完成
-            self.root.after(1000, self._switch_to_reprocessing)
-            
+            scheduler = loganalyzer_core.PipelineScheduler(dispatch=self._call_on_main_thread,
+                                                           on_stage_finished=self._on_pipeline_stage_finished)
+            scheduler.add_stage('Data Processing', render=lambda _: self._run_processing_stage())
+            scheduler.add_stage('Data Re-Processing', render=lambda _: self._run_reprocessing_stage(),
+                                depends=['Data Processing'])
+            scheduler.add_stage('Yield Analysis', render=lambda _: self._run_pipeline_render(
+                'yield_analysis_tab', self.yield_analysis), depends=['Data Re-Processing'])
+            scheduler.add_stage('Top Defects', compute=lambda _: self._compute_top_defects(),
+                                render=lambda result: self._run_pipeline_render(
+                                    'top10_tab', self.show_top10_tab, 'top_defects', result),
+                                depends=['Data Re-Processing'])
+            scheduler.add_stage('Cpk', compute=lambda _: self._compute_cpk(),
+                                render=lambda result: self._run_pipeline_render(
+                                    'cpk_tab', self.show_cpk_tab, 'cpk', result),
+                                depends=['Data Re-Processing'])
+            scheduler.add_stage('Color Point Chart', compute=lambda _: self._compute_color_point_series(),
+                                render=lambda result: self._run_pipeline_render(
+                                    'color_point_chart_tab', self.show_color_point_chart, 'color_point_chart', result),
+                                depends=['Data Re-Processing'])
+            
+            self.pipeline_scheduler = scheduler
+            self.update_status("开始执行自动化分析流程")
+            scheduler.start(on_finished=self._on_pipeline_finished)
+        
         except Exception as e:
             self.update_status(f"自动化处理序列出错: {str(e)}")
             
-    def _switch_to_reprocessing(self):
-        """切换到重新处理数据选项卡并执行重新处理功能，然后继续执行后续分析功能"""
-        try:
-            # 1. 切换到Data Re-Processing选项卡
-            if hasattr(self, 'tab_control') and hasattr(self, 'data_reprocessing_tab'):
-                self.tab_control.select(self.data_reprocessing_tab)
-                self.update_status("切换到Data Re-Processing选项卡")
-                
-            # 2. 执行重新处理数据功能
-            self.update_status("开始执行重新处理数据功能")
-            self.data_reprocessing_function()
-            
-            # 3. 添加延迟，确保重新处理完成后继续执行
-            self.root.after(1000, self._execute_yield_analysis)
-            
-        except Exception as e:
-            self.update_status(f"重新处理数据序列出错: {str(e)}")
+    def _run_processing_stage(self):
+        """流水线阶段：切换到Data Processing选项卡并执行Data Processing"""
+        previous_data = self.processed_data
+        if hasattr(self, 'tab_control') and hasattr(self, 'data_processing_tab'):
+            self.tab_control.select(self.data_processing_tab)
+        self.data_processing_function()
+        # data_processing_function内部处理异常，没有生成新数据时后续阶段不再执行
+        if self.processed_data is None or self.processed_data is previous_data or self.processed_data.empty:
+            raise RuntimeError("Data Processing did not produce data")
     
-    def _execute_yield_analysis(self):
-        """执行Yield Analysis功能"""
-        try:
-            # 切换到Yield Analysis选项卡
-            if hasattr(self, 'tab_control') and hasattr(self, 'yield_analysis_tab'):
-                self.tab_control.select(self.yield_analysis_tab)
-                self.update_status("切换到Yield Analysis选项卡")
-            
-            # 执行Yield Analysis功能
-            self.update_status("开始执行Yield Analysis功能")
-            self.yield_analysis()
-            
-            # 添加延迟后继续执行Top Defects功能
-            self.root.after(1000, self._execute_top_defects)
-            
-        except Exception as e:
-            self.update_status(f"执行Yield Analysis出错: {str(e)}")
-            # 即使出错也要继续执行下一个功能
-            self.root.after(1000, self._execute_top_defects)
+    def _run_reprocessing_stage(self):
+        """流水线阶段：切换到Data Re-Processing选项卡并执行重新处理
+        
+        重新处理时会保存Criteria临时文件，Cpk阶段在工作线程中读取该文件（Criteria控件只能在主线程中读取）。
+        """
+        previous_data = getattr(self, 'reprocessed_data', None)
+        if hasattr(self, 'tab_control') and hasattr(self, 'data_reprocessing_tab'):
+            self.tab_control.select(self.data_reprocessing_tab)
+        self.data_reprocessing_function()
+        reprocessed_data = getattr(self, 'reprocessed_data', None)
+        if reprocessed_data is None or reprocessed_data is previous_data or reprocessed_data.empty:
+            raise RuntimeError("Data Re-Processing did not produce data")
     
-    def _execute_top_defects(self):
-        """执行Top Defects功能"""
+    def _run_pipeline_render(self, tab_name, show_function, result_key=None, result=None):
+        """流水线阶段：在主线程中切换选项卡并显示结果，result为工作线程预先计算的(数据, 结果)"""
+        if result_key is not None and result is not None:
+            self._pipeline_results[result_key] = result
         try:
-            # 切换到Top Defects选项卡
-            if hasattr(self, 'tab_control') and hasattr(self, 'top10_tab'):
-                self.tab_control.select(self.top10_tab)
-                self.update_status("切换到Top Defects选项卡")
-            
-            # 执行Top Defects功能
-            self.update_status("开始执行Top Defects功能")
-            self.show_top10_tab()
-            
-            # 添加延迟后继续执行Cpk功能
-            self.root.after(1000, self._execute_cpk)
-            
-        except Exception as e:
-            self.update_status(f"执行Top Defects出错: {str(e)}")
-            # 即使出错也要继续执行下一个功能
-            self.root.after(1000, self._execute_cpk)
+            if hasattr(self, 'tab_control') and hasattr(self, tab_name):
+                self.tab_control.select(getattr(self, tab_name))
+            show_function()
+        finally:
+            self._pipeline_results.pop(result_key, None)
     
-    def _execute_cpk(self):
-        """执行Cpk功能"""
-        try:
-            # 切换到Cpk选项卡
-            if hasattr(self, 'tab_control') and hasattr(self, 'cpk_tab'):
-                self.tab_control.select(self.cpk_tab)
-                self.update_status("切换到Cpk选项卡")
-            
-            # 执行Cpk功能
-            self.update_status("开始执行Cpk功能")
-            self.show_cpk_tab()
-            
-            # 添加延迟后继续执行Color Point Chart功能
-            self.root.after(1000, self._execute_color_point_chart)
-            
-        except Exception as e:
-            self.update_status(f"执行Cpk出错: {str(e)}")
-            # 即使出错也要继续执行下一个功能
-            self.root.after(1000, self._execute_color_point_chart)
+    def _take_pipeline_result(self, result_key, data):
+        """取出流水线在工作线程中预先计算的结果，只在计算时使用的数据仍是当前数据时返回"""
+        entry = self._pipeline_results.pop(result_key, None)
+        if entry is None or entry[0] is not data:
+            return None
+        return entry[1]
     
-    def _execute_color_point_chart(self):
-        """执行Color Point Chart功能"""
-        try:
-            # 切换到Color Point Chart选项卡
-            if hasattr(self, 'tab_control') and hasattr(self, 'color_point_chart_tab'):
-                self.tab_control.select(self.color_point_chart_tab)
-                self.update_status("切换到Color Point Chart选项卡")
-            
-            # 执行Color Point Chart功能
-            self.update_status("开始执行Color Point Chart功能")
-            self.show_color_point_chart()
-            
-            # 所有功能执行完成
-            self.update_status("自动化分析流程执行完成")
-            
-        except Exception as e:
-            self.update_status(f"执行Color Point Chart出错: {str(e)}")
+    def _compute_top_defects(self):
+        """工作线程：统计Top Defects的不良单元格数量"""
+        data = self.reprocessed_data
+        return data, self._cached_fail_counts(data)
     
-    def update_menu_status(self, has_files=False, has_selected_files=False, has_processed_data=False):
-        """更新菜单和按钮的状态"""
+    def _compute_cpk(self):
+        """工作线程：计算White和Mixed的Cpk数据"""
+        data = self.reprocessed_data
+        return data, {data_type: self._cached_cpk_data(data_type) for data_type in ("White", "Mixed")}
+    
+    def _compute_color_point_series(self):
+        """工作线程：提取Color Point Chart的u'v'数据点"""
+        data = self.processed_data
+        return data, self._cached_color_point_series(data)
+    
+    def _on_pipeline_stage_finished(self, stage):
+        """流水线阶段结束时更新状态栏"""
+        if stage.state == 'done':
+            self.update_status(f"{stage.name} completed in {stage.wall:.2f} s")
+        elif stage.state == 'failed':
+            self.update_status(f"执行{stage.name}出错: {str(stage.error)}")
+        elif stage.state == 'skipped':
+            self.update_status(f"{stage.name} skipped")
+    
+    def _on_pipeline_finished(self, scheduler):
+        states = [stage.state for stage in scheduler.stages.values()]
+        if all(state == 'done' for state in states):
+            self.update_status("自动化分析流程执行完成")
+        else:
+            self.update_status(f"自动化分析流程结束: {states.count('done')}/{len(states)} stages completed")
+    
+    def _call_on_main_thread(self, callback, *args):
+        """在Tk主线程中执行callback：主线程中用after(0)排队，工作线程中放入队列由主线程取出执行"""
+        if threading.current_thread() is threading.main_thread():
+            self.root.after(0, callback, *args)
+        else:
+            self._main_thread_calls.put((callback, args))
+    
+    def _pump_main_thread_calls(self):
+        """在主线程中执行工作线程提交的回调"""
+        try:
+            while True:
+                callback, args = self._main_thread_calls.get_nowait()
+                try:
+                    callback(*args)
+                except Exception as e:
+                    self.logger.exception(f"Main thread callback failed: {str(e)}")
+        except queue.Empty:
+            pass
+        try:
+            self.root.after(20, self._pump_main_thread_calls)
+        except tk.TclError:
+            pass  # 窗口已关闭
+    
+    def update_menu_status(self, has_files=False, has_selected_files=False, has_processed_data=False):
+        """更新菜单和按钮的状态"""
         # 更新File菜单
         if hasattr(self, 'file_menu'):
             # Clear All菜单项的状态与Clear Data按钮保持一致
@@ -1921,7 +2171,7 @@ class TestLogAnalyzer:
                 for i in range(self.process_menu.index('end') + 1):
                     try:
                         label = self.process_menu.entrycget(i, 'label')
-                        if label == 'Data Processing':
+                        if label in ('Data Processing', 'Chunked Processing (Large Files)', 'Run Full Analysis'):
                             self.process_menu.entryconfig(i, state=tk.NORMAL)
                         elif label == 'Data Re-Processing':
                             # 只有在有已处理数据的情况下才启用Data Re-Processing
@@ -1937,7 +2187,8 @@ class TestLogAnalyzer:
                 for i in range(self.process_menu.index('end') + 1):
                     try:
                         label = self.process_menu.entrycget(i, 'label')
-                        if label == 'Data Processing' or label == 'Data Re-Processing':
+                        if label in ('Data Processing', 'Data Re-Processing', 'Chunked Processing (Large Files)',
+                                     'Run Full Analysis'):
                             self.process_menu.entryconfig(i, state=tk.DISABLED)
                     except:
                         pass
@@ -2023,7 +2274,7 @@ class TestLogAnalyzer:
         """复选框状态改变时的处理函数"""
         # 不再自动预览文件，等待用户点击刷新按钮
         # 检查是否还有选中的文件
-        selected_files = [path for path, var in self.file_vars.items() if var.get()]
+        selected_files = self.file_model.selected_paths()
         # 无论是否有选中文件，都更新self.selected_file
         self.selected_files = selected_files
         
@@ -2042,7 +2293,7 @@ class TestLogAnalyzer:
                 self.read_colorpoint_spec_button.config(state=tk.DISABLED)
         
         # 更新菜单和按钮状态
-        self.update_menu_status(has_files=bool(self.file_vars), has_selected_files=bool(selected_files))
+        self.update_menu_status(has_files=len(self.file_model) > 0, has_selected_files=bool(selected_files))
         
     def refresh_data(self):
         """加载数据预览"""
@@ -2055,7 +2306,7 @@ class TestLogAnalyzer:
     def preview_all_selected_files(self):
         """预览所有选中的文件"""
         # 获取所有选中的文件
-        selected_files = [path for path, var in self.file_vars.items() if var.get()]
+        selected_files = self.file_model.selected_paths()
         
         # 保存最新的选中文件列表，供Save as CSV功能使用
         self.selected_files = selected_files
@@ -2079,111 +2330,9 @@ class TestLogAnalyzer:
                 # 更新状态栏信息
                 self.update_status(f"Processing file: {file_name}")
                 
-                # 智能检测CSV文件中的数据标题行
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    lines = []
-                    for i in range(20):
-                        line = f.readline()
-                        if not line:
-                            break
-                        lines.append(line.strip())
-                    
-                    # 识别元数据行（通常是键值对格式，如"键:,值"的形式）
-                    metadata_lines = []
-                    non_metadata_lines = []
-                    
-                    for i, line in enumerate(lines):
-                        # 元数据行的特征: 通常包含键值对格式
-                        # 1. 检查是否包含冒号加逗号的模式（如"键:,值"）
-                        # 2. 检查行的开头是否包含典型的元数据键名
-                        is_metadata = False
-                        
-                        # 检查标点符号模式
-                        if ',:' in line or (':' in line and ',' in line):
-                            is_metadata = True
-                        
-                        # 检查是否为典型的元数据行（有内容但不是标题行）
-                        elif line.strip() and i < 10 and not (line.startswith('Model') or line.startswith('Serial Number')):
-                            # 检查行是否有有意义的内容且不是明显的标题行
-                            content_parts = [p.strip() for p in line.split(',') if p.strip()]
-                            if content_parts and ':' in content_parts[0]:
-                                is_metadata = True
-                        
-                        if is_metadata:
-                            metadata_lines.append(i)
-                        else:
-                            non_metadata_lines.append((i, line))
-                    
-                    # 如果有非元数据行，在这些行中寻找包含最多逗号的非空行作为标题行
-                    max_commas = -1
-                    header_line_candidates = []
-                    header_line_index = 0
-                    
-                    # 首先筛选出非空的非元数据行
-                    non_empty_non_metadata = [(i, line) for i, line in non_metadata_lines if line.strip()]
-                    
-                    if non_empty_non_metadata:
-                        # 找到所有非空非元数据行中的最大逗号数
-                        max_commas = max(line.count(',') for i, line in non_empty_non_metadata)
-                        # 获取所有具有最大逗号数的候选行
-                        header_line_candidates = [(i, line) for i, line in non_empty_non_metadata if line.count(',') == max_commas]
-                        
-                        if header_line_candidates:
-                            # 增强选择逻辑: 优先选择包含字母字符、内容长度更长的行作为标题行
-                            # 计算每个候选行的分数
-                            best_score = -1
-                            for i, line in header_line_candidates:
-                                # 基础分数（保证至少有一个分数）
-                                score = 1
-                                # 包含字母字符加分（标题行通常包含字段名）
-                                if any(c.isalpha() for c in line):
-                                    score += 10
-                                # 内容长度加分（不含逗号）
-                                content_length = len(line.replace(',', ''))
-                                score += min(content_length, 50)  # 内容长度最多加50分
-                                
-                                if score > best_score:
-                                    best_score = score
-                                    header_line_index = i
-                    elif non_metadata_lines:
-                        # 如果所有非元数据行都是空的，使用原始方法
-                        for i, line in non_metadata_lines:
-                            comma_count = line.count(',')
-                            if comma_count > max_commas:
-                                max_commas = comma_count
-                                header_line_index = i
-                    else:
-                        # 如果没有非元数据行，使用原始方法寻找最多逗号的行
-                        for i, line in enumerate(lines):
-                            comma_count = line.count(',')
-                            if comma_count > max_commas:
-                                max_commas = comma_count
-                                header_line_index = i
-                    
-                    # 再次检查: 确保找到的标题行不是全空的，且有合理数量的非空列
-                    if header_line_index < len(lines) and lines[header_line_index].strip() == '':
-                        self.update_status(f"Warning: Empty header line detected (Line {header_line_index+1}). Trying to find the next suitable line.")
-                        # 寻找下一个非空行
-                        for i in range(header_line_index + 1, min(len(lines), header_line_index + 10)):
-                            if lines[i].strip() != '':
-                                header_line_index = i
-                                max_commas = lines[i].count(',')
-                                break
-                    
-                    # 确定是否使用检测到的标题行
-                    if header_line_index < len(lines) and max_commas >= 9:
-                        # 如果找到明显的标题行（逗号数足够多），使用它
-                        self.update_status(f"Data header line detected (Line {header_line_index+1}) with {max_commas+1} columns.")
-                        df = pd.read_csv(file_path, 
-                                        skiprows=header_line_index,  # 跳过说明性行
-                                        on_bad_lines='skip',    # 跳过有问题的行
-                                        engine='python')        # 使用Python解析器
-                    else:
-                        # 如果没有找到明显的标题行，尝试使用默认方式读取
-                        self.update_status("No obvious data header line detected. Trying to read with default settings.")
-                        df = pd.read_csv(file_path, 
-                                        on_bad_lines='skip',    # 跳过有问题的行
-                                        engine='python')        # 使用Python解析器
+                # 只读取表头和需要显示的行（表头识别结果随预览缓存）
+                preview = self._load_file_preview(file_path, self._preview_row_limit(file_path, 3))
+                df = preview.df
                 
                 # 记录文件名和数据
                 all_files_data.append((file_path, file_name, df))
@@ -2203,10 +2352,63 @@ class TestLogAnalyzer:
             self.reset_data_preview_table()
             self.empty_table_label.config(text="No files were successfully processed.")
     
+    def _preview_row_limit(self, file_path, default_rows):
+        """文件预览需要读取的行数: 默认行数加上"More rows"追加的行数，显示所有行时为None（流式读取全部）"""
+        if getattr(self, 'show_all_rows', False):
+            return None
+        return default_rows + self.preview_extra_rows.get(file_path, 0)
+    
+    def _load_file_preview(self, file_path, rows):
+        """读取文件预览（表头和前rows行），文件未改变时复用缓存并只继续读取还未读取的行
+        
+        Returns:
+            loganalyzer_core.LogPreview
+        """
+        file_name = os.path.basename(file_path)
+        sample = bool(self.preview_sample_var.get()) and rows is not None
+        preview = self._preview_cache.get(file_path)
+        if preview is not None and (not preview.is_current() or preview.sampled != sample
+                                    or (sample and len(preview.df) != rows)):
+            preview = None
+        
+        if preview is None:
+            header = loganalyzer_core.sniff_log_header(file_path)
+            if header.has_header:
+                self.update_status(f"Data header line detected (Line {header.header_line_index+1}) "
+                                   f"with {header.max_commas+1} columns.")
+            else:
+                self.update_status("No obvious data header line detected. Trying to read with default settings.")
+            if header.encoding != 'utf-8':
+                self.update_status(f"Detected file encoding: {header.encoding}")
+            preview = loganalyzer_core.read_log_preview(file_path, rows, sample=sample, header=header)
+            self._preview_cache[file_path] = preview
+        elif rows is None or len(preview.df) < rows:
+            self.update_status(f"Reading more rows from {file_name}...")
+            loganalyzer_core.read_more_preview_rows(preview, None if rows is None else rows - len(preview.df))
+        return preview
+    
+    def _preview_rows_text(self, file_path, df):
+        """预览中显示的文件行数文本: 已读到末尾（或抽样时扫描了整个文件）时为实际行数，否则为估算值"""
+        preview = self._preview_cache.get(file_path)
+        if preview is None or preview.df is not df:
+            return str(len(df))
+        estimated = preview.estimated_rows
+        if preview.complete and estimated is not None:
+            return str(estimated)
+        return f"~{estimated}" if estimated is not None else "?"
+    
+    def _show_more_preview_rows(self, file_path, multiple_files=True):
+        """流式读取并显示该文件接下来的PREVIEW_MORE_ROWS行"""
+        self.preview_extra_rows[file_path] = self.preview_extra_rows.get(file_path, 0) + PREVIEW_MORE_ROWS
+        if multiple_files:
+            self.preview_all_selected_files()
+        else:
+            self.preview_first_selected_file()
+    
     def preview_first_selected_file(self):
         """预览第一个选中的文件（保持向后兼容）"""
         # 获取所有选中的文件
-        selected_files = [path for path, var in self.file_vars.items() if var.get()]
+        selected_files = self.file_model.selected_paths()
         
         if not selected_files:
             self.update_status("No files selected.")
@@ -2220,116 +2422,9 @@ class TestLogAnalyzer:
             # 更新状态栏信息
             self.update_status(f"Previewing file: {file_name}")
             
-            # 智能检测CSV文件中的数据标题行
-            with open(first_file_path, 'r', encoding='utf-8') as f:
-                    lines = []
-                    for i in range(20):
-                        line = f.readline()
-                        if not line:
-                            break
-                        lines.append(line.strip())
-                    
-                    # 识别元数据行（通常是键值对格式，如"键:,值"的形式）
-                    metadata_lines = []
-                    non_metadata_lines = []
-                    
-                    for i, line in enumerate(lines):
-                        # 元数据行的特征: 通常包含键值对格式
-                        # 1. 检查是否包含冒号加逗号的模式（如"键:,值"）
-                        # 2. 检查行的开头是否包含典型的元数据键名
-                        is_metadata = False
-                        
-                        # 检查标点符号模式
-                        if ',:' in line or (':' in line and ',' in line):
-                            is_metadata = True
-                        
-                        # 检查是否为典型的元数据行（有内容但不是标题行）
-                        elif line.strip() and i < 10 and not (line.startswith('Model') or line.startswith('Serial Number')):
-                            # 检查行是否有有意义的内容且不是明显的标题行
-                            content_parts = [p.strip() for p in line.split(',') if p.strip()]
-                            if content_parts and ':' in content_parts[0]:
-                                is_metadata = True
-                        
-                        if is_metadata:
-                            metadata_lines.append(i)
-                        else:
-                            non_metadata_lines.append((i, line))
-                    
-                    # 如果有非元数据行，在这些行中寻找包含最多逗号的非空行作为标题行
-                    max_commas = -1
-                    header_line_candidates = []
-                    header_line_index = 0
-                    
-                    # 首先筛选出非空的非元数据行
-                    non_empty_non_metadata = [(i, line) for i, line in non_metadata_lines if line.strip()]
-                    
-                    if non_empty_non_metadata:
-                        # 找到所有非空非元数据行中的最大逗号数
-                        max_commas = max(line.count(',') for i, line in non_empty_non_metadata)
-                        # 获取所有具有最大逗号数的候选行
-                        header_line_candidates = [(i, line) for i, line in non_empty_non_metadata if line.count(',') == max_commas]
-                        
-                        if header_line_candidates:
-                            # 增强选择逻辑: 优先选择包含字母字符、内容长度更长的行作为标题行
-                            # 计算每个候选行的分数
-                            best_score = -1
-                            for i, line in header_line_candidates:
-                                # 基础分数（保证至少有一个分数）
-                                score = 1
-                                # 包含字母字符加分（标题行通常包含字段名）
-                                if any(c.isalpha() for c in line):
-                                    score += 10
-                                # 内容长度加分（不含逗号）
-                                content_length = len(line.replace(',', ''))
-                                score += min(content_length, 50)  # 内容长度最多加50分
-                                
-                                if score > best_score:
-                                    best_score = score
-                                    header_line_index = i
-                    elif non_metadata_lines:
-                        # 如果所有非元数据行都是空的，使用原始方法
-                        for i, line in non_metadata_lines:
-                            comma_count = line.count(',')
-                            if comma_count > max_commas:
-                                max_commas = comma_count
-                                header_line_index = i
-                    else:
-                        # 如果没有非元数据行，使用原始方法寻找最多逗号的行
-                        for i, line in enumerate(lines):
-                            comma_count = line.count(',')
-                            if comma_count > max_commas:
-                                max_commas = comma_count
-                                header_line_index = i
-                    
-                    # 再次检查: 确保找到的标题行不是全空的，且有合理数量的非空列
-                    if header_line_index < len(lines) and lines[header_line_index].strip() == '':
-                        self.update_status(f"Warning: Empty header line detected (Line {header_line_index+1}). Trying to find the next suitable line.")
-                        # 寻找下一个非空行
-                        for i in range(header_line_index + 1, min(len(lines), header_line_index + 10)):
-                            if lines[i].strip() != '':
-                                header_line_index = i
-                                max_commas = lines[i].count(',')
-                                break
-                    
-                    # 额外检查: 如果找到的标题行内容太短，考虑是否为真正的标题行
-                    if header_line_index < len(lines) and len(lines[header_line_index].strip()) < 20 and max_commas >= 5:
-                        self.update_status(f"Warning: Header line content is too short (Line {header_line_index+1}). Please confirm manually.")
-                    
-                    # 确定是否使用检测到的标题行
-                    if max_commas >= 9:
-                        # 如果找到明显的标题行（逗号数足够多），使用它
-                        self.update_status(f"Data header line detected (Line {header_line_index+1}). Columns: {max_commas+1}")
-                        self.update_status(f"Excluded metadata lines: {len(metadata_lines)}")
-                        df = pd.read_csv(first_file_path,
-                                        skiprows=header_line_index,  # 跳过说明性行
-                                        on_bad_lines='skip',    # 跳过有问题的行
-                                        engine='python')        # 使用Python解析器
-                    else:
-                        # 如果没有找到明显的标题行，尝试使用默认方式读取
-                        self.update_status("No obvious data header line detected. Trying default read.")
-                        df = pd.read_csv(first_file_path,
-                                        on_bad_lines='skip',    # 跳过有问题的行
-                                        engine='python')        # 使用Python解析器
+            # 只读取表头和需要显示的行（表头识别结果随预览缓存）
+            preview = self._load_file_preview(first_file_path, self._preview_row_limit(first_file_path, 5))
+            df = preview.df
             
             # 更新数据预览表格，传递当前文件路径和文件名
             self.update_data_preview_table(df, first_file_path, file_name)
@@ -2341,83 +2436,33 @@ class TestLogAnalyzer:
             messagebox.showerror("Error", f"Failed to preview file {file_name}: {str(e)}")
             self.update_status(f"Preview file failed: {file_name}")
         
-    def find_file(self):
-        """查找文件"""
-        pass
-        
     def remove_selected(self):
         """移除选中的文件"""
         pass
         
     def unload_selected_files(self):
         """卸载选中的文件"""
-        if not hasattr(self, 'file_vars') or not self.file_vars:
+        if not len(self.file_model):
             tk.messagebox.showinfo("Warning", "No files to unload!")
             return
         
         # 获取选中的文件路径
-        selected_files = [path for path, var in self.file_vars.items() if var.get()]
+        selected_files = self.file_model.selected_paths()
         
         if not selected_files:
             tk.messagebox.showinfo("Warning", "Please select files to unload!")
             return
         
-        # 删除选中的文件
-        for file_path in selected_files:
-            if file_path in self.file_vars:
-                del self.file_vars[file_path]
-            if file_path in self.file_checks:
-                del self.file_checks[file_path]
-            if file_path in self.file_labels:
-                del self.file_labels[file_path]
-            
-        # 重新显示剩余文件
-        for widget in self.file_list_container.winfo_children():
-            widget.destroy()
-        
-        # 重新创建文件列表
-        self.file_count = 0
-        remaining_files = list(self.file_vars.keys())
-        
-        for i, file_path in enumerate(remaining_files):
-            # 只获取文件名（不含路径）
-            file_name = os.path.basename(file_path)
-            
-            # 增加文件计数
-            self.file_count += 1
-            
-            # 计算网格位置（每行4个文件）
-            row = (i) // 4
-            col = (i) % 4
-            
-            # 创建文件框架
-            file_frame = tk.Frame(self.file_list_container)
-            file_frame.grid(row=row, column=col, padx=5, pady=5, sticky="w")
-            
-            # 创建复选框
-            check = tk.Checkbutton(file_frame, variable=self.file_vars[file_path], command=lambda path=file_path: self.on_checkbox_change(path))
-            check.pack(side="left", padx=2)
-            self.file_checks[file_path] = check
-            
-            # 创建编号标签
-            number_label = tk.Label(file_frame, text=f"{self.file_count}.", width=4, anchor="w")
-            number_label.pack(side="left")
-            
-            # 创建文件名标签
-            label = tk.Label(file_frame, text=file_name, anchor="w")
-            label.pack(side="left")
-            self.file_labels[file_path] = label
-        
-        # 重新配置滚动区域
-        self.file_list_container.update_idletasks()
-        self.file_list_canvas.configure(scrollregion=self.file_list_canvas.bbox("all"))
+        # 删除选中的文件，剩余文件重新编号
+        self.file_model.remove(selected_files)
+        self._apply_file_filter()
         
         # 清空选中文件列表
         if hasattr(self, 'selected_files'):
             self.selected_files = []
         
         # 检查是否还有剩余文件
-        has_remaining_files = bool(self.file_vars)
+        has_remaining_files = len(self.file_model) > 0
         
         # 更新菜单状态
         self.update_menu_status(has_files=has_remaining_files, has_selected_files=False)
@@ -2435,11 +2480,16 @@ class TestLogAnalyzer:
             self.refresh_button.config(state=tk.DISABLED)
     
     def find_file(self):
-        """在指定目录中使用通配符查找CSV文件"""
+        """在指定目录中使用通配符查找CSV文件
+        
+        扫描在工作线程中进行（loganalyzer_core.scan_directory，线程池递归os.scandir），找到的文件分批显示，
+        可随时停止；可按文件大小和修改日期筛选，使用扫描索引时未改变的目录不再重新读取。
+        .gz/.bz2/.xz压缩日志去掉压缩扩展名后匹配，zip归档中的CSV成员直接列出，加载后不需要解压到磁盘。
+        """
         # 创建查找文件对话框
         find_window = tk.Toplevel(self.root)
         find_window.title("Find CSV Files")
-        find_window.geometry("700x500")  # 增大窗口大小
+        find_window.geometry("800x550")  # 增大窗口大小
         find_window.resizable(True, True)
         
         # 居中显示
@@ -2474,169 +2524,147 @@ class TestLogAnalyzer:
         pattern_entry = tk.Entry(pattern_frame, textvariable=pattern_var, width=50)
         pattern_entry.pack(side="left", fill="x", expand=True, padx=5)
         
-        # 搜索结果显示区域
+        # 大小和修改日期筛选区域（为空时不限制）
+        filter_frame = tk.Frame(find_window)
+        filter_frame.pack(fill="x", padx=10, pady=(5, 5))
+        filter_vars = {}
+        for key, text in (("min_kb", "Min size (KB):"), ("max_kb", "Max size (KB):"),
+                          ("date_from", "Modified from:"), ("date_to", "to:")):
+            tk.Label(filter_frame, text=text).pack(side="left", padx=(5, 2))
+            filter_vars[key] = tk.StringVar()
+            tk.Entry(filter_frame, textvariable=filter_vars[key], width=11).pack(side="left")
+        use_index_var = tk.BooleanVar(value=True)
+        tk.Checkbutton(filter_frame, text="Use scan index", variable=use_index_var).pack(side="left", padx=10)
+        
+        # 搜索结果显示区域（与文件列表相同的虚拟化列表）
         result_frame = tk.Frame(find_window)
         result_frame.pack(fill="both", expand=True, padx=10, pady=10)
         
         tk.Label(result_frame, text="Search Results:", anchor="w").pack(fill="x")
         
-        result_canvas = tk.Canvas(result_frame)
-        result_canvas.pack(side="left", fill="both", expand=True)
-        
-        result_scrollbar = tk.Scrollbar(result_frame, orient="vertical", command=result_canvas.yview)
-        result_scrollbar.pack(side="right", fill="y")
-        
-        result_canvas.configure(yscrollcommand=result_scrollbar.set)
-        
-        result_container = tk.Frame(result_canvas)
-        result_window = result_canvas.create_window((0, 0), window=result_container, anchor="nw", width=result_canvas.winfo_width())
-        
-        # 绑定Canvas配置事件
-        def on_result_configure(event):
-            result_canvas.itemconfig(result_window, width=event.width)
-        result_canvas.bind("<Configure>", on_result_configure)
-        
-        def on_result_container_configure(event):
-            result_canvas.configure(scrollregion=result_canvas.bbox("all"))
-        result_container.bind("<Configure>", on_result_container_configure)
+        result_model = loganalyzer_core.FileListModel()
+        result_list = VirtualFileList(result_frame, result_model)
+        result_list.pack(fill="both", expand=True)
         
         # 状态标签
         status_label = tk.Label(find_window, text="Ready", anchor="w")
         status_label.pack(fill="x", padx=10, pady=5)
         
-        # 文件变量存储
-        found_files = []
-        file_vars = []
+        # 当前扫描的取消事件，没有正在进行的扫描时为None
+        scan = {'cancel': None}
+        
+        def parse_filters():
+            """把筛选输入转换为scan_directory的参数，输入无效时抛出ValueError"""
+            filters = {}
+            for key, argument in (("min_kb", "min_size"), ("max_kb", "max_size")):
+                text = filter_vars[key].get().strip()
+                if text:
+                    filters[argument] = float(text) * 1024
+            for key, argument in (("date_from", "modified_after"), ("date_to", "modified_before")):
+                text = filter_vars[key].get().strip()
+                if text:
+                    value = pd.to_datetime(text, errors='coerce')
+                    if pd.isna(value):
+                        raise ValueError(f"Invalid date: {text}")
+                    # 结束日期包含当天
+                    if key == "date_to":
+                        value += pd.Timedelta(days=1)
+                    filters[argument] = time.mktime(value.timetuple())
+            return filters
+        
+        def show_batch(cancel_event, paths):
+            if scan['cancel'] is not cancel_event:
+                return
+            result_model.add(paths, checked=False)
+            result_list.refresh()
+            status_label.config(text=f"Searching... found {len(result_model)} files")
+        
+        def finish_search(cancel_event, result):
+            if scan['cancel'] is not cancel_event:
+                return
+            scan['cancel'] = None
+            if isinstance(result, Exception):
+                tk.messagebox.showerror("Searching error ", f"Searching error: {str(result)}", parent=find_window)
+                status_label.config(text="Search failed")
+                return
+            # 按路径排序显示，保留已勾选的文件
+            checked_paths = result_model.selected_paths()
+            result_model.clear()
+            result_model.add([file_path for file_path, _, _ in result['files']], checked=False)
+            result_model.set_checked(checked_paths, True)
+            result_list.refresh()
+            
+            message = (f"Found {len(result['files'])} files in {result['directories']} directories "
+                       f"({result['indexed_directories']} from index) in {result['seconds']:.2f} s")
+            if result['errors']:
+                message += f", {result['errors']} directories could not be read"
+            if result['cancelled']:
+                message += " (stopped)"
+            status_label.config(text=message)
         
-        # 定义内部函数
         def search_files():
-            # 清空之前的结果
-            for widget in result_container.winfo_children():
-                widget.destroy()
-            found_files.clear()
-            file_vars.clear()
-            
+            if scan['cancel'] is not None:
+                return
             directory = dir_var.get()
-            pattern = pattern_var.get()
-            
             if not os.path.isdir(directory):
-                tk.messagebox.showerror("Error", "Please select a valid directory!")
+                tk.messagebox.showerror("Error", "Please select a valid directory!", parent=find_window)
                 return
-            
             try:
-                # 转换通配符为正则表达式
-                regex_pattern = fnmatch.translate(pattern)
-                regex = re.compile(regex_pattern)
-                
-                # 搜索文件
-                for root, dirs, files in os.walk(directory):
-                    for file in files:
-                        if regex.match(file) and file.lower().endswith('.csv'):
-                            file_path = os.path.join(root, file)
-                            found_files.append(file_path)
-                
-                # 显示搜索结果
-                tk.Label(result_container, text=f"Found {len(found_files)} files:", anchor="w").pack(fill="x", pady=(0, 5))
-                
-                if found_files:
-                    for i, file_path in enumerate(found_files):
-                        var = tk.BooleanVar(value=False)
-                        file_vars.append(var)
-                        
-                        frame = tk.Frame(result_container)
-                        frame.pack(fill="x", pady=2)
-                        
-                        check = tk.Checkbutton(frame, variable=var)
-                        check.pack(side="left", padx=5)
-                        
-                        # 显示相对路径
-                        rel_path = os.path.relpath(file_path, directory)
-                        label = tk.Label(frame, text=rel_path, anchor="w")
-                        label.pack(side="left", fill="x", expand=True)
-                
-                # 更新滚动区域
-                result_container.update_idletasks()
-                result_canvas.configure(scrollregion=result_canvas.bbox("all"))
-                
-                # 更新状态标签
-                status_label.config(text=f"Found {len(found_files)} files")
+                filters = parse_filters()
+            except ValueError as e:
+                tk.messagebox.showerror("Error", f"Invalid filter: {str(e)}", parent=find_window)
+                return
+            
+            # 清空之前的结果
+            result_model.clear()
+            result_list.display_root = directory
+            result_list.refresh()
+            status_label.config(text="Searching...")
                 
-            except Exception as e:
-                tk.messagebox.showerror("Searching error ", f"Searching error: {str(e)}")
+            cancel_event = threading.Event()
+            scan['cancel'] = cancel_event
+            pattern = pattern_var.get()
+            index = self.scan_index if use_index_var.get() else None
+            
+            def run():
+                try:
+                    result = loganalyzer_core.scan_directory(
+                        directory, pattern, cancel_event=cancel_event, index=index,
+                        on_batch=lambda batch: self._call_on_main_thread(
+                            show_batch, cancel_event, [file_path for file_path, _, _ in batch]),
+                        **filters)
+                except Exception as e:
+                    result = e
+                self._call_on_main_thread(finish_search, cancel_event, result)
+            
+            threading.Thread(target=run, name="find-file-scan", daemon=True).start()
+        
+        def stop_search():
+            if scan['cancel'] is not None:
+                scan['cancel'].set()
+                status_label.config(text="Stopping...")
+        
+        def close_window():
+            stop_search()
+            scan['cancel'] = None
+            find_window.destroy()
         
         def select_all_results():
-            for var in file_vars:
-                var.set(True)
+            result_model.set_checked(result_list.view, True)
+            result_list.render()
         
         def clear_selection():
-            for var in file_vars:
-                var.set(False)
+            result_model.set_checked(result_list.view, False)
+            result_list.render()
         
         def load_selected_files():
             try:
-                selected_paths = [found_files[i] for i, var in enumerate(file_vars) if var.get()]
+                selected_paths = result_model.selected_paths()
                 if not selected_paths:
                     tk.messagebox.showinfo("Warning", "Selece files to load！")
                     return
-                # 使用现有的add_files方法逻辑来添加文件
-                # 为新添加的文件创建复选框和标签
-                first_file_path = None
-                # 计算当前已有文件数量
-                current_count = len(self.file_vars)
-                
-                for i, file_path in enumerate(selected_paths):
-                    # 只获取文件名（不含路径）
-                    file_name = os.path.basename(file_path)
-                    
-                    # 如果文件已存在，跳过
-                    if file_path in self.file_vars:
-                        continue
-                    
-                    # 记录第一个文件路径用于预览和保存目录
-                    if first_file_path is None:
-                        first_file_path = file_path
-                        # 保存为实例变量，供保存功能使用
-                        self.first_file_path = file_path
-                    
-                    # 增加文件计数
-                    self.file_count += 1
-                    
-                    # 创建变量存储复选框状态
-                    var = tk.BooleanVar(value=True)
-                    self.file_vars[file_path] = var
-                    
-                    # 计算网格位置（每行4个文件）
-                    total_files = current_count + i + 1  # 包含当前正在添加的文件
-                    row = (total_files - 1) // 4
-                    col = (total_files - 1) % 4
-                    
-                    # 创建文件框架
-                    file_frame = tk.Frame(self.file_list_container)
-                    file_frame.grid(row=row, column=col, padx=5, pady=5, sticky="w")
-                    
-                    # 创建复选框
-                    check = tk.Checkbutton(file_frame, variable=var, command=lambda path=file_path: self.on_checkbox_change(path))
-                    check.pack(side="left", padx=2)
-                    self.file_checks[file_path] = check
-                    
-                    # 创建编号标签
-                    number_label = tk.Label(file_frame, text=f"{self.file_count}.", width=4, anchor="w")
-                    number_label.pack(side="left")
-                    
-                    # 创建文件名标签
-                    label = tk.Label(file_frame, text=file_name, anchor="w")
-                    label.pack(side="left")
-                    self.file_labels[file_path] = label
-                    
-                    # 更新状态栏信息
-                    self.update_status(f"Successfully added file: {file_name}")
-                
-                # 重新配置滚动区域
-                self.file_list_container.update_idletasks()
-                self.file_list_canvas.configure(scrollregion=self.file_list_canvas.bbox("all"))
-                
-                # 保存选中文件列表，供Save as CSV功能使用
-                self.selected_files = [path for path, var in self.file_vars.items() if var.get()]
+                # 使用与add_files相同的方法添加文件
+                self._add_loaded_files(selected_paths)
                 
                 # 更新菜单和按钮状态
                 self.update_menu_status(has_files=True, has_selected_files=True)
@@ -2645,7 +2673,7 @@ class TestLogAnalyzer:
                 self.refresh_button.config(state="normal")
                 
                 # 关闭查找窗口
-                find_window.destroy()
+                close_window()
             except (OSError, tk.TclError) as e:
                 tk.messagebox.showerror("Error", f"Failed to load files: {str(e)}")
                 self.update_status(f"Error loading files: {str(e)}")
@@ -2658,6 +2686,10 @@ class TestLogAnalyzer:
         search_button.pack(side="left", padx=5)
         self.add_hover_effect(search_button)
         
+        stop_button = tk.Button(button_frame, text="Stop", command=stop_search)
+        stop_button.pack(side="left", padx=5)
+        self.add_hover_effect(stop_button)
+        
         select_all_button = tk.Button(button_frame, text="Select All", command=select_all_results)
         select_all_button.pack(side="left", padx=5)
         self.add_hover_effect(select_all_button)
@@ -2670,36 +2702,34 @@ class TestLogAnalyzer:
         load_button.pack(side="right", padx=5)
         self.add_hover_effect(load_button)
         
-        cancel_button = tk.Button(button_frame, text="Cancel", command=find_window.destroy)
+        cancel_button = tk.Button(button_frame, text="Cancel", command=close_window)
         cancel_button.pack(side="right", padx=5)
         self.add_hover_effect(cancel_button)
+        
+        find_window.protocol("WM_DELETE_WINDOW", close_window)
 
     def select_all_files(self):
         """全选或取消全选所有文件"""
-        if not hasattr(self, 'file_vars') or not self.file_vars:
+        if not len(self.file_model):
             return
         
-        # 检查当前是否全部选中
-        all_selected = all(var.get() for var in self.file_vars.values())
+        # 只作用于筛选后显示的文件，检查这些文件是否全部选中
+        shown_files = self.file_list.view
+        target_state = not self.file_model.all_checked(shown_files)
         
-        # 设置所有复选框状态为相反值
-        target_state = 0 if all_selected else 1
-        for var in self.file_vars.values():
-            var.set(target_state)
+        # 设置为相反状态，界面只重绘可见的行
+        self.file_model.set_checked(shown_files, target_state)
+        self.file_list.render()
         
         # 更新选中文件列表
-        if hasattr(self, 'selected_files'):
-            if target_state == 1:
-                self.selected_files = list(self.file_vars.keys())
-            else:
-                self.selected_files = []
-            
-            # 更新菜单和按钮状态
-            self.update_menu_status(has_files=True, has_selected_files=(target_state == 1))
+        self.selected_files = self.file_model.selected_paths()
+        
+        # 更新菜单和按钮状态
+        self.update_menu_status(has_files=True, has_selected_files=bool(self.selected_files))
         
         # 更新状态栏信息
-        action = "Select all" if target_state == 1 else "Unselect all"
-        self.status_var.set(f"{action} all files")
+        action = "Select all" if target_state else "Unselect all"
+        self.status_var.set(f"{action} {len(shown_files)} files")
         
         # 记录日志
         logging.info(f"{action} all files")
@@ -2707,14 +2737,8 @@ class TestLogAnalyzer:
     def clear_all(self):
         """清除所有文件和所有选项卡内容，将程序恢复至初始设置状态"""
         # 清除文件列表
-        for widget in self.file_list_container.winfo_children():
-            widget.destroy()
-        
-        # 重置文件相关变量
-        self.file_vars = {}
-        self.file_checks = {}
-        self.file_labels = {}
-        self.file_count = 0
+        self.file_model.clear()
+        self._apply_file_filter()
         
         # 重置数据预览表格
         self.reset_data_preview_table()
@@ -2795,16 +2819,20 @@ class TestLogAnalyzer:
         
         # 清空处理后的数据引用和选中文件列表
         self.processed_data = None
+        self.processed_data_key = None
+        self.reprocessed_data_key = None
+        self.incremental_evaluator = None
+        self.analysis_graph.clear()
+        self._preview_cache.clear()
+        self.preview_extra_rows.clear()
+        self.attempt_history = None
+        self.chunked_report = None
         if hasattr(self, 'selected_files'):
             self.selected_files = []
         
         # 更新主状态栏信息
         self.update_status("All files and all tabs content have been cleared. The program is now ready.")
         
-        # 确保滚动区域正确更新
-        self.file_list_container.update_idletasks()
-        self.file_list_canvas.configure(scrollregion=self.file_list_canvas.bbox("all"))
-        
         # 强制刷新整个窗口布局
         self.root.update_idletasks()
         
@@ -2843,6 +2871,8 @@ class TestLogAnalyzer:
         # 返回窗口和控制变量
         return progress_window, progress_var, status_var
     
+    @profiled_action("Data Processing")
+    @loganalyzer_core.timed_stage("data_processing", rows_from='processed_data')
     def data_processing_function(self):
         """数据处理功能"""
         # 切换到数据处理选项卡
@@ -2850,13 +2880,22 @@ class TestLogAnalyzer:
             self.tab_control.select(self.data_processing_tab)
             
         # 获取所有选中的文件
-        selected_files = [path for path, var in self.file_vars.items() if var.get()]
+        selected_files = self.file_model.selected_paths()
         
         if not selected_files:
             self.update_status("No files selected for processing.")
             self.show_processing_result(None, "No files selected for processing.", is_reprocessing=False)
             return
         
+        # 选中文件总大小超过阈值时，建议改用分块处理模式，避免内存不足
+        total_size = sum(os.path.getsize(path) for path in selected_files if os.path.isfile(path))
+        if total_size > self.chunked_threshold_bytes:
+            if messagebox.askyesno("Large Files",
+                                   f"Selected files total {total_size / (1024 * 1024 * 1024):.2f} GB.\n"
+                                   "Use chunked processing to produce the report with bounded memory?"):
+                self.chunked_processing_function()
+                return
+        
         # 创建进度条窗口，进度最大值设为选中文件数+5（额外步骤）
         progress_window, progress_var, status_var = self.create_progress_window("Data Processing Progress", len(selected_files) + 5)
         
@@ -2880,6 +2919,16 @@ class TestLogAnalyzer:
             # 创建临时目录
             temp_dir = tempfile.mkdtemp()
             processed_files = []
+            ingest_keys = []
+            
+            # 压缩日志和zip成员先在线程池中并行解压读取，结果进入analysis_graph缓存，下面逐个文件直接取用
+            compressed_files = [path for path in selected_files if loganalyzer_core.is_compressed_log(path)]
+            if len(compressed_files) > 1:
+                status_var.set(f"Decompressing {len(compressed_files)} compressed logs...")
+                progress_window.update_idletasks()
+                self.analysis_graph.prefetch_ingest(
+                    compressed_files,
+                    [loganalyzer_core.config_from_file_name(os.path.basename(path)) for path in compressed_files])
             
             for i, file_path in enumerate(selected_files):
                 file_name = os.path.basename(file_path)
@@ -2890,168 +2939,33 @@ class TestLogAnalyzer:
                 status_var.set(f"Processing file {i+1}/{len(selected_files)}: {file_name}")
                 progress_window.update_idletasks()
                 
-                # 解析文件名，优先检查MP/PVT标识
-                if "MP" in file_name:
-                    extracted_text = "MP"
-                elif "PVT" in file_name:
-                    extracted_text = "PVT"
-                else:
-                    # 提取第二和第三空格之间的文本
-                    parts = file_name.split(' ')
-                    # 确保有足够的空格来提取文本
-                    if len(parts) >= 4:
-                        # 第二和第三空格之间的文本是parts[2]
-                        extracted_text = parts[2]
-                    else:
-                        extracted_text = "Unknown"
-                    
+                # 解析文件名，优先检查MP/PVT标识，否则取第二和第三空格之间的文本
+                extracted_text = loganalyzer_core.config_from_file_name(file_name)
+                
                 # 读取文件并处理
                 try:
-                    # 智能检测CSV文件中的数据标题行
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            lines = []
-                            for i in range(20):
-                                line = f.readline()
-                                if not line:
-                                    break
-                                lines.append(line.strip())
-                            
-                            # 识别元数据行（通常是键值对格式，如"键:,值"的形式）
-                            metadata_lines = []
-                            non_metadata_lines = []
-                            
-                            for i, line in enumerate(lines):
-                                # 元数据行的特征: 通常包含键值对格式
-                                # 1. 检查是否包含冒号加逗号的模式（如"键:,值"）
-                                # 2. 检查行的开头是否包含典型的元数据键名
-                                is_metadata = False
-                                
-                                # 检查标点符号模式
-                                if ',:' in line or (':' in line and ',' in line):
-                                    is_metadata = True
-                                
-                                # 检查是否为典型的元数据行（有内容但不是标题行）
-                                elif line.strip() and i < 10 and not (line.startswith('Model') or line.startswith('Serial Number')):
-                                    # 检查行是否有有意义的内容且不是明显的标题行
-                                    content_parts = [p.strip() for p in line.split(',') if p.strip()]
-                                    if content_parts and ':' in content_parts[0]:
-                                        is_metadata = True
-                                
-                                if is_metadata:
-                                    metadata_lines.append(i)
-                                else:
-                                    non_metadata_lines.append((i, line))
-                            
-                            # 如果有非元数据行，在这些行中寻找包含最多逗号的非空行作为标题行
-                            max_commas = -1
-                            header_line_candidates = []
-                            header_line_index = 0
-                            
-                            # 首先筛选出非空的非元数据行
-                            non_empty_non_metadata = [(i, line) for i, line in non_metadata_lines if line.strip()]
-                            
-                            if non_empty_non_metadata:
-                                # 找到所有非空非元数据行中的最大逗号数
-                                max_commas = max(line.count(',') for i, line in non_empty_non_metadata)
-                                # 获取所有具有最大逗号数的候选行
-                                header_line_candidates = [(i, line) for i, line in non_empty_non_metadata if line.count(',') == max_commas]
-                                
-                                if header_line_candidates:
-                                    # 增强选择逻辑: 优先选择包含字母字符、内容长度更长的行作为标题行
-                                    # 计算每个候选行的分数
-                                    best_score = -1
-                                    for i, line in header_line_candidates:
-                                        # 基础分数（保证至少有一个分数）
-                                        score = 1
-                                        # 包含字母字符加分（标题行通常包含字段名）
-                                        if any(c.isalpha() for c in line):
-                                            score += 10
-                                        # 内容长度加分（不含逗号）
-                                        content_length = len(line.replace(',', ''))
-                                        score += min(content_length, 50)  # 内容长度最多加50分
-                                        
-                                        if score > best_score:
-                                            best_score = score
-                                            header_line_index = i
-                            elif non_metadata_lines:
-                                # 如果所有非元数据行都是空的，使用原始方法
-                                for i, line in non_metadata_lines:
-                                    comma_count = line.count(',')
-                                    if comma_count > max_commas:
-                                        max_commas = comma_count
-                                        header_line_index = i
-                            else:
-                                # 如果没有非元数据行，使用原始方法寻找最多逗号的行
-                                for i, line in enumerate(lines):
-                                    comma_count = line.count(',')
-                                    if comma_count > max_commas:
-                                        max_commas = comma_count
-                                        header_line_index = i
-                            
-                            # 再次检查: 确保找到的标题行不是全空的，且有合理数量的非空列
-                            if header_line_index < len(lines) and lines[header_line_index].strip() == '':
-                                self.update_status(f"Warning: Empty header line detected (Line {header_line_index+1}). Trying to find the next suitable line.")
-                                # 寻找下一个非空行
-                                for i in range(header_line_index + 1, min(len(lines), header_line_index + 10)):
-                                    if lines[i].strip() != '':
-                                        header_line_index = i
-                                        max_commas = lines[i].count(',')
-                                        break
-                            
-                            # 确定是否使用检测到的标题行
-                            if max_commas >= 9:
-                                # 如果找到明显的标题行（逗号数足够多），使用它
-                                self.update_status(f"Data header line detected (Line {header_line_index+1}) with {max_commas+1} columns of data.")
-                                self.update_status(f"Excluded metadata lines: {len(metadata_lines)}")
-                                df = pd.read_csv(file_path,
-                                                skiprows=header_line_index,  # 跳过说明性行
-                                                on_bad_lines='skip',    # 跳过有问题的行
-                                                engine='python')        # 使用Python解析器
-                            else:
-                                # 如果没有找到明显的标题行，尝试使用默认方式读取
-                                self.update_status("No obvious data header line detected. Trying to read with default settings.")
-                                df = pd.read_csv(file_path,
-                                                on_bad_lines='skip',    # 跳过有问题的行
-                                                engine='python')        # 使用Python解析器
-                        
-                        # 直接填入第二列，并将标题改为"Config"
-                        if not df.empty:
-                            # 确保DataFrame至少有一列
-                            if len(df.columns) >= 1:
-                                # 将第二列（索引为1）的数据替换为提取的文本
-                                if len(df.columns) >= 2:
-                                    # 检查第二列标题是否为"Config"
-                                    if df.columns[1] != 'Config':
-                                        # 标题不是Config，才替换数据
-                                        df.iloc[:, 1] = extracted_text
-                                    # 将第二列的标题改为"Config"
-                                    df.columns.values[1] = 'Config'
-                                else:
-                                    # 没有第二列，添加一列
-                                    df['Config'] = extracted_text
-                        
-                        # 过滤坏行: 移除Serial Number列文本长度异常的行
-                        original_rows = len(df)
-                        if 'Serial Number' in df.columns:
-                            # 计算Serial Number列文本长度的中位数
-                            serial_lengths = df['Serial Number'].astype(str).str.len()
-                            median_length = serial_lengths.median()
-                            
-                            # 过滤掉Serial Number长度与中位数相差5以上的行
-                            df = df[abs(serial_lengths - median_length) < 5]
-                            filtered_rows = original_rows - len(df)
-                            if filtered_rows > 0:
-                                self.update_status(f"Filtered out {filtered_rows} rows with Serial Number length difference > 5 from median ({median_length}).")
-                        
-
-                        
-                        # 保存到临时文件夹
-                        temp_file_path = os.path.join(temp_dir, file_name)
-                        df.to_csv(temp_file_path, index=False, encoding='utf-8')
-                        
-                        # 记录处理后的文件
-                        processed_files.append((temp_file_path, file_name, df))
-                        
+                    # 智能检测CSV文件中的数据标题行，读取数据、填入Config并过滤坏行（与批处理模式共用）
+                    # 文件未修改时直接使用analysis_graph缓存的读取结果，缓存的DataFrame只以浅副本使用
+                    ingest_key, (df, header, filtered_rows, median_length) = self.analysis_graph.ingest(file_path, extracted_text)
+                    df = df.copy(deep=False)
+                    if header.has_header:
+                        self.update_status(f"Data header line detected (Line {header.header_line_index+1}) with {header.max_commas+1} columns of data.")
+                        self.update_status(f"Excluded metadata lines: {header.metadata_count}")
+                    else:
+                        self.update_status("No obvious data header line detected. Trying to read with default settings.")
+                    
+                    # 过滤坏行: 移除Serial Number列文本长度与中位数相差5以上的行
+                    if filtered_rows > 0:
+                        self.update_status(f"Filtered out {filtered_rows} rows with Serial Number length difference > 5 from median ({median_length}).")
+                    
+                    # 保存到临时文件夹（压缩日志保存为解压后的CSV）
+                    temp_file_path = os.path.join(temp_dir, loganalyzer_core.log_file_name(file_name))
+                    df.to_csv(temp_file_path, index=False, encoding='utf-8')
+                    
+                    # 记录处理后的文件
+                    processed_files.append((temp_file_path, file_name, df))
+                    ingest_keys.append(ingest_key)
+                    
                 except Exception as e:
                     self.update_status(f"Error processing file {file_name}: {str(e)}")
                     continue
@@ -3074,38 +2988,17 @@ class TestLogAnalyzer:
                 combined_df = pd.concat([df for _, _, df in processed_files], ignore_index=True)
                 
                 # 对合并后的数据进行去重: 以Serial Number列为索引，优先保留Pass/Fail列值为PASS的行
-                if 'Serial Number' in combined_df.columns:
-                    original_dup_rows = len(combined_df)
-                    # 创建一个排序键，Pass/Fail列为PASS的排在前面
-                    if 'Pass/Fail' in combined_df.columns:
-                        # 给PASS值赋较低的排序值，使其在去重时保留
-                        combined_df['_sort_key'] = combined_df['Pass/Fail'].apply(lambda x: 0 if str(x).strip().upper() == 'PASS' else 1)
-                        # 按照Serial Number和排序键排序
-                        combined_df = combined_df.sort_values(by=['Serial Number', '_sort_key'])
-                        # 去重，保留每个Serial Number的第一行（即PASS的行优先）
-                        combined_df = combined_df.drop_duplicates(subset=['Serial Number'], keep='first')
-                        # 删除临时排序键列
-                        combined_df = combined_df.drop(columns=['_sort_key'])
-                    else:
-                        # 如果没有Pass/Fail列，直接去重
-                        combined_df = combined_df.drop_duplicates(subset=['Serial Number'], keep='first')
-                    
-                    deduped_rows = original_dup_rows - len(combined_df)
-                    if deduped_rows > 0:
-                        self.update_status(f"Deduplicated {deduped_rows} rows with duplicate Serial Numbers.")
-                
-                # 修改列标题格式
-                combined_df = self.rename_columns(combined_df)
+                combined_df = self._deduplicate_serial_numbers(combined_df)
                 
-                # 删除不需要的列
-                combined_df = self.remove_unwanted_columns(combined_df)
-                
-                # 对W_M和M_M列组内的列进行排序
-                combined_df = self.sort_wm_and_mm_columns(combined_df)
+                # 修改列标题格式、删除不需要的列并对W_M和M_M列组内的列进行排序（按表头签名缓存处理计划）
+                combined_df = self.apply_column_schema(combined_df)
                 
                 # 处理特殊单元格（FAIL值和含#字符的单元格）
                 combined_df = self.process_special_cells(combined_df)
                 
+                # 优化列类型，降低内存占用
+                combined_df = self._optimize_memory_dtypes(combined_df)
+                
                 # 更新进度条
                 progress_var.set(len(selected_files) + 4)
                 status_var.set("Post-processing completed. Ready to display results...")
@@ -3113,10 +3006,14 @@ class TestLogAnalyzer:
                 
                 # 保存处理后的数据引用
                 self.processed_data = combined_df
+                self.processed_data_key = self.analysis_graph.processed_key(ingest_keys)
+                # format_cells已按新数据重新生成，之前的重新处理结果不再对应
+                self.reprocessed_data_key = None
+                self.incremental_evaluator = None
                 # 使用统一的方法启用所有相关菜单和按钮
                 # 处理完成后，即使没有原始文件，也应该认为has_files为True
                 has_files = (len(self.loaded_files) > 0 if hasattr(self, 'loaded_files') else False) or True
-                has_selected_files = len([path for path, var in self.file_vars.items() if var.get()]) > 0
+                has_selected_files = bool(self.file_model.selected_paths())
                 self.update_menu_status(has_files=has_files, has_selected_files=has_selected_files, has_processed_data=True)
                 # 在数据处理选项卡中预览合并后的数据
                 self.show_processing_result(combined_df, f"Combined data from {len(processed_files)} files.", is_reprocessing=False)
@@ -3138,38 +3035,17 @@ class TestLogAnalyzer:
                 _, file_name, df = processed_files[0]
                 
                 # 对单个文件数据进行去重: 以Serial Number列为索引，优先保留Pass/Fail列值为PASS的行
-                if 'Serial Number' in df.columns:
-                    original_dup_rows = len(df)
-                    # 创建一个排序键，Pass/Fail列为PASS的排在前面
-                    if 'Pass/Fail' in df.columns:
-                        # 给PASS值赋较低的排序值，使其在去重时保留
-                        df['_sort_key'] = df['Pass/Fail'].apply(lambda x: 0 if str(x).strip().upper() == 'PASS' else 1)
-                        # 按照Serial Number和排序键排序
-                        df = df.sort_values(by=['Serial Number', '_sort_key'])
-                        # 去重，保留每个Serial Number的第一行（即PASS的行优先）
-                        df = df.drop_duplicates(subset=['Serial Number'], keep='first')
-                        # 删除临时排序键列
-                        df = df.drop(columns=['_sort_key'])
-                    else:
-                        # 如果没有Pass/Fail列，直接去重
-                        df = df.drop_duplicates(subset=['Serial Number'], keep='first')
-                    
-                    deduped_rows = original_dup_rows - len(df)
-                    if deduped_rows > 0:
-                        self.update_status(f"Deduplicated {deduped_rows} rows with duplicate Serial Numbers in file {file_name}.")
-                
-                # 修改列标题格式
-                df = self.rename_columns(df)
-                
-                # 删除不需要的列
-                df = self.remove_unwanted_columns(df)
+                df = self._deduplicate_serial_numbers(df, file_name)
                 
-                # 对W_M和M_M列组内的列进行排序
-                df = self.sort_wm_and_mm_columns(df)
+                # 修改列标题格式、删除不需要的列并对W_M和M_M列组内的列进行排序（按表头签名缓存处理计划）
+                df = self.apply_column_schema(df)
                 
                 # 处理特殊单元格（FAIL值和含#字符的单元格）
                 df = self.process_special_cells(df)
                 
+                # 优化列类型，降低内存占用
+                df = self._optimize_memory_dtypes(df)
+                
                 # 更新进度条
                 progress_var.set(len(selected_files) + 4)
                 status_var.set("Post-processing completed. Ready to display results...")
@@ -3177,10 +3053,14 @@ class TestLogAnalyzer:
                 
                 # 保存处理后的数据引用
                 self.processed_data = df
+                self.processed_data_key = self.analysis_graph.processed_key(ingest_keys)
+                # format_cells已按新数据重新生成，之前的重新处理结果不再对应
+                self.reprocessed_data_key = None
+                self.incremental_evaluator = None
                 # 使用统一的方法启用所有相关菜单和按钮
                 # 处理完成后，即使没有原始文件，也应该认为has_files为True
                 has_files = (len(self.loaded_files) > 0 if hasattr(self, 'loaded_files') else False) or True
-                has_selected_files = len([path for path, var in self.file_vars.items() if var.get()]) > 0
+                has_selected_files = bool(self.file_model.selected_paths())
                 self.update_menu_status(has_files=has_files, has_selected_files=has_selected_files, has_processed_data=True)
                 # 预览数据
                 self.show_processing_result(df, f"Post-processed data from file: {file_name}", is_reprocessing=False)
@@ -3195,8 +3075,9 @@ class TestLogAnalyzer:
             else:
                 # 没有成功处理数据，清空数据引用并更新状态
                 self.processed_data = None
+                self.processed_data_key = None
                 has_files = len(self.loaded_files) > 0 if hasattr(self, 'loaded_files') else False
-                has_selected_files = len([path for path, var in self.file_vars.items() if var.get()]) > 0
+                has_selected_files = bool(self.file_model.selected_paths())
                 self.update_menu_status(has_files=has_files, has_selected_files=has_selected_files, has_processed_data=False)
                 self.show_processing_result(None, "No files were successfully processed.", is_reprocessing=False)
                 self.update_status("No files were successfully processed.")
@@ -3216,275 +3097,193 @@ class TestLogAnalyzer:
             
             # 处理失败时更新菜单和按钮状态
             self.processed_data = None
+            self.processed_data_key = None
             has_files = len(self.loaded_files) > 0 if hasattr(self, 'loaded_files') else False
             has_selected_files = len(self.selected_files) > 0 if hasattr(self, 'selected_files') else False
             self.update_menu_status(has_files=has_files, has_selected_files=has_selected_files, has_processed_data=False)
         
-    def copy_file_path(self, file_path):
-        """复制文件路径到剪贴板"""
-        pass
-    
-    def rename_columns(self, df):
-        """修改列标题格式:
-
-           - 将 "White Metric2 Value" 改为 "W_M2_前一列第一行文本"
-           - 将 "White Metric15 Value" 改为 "W_M15_前一列第一行文本"
-           - 将 "Mixed Metric3 Value" 改为 "M_M3_前一列第一行文本"
+    @profiled_action("Chunked Processing")
+    @loganalyzer_core.timed_stage("chunked_processing")
+    def chunked_processing_function(self):
+        """分块处理模式: 以有限内存处理超出内存容量的测试日志，生成Yield、Top Defects、FPY和Cpk汇总报告
+        
+        日志按块读取，列结构处理和特殊单元格清理逐块进行，SN去重使用流式索引，
+        统计结果以可合并的计数、求和与Welford矩累计，不保留完整数据集。
         """
-        import re
+        # 切换到数据处理选项卡
+        if hasattr(self, 'tab_control') and hasattr(self, 'data_processing_tab'):
+            self.tab_control.select(self.data_processing_tab)
         
-        # 创建新的列名映射
-        new_columns = {}
-        renamed_count = 0
-        
-        # 首先找出所有需要重命名的列及其位置
-        columns_to_rename = []
-        for i, col in enumerate(df.columns):
-            white_match = re.match(r'White\s+Metric(\d+)\s+Value', col)
-            mixed_match = re.match(r'Mixed\s+Metric(\d+)\s+Value', col)
-            if white_match or mixed_match:
-                columns_to_rename.append((i, col, white_match, mixed_match))
-        
-        # 先创建一个临时映射，只做基本重命名
-        temp_columns = {col: col for col in df.columns}
-        
-        # 进行基本重命名
-        for _, col, white_match, mixed_match in columns_to_rename:
-            if white_match:
-                metric_num = white_match.group(1)
-                temp_columns[col] = f'W_M{metric_num}_'
-            elif mixed_match:
-                metric_num = mixed_match.group(1)
-                temp_columns[col] = f'M_M{metric_num}_'
-            renamed_count += 1
-        
-        # 应用临时重命名
-        temp_df = df.rename(columns=temp_columns)
-        
-        # 重新构建列名映射，添加前一列第一行文本
-        final_columns = {}
-        for original_col, temp_col in temp_columns.items():
-            # 如果是需要重命名的列
-            if temp_col.startswith('W_M') or temp_col.startswith('M_M'):
-                # 找到该列在原始DataFrame中的位置
-                original_index = list(df.columns).index(original_col)
-                
-                # 确保该列不是第一列
-                if original_index > 0:
-                    # 获取前一列的名称
-                    prev_col = df.columns[original_index - 1]
-                    # 获取前一列的第一行文本
-                    if not df.empty and prev_col in df.columns:
-                        first_row_text = str(df.iloc[0][prev_col]).strip()
-                        # 移除任何非字母数字字符，只保留有效文本
-                        first_row_text = re.sub(r'[^a-zA-Z0-9]', '', first_row_text)
-                        if first_row_text:
-                            # 将前一列的第一行文本添加到新标题中
-                            final_col = f'{temp_col}{first_row_text}'
-                            final_columns[original_col] = final_col
-                            continue
-                # 如果没有前一列或前一列没有有效文本，使用基本重命名
-                final_columns[original_col] = temp_col
-            else:
-                # 其他列名保持不变
-                final_columns[original_col] = original_col
+        selected_files = self.file_model.selected_paths()
+        if not selected_files:
+            self.update_status("No files selected for processing.")
+            self.show_processing_result(None, "No files selected for processing.", is_reprocessing=False)
+            return
         
-        # 应用最终重命名
-        if renamed_count > 0:
-            df = df.rename(columns=final_columns)
-            self.update_status(f"Successfully renamed {renamed_count} column headers, added prefix from previous column's first row text.")
+        # 规格判定与Data Re-Processing一致，需要先设置Review Criteria
+        criteria_dict = self._get_criteria_dict()
+        if not criteria_dict:
+            messagebox.showinfo("提示", "请先设置Review Criteria")
+            return
         
-        return df
+        # 加载ColorPointSpec多边形（缺失时使用默认多边形）
+        try:
+            self._load_colorpoint_spec_from_temp_file()
+        except Exception as e:
+            self.logger.warning(f"Failed to load ColorPointSpec for chunked processing: {str(e)}")
+        polygons = loganalyzer_core.colorpoint_polygons(getattr(self, 'colorpoint_spec_data', None))
         
-    def remove_unwanted_columns(self, df):
-        """保留指定的列、W_M/M_M开头的列以及包含点号的列，删除其他所有列，并保持原始列顺序不变"""
-        # 定义需要保留的特定列
-        columns_to_keep = [
-            "Model",
-            "Config",
-            "Serial Number",
-            "Test Station",
-            "Position ID",
-            "Date/Time",
-            "Pass/Fail",
-            "White L (cd/m^2)",
-            "White U (%)",
-            "White dY (%/cm)",
-            "White u Avg",
-            "White v Avg",
-            "White Ru",
-            "White Rv",
-            "White Du",
-            "White Dv",
-            "White dL*Min (%/cm)",
-            "White dL*Max (%/cm)",
-            "White dEMax (%/cm)",
-            "White Pass/Fail Criteria",
-            "Mixed L (cd/m^2)",
-            "Mixed U (%)",
-            "Mixed dY (%/cm)",
-            "Mixed u Avg",
-            "Mixed v Avg",
-            "Mixed Ru",
-            "Mixed Rv",
-            "Mixed Du",
-            "Mixed Dv",
-            "Mixed dL*Min (%/cm)",
-            "Mixed dL*Max (%/cm)",
-            "Mixed dEMax (%/cm)",
-            "Mixed Pass/Fail Criteria"
-        ]
-        
-        # 创建一个集合用于快速查找
-        columns_to_keep_set = set(columns_to_keep)
-        
-        # 按原始DataFrame中列的顺序，筛选出需要保留的列
-        all_columns_to_keep = []
-        existing_specific_columns_count = 0
-        pattern_columns_count = 0
-        
-        for col in df.columns:
-            if col in columns_to_keep_set:
-                all_columns_to_keep.append(col)
-                existing_specific_columns_count += 1
-            elif col.startswith("W_M") or col.startswith("M_M"):
-                all_columns_to_keep.append(col)
-                pattern_columns_count += 1
-            elif "." in col:
-                all_columns_to_keep.append(col)
-                pattern_columns_count += 1
-        
-        # 删除其他所有列
-        if all_columns_to_keep:
-            df = df[all_columns_to_keep]
-            self.update_status(f"Successfully kept {len(all_columns_to_keep)} columns (including {existing_specific_columns_count} specific columns and {pattern_columns_count} pattern-matched columns, including those with dots) in original order.")
-        else:
-            self.update_status("Warning: No columns to keep were found.")
+        def resolve_limits(columns):
+            # 每种表头只匹配一次规格与列
+            return loganalyzer_core.resolve_criteria_columns(criteria_dict, columns)
         
-        return df
+        progress_window, progress_var, status_var = self.create_progress_window("Chunked Processing Progress", len(selected_files) * 2 + 1)
         
-    def sort_wm_and_mm_columns(self, df):
-        """对标题格式为"W_M"和"M_M"的列组，按列标题中包含的数字从小到大对组内列进行排序，同时保持列组在表格中的整体位置不变"""
-        import re
+        def on_progress(stage, done, total):
+            # 第一遍建立索引，第二遍累计统计
+            offset = 0 if stage.startswith("Indexing") else len(selected_files)
+            progress_var.set(offset + done + 1)
+            status_var.set(stage)
+            progress_window.update_idletasks()
         
-        # 创建一个副本，避免直接修改原始数据
-        sorted_df = df.copy()
+        try:
+            self.format_cells = {}
+            self.hash_cells = {}
+            self.reprocessed_data_key = None
+            self.incremental_evaluator = None
+            report = loganalyzer_core.run_chunked_pipeline(selected_files, resolve_limits=resolve_limits,
+                                                           polygons=polygons, progress=on_progress)
+            progress_window.destroy()
+        except Exception as e:
+            self.logger.error(f"Chunked processing failed: {str(e)}", exc_info=True)
+            self.update_status(f"Chunked processing failed: {str(e)}")
+            try:
+                progress_window.destroy()
+            except:
+                pass
+            return
         
-        # 找出所有列，并分别处理不同的列组
-        all_columns = list(sorted_df.columns)
-        new_column_order = []
-        current_group = None
-        group_columns = []
+        self.chunked_report = report
+        self.attempt_history = report.attempt_history
+        
+        summary = (f"Chunked processing: {report.files} files, {report.rows_read} rows read, "
+                   f"{report.rows_filtered} bad rows filtered, {report.units} units after deduplication, "
+                   f"{sum(report.config_fails.values())} units failed criteria.")
+        self.update_status(summary)
+        self.show_processing_result(report.preview, summary, is_reprocessing=False)
+        
+        # 保存汇总报告
+        default_filename = f"Chunked_Report_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".xlsx",
+            filetypes=[("Excel files", "*.xlsx"), ("All files", "*.*")],
+            initialfile=default_filename,
+            initialdir=getattr(self, 'last_save_dir', '')
+        )
+        if not file_path:
+            return
+        try:
+            report.to_excel(file_path)
+            self.last_save_dir = os.path.dirname(file_path)
+            self.update_status(f"Chunked report saved to {file_path}")
+        except Exception as e:
+            self.update_status(f"Failed to save chunked report: {str(e)}")
+            messagebox.showerror("Error", f"Failed to save chunked report: {str(e)}")
+    
+    def copy_file_path(self, file_path):
+        """复制文件路径到剪贴板"""
+        pass
+    
+    @loganalyzer_core.timed_stage("dedup")
+    def _deduplicate_serial_numbers(self, df, file_name=None):
+        """以Serial Number列去重，优先保留Pass/Fail列值为PASS的行，并在同一次分组中记录每个SN的测试历史
         
-        # 辅助函数: 从列名中提取数字
-        def extract_number(col_name):
-            match = re.search(r'(W_M|M_M)(\d+)', col_name)
-            if match:
-                return int(match.group(2))
-            return float('inf')  # 非W_M/M_M列返回无穷大，确保它们排在最后
-        
-        # 遍历所有列，按顺序分组并排序
-        for col in all_columns:
-            # 确定列所属的组
-            if col.startswith('W_M'):
-                col_group = 'W_M'
-            elif col.startswith('M_M'):
-                col_group = 'M_M'
-            else:
-                col_group = 'OTHER'
-            
-            # 如果当前列与前一列属于不同的组，先处理前一组
-            if col_group != current_group and current_group is not None:
-                if current_group in ['W_M', 'M_M']:
-                    # 对W_M和M_M组内的列按数字从小到大排序
-                    group_columns.sort(key=extract_number)
-                # 将排序后的组添加到新的列顺序中
-                new_column_order.extend(group_columns)
-                # 重置当前组
-                group_columns = []
-            
-            # 更新当前组并添加列
-            current_group = col_group
-            group_columns.append(col)
+        Args:
+            df: 待去重的DataFrame
+            file_name: 单个文件去重时用于状态提示的文件名
         
-        # 处理最后一组
-        if group_columns:
-            if current_group in ['W_M', 'M_M']:
-                group_columns.sort(key=extract_number)
-            new_column_order.extend(group_columns)
+        Returns:
+            去重后的DataFrame（保持原始行顺序，索引重置为连续行号）
+        """
+        if df is None or 'Serial Number' not in df.columns:
+            return df
         
-        # 重新排列DataFrame的列
-        sorted_df = sorted_df[new_column_order]
+        original_dup_rows = len(df)
+        # Date/Time列只解析一次，去重和后续统计直接使用datetime64列
+        loganalyzer_core.convert_datetime_column(df)
+        df, self.attempt_history = loganalyzer_core.dedup_by_serial(df)
         
-        # 计算排序后的结果
-        wm_count = sum(1 for col in sorted_df.columns if col.startswith('W_M'))
-        mm_count = sum(1 for col in sorted_df.columns if col.startswith('M_M'))
+        deduped_rows = original_dup_rows - len(df)
+        if deduped_rows > 0:
+            retested_units = int((self.attempt_history['Retests'] > 0).sum())
+            if file_name:
+                self.update_status(f"Deduplicated {deduped_rows} rows with duplicate Serial Numbers in file {file_name} ({retested_units} units retested).")
+            else:
+                self.update_status(f"Deduplicated {deduped_rows} rows with duplicate Serial Numbers ({retested_units} units retested).")
+        return df
+    
+    def _optimize_memory_dtypes(self, df, data_label="processed data"):
+        """优化数据列类型以降低内存占用（文本列转category、Date/Time转datetime64），并报告优化前后的内存
         
-        self.update_status(f"Successfully sorted W_M group ({wm_count} columns) and M_M group ({mm_count} columns) columns by number in ascending order, while keeping group positions unchanged.")
+        Args:
+            df: 待优化的DataFrame（逐列原地替换）
+            data_label: 状态提示中使用的数据名称
         
-        return sorted_df
+        Returns:
+            优化后的DataFrame
+        """
+        try:
+            df, report = loganalyzer_core.optimize_dtypes(df)
+        except Exception as e:
+            self.logger.warning(f"Dtype optimization skipped for {data_label}: {str(e)}")
+            return df
         
-    def process_special_cells(self, df):
-        """处理特殊单元格: 将Pass/Fail列中的Fail单元格和包含#字符的单元格（不良）标记为需要格式化，
+        if report['before'] > 0:
+            before_mb = report['before'] / (1024 * 1024)
+            after_mb = report['after'] / (1024 * 1024)
+            message = (f"Optimized {data_label} memory: {before_mb:.2f} MB -> {after_mb:.2f} MB "
+                       f"({len(report['categorical'])} categorical, {len(report['datetime'])} datetime columns).")
+            self.logger.info(message)
+            self.update_status(message)
+        return df
+    
+    @loganalyzer_core.timed_stage("schema_plan")
+    def apply_column_schema(self, df):
+        """按表头签名一次性完成列标题重命名、删除不需要的列以及W_M/M_M列组排序:
 
-        去除单元格中含有的#字符，并将含#字符的列尝试转换为数字数据"""
-        # 创建一个字典来存储需要格式化的单元格位置
-        self.format_cells = {}
+           - 将 "White Metric2 Value" 改为 "W_M2_前一列第一行文本"
+           - 将 "Mixed Metric3 Value" 改为 "M_M3_前一列第一行文本"
+           - 保留指定的列、W_M/M_M开头的列以及包含点号的列，保持原始列顺序
+           - W_M和M_M列组内按编号从小到大排序，列组整体位置不变
         
-        # 创建一个集合来存储包含#字符的列索引
-        columns_with_hash = set()
+        相同表头的文件只编译一次处理计划，并以一次列选取完成全部操作。
+        """
+        plan = loganalyzer_core.get_schema_plan(df)
         
-        # 创建一个字典来存储包含#字符的单元格位置，用于后续添加淡红色背景
-        self.hash_cells = {}
+        if plan.renamed_count > 0:
+            self.update_status(f"Successfully renamed {plan.renamed_count} column headers, added prefix from previous column's first row text.")
         
-        # 创建一个副本，避免直接修改原始数据
-        processed_df = df.copy()
+        if not plan.positions:
+            self.update_status("Warning: No columns to keep were found.")
+            return df
         
-        # 遍历所有单元格
-        for col_idx, column in enumerate(processed_df.columns):
-            has_hash_char = False
-            # 检查当前列是否为Pass/Fail列（不区分大小写，要求列名完全匹配'pass/fail'）
-            col_name_lower = str(column).lower().strip()
-            is_pass_fail_column = col_name_lower == 'pass/fail'
-            
-            for row_idx, value in enumerate(processed_df[column]):
-                cell_value = str(value)
-                
-                # 检查是否需要格式化
-                need_format = False
-                
-                # 只在Pass/Fail列中检查FAIL值（不区分大小写）
-                if is_pass_fail_column and cell_value.strip().upper() == 'FAIL':
-                    need_format = True
-                
-                # 检查单元格是否包含#字符（标记为不良的单元格）
-                elif '#' in cell_value:
-                    has_hash_char = True
-                    # 去除#字符
-                    clean_value = cell_value.replace('#', '')
-                    processed_df.iloc[row_idx, col_idx] = clean_value
-                    need_format = True
-                    
-                    # 记录包含#字符的单元格位置
-                    if row_idx not in self.hash_cells:
-                        self.hash_cells[row_idx] = []
-                    self.hash_cells[row_idx].append(col_idx)
-                
-                # 如果需要格式化，记录单元格位置
-                if need_format:
-                    if row_idx not in self.format_cells:
-                        self.format_cells[row_idx] = []
-                    self.format_cells[row_idx].append(col_idx)
-            
-            # 如果该列包含#字符，尝试将整列转换为数字
-            if has_hash_char:
-                columns_with_hash.add(col_idx)
-                try:
-                    # 尝试将列转换为数字
-                    processed_df[column] = pd.to_numeric(processed_df[column], errors='ignore')
-                except (ValueError, TypeError):
-                    # 如果转换失败，保持原样
-                    pass
+        df = plan.apply(df)
+        self.update_status(f"Successfully kept {len(plan.positions)} columns (including {plan.specific_count} specific columns and {plan.pattern_count} pattern-matched columns, including those with dots) in original order.")
+        self.update_status(f"Successfully sorted W_M group ({plan.wm_count} columns) and M_M group ({plan.mm_count} columns) columns by number in ascending order, while keeping group positions unchanged.")
+        
+        return df
+        
+    @loganalyzer_core.timed_stage("special_cells")
+    def process_special_cells(self, df):
+        """处理特殊单元格: 将Pass/Fail列中的Fail单元格和包含#字符的单元格（不良）标记为需要格式化，
+
+        去除单元格中含有的#字符，并将含#字符的列尝试转换为数字数据（与批处理模式共用loganalyzer_core.clean_special_cells）"""
+        # 输入数据是列结构处理后新生成的DataFrame，直接在其上处理，无需再复制
+        cell_masks = {}
+        processed_df, _, _, _ = loganalyzer_core.clean_special_cells(df, cell_masks)
+        
+        # 需要格式化的单元格位置，以及包含#字符的单元格位置（用于后续添加淡红色背景），格式为 {行位置: [列位置, ...]}
+        self.format_cells, self.hash_cells, columns_with_hash = loganalyzer_core.special_cell_positions(cell_masks)
         
         # 保存包含#字符的列信息，用于预览时的背景色设置
         self.columns_with_hash = columns_with_hash
@@ -3561,9 +3360,9 @@ class TestLogAnalyzer:
         # 为Linux系统绑定鼠标滚轮事件
         self.preview_canvas.bind_all("<Button-4>", lambda e: self.preview_canvas.yview_scroll(-1, "units"))
         self.preview_canvas.bind_all("<Button-5>", lambda e: self.preview_canvas.yview_scroll(1, "units"))
-        
 
         
+    
     def reset_data_preview_table(self):
         """重置数据预览表格"""
         # 移除所有现有的表格内容
@@ -3606,7 +3405,7 @@ class TestLogAnalyzer:
             # 获取默认保存目录 - 第一个选中的原csv文件的目录
             default_dir = ""
             # 获取选中的文件列表
-            selected_files = [path for path, var in self.file_vars.items() if var.get()]
+            selected_files = self.file_model.selected_paths()
             if selected_files:
                 # 获取第一个选中文件的目录
                 first_file_path = selected_files[0]
@@ -3772,28 +3571,25 @@ class TestLogAnalyzer:
                     # 尝试获取criteria数据
                     criteria_data = None
                     try:
-                        # 使用已有的_save_criteria_to_temp_file方法获取criteria数据
+                        # 使用_save_criteria_to_temp_file整理规格数据，直接从criteria_store获取各行
                         temp_file_path = self._save_criteria_to_temp_file()
                         if temp_file_path:
-                            import csv
                             criteria_data = {}
-                            with open(temp_file_path, 'r', encoding='utf-8') as f:
-                                reader = csv.DictReader(f)
-                                for row in reader:
-                                    data_type = row['DataType']
-                                    if data_type not in criteria_data:
-                                        criteria_data[data_type] = []
-                                    # 将数据添加到对应的数据类型列表中
-                                    criteria_data[data_type].append((
-                                        row['StandardType'],
-                                        row['LowerLimit'],
-                                        row['UpperLimit'],
-                                        row['Description']
-                                    ))
+                            for row in self.criteria_store.rows():
+                                data_type = row['DataType']
+                                if data_type not in criteria_data:
+                                    criteria_data[data_type] = []
+                                # 将数据添加到对应的数据类型列表中
+                                criteria_data[data_type].append((
+                                    row['StandardType'],
+                                    row['LowerLimit'],
+                                    row['UpperLimit'],
+                                    row['Description']
+                                ))
                             # 添加日志记录
                             try:
                                 import logging
-                                logging.info(f"Successfully loaded criteria data from CSV file. Data types: {list(criteria_data.keys())}")
+                                logging.info(f"Successfully loaded criteria data. Data types: {list(criteria_data.keys())}")
                             except:
                                 pass
                     except Exception as e:
@@ -3834,7 +3630,7 @@ class TestLogAnalyzer:
                         for data_type in ["White", "Mixed"]:
                             if data_type in criteria_data:
                                 for std_type, lower_limit, upper_limit, description in criteria_data[data_type]:
-                                    # 已经从CSV中获取了解析好的上下限和描述，无需再次解析
+                                    # criteria_store中已经是解析好的上下限和描述，无需再次解析
                                     # 只需进行最后的检查和修正
                                     
                                     # 修正规格值: uniformity规格上限修正为100，规格下限为-1的修正为0
@@ -3887,7 +3683,7 @@ class TestLogAnalyzer:
                         # 分别获取White和Mixed的Cpk数据
                         for data_type in ["White", "Mixed"]:
                             self.update_status(f"Calculating Cpk data for {data_type}...")
-                            cpk_data[data_type] = self._calculate_cpk_data(data_type)
+                            cpk_data[data_type] = self._cached_cpk_data(data_type)
                         # 添加日志记录
                         try:
                             import logging
@@ -4195,7 +3991,7 @@ class TestLogAnalyzer:
                         config_stats = []
                         if 'Config' in self.processed_data.columns and 'Pass/Fail' in self.processed_data.columns:
                             # 按Config分组
-                            for config, group in self.processed_data.groupby('Config'):
+                            for config, group in self.processed_data.groupby('Config', observed=True):
                                 config_total = len(group)
                                 config_fail = (group['Pass/Fail'] == 'FAIL').sum()
                                 config_fail_rate = (config_fail / config_total * 100) if config_total > 0 else 0
@@ -4262,6 +4058,8 @@ class TestLogAnalyzer:
                         logging.info("第一个工作表使用data reprocessing后的数据")
                     except:
                         pass
+                # Date/Time按原始格式导出
+                data_source = loganalyzer_core.format_datetime_columns(data_source)
                 
                 # 创建索引到列名的映射，以正确处理color point的前七列逻辑
                 col_index_map = {i: col for i, col in enumerate(data_source.columns)}
@@ -4597,7 +4395,7 @@ class TestLogAnalyzer:
                         # 添加包含Avg的列（但不重复添加）
                         avg_cols = [col for col in self.processed_data.columns if "Avg" in col and col not in color_point_cols]
                         color_point_cols.extend(avg_cols)
-                        color_point_df = self.processed_data[color_point_cols]
+                        color_point_df = loganalyzer_core.format_datetime_columns(self.processed_data[color_point_cols])
                         color_point_df.to_excel(writer, sheet_name='color point', index=False)
                         
                         # 不再创建spec工作表
@@ -4606,22 +4404,17 @@ class TestLogAnalyzer:
                         # 尝试获取criteria数据
                         criteria_data = None
                         try:
-                            # 使用已有的_save_criteria_to_temp_file方法获取criteria数据
+                            # 使用_save_criteria_to_temp_file整理规格数据，直接从criteria_store获取各行
                             temp_file_path = self._save_criteria_to_temp_file()
                             if temp_file_path:
-                                import csv
-                                criteria_data = []
-                                with open(temp_file_path, 'r', encoding='utf-8') as f:
-                                    reader = csv.DictReader(f)
-                                    for row in reader:
-                                        criteria_data.append(row)
+                                criteria_data = self.criteria_store.rows()
                         except Exception as e:
                             self.update_status(f"Error loading criteria data for pandas backup: {str(e)}")
                         
                         # 如果获取到criteria数据，写入工作表
                         if criteria_data:
                             import pandas as pd
-                            # 直接使用从CSV获取的数据，确保包含Criteria选项卡中White和Mixed子窗口的所有数据
+                            # 直接使用criteria_store中的数据，确保包含Criteria选项卡中White和Mixed子窗口的所有数据
                             criteria_rows = []
                             
                             for row in criteria_data:
@@ -4659,7 +4452,7 @@ class TestLogAnalyzer:
                             cpk_rows = []
                             # 分别获取White和Mixed的Cpk数据
                             for data_type in ["White", "Mixed"]:
-                                cpk_data = self._calculate_cpk_data(data_type)
+                                cpk_data = self._cached_cpk_data(data_type)
                                 for row in cpk_data:
                                     # 获取列名作为测试项
                                     column_name = row["column_name"]
@@ -4858,7 +4651,7 @@ class TestLogAnalyzer:
                             # 按Config分组统计
                             if 'Config' in self.processed_data.columns and 'Pass/Fail' in self.processed_data.columns:
                                 config_stats = []
-                                for config, group in self.processed_data.groupby('Config'):
+                                for config, group in self.processed_data.groupby('Config', observed=True):
                                     config_total = len(group)
                                     config_fail = (group['Pass/Fail'] == 'FAIL').sum()
                                     config_fail_rate = (config_fail / config_total * 100) if config_total > 0 else 0
@@ -5006,12 +4799,8 @@ class TestLogAnalyzer:
             file_info_frame.grid(row=current_row, column=0, columnspan=len(all_headers), sticky="we", pady=3)
             
             # 获取当前文件的复选框变量和编号
-            file_var = self.file_vars.get(file_path)
-            file_number = ""
-            for i, (path, var) in enumerate(self.file_vars.items(), 1):
-                if path == file_path:
-                    file_number = str(i)
-                    break
+            file_var = self._preview_file_var(file_path)
+            file_number = str(self.file_model.number(file_path) or "")
             
             # 添加复选框（如果有文件被选中）
             if file_var:
@@ -5030,15 +4819,23 @@ class TestLogAnalyzer:
                                  font=('Courier New', 10, 'bold'), anchor="w", bg="lightgray")
             name_label.pack(side="left", padx=(0, 10))
             
-            # 添加文件的总行数和总列数
-            data_info_label = tk.Label(file_info_frame, text=f"({len(df)} rows × {len(df.columns)} columns)", 
+            # 添加文件的总行数和总列数（只读取了开头的行时为估算的总行数）
+            data_info_label = tk.Label(file_info_frame, text=f"({self._preview_rows_text(file_path, df)} rows × {len(df.columns)} columns)", 
                                       font=('Courier New', 10), fg="blue", anchor="w", bg="lightgray")
             data_info_label.pack(side="left")
             
+            # 限制行数（"More rows"追加的行也显示）
+            row_limit = self._preview_row_limit(file_path, max_rows_per_file)
+            df_preview = df if row_limit is None or len(df) <= row_limit else df.head(row_limit)
+            preview = self._preview_cache.get(file_path)
+            has_more = len(df_preview) < len(df) or (preview is not None and preview.df is df and not preview.complete)
+            
             # 添加提示文本，显示是否仅显示前几行
             提示文本 = []
-            if not self.show_all_rows and len(df) > max_rows_per_file:
-                提示文本.append(f"Only showing first {max_rows_per_file} rows")
+            if preview is not None and preview.df is df and preview.sampled:
+                提示文本.append(f"Showing {len(df_preview)} randomly sampled rows")
+            elif has_more:
+                提示文本.append(f"Only showing first {len(df_preview)} rows")
             elif self.show_all_rows:
                 提示文本.append(f"Showing all {len(df)} rows")
                 
@@ -5048,16 +4845,14 @@ class TestLogAnalyzer:
                 more_label = tk.Label(file_info_frame, text=more_label_text, font=('Courier New', 10, 'italic'), fg="gray", anchor="w")
                 more_label.pack(side="left", padx=(10, 0))
             
-            current_row += 1
+            # 按需继续读取后续行
+            if has_more and not (preview is not None and preview.sampled):
+                more_rows_label = tk.Label(file_info_frame, text=f"More rows (+{PREVIEW_MORE_ROWS})", font=('Courier New', 10, 'underline'),
+                                           fg="blue", cursor="hand2", anchor="w", bg="lightgray")
+                more_rows_label.pack(side="left", padx=(10, 0))
+                more_rows_label.bind("<Button-1>", lambda event, path=file_path: self._show_more_preview_rows(path))
             
-            # 限制行数
-            if self.show_all_rows:
-                df_preview = df  # 显示所有行
-            else:
-                if len(df) > max_rows_per_file:
-                    df_preview = df.head(max_rows_per_file)
-                else:
-                    df_preview = df
+            current_row += 1
             
             # 创建表格内容，所有列使用统一的设置
             for i, row in df_preview.iterrows():
@@ -5124,19 +4919,13 @@ class TestLogAnalyzer:
             self.show_all_rows = False
         
         # 限制显示行数，显示所有列
-        max_rows = 5  # 默认只显示前5行
+        max_rows = 5  # 默认只显示前5行（"More rows"追加的行也显示）
         
         # 限制行数
-        if self.show_all_rows:
-            df_preview = df  # 显示所有行
-            show_more_rows = False
-        else:
-            if len(df) > max_rows:
-                df_preview = df.head(max_rows)
-                show_more_rows = True
-            else:
-                df_preview = df
-                show_more_rows = False
+        row_limit = self._preview_row_limit(current_file_path, max_rows)
+        df_preview = df if row_limit is None or len(df) <= row_limit else df.head(row_limit)
+        preview = self._preview_cache.get(current_file_path)
+        show_more_rows = len(df_preview) < len(df) or (preview is not None and preview.df is df and not preview.complete)
         
         # 显示所有列，不再限制列数
         show_more_cols = False
@@ -5228,8 +5017,10 @@ class TestLogAnalyzer:
         
         # 显示数据量提示信息
         提示文本 = []
-        if show_more_rows:
-            提示文本.append(f"Only showing first {max_rows} rows")
+        if preview is not None and preview.df is df and preview.sampled:
+            提示文本.append(f"Showing {len(df_preview)} randomly sampled rows")
+        elif show_more_rows:
+            提示文本.append(f"Only showing first {len(df_preview)} rows")
         elif self.show_all_rows:
             提示文本.append(f"Showing all {total_rows} rows")
         if show_more_cols:
@@ -5244,12 +5035,8 @@ class TestLogAnalyzer:
         file_var = None
         file_number = ""
         if current_file_path:
-            file_var = self.file_vars.get(current_file_path)
-            # 查找当前文件的编号
-            for i, (path, var) in enumerate(self.file_vars.items(), 1):
-                if path == current_file_path:
-                    file_number = str(i)
-                    break
+            file_var = self._preview_file_var(current_file_path)
+            file_number = str(self.file_model.number(current_file_path) or "")
         
         # 添加复选框（如果有文件被选中）
         if file_var:
@@ -5268,8 +5055,8 @@ class TestLogAnalyzer:
                              font=('Courier New', 10), anchor="w")
         name_label.pack(side="left", padx=(0, 10))
         
-        # 添加文件的总行数和总列数
-        data_info_label = tk.Label(file_info_frame, text=f"{total_rows} rows × {total_cols} columns", 
+        # 添加文件的总行数和总列数（只读取了开头的行时为估算的总行数）
+        data_info_label = tk.Label(file_info_frame, text=f"{self._preview_rows_text(current_file_path, df)} rows × {total_cols} columns", 
                                   font=('Courier New', 10), fg="blue", anchor="w")
         data_info_label.pack(side="left")
         
@@ -5280,6 +5067,13 @@ class TestLogAnalyzer:
             more_label = tk.Label(file_info_frame, text=more_label_text, font=('Courier New', 10, 'italic'), fg="gray", anchor="w")
             more_label.pack(side="left", padx=(10, 0))
         
+        # 按需继续读取后续行
+        if show_more_rows and current_file_path and not (preview is not None and preview.sampled):
+            more_rows_label = tk.Label(file_info_frame, text=f"More rows (+{PREVIEW_MORE_ROWS})", font=('Courier New', 10, 'underline'),
+                                       fg="blue", cursor="hand2", anchor="w")
+            more_rows_label.pack(side="left", padx=(10, 0))
+            more_rows_label.bind("<Button-1>", lambda event, path=current_file_path: self._show_more_preview_rows(path, multiple_files=False))
+        
         # 优化滚动区域更新和布局调整逻辑
         def final_layout_refresh():
             """最终布局刷新，确保所有列正确显示"""
@@ -5354,41 +5148,10 @@ class TestLogAnalyzer:
         Returns:
             tuple: (window_type, metric_type) - 窗口类型和度量类型
         """
-        std_type_lower = std_type.strip().lower()
-        window_type = None
-        metric_type = std_type
-        
-        # 检查是否包含窗口类型前缀
-        if 'white' in std_type_lower:
-            window_type = 'white'
-            # 移除窗口类型前缀，提取度量类型
-            metric_type = std_type_lower.replace('white', '').strip()
-        elif 'mixed' in std_type_lower:
-            window_type = 'mixed'
-            # 移除窗口类型前缀，提取度量类型
-            metric_type = std_type_lower.replace('mixed', '').strip()
-        
-        # 度量类型标准化
-        metric_mapping = {
-            'l': 'L', 'l value': 'L', 'lightness': 'L',
-            'u': 'U', 'uniformity': 'U',
-            'dy': 'dY', 'delta y': 'dY', 'ydelta': 'dY',
-            'ru': 'Ru', 'r uniformity': 'Ru',
-            'rv': 'Rv', 'v uniformity': 'Rv',
-            'du': 'Du', 'd uniformity': 'Du',
-            'dv': 'Dv', 'v delta uniformity': 'Dv',
-            'dl*min': 'dL*Min', 'dl min': 'dL*Min', 'delta l min': 'dL*Min',
-            'dl*max': 'dL*Max', 'dl max': 'dL*Max', 'delta l max': 'dL*Max',
-            'demax': 'dEMax', 'de max': 'dEMax', 'delta e max': 'dEMax'
-        }
-        
-        # 标准化度量类型
-        metric_type = metric_mapping.get(metric_type, metric_type)
-        
-        return window_type, metric_type
+        return loganalyzer_core.standardize_criteria_type(std_type)
     
     def _get_best_matching_column(self, std_type_info, available_columns):
-        """智能匹配标准类型到最合适的列名，考虑窗口类型和带单位的名称
+        """智能匹配标准类型到最合适的列名，考虑窗口类型和带单位的名称（匹配规则与批处理模式共用）
         
         Args:
             std_type_info: 标准类型信息，格式为(window_type, metric_type)
@@ -5397,115 +5160,58 @@ class TestLogAnalyzer:
         Returns:
             str or None: 最佳匹配的列名，如果没有匹配则返回None
         """
-        import re
-        
-        # 如果传入的是字符串而不是元组（兼容旧代码）
-        if isinstance(std_type_info, str):
-            window_type = None
-            metric_type = std_type_info
-        else:
-            window_type, metric_type = std_type_info
-        
-        # 预处理文本，移除特殊字符、单位并转换为小写
-        def preprocess_text(text):
-            # 移除括号中的单位信息，如 (cd/m^2), (%), (%/cm) 等
-            text = re.sub(r'\([^)]*\)', '', text)
-            # 移除特殊字符，只保留字母、数字和空格
-            text = re.sub(r'[^a-zA-Z0-9\s]', '', text)
-            # 标准化空格
-            text = re.sub(r'\s+', ' ', text).strip().lower()
-            return text
-        
-        # 定义窗口类型到前缀的映射
-        window_prefix_mapping = {
-            'white': ['white', 'w_'],
-            'mixed': ['mixed', 'm_']
-        }
-        
-        # 定义度量类型到关键词的映射
-        metric_keywords = {
-            'L': ['l', 'lightness'],
-            'U': ['u', 'uniformity'],
-            'dY': ['dy', 'ydelta', 'ydiff'],
-            'Ru': ['ru', 'runiformity'],
-            'Rv': ['rv', 'rvuniformity'],
-            'Du': ['du', 'duuniformity'],
-            'Dv': ['dv', 'dvuniformity'],
-            'dL*Min': ['dl*min', 'dlmin', 'dl_min'],
-            'dL*Max': ['dl*max', 'dlmax', 'dl_max'],
-            'dEMax': ['demax', 'de_max', 'deltemax']
-        }
+        return loganalyzer_core.best_matching_column(std_type_info, available_columns)
+    
+    def _criteria_yield_verdict(self, df, criteria_dict):
+        """按Review Criteria向量化判定所有记录（Yield Analysis规则），结果与逐条调用_evaluate_record_against_criteria一致
         
-        # 特殊处理Metric类型（如Metric1, Metric2等）
-        metric_match = re.match(r'metric(\d+)', metric_type.lower())
-        if metric_match:
-            metric_num = metric_match.group(1)
-            if window_type:
-                # 根据窗口类型选择对应的前缀
-                if window_type == 'white':
-                    target_pattern = f'w_m{metric_num}'  # White窗口的Metric对应W_M1, W_M2等
-                else:  # mixed
-                    target_pattern = f'm_m{metric_num}'  # Mixed窗口的Metric对应M_M1, M_M2等
-                
-                # 查找匹配的列
-                for col in available_columns:
-                    col_lower = col.lower()
-                    if target_pattern in col_lower:
-                        return col
-            return None
+        Args:
+            df: processed_data（或其浅副本）
+            criteria_dict: 标准字典，格式为 {std_type: (lower_limit, upper_limit)}
         
-        # 预处理标准类型信息
-        processed_metric_type = preprocess_text(metric_type)
+        Returns:
+            tuple: (is_fail, failed_details, matched_text)
+                is_fail: 行不良bool数组
+                failed_details: 每行以" | "分隔的失败描述（object数组）
+                matched_text: 标准类型与匹配列的对应关系文本（所有行相同）
+        """
+        import numpy as np
         
-        # 为每个列计算匹配分数
-        best_score = 0
-        best_match = None
+        data_key = self._processed_data_version()
+        column_of = {}
+        for column, entries in loganalyzer_core.resolve_criteria_columns(criteria_dict, list(df.columns)).items():
+            for std_type, lower_limit, upper_limit in entries:
+                column_of[std_type] = (column, lower_limit, upper_limit)
         
-        for col in available_columns:
-            # 原始列名和处理后的列名
-            original_col = col
-            col_lower = preprocess_text(col)
-            score = 0
-            
-            # 1. 检查窗口类型匹配（最高优先级）
-            if window_type and window_type in window_prefix_mapping:
-                for prefix in window_prefix_mapping[window_type]:
-                    if col_lower.startswith(prefix) or f' {prefix}' in col_lower:
-                        score += 5  # 窗口类型匹配（权重最高）
-                        break
-            
-            # 2. 检查度量类型匹配
-            # 首先尝试精确匹配处理后的完整度量类型
-            if processed_metric_type in col_lower:
-                score += 10  # 完整度量类型匹配给较高分数
-            else:
-                # 然后尝试使用关键词列表匹配
-                base_metric_type = metric_type.split('(')[0].strip()  # 提取不带单位的基本类型
-                metric_keywords_list = metric_keywords.get(base_metric_type, [base_metric_type.lower()])
-                for keyword in metric_keywords_list:
-                    if keyword in col_lower:
-                        score += 5  # 度量类型关键词匹配
-                        
-                        # 如果关键词是列名的主要部分，额外加分
-                        if col_lower.endswith(keyword) or keyword + ' ' in col_lower:
-                            score += 3
-                        break
-            
-            # 3. 完全匹配检查（同时考虑原始名称和处理后名称）
-            if (metric_type.lower() == original_col.lower() or 
-                processed_metric_type == col_lower):
-                score += 20  # 完全匹配给最高分
+        is_fail = np.zeros(len(df), dtype=bool)
+        failed_details = np.full(len(df), '', dtype=object)
+        matched_columns = {}
+        for std_type, limits in criteria_dict.items():
+            # 跳过格式无效或上下限都为空的标准
+            if not isinstance(limits, (list, tuple)) or len(limits) < 2 or (not limits[0] and not limits[1]):
+                continue
+            if std_type not in column_of:
+                continue
+            column_name, lower_limit, upper_limit = column_of[std_type]
+            matched_columns[std_type] = column_name
             
-            # 更新最佳匹配
-            if score > best_score:
-                best_score = score
-                best_match = col
-        
-        # 只有当匹配分数足够高时才返回匹配结果
-        if best_score >= 9:  # 阈值保持不变
-            return best_match
-        
-        return None
+            for condition, limit in (('<', lower_limit), ('>', upper_limit)):
+                if limit is None:
+                    continue
+                _, mask = self.analysis_graph.limit_mask(df, data_key, column_name,
+                                                         limit if condition == '<' else None,
+                                                         limit if condition == '>' else None, rule='strict')
+                if not mask.any():
+                    continue
+                is_fail |= mask
+                values = loganalyzer_core.numeric_values(df, column_name)[mask]
+                descriptions = np.array([f"{column_name} ({std_type}) = {value} {condition} {limit}" for value in values.tolist()],
+                                        dtype=object)
+                current = failed_details[mask]
+                failed_details[mask] = np.where(current == '', descriptions, current + ' | ' + descriptions)
+        
+        matched_text = ' | '.join(f"{k}→{v}" for k, v in matched_columns.items())
+        return is_fail, failed_details, matched_text
     
     def _evaluate_record_against_criteria(self, record, criteria_dict):
         """根据Review Criteria中的阈值判断记录的各项指标是否合格
@@ -5597,1645 +5303,45 @@ class TestLogAnalyzer:
                 except ValueError:
                     pass
             
-            # 检查上限
-            if upper_str:
-                try:
-                    upper_limit = float(upper_str)
-                    if value_float > upper_limit:
-                        is_pass = False
-                        # 添加更详细的失败原因信息
-                        failed_criteria.append({
-                            "std_type": std_type,
-                            "std_info": std_info,
-                            "column": column_name,
-                            "value": value_float,
-                            "condition": "upper",
-                            "limit": upper_limit,
-                            "description": f"{column_name} ({std_type}) = {value_float} > {upper_limit}"
-                        })
-                except ValueError:
-                    pass
-        
-        return is_pass, failed_criteria, matched_columns
-    
-    def _load_criteria_from_temp_files(self):
-        """从临时文件读取Review Criteria子窗口数据并解析上下限
-        
-        Returns:
-            dict: 标准字典，格式为 {std_type: (lower_limit, upper_limit)}
-        """
-        criteria_dict = {}
-        
-        try:
-            import os
-            import csv
-            global logger
-            
-            # 检查临时文件是否存在
-            white_file_exists = hasattr(self, '_white_criteria_file') and os.path.exists(self._white_criteria_file)
-            mixed_file_exists = hasattr(self, '_mixed_criteria_file') and os.path.exists(self._mixed_criteria_file)
-            
-            # 从临时文件读取数据的函数
-            def read_criteria_from_file(file_path, window_type):
-                results = {}
-                if os.path.exists(file_path):
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        reader = csv.DictReader(f)
-                        for row in reader:
-                            std_name = row.get('Standard', '')
-                            lower = self._parse_numeric_value(row.get('Lower_Limit', ''))
-                            upper = self._parse_numeric_value(row.get('Upper_Limit', ''))
-                            
-                            # 只有当标准名称有效时才添加到结果中
-                            if std_name:
-                                full_name = f"{window_type} {std_name}"
-                                results[full_name] = (lower, upper)
-                return results
-            
-            # 读取White窗口数据
-            if white_file_exists:
-                white_data = read_criteria_from_file(self._white_criteria_file, 'White')
-                criteria_dict.update(white_data)
-                
-                if logger:
-                    logger.info(f"从临时文件读取White窗口数据: {len(white_data)} 条规格")
-            
-            # 读取Mixed窗口数据
-            if mixed_file_exists:
-                mixed_data = read_criteria_from_file(self._mixed_criteria_file, 'Mixed')
-                criteria_dict.update(mixed_data)
-                
-                if logger:
-                    logger.info(f"从临时文件读取Mixed窗口数据: {len(mixed_data)} 条规格")
-            
-            # 如果没有读取到数据，记录警告
-            if not criteria_dict and logger:
-                logger.warning("未能从临时文件读取Review Criteria数据")
-        
-        except Exception as e:
-            # 记录错误但不中断流程
-            if logger:
-                logger.error(f"从临时文件读取Review Criteria数据时出错: {str(e)}")
-        
-        return criteria_dict
-    
-    def _parse_numeric_value(self, value):
-        """将字符串值解析为数值
-        
-        Args:
-            value: 要解析的值
-            
-        Returns:
-            float或int: 解析后的数值，如果无法解析则返回None
-        """
-        if isinstance(value, (int, float)):
-            return value
-            
-        if value is None:
-            return None
-            
-        try:
-            # 尝试移除可能的特殊字符
-            clean_value = str(value).strip().replace('#', '')
-            if clean_value == '':
-                return None
-            # 尝试转换为浮点数
-            num_value = float(clean_value)
-            # 如果是整数，转换为int类型
-            if num_value.is_integer():
-                return int(num_value)
-            return num_value
-        except (ValueError, TypeError):
-            return None
-    
-    def _get_criteria_dict(self):
-        """获取Review Criteria中的阈值数据，优先从临时规格文件读取
-        
-        Returns:
-            dict: 标准字典，格式为 {std_type: (lower_limit, upper_limit)}
-        """
-        # 声明全局logger变量 - 必须放在函数最开始，在任何使用logger之前
-        global logger
-        
-        # 优先尝试从TestLogAnalyzer_Criteria.json临时文件读取数据
-        try:
-            import os
-            import json
-            import tempfile
-            
-            # 获取临时文件路径
-            temp_dir = tempfile.gettempdir()
-            temp_file_path = os.path.join(temp_dir, 'TestLogAnalyzer_Criteria.json')
-            
-            # 检查文件是否存在且可读
-            if os.path.exists(temp_file_path) and os.access(temp_file_path, os.R_OK):
-                if logger:
-                    logger.info(f"尝试从临时规格文件读取数据: {temp_file_path}")
-                
-                # 读取并解析JSON文件
-                with open(temp_file_path, 'r', encoding='utf-8') as f:
-                    criteria_data = json.load(f)
-                
-                if logger:
-                    logger.info(f"成功从临时规格文件读取到数据，数据类型: {type(criteria_data).__name__}")
-                
-                # 将数据转换为标准格式 {std_type: (lower_limit, upper_limit)}
-                criteria_dict = {}
-                
-                # 处理list格式的数据
-                if isinstance(criteria_data, list):
-                    if logger:
-                        logger.info(f"检测到list格式数据，包含{len(criteria_data)}个元素")
-                    
-                    for idx, item in enumerate(criteria_data):
-                        try:
-                            # 检查每个元素是否为字典
-                            if isinstance(item, dict):
-                                # 检查必要的字段
-                                if 'std_type' in item and 'lower' in item and 'upper' in item:
-                                    std_type = item['std_type']
-                                    # 获取并转换上下限
-                                    lower = float(item['lower']) if item['lower'] is not None else 0
-                                    upper = float(item['upper']) if item['upper'] is not None else float('inf')
-                                    
-                                    # 根据std_type判断窗口类型
-                                    if std_type.startswith('White'):
-                                        criteria_dict[std_type] = (lower, upper)
-                                    elif std_type.startswith('Mixed'):
-                                        criteria_dict[std_type] = (lower, upper)
-                                    else:
-                                        # 如果没有窗口类型前缀，默认为通用类型
-                                        criteria_dict[std_type] = (lower, upper)
-                                else:
-                                    if logger:
-                                        logger.warning(f"list元素[{idx}]缺少必要字段: {item}")
-                            else:
-                                if logger:
-                                    logger.warning(f"list元素[{idx}]不是字典类型: {type(item).__name__}")
-                        except Exception as e:
-                            if logger:
-                                logger.warning(f"处理list元素[{idx}]时出错: {str(e)}")
-                
-                # 处理原有的字典格式数据
-                elif isinstance(criteria_data, dict):
-                    # 处理White窗口数据
-                    if 'White' in criteria_data:
-                        for std_type, values in criteria_data['White'].items():
-                            try:
-                                # 处理字典类型的值
-                                if isinstance(values, dict):
-                                    # 确保值是数值类型
-                                    lower = float(values.get('lower', 0)) if values.get('lower') is not None else 0
-                                    upper = float(values.get('upper', float('inf'))) if values.get('upper') is not None else float('inf')
-                                    criteria_dict[f"White {std_type}"] = (lower, upper)
-                                # 新增: 处理列表类型的值
-                                elif isinstance(values, list):
-                                    if logger:
-                                        logger.info(f"检测到White窗口中{std_type}规格数据为list类型，尝试解析: {values}")
-                                    # 尝试从列表中提取下限和上限
-                                    if len(values) >= 2:
-                                        # 假设列表第一个元素是下限，第二个元素是上限
-                                        lower = float(values[0]) if values[0] is not None else 0
-                                        upper = float(values[1]) if values[1] is not None else float('inf')
-                                        criteria_dict[f"White {std_type}"] = (lower, upper)
-                                        if logger:
-                                            logger.info(f"成功解析White窗口中{std_type}规格数据，下限={lower}，上限={upper}")
-                                    else:
-                                        if logger:
-                                            logger.warning(f"White窗口中{std_type}规格数据列表长度不足，无法解析: {values}")
-                                else:
-                                    # 处理其他类型的情况
-                                    if logger:
-                                        logger.warning(f"White窗口中的{std_type}规格数据类型不支持，实际为: {type(values).__name__}")
-                            except (ValueError, TypeError) as e:
-                                if logger:
-                                    logger.warning(f"无法解析White窗口中的{std_type}规格数据: {values}, 错误: {str(e)}")
-                    
-                    # 处理Mixed窗口数据
-                    if 'Mixed' in criteria_data:
-                        for std_type, values in criteria_data['Mixed'].items():
-                            try:
-                                # 处理字典类型的值
-                                if isinstance(values, dict):
-                                    # 确保值是数值类型
-                                    lower = float(values.get('lower', 0)) if values.get('lower') is not None else 0
-                                    upper = float(values.get('upper', float('inf'))) if values.get('upper') is not None else float('inf')
-                                    criteria_dict[f"Mixed {std_type}"] = (lower, upper)
-                                # 新增：处理列表类型的值
-                                elif isinstance(values, list):
-                                    if logger:
-                                        logger.info(f"检测到Mixed窗口中{std_type}规格数据为list类型，尝试解析: {values}")
-                                    # 尝试从列表中提取下限和上限
-                                    if len(values) >= 2:
-                                        # 假设列表第一个元素是下限，第二个元素是上限
-                                        lower = float(values[0]) if values[0] is not None else 0
-                                        upper = float(values[1]) if values[1] is not None else float('inf')
-                                        criteria_dict[f"Mixed {std_type}"] = (lower, upper)
-                                        if logger:
-                                            logger.info(f"成功解析Mixed窗口中{std_type}规格数据，下限={lower}，上限={upper}")
-                                    else:
-                                        if logger:
-                                            logger.warning(f"Mixed窗口中{std_type}规格数据列表长度不足，无法解析: {values}")
-                                else:
-                                    # 处理其他类型的情况
-                                    if logger:
-                                        logger.warning(f"Mixed窗口中的{std_type}规格数据类型不支持，实际为: {type(values).__name__}")
-                            except (ValueError, TypeError) as e:
-                                if logger:
-                                    logger.warning(f"无法解析Mixed窗口中的{std_type}规格数据: {values}, 错误: {str(e)}")
-                else:
-                    if logger:
-                        logger.warning(f"临时规格文件数据格式不支持，数据类型: {type(criteria_data).__name__}")
-                
-                # 如果成功解析到数据，则直接返回
-                if criteria_dict:
-                    if logger:
-                        logger.info(f"从临时规格文件解析到 {len(criteria_dict)} 条规格数据")
-                    return criteria_dict
-                elif logger:
-                    logger.warning("临时规格文件存在但未解析到有效数据")
-            elif logger:
-                logger.info(f"临时规格文件不存在或不可读: {temp_file_path}")
-        except Exception as e:
-            if logger:
-                logger.error(f"读取临时规格文件时出错: {str(e)}")
-        
-        # 如果从临时文件读取失败，则回退到原来的方式获取数据
-        if logger:
-            logger.info("回退到从UI组件获取规格数据")
-            
-        # 同时调用两种方法并合并结果
-        improved_criteria = self._get_improved_criteria_dict()
-        original_criteria = self._get_original_criteria_dict()
-        
-        # 合并两个字典，优先使用改进方法的数据
-        criteria_dict = {}
-        
-        # 添加带前缀的改进方法数据
-        if improved_criteria:
-            criteria_dict.update(improved_criteria)
-        
-        # 添加原始方法数据（如果没有在改进方法中捕获到）
-        for std_type, limits in original_criteria.items():
-            # 检查是否已经有对应的带前缀版本
-            has_white_version = f"White {std_type}" in criteria_dict
-            has_mixed_version = f"Mixed {std_type}" in criteria_dict
-            
-            # 如果没有对应的带前缀版本，则添加原始版本
-            if not has_white_version and not has_mixed_version:
-                criteria_dict[std_type] = limits
-        
-        # 创建临时文件存储Review Criteria子窗口数据
-        try:
-            import tempfile
-            import os
-            import csv
-            import time
-            
-            # 数据验证函数
-            def validate_criteria_data(criteria_dict, window_type):
-                """验证规格数据的有效性"""
-                # 内部函数不需要再次声明global logger
-                valid_data = {}
-                invalid_data = {}
-                warnings = []
-                errors = []
-                
-                for std_name, values in criteria_dict.items():
-                    try:
-                        # 检查数据结构
-                        if not isinstance(values, (list, tuple)) or len(values) != 2:
-                            errors.append(f"{std_name}: 数据格式错误，应为(lower, upper)元组")
-                            invalid_data[std_name] = values
-                            continue
-                        
-                        lower, upper = values
-                        
-                        # 数据类型检查
-                        original_lower, original_upper = lower, upper
-                        
-                        # 转换为数值类型
-                        if isinstance(lower, str):
-                            lower = lower.strip()
-                            if lower == '':
-                                lower = 0.0  # 空值默认为0
-                                warnings.append(f"{std_name}: 下限为空，已设置为默认值0")
-                            else:
-                                try:
-                                    lower = float(lower)
-                                except ValueError:
-                                    errors.append(f"{std_name}: 下限值 '{original_lower}' 不是有效的数值")
-                                    invalid_data[std_name] = values
-                                    continue
-                        elif lower is None:
-                            lower = 0.0
-                            warnings.append(f"{std_name}: 下限为None，已设置为默认值0")
-                        
-                        if isinstance(upper, str):
-                            upper = upper.strip()
-                            if upper == '':
-                                upper = float('inf')  # 空上限默认为无穷大
-                                warnings.append(f"{std_name}: 上限为空，已设置为默认值无穷大")
-                            else:
-                                try:
-                                    upper = float(upper)
-                                except ValueError:
-                                    errors.append(f"{std_name}: 上限值 '{original_upper}' 不是有效的数值")
-                                    invalid_data[std_name] = values
-                                    continue
-                        elif upper is None:
-                            upper = float('inf')
-                            warnings.append(f"{std_name}: 上限为None，已设置为默认值无穷大")
-                        
-                        # 上下限关系检查
-                        if lower > upper and upper != float('inf'):
-                            # 自动交换上下限
-                            lower, upper = upper, lower
-                            warnings.append(f"{std_name}: 下限({original_lower})大于上限({original_upper})，已自动交换")
-                        
-                        # 数值合理性检查
-                        if lower < 0 and 'percentage' in std_name.lower() or 'rate' in std_name.lower():
-                            warnings.append(f"{std_name}: 百分比/比率值({lower})为负数，可能不合理")
-                        
-                        # 特殊边界值检查
-                        if abs(lower) > 1e6 or (upper != float('inf') and abs(upper) > 1e6):
-                            warnings.append(f"{std_name}: 值范围过大({lower} to {upper})，请确认是否合理")
-                        
-                        # 检查NaN值
-                        import math
-                        if math.isnan(lower) or (upper != float('inf') and math.isnan(upper)):
-                            errors.append(f"{std_name}: 包含无效的NaN值")
-                            invalid_data[std_name] = values
-                            continue
-                        
-                        # 所有检查通过，添加到有效数据
-                        valid_data[std_name] = (lower, upper)
-                        
-                    except Exception as e:
-                        errors.append(f"{std_name}: 验证过程发生错误: {str(e)}")
-                        invalid_data[std_name] = values
-                
-                # 返回验证结果
-                return {
-                    'valid_data': valid_data,
-                    'invalid_data': invalid_data,
-                    'warnings': warnings,
-                    'errors': errors
-                }
-            
-            # 按窗口类型分类数据
-            white_criteria = {k.replace('White ', ''): v for k, v in criteria_dict.items() if k.startswith('White')}
-            mixed_criteria = {k.replace('Mixed ', ''): v for k, v in criteria_dict.items() if k.startswith('Mixed')}
-            
-            # 验证收集到的数据并记录验证开始
-            if logger:
-                logger.info("\n===== 数据验证开始 =====")
-            
-            white_validation = validate_criteria_data(white_criteria, "White")
-            mixed_validation = validate_criteria_data(mixed_criteria, "Mixed")
-            
-            # 记录验证结果
-            if logger:
-                # White窗口验证结果
-                logger.info(f"\nWhite窗口数据验证结果:")
-                logger.info(f"  有效数据: {len(white_validation['valid_data'])}")
-                logger.info(f"  无效数据: {len(white_validation['invalid_data'])}")
-                logger.info(f"  警告: {len(white_validation['warnings'])}")
-                logger.info(f"  错误: {len(white_validation['errors'])}")
-                
-                if white_validation['warnings']:
-                    logger.warning("  警告详情:")
-                    for w in white_validation['warnings']:
-                        logger.warning(f"    - {w}")
-                
-                if white_validation['errors']:
-                    logger.error("  错误详情:")
-                    for e in white_validation['errors']:
-                        logger.error(f"    - {e}")
-                
-                # Mixed窗口验证结果
-                logger.info(f"\nMixed窗口数据验证结果:")
-                logger.info(f"  有效数据: {len(mixed_validation['valid_data'])}")
-                logger.info(f"  无效数据: {len(mixed_validation['invalid_data'])}")
-                logger.info(f"  警告: {len(mixed_validation['warnings'])}")
-                logger.info(f"  错误: {len(mixed_validation['errors'])}")
-                
-                if mixed_validation['warnings']:
-                    logger.warning("  警告详情:")
-                    for w in mixed_validation['warnings']:
-                        logger.warning(f"    - {w}")
-                
-                if mixed_validation['errors']:
-                    logger.error("  错误详情:")
-                    for e in mixed_validation['errors']:
-                        logger.error(f"    - {e}")
-                
-                logger.info("===== 数据验证完成 =====")
-            
-            # 使用验证后的数据
-            white_criteria = white_validation['valid_data']
-            mixed_criteria = mixed_validation['valid_data']
-            
-            # 如果没有数据，记录日志并返回
-            if not white_criteria and not mixed_criteria:
-                if logger:
-                    logger.warning("没有提取到White或Mixed窗口的规格数据，跳过保存操作")
-                return
-            
-            # 定义多个可能的临时目录，按优先级尝试
-            temp_dirs = []
-            
-            # 首选: 标准临时目录
-            try:
-                system_temp = tempfile.gettempdir()
-                if os.path.exists(system_temp) and os.access(system_temp, os.W_OK):
-                    temp_dirs.append(system_temp)
-                    if logger:
-                        logger.debug(f"添加系统临时目录: {system_temp}")
-            except Exception as e:
-                if logger:
-                    logger.warning(f"获取系统临时目录失败: {str(e)}")
-            
-            # 备选: 程序当前目录
-            try:
-                current_dir = os.path.dirname(os.path.abspath(__file__))
-                if os.path.exists(current_dir) and os.access(current_dir, os.W_OK):
-                    temp_dirs.append(current_dir)
-                    if logger:
-                        logger.debug(f"添加程序当前目录: {current_dir}")
-            except Exception as e:
-                if logger:
-                    logger.warning(f"获取程序当前目录失败: {str(e)}")
-            
-            # 备选: 用户桌面目录
-            try:
-                import getpass
-                user = getpass.getuser()
-                desktop_dir = os.path.join(os.path.expanduser('~'), 'Desktop')
-                if os.path.exists(desktop_dir) and os.access(desktop_dir, os.W_OK):
-                    temp_dirs.append(desktop_dir)
-                    if logger:
-                        logger.debug(f"添加桌面目录: {desktop_dir}")
-            except Exception as e:
-                if logger:
-                    logger.warning(f"获取用户桌面目录失败: {str(e)}")
-            
-            # 检查是否有可用的目录
-            if not temp_dirs:
-                raise Exception("未找到可写入的临时目录")
-            
-            # 使用第一个可用目录
-            temp_dir = temp_dirs[0]
-            if logger:
-                logger.info(f"使用临时目录: {temp_dir}")
-            
-            # 创建带时间戳的文件名，避免冲突
-            timestamp = time.strftime("%Y%m%d_%H%M%S")
-            white_temp_file = os.path.join(temp_dir, f"review_criteria_white_{timestamp}.csv")
-            mixed_temp_file = os.path.join(temp_dir, f"review_criteria_mixed_{timestamp}.csv")
-            
-            # 存储数据的辅助函数，包含写入验证
-            def save_data_to_csv(file_path, data_dict):
-                # 只有当有数据时才创建文件
-                if not data_dict:
-                    if logger:
-                        logger.info(f"没有{os.path.basename(file_path).split('_')[2]}窗口数据，跳过创建文件")
-                    return False
-                
-                # 写入文件
-                try:
-                    with open(file_path, 'w', newline='', encoding='utf-8') as f:
-                        writer = csv.writer(f)
-                        writer.writerow(['Standard', 'Lower_Limit', 'Upper_Limit'])
-                        written_count = 0
-                        for std_name, (lower, upper) in data_dict.items():
-                            writer.writerow([std_name, lower, upper])
-                            written_count += 1
-                    
-                    # 验证文件是否成功创建
-                    if not os.path.exists(file_path):
-                        raise Exception(f"文件创建失败，路径不存在: {file_path}")
-                    
-                    # 验证文件大小是否合理
-                    file_size = os.path.getsize(file_path)
-                    if file_size == 0:
-                        raise Exception(f"文件创建成功但为空: {file_path}")
-                    
-                    if logger:
-                        logger.info(f"成功保存{written_count}条数据到 {file_path} (大小: {file_size} 字节)")
-                    return True
-                except Exception as e:
-                    raise Exception(f"写入文件失败: {str(e)}")
-            
-            # 尝试保存两个窗口的数据
-            white_saved = False
-            mixed_saved = False
-            
-            if white_criteria:
-                try:
-                    white_saved = save_data_to_csv(white_temp_file, white_criteria)
-                except Exception as e:
-                    if logger:
-                        logger.error(f"保存White窗口数据失败: {str(e)}")
-            
-            if mixed_criteria:
-                try:
-                    mixed_saved = save_data_to_csv(mixed_temp_file, mixed_criteria)
-                except Exception as e:
-                    if logger:
-                        logger.error(f"保存Mixed窗口数据失败: {str(e)}")
-            
-            # 只有成功保存时才记录文件路径
-            if white_saved:
-                self._white_criteria_file = white_temp_file
-            
-            if mixed_saved:
-                self._mixed_criteria_file = mixed_temp_file
-            
-            # 用户反馈函数
-            def show_save_status_dialog(success, details):
-                """显示保存状态对话框给用户"""
-                try:
-                    import tkinter as tk
-                    from tkinter import messagebox, scrolledtext
-                    import threading
-                    
-                    # 创建新线程显示对话框，避免阻塞主界面
-                    def create_dialog():
-                        # 检查是否已存在Tk实例
-                        root = None
-                        try:
-                            root = tk.Tk()
-                        except:
-                            # 如果无法创建Tk实例，尝试使用messagebox
-                            msg = "数据保存" + ("成功" if success else "完成，但有问题") + "\n\n" + details
-                            messagebox.showinfo("保存状态", msg)
-                            return
-                        
-                        # 设置窗口属性
-                        root.title("保存状态")
-                        root.geometry("500x350")
-                        root.resizable(True, True)
-                        
-                        # 添加图标
-                        try:
-                            icon_label = tk.Label(root, text="📊" if success else "⚠️", font=("Arial", 48))
-                            icon_label.pack(pady=10)
-                        except:
-                            pass
-                        
-                        # 添加标题
-                        status_text = "✅ 数据保存成功" if success else "⚠️ 数据保存完成，但有警告/错误"
-                        status_label = tk.Label(root, text=status_text, font=("Arial", 14, "bold"), 
-                                              fg="green" if success else "orange")
-                        status_label.pack(pady=5)
-                        
-                        # 添加详情文本框
-                        detail_text = scrolledtext.ScrolledText(root, wrap=tk.WORD, width=50, height=10, font=("Arial", 10))
-                        detail_text.pack(padx=10, pady=10, fill=tk.BOTH, expand=True)
-                        detail_text.insert(tk.END, details)
-                        detail_text.config(state=tk.DISABLED)  # 设置为只读
-                        
-                        # 添加关闭按钮
-                        close_btn = tk.Button(root, text="关闭", command=root.destroy, font=("Arial", 10), 
-                                             width=15, bg="#4CAF50" if success else "#FF9800", fg="white")
-                        close_btn.pack(pady=10)
-                        
-                        # 添加悬浮效果
-                        original_bg = close_btn.cget('bg')
-                        def on_enter(event):
-                            # 按钮悬浮时背景色稍微加深
-                            if success:
-                                close_btn.config(bg="#388E3C")
-                            else:
-                                close_btn.config(bg="#F57C00")
-                        
-                        def on_leave(event):
-                            # 按钮离开时恢复原始背景色
-                            close_btn.config(bg=original_bg)
-                        
-                        # 绑定事件
-                        close_btn.bind("<Enter>", on_enter)
-                        close_btn.bind("<Leave>", on_leave)
-                        
-                        # 使窗口居中
-                        root.update_idletasks()
-                        width = root.winfo_width()
-                        height = root.winfo_height()
-                        x = (root.winfo_screenwidth() // 2) - (width // 2)
-                        y = (root.winfo_screenheight() // 2) - (height // 2)
-                        root.geometry('{}x{}+{}+{}'.format(width, height, x, y))
-                        
-                        # 显示窗口
-                        root.mainloop()
-                    
-                    # 在新线程中启动对话框
-                    dialog_thread = threading.Thread(target=create_dialog, daemon=True)
-                    dialog_thread.start()
-                    
-                except Exception as e:
-                    # 如果对话框创建失败，记录到日志
-                    if logger:
-                        logger.warning(f"无法创建保存状态对话框: {str(e)}")
-            
-            # 准备用户反馈信息
-            feedback_details = []
-            feedback_success = (white_saved or mixed_saved) and not (white_validation['errors'] or mixed_validation['errors'])
-            
-            # 添加验证结果
-            feedback_details.append("📋 数据验证结果:")
-            feedback_details.append(f"  - White窗口: 有效{len(white_validation['valid_data'])}条, 无效{len(white_validation['invalid_data'])}条")
-            feedback_details.append(f"  - Mixed窗口: 有效{len(mixed_validation['valid_data'])}条, 无效{len(mixed_validation['invalid_data'])}条")
-            
-            # 添加保存结果
-            feedback_details.append("\n💾 文件保存结果:")
-            if white_saved:
-                feedback_details.append(f"  - White窗口数据: ✅ 成功 (保存到: {os.path.basename(white_temp_file)})")
-            else:
-                feedback_details.append(f"  - White窗口数据: ❌ 失败")
-                
-            if mixed_saved:
-                feedback_details.append(f"  - Mixed窗口数据: ✅ 成功 (保存到: {os.path.basename(mixed_temp_file)})")
-            else:
-                feedback_details.append(f"  - Mixed窗口数据: ❌ 失败")
-            
-            # 添加警告信息
-            if white_validation['warnings'] or mixed_validation['warnings']:
-                feedback_details.append("\n⚠️ 警告信息:")
-                if white_validation['warnings']:
-                    feedback_details.append(f"  White窗口 ({len(white_validation['warnings'])}个):")
-                    for w in white_validation['warnings'][:3]:  # 只显示前3个警告
-                        feedback_details.append(f"    - {w}")
-                    if len(white_validation['warnings']) > 3:
-                        feedback_details.append(f"    ... 还有{len(white_validation['warnings'])-3}个警告")
-                
-                if mixed_validation['warnings']:
-                    feedback_details.append(f"  Mixed窗口 ({len(mixed_validation['warnings'])}个):")
-                    for w in mixed_validation['warnings'][:3]:  # 只显示前3个警告
-                        feedback_details.append(f"    - {w}")
-                    if len(mixed_validation['warnings']) > 3:
-                        feedback_details.append(f"    ... 还有{len(mixed_validation['warnings'])-3}个警告")
-            
-            # 添加错误信息
-            if white_validation['errors'] or mixed_validation['errors']:
-                feedback_details.append("\n❌ 错误信息:")
-                if white_validation['errors']:
-                    feedback_details.append(f"  White窗口 ({len(white_validation['errors'])}个):")
-                    for e in white_validation['errors'][:3]:  # 只显示前3个错误
-                        feedback_details.append(f"    - {e}")
-                    if len(white_validation['errors']) > 3:
-                        feedback_details.append(f"    ... 还有{len(white_validation['errors'])-3}个错误")
-                
-                if mixed_validation['errors']:
-                    feedback_details.append(f"  Mixed窗口 ({len(mixed_validation['errors'])}个):")
-                    for e in mixed_validation['errors'][:3]:  # 只显示前3个错误
-                        feedback_details.append(f"    - {e}")
-                    if len(mixed_validation['errors']) > 3:
-                        feedback_details.append(f"    ... 还有{len(mixed_validation['errors'])-3}个错误")
-            
-            # 添加保存位置信息
-            if white_saved or mixed_saved:
-                save_dir = os.path.dirname(white_temp_file if white_saved else mixed_temp_file)
-                feedback_details.append(f"\n📂 保存位置: {save_dir}")
-            
-            # 添加时间戳
-            import datetime
-            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            feedback_details.append(f"\n🕒 操作时间: {timestamp}")
-            
-            # 显示用户反馈
-            feedback_text = "\n".join(feedback_details)
-            show_save_status_dialog(feedback_success, feedback_text)
-            
-            # 同时记录到日志
-            if logger:
-                logger.info("\n===== 临时文件保存结果 =====")
-                logger.info(f"White窗口数据: {'成功' if white_saved else '失败'} (计划保存: {len(white_criteria)}条)")
-                if white_saved:
-                    logger.info(f"  - 文件路径: {white_temp_file}")
-                
-                logger.info(f"Mixed窗口数据: {'成功' if mixed_saved else '失败'} (计划保存: {len(mixed_criteria)}条)")
-                if mixed_saved:
-                    logger.info(f"  - 文件路径: {mixed_temp_file}")
-                
-                if white_saved or mixed_saved:
-                    logger.info("保存操作完成")
-                else:
-                    logger.warning("警告: 所有保存操作均失败")
-                    
-        except Exception as e:
-            # 记录详细错误但不中断流程
-            if logger:
-                logger.error(f"保存Review Criteria子窗口数据到临时文件时发生严重错误: {str(e)}")
-                import traceback
-                logger.debug(f"错误详情: {traceback.format_exc()}")
-            # 创建备选简单保存方案
-            try:
-                simple_temp_dir = tempfile.gettempdir()
-                simple_white_file = os.path.join(simple_temp_dir, "review_criteria_white.csv")
-                simple_mixed_file = os.path.join(simple_temp_dir, "review_criteria_mixed.csv")
-                
-                # 简化版保存逻辑，作为最后的备选
-                if white_criteria:
-                    with open(simple_white_file, 'w', newline='', encoding='utf-8') as f:
-                        writer = csv.writer(f)
-                        writer.writerow(['Standard', 'Lower_Limit', 'Upper_Limit'])
-                        for std_name, (lower, upper) in white_criteria.items():
-                            writer.writerow([std_name, lower, upper])
-                    self._white_criteria_file = simple_white_file
-                
-                if mixed_criteria:
-                    with open(simple_mixed_file, 'w', newline='', encoding='utf-8') as f:
-                        writer = csv.writer(f)
-                        writer.writerow(['Standard', 'Lower_Limit', 'Upper_Limit'])
-                        for std_name, (lower, upper) in mixed_criteria.items():
-                            writer.writerow([std_name, lower, upper])
-                    self._mixed_criteria_file = simple_mixed_file
-                    
-                if logger:
-                    logger.info("已使用简化方案保存数据")
-            except Exception as backup_e:
-                if logger:
-                    logger.critical(f"简化保存方案也失败: {str(backup_e)}")
-        
-        # 尝试从临时文件读取规格数据（新的方式）
-        try:
-            if logger:
-                logger.info("尝试从临时文件读取Review Criteria规格数据...")
-                
-            temp_criteria = self._load_criteria_from_temp_files()
-            
-            # 如果从临时文件读取到数据，则优先使用这些数据
-            if temp_criteria:
-                if logger:
-                    logger.info(f"成功从临时文件读取 {len(temp_criteria)} 条规格数据")
-                criteria_dict = temp_criteria
-            else:
-                if logger:
-                    logger.info("未能从临时文件读取到数据，使用原始方式获取的数据")
-                    
-        except Exception as e:
-            # 记录错误但使用原始数据继续
-            if logger:
-                logger.error(f"从临时文件读取Review Criteria数据时出错: {str(e)}")
-        
-        # 确保日志输出包含所有捕获的数据
-        if logger:
-            logger.info("\n=== Review Criteria规格数据汇总 ===")
-            logger.info(f"总共读取到 {len(criteria_dict)} 条规格标准")
-            
-            # 按子窗口类型分类输出
-            white_criteria = {k: v for k, v in criteria_dict.items() if k.startswith('White')}
-            mixed_criteria = {k: v for k, v in criteria_dict.items() if k.startswith('Mixed')}
-            original_criteria_only = {k: v for k, v in criteria_dict.items() if not (k.startswith('White') or k.startswith('Mixed'))}
-            
-            # 详细输出White窗口规格，显示没有前缀的名称
-            logger.info(f"\n------ White子窗口规格 ------")
-            if white_criteria:
-                logger.info(f"从White窗口读取到 {len(white_criteria)} 条规格:")
-                for std_type, (lower, upper) in sorted(white_criteria.items()):
-                    # 显示没有前缀的规格名称，使输出更清晰
-                    display_name = std_type.replace('White ', '')
-                    logger.info(f"  {display_name}: 下限={lower}, 上限={upper}")
-            else:
-                logger.info("  未从White子窗口读取到规格数据")
-            
-            # 详细输出Mixed窗口规格，显示没有前缀的名称
-            logger.info(f"\n------ Mixed子窗口规格 ------")
-            if mixed_criteria:
-                logger.info(f"从Mixed窗口读取到 {len(mixed_criteria)} 条规格:")
-                for std_type, (lower, upper) in sorted(mixed_criteria.items()):
-                    # 显示没有前缀的规格名称，使输出更清晰
-                    display_name = std_type.replace('Mixed ', '')
-                    logger.info(f"  {display_name}: 下限={lower}, 上限={upper}")
-            else:
-                logger.info("  未从Mixed子窗口读取到规格数据")
-            
-            # 输出未分类规格
-            if original_criteria_only:
-                logger.info(f"\n------ 未分类规格 ------")
-                logger.info(f"读取到 {len(original_criteria_only)} 条未分类规格:")
-                for std_type, (lower, upper) in sorted(original_criteria_only.items()):
-                    logger.info(f"  {std_type}: 下限={lower}, 上限={upper}")
-            
-            logger.info("\n==========================\n")
-            
-        return criteria_dict
-        
-    def _get_improved_criteria_dict(self):
-        """改进的方法，专门用于读取Review Criteria选项卡中White和Mixed两个子窗口的所有规格数据"""
-        criteria_dict = {}
-        white_data_found = False
-        mixed_data_found = False
-        
-        try:
-            # 使用logger记录信息
-            global logger
-            if logger:
-                logger.info("\n--- 开始从Review Criteria选项卡读取规格数据 ---")
-            
-            # 尝试直接从UI组件获取数据
-            # 方法1: 检查是否有left_frame和right_frame属性
-            if hasattr(self, 'left_frame') and hasattr(self, 'right_frame'):
-                if logger:
-                    logger.info("[方法1] 发现独立的left_frame和right_frame，尝试从这两个框架读取数据...")
-                
-                # 从左框架(White)读取数据
-                white_frame_data = {}
-                self._extract_criteria_from_ui_hierarchy(self.left_frame, 'White', white_frame_data)
-                if white_frame_data:
-                    criteria_dict.update(white_frame_data)
-                    white_data_found = True
-                    if logger:
-                        logger.info(f"[方法1] 从left_frame成功提取到 {len(white_frame_data)} 条White窗口数据")
-                else:
-                    if logger:
-                        logger.info("[方法1] 未能从left_frame提取到White窗口数据")
-                        
-                # 从右框架(Mixed)读取数据
-                mixed_frame_data = {}
-                self._extract_criteria_from_ui_hierarchy(self.right_frame, 'Mixed', mixed_frame_data)
-                if mixed_frame_data:
-                    criteria_dict.update(mixed_frame_data)
-                    mixed_data_found = True
-                    if logger:
-                        logger.info(f"[方法1] 从right_frame成功提取到 {len(mixed_frame_data)} 条Mixed窗口数据")
-                else:
-                    if logger:
-                        logger.info("[方法1] 未能从right_frame提取到Mixed窗口数据")
-            
-            # 方法2: 检查Review Criteria选项卡
-            elif hasattr(self, 'review_criteria_tab'):
-                tab_children = self.review_criteria_tab.winfo_children()
-                
-                if logger:
-                    logger.info(f"[方法2] 从review_criteria_tab读取数据，发现{len(tab_children)}个子组件")
-                
-                # 窗口类型映射（左框架为White，右框架为Mixed）
-                window_types = ['White', 'Mixed']
-                
-                # 遍历Review Criteria选项卡中的所有组件
-                for idx, child in enumerate(tab_children):
-                    # 根据框架位置确定窗口类型
-                    window_type = window_types[idx % len(window_types)] if idx < len(window_types) else f'Unknown_{idx}'
-                    
-                    if logger:
-                        logger.info(f"[方法2] 处理 {window_type} 组件: {str(type(child))}")
-                    
-                    # 递归搜索所有子框架中的规格数据
-                    component_data = {}
-                    self._extract_criteria_from_ui_hierarchy(child, window_type, component_data)
-                    
-                    if component_data:
-                        criteria_dict.update(component_data)
-                        if window_type == 'White':
-                            white_data_found = True
-                        elif window_type == 'Mixed':
-                            mixed_data_found = True
-                        if logger:
-                            logger.info(f"[方法2] 从{window_type}组件成功提取到 {len(component_data)} 条数据")
-                    else:
-                        if logger:
-                            logger.info(f"[方法2] 未能从{window_type}组件提取到数据")
-                            
-                # 特殊处理: 尝试从review_criteria_tab的Canvas组件中查找数据
-                canvas_found = False
-                for child in tab_children:
-                    if isinstance(child, tk.Canvas):
-                        canvas_found = True
-                        if logger:
-                            logger.info("[方法2-扩展] 发现Canvas组件，尝试从中提取数据")
-                        
-                        # 为Canvas创建单独的数据字典
-                        canvas_data = {}
-                        # 获取Canvas中的所有项目
-                        for item_id in child.find_all():
-                            try:
-                                window = child.itemcget(item_id, "window")
-                                if window and isinstance(window, (tk.Frame, ttk.Frame)):
-                                    # 尝试从Canvas中的窗口提取White和Mixed数据
-                                    canvas_white_data = {}
-                                    canvas_mixed_data = {}
-                                    self._extract_criteria_from_ui_hierarchy(window, 'White', canvas_white_data)
-                                    self._extract_criteria_from_ui_hierarchy(window, 'Mixed', canvas_mixed_data)
-                                    
-                                    if canvas_white_data:
-                                        criteria_dict.update(canvas_white_data)
-                                        white_data_found = True
-                                        if logger:
-                                            logger.info(f"[方法2-扩展] 从Canvas窗口提取到 {len(canvas_white_data)} 条White数据")
-                                    if canvas_mixed_data:
-                                        criteria_dict.update(canvas_mixed_data)
-                                        mixed_data_found = True
-                                        if logger:
-                                            logger.info(f"[方法2-扩展] 从Canvas窗口提取到 {len(canvas_mixed_data)} 条Mixed数据")
-                            except Exception as e:
-                                if logger:
-                                    logger.debug(f"[方法2-扩展] 处理Canvas项目时出错: {str(e)}")
-                
-                if not canvas_found and logger:
-                    logger.info("[方法2-扩展] 在review_criteria_tab中未发现Canvas组件")
-            
-            # 方法3: 搜索所有可能的属性名变体
-            else:
-                if logger:
-                    logger.info("[方法3] 尝试通过搜索可能的属性名查找规格数据组件...")
-                
-                # 定义可能包含窗口数据的属性名模式
-                patterns = [
-                    ('_white_', 'White'),
-                    ('white_', 'White'),
-                    ('_mixed_', 'Mixed'),
-                    ('mixed_', 'Mixed'),
-                    ('_frame', None),  # 通用框架模式，稍后确定类型
-                    ('frame_', None)
-                ]
-                
-                # 尝试查找所有可能包含框架的属性
-                for attr_name in dir(self):
-                    # 检查是否为私有属性或方法
-                    if attr_name.startswith('__') and attr_name.endswith('__'):
-                        continue
-                    
-                    # 检查是否为方法
-                    attr_value = getattr(self, attr_name)
-                    if callable(attr_value):
-                        continue
-                    
-                    # 尝试匹配预定义的模式
-                    matched_pattern = None
-                    window_type = None
-                    for pattern, wtype in patterns:
-                        if pattern in attr_name.lower():
-                            matched_pattern = pattern
-                            window_type = wtype
-                            break
-                    
-                    # 如果找到匹配的模式且是框架类型
-                    if matched_pattern and isinstance(attr_value, (tk.Frame, ttk.Frame)):
-                        # 如果没有预定义窗口类型，尝试根据属性名推断
-                        if window_type is None:
-                            window_type = 'White' if 'white' in attr_name.lower() else 'Mixed' if 'mixed' in attr_name.lower() else 'Unknown'
-                        
-                        if logger:
-                            logger.info(f"[方法3] 从属性 {attr_name} 尝试提取 {window_type} 窗口数据")
-                        
-                        # 创建临时字典来存储从此组件提取的数据
-                        attr_data = {}
-                        self._extract_criteria_from_ui_hierarchy(attr_value, window_type, attr_data)
-                        
-                        if attr_data:
-                            criteria_dict.update(attr_data)
-                            if window_type == 'White':
-                                white_data_found = True
-                            elif window_type == 'Mixed':
-                                mixed_data_found = True
-                            if logger:
-                                logger.info(f"[方法3] 从{attr_name}成功提取到 {len(attr_data)} 条{window_type}数据")
-                        else:
-                            if logger:
-                                logger.info(f"[方法3] 未能从{attr_name}提取到数据")
-            
-            # 方法4: 检查是否有专门的white_frame和mixed_frame属性
-            if not (white_data_found and mixed_data_found):
-                # 尝试查找white_frame
-                if hasattr(self, 'white_frame') and isinstance(self.white_frame, (tk.Frame, ttk.Frame)):
-                    if logger:
-                        logger.info("[方法4] 发现专门的white_frame属性，尝试从中提取数据")
-                    
-                    white_data = {}
-                    self._extract_criteria_from_ui_hierarchy(self.white_frame, 'White', white_data)
-                    if white_data:
-                        criteria_dict.update(white_data)
-                        white_data_found = True
-                        if logger:
-                            logger.info(f"[方法4] 从white_frame成功提取到 {len(white_data)} 条数据")
-                
-                # 尝试查找mixed_frame
-                try:
-                    if hasattr(self, 'mixed_frame') and isinstance(self.mixed_frame, (tk.Frame, ttk.Frame)):
-                        if logger:
-                            logger.info("[方法4] 发现专门的mixed_frame属性，尝试从中提取数据")
-                        
-                        mixed_data = {}
-                        self._extract_criteria_from_ui_hierarchy(self.mixed_frame, 'Mixed', mixed_data)
-                        if mixed_data:
-                            criteria_dict.update(mixed_data)
-                            mixed_data_found = True
-                            if logger:
-                                logger.info(f"[方法4] 从mixed_frame成功提取到 {len(mixed_data)} 条数据")
-                except Exception as e:
-                    if logger:
-                        logger.debug(f"[方法4] 处理mixed_frame时出错: {str(e)}")
-            
-            # 统计最终结果
-            white_count = sum(1 for k in criteria_dict.keys() if k.startswith('White'))
-            mixed_count = sum(1 for k in criteria_dict.keys() if k.startswith('Mixed'))
-            
-            # 如果成功获取了数据，记录详情
-            if criteria_dict:
-                if logger:
-                    logger.info(f"\n[总结] 改进方法成功读取到 {len(criteria_dict)} 条带前缀的规格标准！")
-                    logger.info(f"[总结] 其中White窗口数据: {white_count} 条")
-                    logger.info(f"[总结] Mixed窗口数据: {mixed_count} 条")
-                    
-                    # 详细记录部分关键数据以便调试
-                    sample_data = dict(list(criteria_dict.items())[:5])  # 只记录前5条作为示例
-                    for key, value in sample_data.items():
-                        logger.info(f"[总结] 示例数据 - {key}: {value}")
-            else:
-                if logger:
-                    logger.info("[总结] 改进方法未从UI读取到规格数据")
-                    logger.info("[总结] 检查点:")
-                    logger.info(f"[总结] - 是否找到White窗口数据: {white_data_found}")
-                    logger.info(f"[总结] - 是否找到Mixed窗口数据: {mixed_data_found}")
-                
-        except Exception as e:
-            error_msg = f"[错误] 读取规格数据时出错: {str(e)}"
-            if logger:
-                logger.error(error_msg)
-            else:
-                print(error_msg)
-                
-        return criteria_dict
-        
-    def _extract_criteria_from_ui_hierarchy(self, widget, window_type, criteria_dict):
-        """递归从UI层次结构中提取规格数据，增强组件识别能力"""
-        global logger
-        
-        try:
-            # 添加详细的组件类型和名称日志
-            widget_type = type(widget).__name__
-            widget_name = getattr(widget, 'winfo_name', lambda: 'unknown')()
-            if logger and hasattr(widget, 'winfo_class'):
-                widget_class = widget.winfo_class()
-                logger.debug(f"处理组件: {widget_type} (名称: {widget_name}, 类: {widget_class})")
-            
-            if isinstance(widget, (tk.Frame, ttk.Frame)):
-                # 为当前窗口类型创建临时计数器
-                window_counter = {}
-                extracted_count = 0
-                
-                # 遍历子组件
-                children = widget.winfo_children()
-                if logger:
-                    logger.debug(f"框架组件包含 {len(children)} 个子组件")
-                
-                # 方法3: 首先检查当前框架是否包含任何标签和输入框组合
-                # 这是一个更宽松的检查，可以捕获更多可能的数据结构
-                labels = [c for c in children if isinstance(c, (tk.Label, ttk.Label))]
-                entries = [c for c in children if isinstance(c, (ttk.Entry, tk.Entry))]
-                
-                if labels and len(entries) >= 2:
-                    try:
-                        # 尝试从同一框架中的标签和输入框提取数据
-                        std_type = "".join([l.cget("text").strip() for l in labels if l.cget("text").strip()])
-                        if std_type:
-                            lower_limit = entries[0].get().strip() if entries else ""
-                            upper_limit = entries[1].get().strip() if len(entries) > 1 else ""
-                            
-                            if lower_limit or upper_limit:
-                                full_std_type = f"{window_type} {std_type}"
-                                
-                                # 确保数值类型正确
-                                lower_limit_val = float(lower_limit) if lower_limit and self._is_valid_number(lower_limit) else -1
-                                upper_limit_val = float(upper_limit) if upper_limit and self._is_valid_number(upper_limit) else -1
-                                
-                                criteria_dict[full_std_type] = (lower_limit_val, upper_limit_val)
-                                window_counter[full_std_type] = True
-                                extracted_count += 1
-                                
-                                if logger:
-                                    logger.info(f"从{window_type}窗口提取到(格式3): {full_std_type} - 下限={lower_limit_val}, 上限={upper_limit_val}")
-                    except Exception as e:
-                        if logger:
-                            logger.debug(f"处理直接标签输入框组合时出错: {str(e)}")
-                
-                for i, child in enumerate(children):
-                    # 特殊处理Canvas组件，增强Canvas数据提取
-                    if isinstance(child, tk.Canvas):
-                        if logger:
-                            logger.debug(f"[组件{i+1}/{len(children)}] 发现Canvas组件，尝试提取内嵌窗口数据...")
-                        try:
-                            # 改进Canvas处理，确保获取所有窗口项目
-                            items = child.find_all()
-                            if logger:
-                                logger.debug(f"Canvas包含 {len(items)} 个项目")
-                            
-                            for item_id in items:
-                                try:
-                                    window = child.itemcget(item_id, "window")
-                                    if window:
-                                        if isinstance(window, (tk.Frame, ttk.Frame)):
-                                            if logger:
-                                                logger.debug(f"从Canvas项目 {item_id} 发现窗口组件，递归处理")
-                                            # 递归处理Canvas中的窗口
-                                            prev_count = len(criteria_dict)
-                                            self._extract_criteria_from_ui_hierarchy(window, window_type, criteria_dict)
-                                            new_count = len(criteria_dict) - prev_count
-                                            if new_count > 0 and logger:
-                                                logger.info(f"从Canvas窗口成功提取到 {new_count} 条{window_type}数据")
-                                        else:
-                                            if logger:
-                                                logger.debug(f"Canvas项目 {item_id} 包含非框架窗口: {type(window).__name__}")
-                                    else:
-                                        if logger:
-                                            logger.debug(f"Canvas项目 {item_id} 不包含窗口")
-                                except Exception as e:
-                                    if logger:
-                                        logger.debug(f"处理Canvas项目 {item_id} 时出错: {str(e)}")
-                        except Exception as e:
-                            if logger:
-                                logger.error(f"处理Canvas组件时发生严重错误: {str(e)}")
-                    # 特殊处理PanedWindow组件
-                    elif isinstance(child, (tk.PanedWindow, ttk.PanedWindow)):
-                        if logger:
-                            logger.debug(f"[组件{i+1}/{len(children)}] 发现PanedWindow组件，尝试提取其内容...")
-                        try:
-                            # 处理PanedWindow中的窗格
-                            panes = child.panes()
-                            for pane in panes:
-                                if isinstance(pane, (tk.Frame, ttk.Frame)):
-                                    self._extract_criteria_from_ui_hierarchy(pane, window_type, criteria_dict)
-                        except Exception as e:
-                            if logger:
-                                logger.debug(f"处理PanedWindow组件时出错: {str(e)}")
-                    else:
-                        # 递归处理其他子组件
-                        if logger:
-                            logger.debug(f"[组件{i+1}/{len(children)}] 递归处理 {type(child).__name__} 组件")
-                        self._extract_criteria_from_ui_hierarchy(child, window_type, criteria_dict)
-                    
-                    # 检查当前框架是否包含规格行数据 - 增强版
-                    if isinstance(child, (tk.Frame, ttk.Frame)):
-                        child_children = child.winfo_children()
-                        
-                        # 方法1: 尝试典型的规格行格式 (5+组件, 位置1是标签, 位置2和3是输入框)
-                        if len(child_children) >= 5 and isinstance(child_children[1], (tk.Label, ttk.Label)) and \
-                           all(isinstance(child_children[i], (ttk.Entry, tk.Entry)) for i in range(2, 4)):
-                            try:
-                                self._process_criteria_row(child, window_type, criteria_dict, window_counter)
-                                extracted_count += 1
-                            except Exception as e:
-                                if logger:
-                                    logger.debug(f"处理典型规格行时出错: {str(e)}")
-                        
-                        # 方法2: 尝试更灵活的规格行格式 (任何标签+两个输入框的组合)
-                        elif len(child_children) >= 3:
-                            try:
-                                # 扩展标签和输入框类型识别
-                                labels = [i for i, c in enumerate(child_children) if isinstance(c, (tk.Label, ttk.Label))]
-                                entries = [i for i, c in enumerate(child_children) if isinstance(c, (ttk.Entry, tk.Entry))]
-                                
-                                # 方法2A: 确保找到标签和至少两个输入框
-                                if labels and len(entries) >= 2:
-                                    # 找到第一个标签和前两个输入框
-                                    std_type = child_children[labels[0]].cget("text").strip()
-                                    lower_limit = child_children[entries[0]].get().strip()
-                                    upper_limit = child_children[entries[1]].get().strip()
-                                    
-                                    # 放宽验证条件，提高数据提取成功率
-                                    if std_type:  # 只需要标准类型有值，上下限可以为空
-                                        # 对所有类型都添加窗口类型前缀
-                                        full_std_type = f"{window_type} {std_type}"
-                                        
-                                        # 确保数值类型正确
-                                        lower_limit_val = float(lower_limit) if lower_limit and self._is_valid_number(lower_limit) else -1
-                                        upper_limit_val = float(upper_limit) if upper_limit and self._is_valid_number(upper_limit) else -1
-                                        
-                                        # 记录到结果字典
-                                        criteria_dict[full_std_type] = (lower_limit_val, upper_limit_val)
-                                        window_counter[full_std_type] = True
-                                        extracted_count += 1
-                                        
-                                        if logger:
-                                            logger.info(f"从{window_type}窗口提取到(格式2): {full_std_type} - 下限={lower_limit_val}, 上限={upper_limit_val}")
-                            except Exception as e:
-                                if logger:
-                                    logger.debug(f"处理灵活格式规格行时出错: {str(e)}")
-                
-                # 记录当前窗口提取结果
-                if logger:
-                    logger.info(f"{window_type}窗口({widget_name})本次提取到{extracted_count}条规格数据")
-            else:
-                # 对于非框架组件，仅记录类型（可用于调试）
-                if logger:
-                    logger.debug(f"跳过非框架组件: {widget_type} (名称: {widget_name})")
-        except Exception as e:
-            # 捕获所有异常，确保方法不会崩溃
-            if logger:
-                logger.error(f"_extract_criteria_from_ui_hierarchy方法执行时出错: {str(e)}")
-                
-    def _process_criteria_row(self, row_frame, window_type, criteria_dict, window_counter):
-        """处理单行规格数据，增强数据提取和验证能力"""
-        global logger
-        
-        try:
-            # 获取框架的所有子组件
-            children = row_frame.winfo_children()
-            
-            # 扩展逻辑1: 首先尝试查找任何标签和两个输入框的组合，不限于固定位置
-            if len(children) >= 3:
-                # 查找所有标签和输入框
-                labels = [c for c in children if isinstance(c, (tk.Label, ttk.Label))]
-                entries = [c for c in children if isinstance(c, (tk.Entry, ttk.Entry))]
-                
-                # 如果找到至少一个标签和两个输入框，尝试提取数据
-                if labels and len(entries) >= 2:
-                    try:
-                        # 获取第一个标签的文本作为标准类型
-                        std_type = "".join([l.cget("text").strip() for l in labels if l.cget("text").strip()])
-                        
-                        if std_type:
-                            # 获取前两个输入框的值作为上下限
-                            lower_limit_text = entries[0].get().strip()
-                            upper_limit_text = entries[1].get().strip()
-                            
-                            # 放宽验证条件，只需要标准类型有值
-                            full_std_type = f"{window_type} {std_type}"
-                            
-                            # 确保数值类型正确
-                            lower_limit_val = float(lower_limit_text) if lower_limit_text and self._is_valid_number(lower_limit_text) else -1
-                            upper_limit_val = float(upper_limit_text) if upper_limit_text and self._is_valid_number(upper_limit_text) else -1
-                            
-                            # 添加数据合理性检查
-                            if lower_limit_val > -1 and upper_limit_val > -1 and lower_limit_val > upper_limit_val:
-                                if logger:
-                                    logger.warning(f"数据合理性警告: {full_std_type} 下限({lower_limit_val})大于上限({upper_limit_val})")
-                                # 交换上下限，确保数据合理性
-                                lower_limit_val, upper_limit_val = upper_limit_val, lower_limit_val
-                                if logger:
-                                    logger.warning(f"已自动交换上下限值")
-                            
-                            # 记录到结果字典
-                            criteria_dict[full_std_type] = (lower_limit_val, upper_limit_val)
-                            window_counter[full_std_type] = True
-                            
-                            # 详细记录数据提取结果
-                            if logger:
-                                logger.info(f"成功从{window_type}窗口提取到(灵活匹配): {full_std_type} - 下限={lower_limit_val}, 上限={upper_limit_val}")
-                            return  # 成功提取后返回，避免重复处理
-                    except Exception as flexible_e:
-                        if logger:
-                            logger.debug(f"尝试灵活匹配数据时出错: {str(flexible_e)}")
-            
-            # 原始逻辑: 检查特定位置的组件
-            # 增强索引验证，确保子组件数量足够
-            if len(children) < 4:
-                if logger:
-                    logger.debug(f"规格行框架子组件不足，仅有 {len(children)} 个组件")
-                # 不再直接返回，而是继续尝试其他方法
-            
-            # 检查标签组件是否有效
-            elif not isinstance(children[1], (tk.Label, ttk.Label)):
-                if logger:
-                    logger.debug(f"位置1的组件不是标签类型: {type(children[1]).__name__}")
-            
-            # 检查输入框组件是否有效
-            elif not (isinstance(children[2], (tk.Entry, ttk.Entry)) and isinstance(children[3], (tk.Entry, ttk.Entry))):
-                if logger:
-                    logger.debug(f"位置2或3的组件不是输入框类型: {type(children[2]).__name__}/{type(children[3]).__name__}")
-            
-            else:
-                # 提取标准类型和上下限数据
-                try:
-                    std_type = children[1].cget("text").strip()
-                    if not std_type:
-                        if logger:
-                            logger.debug(f"标准类型名称为空")
-                        return
-                    
-                    lower_limit_text = children[2].get().strip()
-                    upper_limit_text = children[3].get().strip()
-                    
-                    # 放宽数据验证条件，只需要标准类型有值
-                    # 对所有类型都添加窗口类型前缀
-                    full_std_type = f"{window_type} {std_type}"
-                    
-                    # 确保数值类型正确
-                    lower_limit_val = float(lower_limit_text) if lower_limit_text and self._is_valid_number(lower_limit_text) else -1
-                    upper_limit_val = float(upper_limit_text) if upper_limit_text and self._is_valid_number(upper_limit_text) else -1
-                    
-                    # 添加数据合理性检查
-                    if lower_limit_val > -1 and upper_limit_val > -1 and lower_limit_val > upper_limit_val:
-                        if logger:
-                            logger.warning(f"数据合理性警告: {full_std_type} 下限({lower_limit_val})大于上限({upper_limit_val})")
-                        # 交换上下限，确保数据合理性
-                        lower_limit_val, upper_limit_val = upper_limit_val, lower_limit_val
-                        if logger:
-                            logger.warning(f"已自动交换上下限值")
-                    
-                    # 记录到结果字典
-                    criteria_dict[full_std_type] = (lower_limit_val, upper_limit_val)
-                    window_counter[full_std_type] = True
-                    
-                    # 详细记录数据提取结果
-                    if logger:
-                        logger.info(f"成功从{window_type}窗口提取到: {full_std_type} - 下限={lower_limit_val}, 上限={upper_limit_val}")
-                except Exception as inner_e:
-                    if logger:
-                        logger.error(f"提取数据时出错: {str(inner_e)}")
-                        # 添加更详细的组件信息以便调试
-                        child_types = [type(c).__name__ for c in children]
-                        logger.debug(f"子组件类型列表: {child_types}")
-                        logger.debug(f"子组件数量: {len(children)}")
-        except Exception as e:
-            # 捕获所有异常，确保方法不会崩溃
-            if logger:
-                logger.error(f"处理规格行框架时发生未预期错误: {str(e)}")
-            # 不向上层抛出异常，确保其他数据行仍能处理
-                
-    def _is_valid_number(self, text):
-        """检查文本是否是有效的数字格式"""
-        try:
-            float(text)
-            return True
-        except:
-            return False
-            
-    def _get_original_criteria_dict(self):
-        """原始的方法，获取Review Criteria中的阈值数据"""
-        global logger
-        criteria_dict = {}
-        
-        if logger:
-            logger.info("开始尝试从UI提取规格数据...")
-        
-        # 方法1: 尝试我们的增强版数据提取函数
-        enhanced_criteria = self._extract_criteria_enhanced()
-        if enhanced_criteria:
-            criteria_dict = enhanced_criteria
-            if logger:
-                logger.info(f"增强版数据提取成功，获取到 {len(criteria_dict)} 条规格数据")
-            # 直接返回成功提取的数据
-            self._print_criteria_dict(criteria_dict)
-            return criteria_dict
-        
-        # 方法2: 尝试原始的数据提取逻辑
-        if hasattr(self, 'review_criteria_tab'):
-            if logger:
-                logger.info("尝试使用原始方法从Review Criteria选项卡中提取数据...")
-            # 遍历Review Criteria选项卡中的所有窗口组件
-            for child in self.review_criteria_tab.winfo_children():
-                if isinstance(child, ttk.Frame):
-                    # 查找包含标准数据的子框架
-                    for sub_child in child.winfo_children():
-                        if isinstance(sub_child, tk.Frame):
-                            # 查找canvas
-                            for canvas_child in sub_child.winfo_children():
-                                if isinstance(canvas_child, tk.Canvas):
-                                    # 获取canvas中的窗口
-                                    canvas_windows = canvas_child.find_all()
-                                    for window_id in canvas_windows:
-                                        window = canvas_child.itemcget(window_id, "window")
-                                        if window and isinstance(window, tk.Frame):
-                                            # 查找行框架
-                                            for row_frame in window.winfo_children():
-                                                if isinstance(row_frame, tk.Frame):
-                                                    # 查找类型标签和输入框
-                                                    widgets = row_frame.winfo_children()
-                                                    if len(widgets) >= 5:
-                                                        type_label = widgets[1]
-                                                        lower_entry = widgets[2]
-                                                        upper_entry = widgets[3]
-                                                        
-                                                        # 获取标准类型和上下限
-                                                        std_type = type_label.cget("text").strip()
-                                                        lower_limit = lower_entry.get().strip()
-                                                        upper_limit = upper_entry.get().strip()
-                                                        
-                                                        if std_type:
-                                                            criteria_dict[std_type] = (lower_limit, upper_limit)
-                                                            if logger:
-                                                                logger.info(f"原始方法提取成功: {std_type} - 下限={lower_limit}, 上限={upper_limit}")
-        
-        # 方法3: 尝试从整个UI层次结构中搜索White和Mixed窗口
-        if not criteria_dict and hasattr(self, 'root'):
-            if logger:
-                logger.info("尝试从整个UI层次结构中搜索White和Mixed窗口数据...")
-            # 从根窗口开始搜索
-            white_dict = {}
-            mixed_dict = {}
-            
-            # 搜索White窗口数据
-            self._search_ui_for_window_type(self.root, "White", white_dict)
-            # 搜索Mixed窗口数据
-            self._search_ui_for_window_type(self.root, "Mixed", mixed_dict)
-            
-            # 合并结果
-            if white_dict:
-                criteria_dict.update(white_dict)
-                if logger:
-                    logger.info(f"从整个UI找到 {len(white_dict)} 条White窗口数据")
-            
-            if mixed_dict:
-                criteria_dict.update(mixed_dict)
-                if logger:
-                    logger.info(f"从整个UI找到 {len(mixed_dict)} 条Mixed窗口数据")
-        
-        # 如果没有从UI获取到数据，尝试使用默认阈值
-        if not criteria_dict and hasattr(self, 'processed_data') and not self.processed_data.empty:
-            # 尝试从数据中提取标准信息
-            criteria_columns = ['White Pass/Fail Criteria', 'Mixed Pass/Fail Criteria',
-                              'Pass/Fail Criteria', 'Criteria', 'Mixed PassFail Criteria',
-                              'White PassFail Criteria']
-            
-            for col in criteria_columns:
-                if col in self.processed_data.columns:
-                    # 获取第一个非空的值
-                    values = self.processed_data[col].dropna()
-                    if not values.empty:
-                        criteria_string = values.iloc[0]
-                        # 解析标准字符串
-                        criteria_items = self._parse_criteria_string(criteria_string)
-                        # 转换为字典格式
-                        for item in criteria_items:
-                            # 处理可能有3个值的元组（std_type, std_value, number）或2个值的元组
-                            if len(item) == 3:
-                                std_type, std_value, _ = item  # 忽略排序数字
-                            else:
-                                std_type, std_value = item
-                                
-                            if '|' in std_value:
-                                lower, upper = std_value.split('|', 1)
-                            else:
-                                lower = std_value
-                                upper = ''
-                            criteria_dict[std_type] = (lower.strip(), upper.strip())
-                        break
-        
-        # 打印提取结果
-        self._print_criteria_dict(criteria_dict)
-        
-        return criteria_dict
-    
-    def _print_criteria_dict(self, criteria_dict):
-        """打印规格数据字典"""
-        global logger
-        
-        if criteria_dict:
-            print("\n=== Review Criteria规格数据 ===")
-            print(f"总共读取到 {len(criteria_dict)} 条规格标准:")
-            for std_type, (lower_limit, upper_limit) in criteria_dict.items():
-                if lower_limit and upper_limit:
-                    print(f"  {std_type}: 下限={lower_limit}, 上限={upper_limit}")
-                elif lower_limit:
-                    print(f"  {std_type}: 下限={lower_limit}, 无上限")
-                elif upper_limit:
-                    print(f"  {std_type}: 无下限, 上限={upper_limit}")
-                else:
-                    print(f"  {std_type}: 无上下限")
-            print("==========================\n")
-            
-            if logger:
-                logger.info(f"总共成功提取 {len(criteria_dict)} 条规格标准")
-        else:
-            print("\n=== Review Criteria规格数据 ===")
-            print("未读取到任何规格标准")
-            print("==========================\n")
-            
-            if logger:
-                logger.warning("未能从UI中提取任何规格标准")
-    
-    def _extract_criteria_enhanced(self):
-        """增强版数据提取方法，使用多种策略尝试从UI中提取规格数据"""
-        global logger
-        criteria_dict = {}
-        
-        if logger:
-            logger.info("开始使用增强版数据提取方法...")
-        
-        # 检查是否有Review Criteria选项卡
-        if not hasattr(self, 'review_criteria_tab'):
-            if logger:
-                logger.warning("未找到Review Criteria选项卡")
-            return criteria_dict
-        
-        # 策略1: 直接从Review Criteria选项卡开始递归搜索
-        white_dict = {}
-        mixed_dict = {}
-        
-        # 从Review Criteria选项卡开始，针对White窗口搜索
-        self._extract_criteria_from_ui_hierarchy(self.review_criteria_tab, "White", white_dict)
-        
-        # 从Review Criteria选项卡开始，针对Mixed窗口搜索
-        self._extract_criteria_from_ui_hierarchy(self.review_criteria_tab, "Mixed", mixed_dict)
-        
-        # 合并结果
-        if white_dict:
-            criteria_dict.update(white_dict)
-            if logger:
-                logger.info(f"增强方法从White组件提取到 {len(white_dict)} 条数据")
-        else:
-            if logger:
-                logger.warning("[方法2] 未能从White组件提取到数据")
-        
-        if mixed_dict:
-            criteria_dict.update(mixed_dict)
-            if logger:
-                logger.info(f"增强方法从Mixed组件提取到 {len(mixed_dict)} 条数据")
-        else:
-            if logger:
-                logger.warning("[方法2] 未能从Mixed组件提取到数据")
-        
-        # 如果没有找到数据，尝试策略2: 查找所有Frame组件并检查是否包含White或Mixed文本
-        if not criteria_dict:
-            if logger:
-                logger.info("尝试策略2: 查找所有包含White/Mixed文本的Frame组件...")
-            
-            # 递归查找包含特定文本的组件
-            white_frames = []
-            mixed_frames = []
-            self._find_frames_by_text(self.review_criteria_tab, "white", white_frames)
-            self._find_frames_by_text(self.review_criteria_tab, "mixed", mixed_frames)
-            
-            # 从找到的Frame中提取数据
-            for frame in white_frames:
-                temp_dict = {}
-                self._extract_criteria_from_ui_hierarchy(frame, "White", temp_dict)
-                if temp_dict:
-                    criteria_dict.update(temp_dict)
-                    if logger:
-                        logger.info(f"从包含White文本的Frame中提取到 {len(temp_dict)} 条数据")
-            
-            for frame in mixed_frames:
-                temp_dict = {}
-                self._extract_criteria_from_ui_hierarchy(frame, "Mixed", temp_dict)
-                if temp_dict:
-                    criteria_dict.update(temp_dict)
-                    if logger:
-                        logger.info(f"从包含Mixed文本的Frame中提取到 {len(temp_dict)} 条数据")
-        
-        if not criteria_dict:
-            if logger:
-                logger.warning("[总结] 改进方法未从UI读取到规格数据")
-        
-        return criteria_dict
-    
-    def _search_ui_for_window_type(self, widget, window_type, criteria_dict):
-        """从整个UI层次结构中搜索特定窗口类型的数据"""
-        global logger
-        
-        try:
-            # 检查当前组件是否包含目标窗口类型的文本
-            if hasattr(widget, 'cget'):
+            # 检查上限
+            if upper_str:
                 try:
-                    text = widget.cget("text").lower()
-                    if window_type.lower() in text:
-                        if logger:
-                            logger.info(f"发现包含{window_type}文本的组件: {text}")
-                except Exception:
+                    upper_limit = float(upper_str)
+                    if value_float > upper_limit:
+                        is_pass = False
+                        # 添加更详细的失败原因信息
+                        failed_criteria.append({
+                            "std_type": std_type,
+                            "std_info": std_info,
+                            "column": column_name,
+                            "value": value_float,
+                            "condition": "upper",
+                            "limit": upper_limit,
+                            "description": f"{column_name} ({std_type}) = {value_float} > {upper_limit}"
+                        })
+                except ValueError:
                     pass
-            
-            # 检查组件名称
-            if hasattr(widget, 'winfo_name'):
-                name = widget.winfo_name().lower()
-                if window_type.lower() in name:
-                    if logger:
-                        logger.info(f"发现名称包含{window_type}的组件: {name}")
-                    # 尝试从这个组件提取数据
-                    temp_dict = {}
-                    self._extract_criteria_from_ui_hierarchy(widget, window_type, temp_dict)
-                    if temp_dict:
-                        criteria_dict.update(temp_dict)
-            
-            # 递归处理所有子组件
-            if hasattr(widget, 'winfo_children'):
-                children = widget.winfo_children()
-                for child in children:
-                    self._search_ui_for_window_type(child, window_type, criteria_dict)
-        except Exception as e:
-            if logger:
-                logger.error(f"搜索UI时出错: {str(e)}")
+        
+        return is_pass, failed_criteria, matched_columns
     
-    def _find_frames_by_text(self, widget, search_text, frame_list):
-        """递归查找包含特定文本的Frame组件"""
-        try:
-            # 检查当前组件是否是Frame
-            if isinstance(widget, (tk.Frame, ttk.Frame)):
-                # 检查组件自身的文本
-                if hasattr(widget, 'cget'):
-                    try:
-                        text = widget.cget("text").lower()
-                        if search_text in text:
-                            frame_list.append(widget)
-                    except Exception:
-                        pass
-                
-                # 检查组件名称
-                if hasattr(widget, 'winfo_name'):
-                    name = widget.winfo_name().lower()
-                    if search_text in name:
-                        frame_list.append(widget)
-            
-            # 递归处理所有子组件
-            if hasattr(widget, 'winfo_children'):
-                children = widget.winfo_children()
-                for child in children:
-                    self._find_frames_by_text(child, search_text, frame_list)
-        except Exception:
-            pass  # 静默忽略错误，继续搜索
+    def _get_criteria_dict(self):
+        """获取Review Criteria中的阈值数据（criteria_store中的规格数据，按版本缓存解析结果）
+        
+        Review Criteria编辑框通过变量跟踪直接更新criteria_store，不需要遍历界面组件。
+        
+        Returns:
+            dict: 标准字典，格式为 {std_type: (lower_limit, upper_limit)}
+        """
+        criteria_dict = self.criteria_store.criteria_dict()
+        if logger:
+            if criteria_dict:
+                logger.info(f"从criteria_store获取到 {len(criteria_dict)} 条规格数据（版本{self.criteria_store.version}）")
+            else:
+                logger.warning("criteria_store中没有有效规格数据，请先读取Review Criteria")
+        return criteria_dict
     
+    @profiled_action("Yield Analysis")
+    @loganalyzer_core.timed_stage("yield", rows_from='reprocessed_data')
     def yield_analysis(self):
         """执行不良率分析功能"""
         # 切换到不良率分析选项卡
@@ -7374,6 +5480,8 @@ class TestLogAnalyzer:
     def update_yield_analysis_table(self, progress_var=None, status_var=None, progress_window=None):
         """更新不良率分析表格，使用Treeview创建类似Excel的可复制表格
         根据Review Criteria中的阈值判断不良品"""
+        import numpy as np
+        
         # 清空良率分析选项卡中的现有内容
         for widget in self.yield_analysis_tab.winfo_children():
             widget.destroy()
@@ -7514,8 +5622,8 @@ class TestLogAnalyzer:
         total_count = len(self.processed_data)
         fail_count = 0
         
-        # 创建一个副本用于标记Pass/Fail状态
-        df_copy = self.processed_data.copy()
+        # 创建一个浅副本用于标记Pass/Fail状态（只新增判断结果列，不复制原有数据）
+        df_copy = self.processed_data.copy(deep=False)
         
         # 更新进度条
         if progress_var and status_var and progress_window:
@@ -7526,37 +5634,13 @@ class TestLogAnalyzer:
         # 根据Review Criteria中的阈值判断不良品
         if criteria_dict:
             # 在数据副本中添加基于标准的判断结果列和匹配信息
-            df_copy['Criteria_Pass/Fail'] = 'PASS'
-            df_copy['Failed_Details'] = ''
-            df_copy['Matched_Columns'] = ''
-            
-            # 遍历每条记录，根据阈值判断是否合格
-            for idx, row in df_copy.iterrows():
-                is_pass, failed_criteria, matched_columns = self._evaluate_record_against_criteria(row, criteria_dict)
-                if not is_pass:
-                    fail_count += 1
-                    df_copy.at[idx, 'Criteria_Pass/Fail'] = 'FAIL'
-                    
-                    # 保存详细的失败原因和匹配信息
-                    if failed_criteria:
-                        # 如果失败原因是字典格式，提取描述信息
-                        if isinstance(failed_criteria[0], dict):
-                            failed_descriptions = [fc['description'] for fc in failed_criteria]
-                            df_copy.at[idx, 'Failed_Details'] = ' | '.join(failed_descriptions)
-                        else:
-                            df_copy.at[idx, 'Failed_Details'] = ', '.join(failed_criteria)
-                    
-                    if matched_columns:
-                        # 保存匹配信息
-                        match_info = [f"{k}→{v}" for k, v in matched_columns.items()]
-                        df_copy.at[idx, 'Matched_Columns'] = ' | '.join(match_info)
-                
-                # 更新进度条（每处理10%的数据更新一次）
-                if progress_var and status_var and progress_window and idx % max(1, total_count // 10) == 0:
-                    progress = 60 + (idx / total_count) * 20
-                    progress_var.set(min(progress, 80))
-                    status_var.set(f"Evaluated {idx+1}/{total_count} records...")
-                    progress_window.update_idletasks()
+            # 按列向量化判定（与_evaluate_record_against_criteria的逐条判断规则一致: 严格小于下限或大于上限为不良），
+            # 每条标准的不良mask由analysis_graph按数据版本和标准内容缓存
+            is_fail, failed_details, matched_text = self._criteria_yield_verdict(df_copy, criteria_dict)
+            fail_count = int(is_fail.sum())
+            df_copy['Criteria_Pass/Fail'] = np.where(is_fail, 'FAIL', 'PASS')
+            df_copy['Failed_Details'] = failed_details
+            df_copy['Matched_Columns'] = np.where(is_fail, matched_text, '')
         else:
             # 如果没有标准数据，使用原来的Pass/Fail列
             if 'Pass/Fail' in df_copy.columns:
@@ -7584,7 +5668,7 @@ class TestLogAnalyzer:
             config_stats = []
             
             # 按Config分组
-            for config, group in df_copy.groupby('Config'):
+            for config, group in df_copy.groupby('Config', observed=True):
                 config_total = len(group)
                 # 使用基于标准的判断结果统计不良数
                 config_fail = (group['Criteria_Pass/Fail'] == 'FAIL').sum()
@@ -7688,6 +5772,9 @@ class TestLogAnalyzer:
                                     command=lambda: self.show_detailed_failure_analysis(df_copy, criteria_dict))
             details_btn.pack(side="right", padx=10)
         
+        # 添加首次通过率（FPY）与最终良率对比表
+        self._create_fpy_summary_table(container)
+        
         # 添加提示信息
         hint_label = tk.Label(container, text="Tip: Click on column headers to sort data, use Ctrl+C to copy selected content, or right-click menu to copy", 
                              font=("SimHei", 9), fg="gray")
@@ -7701,6 +5788,99 @@ class TestLogAnalyzer:
         
         self.update_status(f"Fail Rate Analysis Completed ({analysis_method}): Total={total_count}, Fail Count={fail_count}, Fail Rate={total_fail_rate:.2f}%")
     
+    def _get_fpy_summary(self):
+        """按Config和Test Station统计首次通过率（FPY）、最终良率和重测率
+        
+        Returns:
+            list: [(分组列名, 统计DataFrame), ...]，最后一项为总体统计；没有测试历史时返回空列表
+        """
+        attempt_history = getattr(self, 'attempt_history', None)
+        if attempt_history is None or attempt_history.empty:
+            return []
+        
+        sections = []
+        for group_column in ("Config", "Test Station"):
+            summary = loganalyzer_core.yield_summary(attempt_history, group_column)
+            if not summary.empty:
+                sections.append((group_column, summary))
+        sections.append(("Total", loganalyzer_core.yield_summary(attempt_history)))
+        return sections
+    
+    def _create_fpy_summary_table(self, parent):
+        """在Yield Analysis选项卡中创建首次通过率（FPY）与最终良率对比表"""
+        sections = self._get_fpy_summary()
+        if not sections:
+            return
+        
+        fpy_frame = ttk.LabelFrame(parent, text="First Pass Yield vs Final Yield (by Serial Number test history)")
+        fpy_frame.pack(fill="x", pady=5)
+        
+        columns = ("Group", "Units", "First Pass", "Final Pass", "Retested Units", "FPY", "Final Yield", "Retest Rate")
+        row_count = sum(len(summary) for _, summary in sections) + len(sections) - 1
+        fpy_tree = ttk.Treeview(fpy_frame, columns=columns, show="headings", height=min(row_count, 12))
+        for col in columns:
+            fpy_tree.heading(col, text=col)
+            fpy_tree.column(col, width=250 if col == "Group" else 100, anchor="w" if col == "Group" else "center")
+        
+        for section_index, (group_column, summary) in enumerate(sections):
+            if section_index > 0:
+                fpy_tree.insert("", "end", values=("-" * 50, "", "", "", "", "", "", ""))
+            for _, row in summary.iterrows():
+                label = row['Group'] if group_column == "Total" else f"{group_column}: {row['Group']}"
+                fpy_tree.insert("", "end", values=(label, int(row['Units']), int(row['First Pass']), int(row['Final Pass']),
+                                                   int(row['Retested Units']), f"{row['FPY (%)']:.2f}%",
+                                                   f"{row['Final Yield (%)']:.2f}%", f"{row['Retest Rate (%)']:.2f}%"))
+        
+        fpy_scrollbar = ttk.Scrollbar(fpy_frame, orient="vertical", command=fpy_tree.yview)
+        fpy_tree.configure(yscroll=fpy_scrollbar.set)
+        fpy_scrollbar.pack(side="right", fill="y")
+        fpy_tree.pack(fill="x", expand=True)
+    
+    def _write_fpy_summary_to_sheet(self, ws, start_row):
+        """将首次通过率（FPY）与最终良率对比表写入Excel工作表
+        
+        Args:
+            ws: openpyxl工作表
+            start_row: 起始行号
+        
+        Returns:
+            int: 写入后的下一个空行行号
+        """
+        import openpyxl
+        
+        sections = self._get_fpy_summary()
+        if not sections:
+            return start_row
+        
+        row_idx = start_row
+        ws.cell(row=row_idx, column=1, value="First Pass Yield vs Final Yield")
+        ws.cell(row=row_idx, column=1).font = openpyxl.styles.Font(bold=True, size=12)
+        row_idx += 1
+        
+        headers = ["Group", "Units", "First Pass", "Final Pass", "Retested Units", "FPY", "Final Yield", "Retest Rate"]
+        for c_idx, header in enumerate(headers, 1):
+            ws.cell(row=row_idx, column=c_idx, value=header)
+            ws.cell(row=row_idx, column=c_idx).font = openpyxl.styles.Font(bold=True)
+        row_idx += 1
+        
+        for group_column, summary in sections:
+            for _, row in summary.iterrows():
+                label = row['Group'] if group_column == "Total" else f"{group_column}: {row['Group']}"
+                ws.cell(row=row_idx, column=1, value=label)
+                ws.cell(row=row_idx, column=2, value=int(row['Units']))
+                ws.cell(row=row_idx, column=3, value=int(row['First Pass']))
+                ws.cell(row=row_idx, column=4, value=int(row['Final Pass']))
+                ws.cell(row=row_idx, column=5, value=int(row['Retested Units']))
+                # 百分比列以数值存储，应用Excel百分比格式
+                for c_idx, column in ((6, 'FPY (%)'), (7, 'Final Yield (%)'), (8, 'Retest Rate (%)')):
+                    cell = ws.cell(row=row_idx, column=c_idx, value=float(row[column]) / 100)
+                    cell.number_format = '0.00%'
+                row_idx += 1
+            # 不同分组之间空一行
+            row_idx += 1
+        
+        return row_idx
+    
     def show_detailed_failure_analysis(self, data_df, criteria_dict):
         """显示详细的不良分析，包括每条记录的具体不良项、判断依据和匹配信息
         
@@ -7889,6 +6069,8 @@ class TestLogAnalyzer:
         placeholder_label = tk.Label(self.top10_tab, text="Click 'Top Defects' button to view Top Defect Items Analysis")
         placeholder_label.pack(pady=20)
     
+    @profiled_action("Top Defects")
+    @loganalyzer_core.timed_stage("top_defects", rows_from='reprocessed_data')
     def show_top10_tab(self):
         """显示Top Defects选项卡并生成不良项目统计报表，数据来源为Data Re-Processing Tab"""
         try:
@@ -8004,38 +6186,18 @@ class TestLogAnalyzer:
             # 检查format_cells是否存在
             format_cells_exists = hasattr(self, 'format_cells') and self.format_cells
             
-            # 从第8列开始统计（索引从0开始，所以是7）
-            valid_columns_found = False
+            # 一次统计全部列和各Config的淡黄色单元格数量（自动分析流程中已在工作线程中计算）
+            fail_counts = self._take_pipeline_result('top_defects', data_source)
+            if fail_counts is None:
+                fail_counts = self._cached_fail_counts(data_source)
+            column_counts, config_column_counts, config_totals = fail_counts
+            
+            # 从第8列开始统计（索引从0开始，所以是7），无论是否有不良，都将项目添加到统计中
+            valid_columns_found = len(data_source.columns) > 7
             # 添加日志信息
             debug_info = f"Total Columns: {len(data_source.columns)}, Starting from Column 8"
-            
-            # 计算总列数，用于进度计算
-            total_columns = len(data_source.columns) - 7  # 从第8列开始的列数
-            
-            # 使用data_source和format_cells字典进行统计
-            for i, col_idx in enumerate(range(7, len(data_source.columns))):
-                # 更新进度条
-                progress = 5 + (i / total_columns) * 2  # 5到7之间的进度
-                progress_var.set(progress)
-                status_var.set(f"Analyzing column {i+1}/{total_columns}...")
-                progress_window.update_idletasks()
-                
-                column_name = data_source.columns[col_idx]
-                valid_columns_found = True
-                
-                # 统计该列中被标记为需要格式化的单元格数量（只统计淡黄色单元格）
-                fail_count = 0
-                
-                if format_cells_exists:
-                    # 使用format_cells统计淡黄色单元格 - 不良判断标准：标记为淡黄色的单元格
-                    for row_idx, col_indices in self.format_cells.items():
-                        # 检查该列是否在当前行的格式化列表中
-                        if col_idx in col_indices:
-                            # 直接计入统计，因为format_cells中的单元格就是淡黄色的
-                            fail_count += 1
-                
-                # 无论是否有不良，都将项目添加到统计中
-                column_fail_counts[column_name] = fail_count
+            for col_idx in range(7, len(data_source.columns)):
+                column_fail_counts[data_source.columns[col_idx]] = int(column_counts[col_idx])
             
             # 更新进度条
             progress_var.set(7)
@@ -8136,14 +6298,9 @@ class TestLogAnalyzer:
             has_config_column = 'Config' in data_source.columns
             
             if has_config_column:
-                # 获取所有不同的Config值
-                configs = data_source['Config'].unique()
-                
                 # 遍历每个Config
-                for config in configs:
-                    # 获取当前Config的数据
-                    config_data = data_source[data_source['Config'] == config]
-                    config_total = len(config_data)
+                for config, counts in config_column_counts.items():
+                    config_total = config_totals[config]
                     
                     # 统计每个不良项目在该Config下的不良数量
                     for col_idx in range(7, len(data_source.columns)):
@@ -8152,18 +6309,9 @@ class TestLogAnalyzer:
                         # 忽略特定的v Avg项目
                         if column_name == "White v Avg" or column_name == "Mixed v Avg":
                             continue
-                            
-                        fail_count = 0
                         
-                        # 使用format_cells统计淡黄色单元格 - 不良判断标准：标记为淡黄色的单元格
-                        if format_cells_exists:
-                            # 只统计当前Config的数据行中被标记为淡黄色的单元格
-                            for row_idx, col_indices in self.format_cells.items():
-                                # 检查行索引是否在当前Config的数据范围内
-                                if row_idx < len(data_source) and data_source.iloc[row_idx]['Config'] == config:
-                                    if col_idx in col_indices:
-                                        # 直接计入统计，因为format_cells中的单元格就是淡黄色的
-                                        fail_count += 1
+                        # 只统计当前Config的数据行中被标记为淡黄色的单元格
+                        fail_count = int(counts[col_idx])
                         
                         # 计算不良率
                         fail_rate = (fail_count / config_total) * 100 if config_total > 0 else 0
@@ -8360,266 +6508,8 @@ class TestLogAnalyzer:
         placeholder_label = tk.Label(self.cpk_tab, text="Click 'Cpk' button to view Cpk Analysis", font=('SimHei', 10))
         placeholder_label.pack(pady=20)
         
-    def _save_criteria_to_temp_file(self):
-        """将Criteria标签页中的数据保存为CSV临时文件（当前目录）
-        实现规格值的正确处理：
-        - 使用"|"分隔符将规格值拆分为下限和上限
-        - 修正uniformity规格笔误（当U类型的上限为"0"时自动修正为"100"）
-        - 将规格下限为"-1"的值自动修正为"0"
-        - 添加完整的描述信息
-        
-        Returns:
-            str: 临时CSV文件路径，如果保存失败则返回None
-        """
-        # 声明全局logger变量
-        global logger
-        
-        try:
-            import os
-            import csv
-            import time
-            
-            # 在当前目录创建临时CSV文件，使用时间戳避免文件名冲突
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            timestamp = int(time.time())
-            temp_file_path = os.path.join(current_dir, f"criteria_temp_data_{timestamp}.csv")
-            
-            # 收集并处理Criteria数据
-            processed_criteria_data = []
-            
-            # 定义标准类型的描述映射
-            standard_descriptions = {
-                "L": "Luminance (cd/m^2)",
-                "U": "Uniformity (%)",
-                "dY": "dY (%/cm)",
-                "u": "u' Coordinate",
-                "v": "v' Coordinate",
-                "Ru": "Ru",
-                "Rv": "Rv",
-                "Du": "Du",
-                "Dv": "Dv",
-                "dL*Min": "dL*Min (%/cm)",
-                "dL*Max": "dL*Max (%/cm)",
-                "dEMax": "dEMax (%/cm)"
-            }
-            
-            # 检查是否有Criteria标签页中的Treeview组件
-            if hasattr(self, 'criteria_tab'):
-                # 查找所有可能的Treeview组件（White和Mixed的表格）
-                for widget in self.criteria_tab.winfo_children():
-                    # 查找包含Treeview的容器
-                    if isinstance(widget, tk.Frame) or isinstance(widget, tk.LabelFrame):
-                        for child in widget.winfo_children():
-                            if isinstance(child, ttk.Treeview):
-                                # 获取Treeview数据
-                                tree = child
-                                items = tree.get_children()
-                                
-                                # 确定是White还是Mixed数据
-                                data_type = "Unknown"
-                                parent_text = widget.cget("text") if isinstance(widget, tk.LabelFrame) else ""
-                                if "White" in parent_text:
-                                    data_type = "White"
-                                elif "Mixed" in parent_text:
-                                    data_type = "Mixed"
-                                
-                                # 提取表格数据
-                                for item in items:
-                                    values = tree.item(item, "values")
-                                    if values and data_type != "Unknown":
-                                        # 确保有足够的数据列
-                                        standard_type = values[0] if len(values) > 0 else ""
-                                        specs = values[1] if len(values) > 1 else ""
-                                        
-                                        # 处理规格值：使用"|"分隔符拆分
-                                        lower_limit = ""
-                                        upper_limit = ""
-                                        
-                                        if '|' in specs:
-                                            # | 是规格上限和规格下限的分隔符
-                                            limits = specs.split('|', 1)
-                                            lower_limit = limits[0].strip()
-                                            upper_limit = limits[1].strip() if len(limits) > 1 else ""
-                                        else:
-                                            # 如果没有|分隔符，尝试其他分隔符
-                                            if '~' in specs:
-                                                limits = specs.split('~')
-                                            elif '-' in specs and not specs.startswith('-'):
-                                                limits = specs.split('-', 1)
-                                            elif ' ' in specs:
-                                                limits = specs.split()
-                                            elif ',' in specs:
-                                                limits = specs.split(',')
-                                            else:
-                                                limits = [specs, ""]
-                                                
-                                            lower_limit = limits[0].strip()
-                                            upper_limit = limits[1].strip() if len(limits) > 1 else ""
-                                        
-                                        # 修正规格值
-                                        # 1. 修正uniformity规格笔误
-                                        if standard_type == "U" and upper_limit == "0":
-                                            upper_limit = "100"
-                                        # 2. 将规格下限为"-1"的值自动修正为"0"
-                                        if lower_limit == "-1":
-                                            lower_limit = "0"
-                                        # 对于Uniformity类型，确保上限不超过100
-                                        if standard_type == "U" or "_U" in standard_type or "Uniformity" in standard_type:
-                                            try:
-                                                if upper_limit:
-                                                    upper_num = float(upper_limit)
-                                                    if upper_num > 100.0:
-                                                        upper_limit = "100"
-                                            except ValueError:
-                                                pass
-                                        
-                                        # 获取描述信息
-                                        description = standard_descriptions.get(standard_type, f"{data_type} {standard_type}")
-                                        
-                                        # 添加处理后的数据到列表
-                                        processed_criteria_data.append([
-                                            data_type, 
-                                            standard_type, 
-                                            lower_limit, 
-                                            upper_limit,
-                                            description
-                                        ])
-            
-            # 如果没有从Treeview获取到数据，尝试从reprocessed_data中获取
-            if not processed_criteria_data and hasattr(self, 'reprocessed_data') and self.reprocessed_data is not None and not self.reprocessed_data.empty:
-                for data_type in ["White", "Mixed"]:
-                    criteria_column = f'{data_type} Pass/Fail Criteria'
-                    if criteria_column in self.reprocessed_data.columns:
-                        criteria_values = self.reprocessed_data[criteria_column].dropna()
-                        if not criteria_values.empty:
-                            first_criteria = criteria_values.iloc[0]
-                            parsed_data = self._parse_criteria_string(first_criteria)
-                            if parsed_data:
-                                for item in parsed_data:
-                                    if isinstance(item, (list, tuple)) and len(item) >= 2:
-                                        standard_type = item[0]
-                                        specs = item[1] if len(item) > 1 else ""
-                                        
-                                        # 处理规格值：使用"|"分隔符拆分
-                                        lower_limit = ""
-                                        upper_limit = ""
-                                        
-                                        if '|' in specs:
-                                            # | 是规格上限和规格下限的分隔符
-                                            limits = specs.split('|', 1)
-                                            lower_limit = limits[0].strip()
-                                            upper_limit = limits[1].strip() if len(limits) > 1 else ""
-                                        else:
-                                            # 如果没有|分隔符，尝试其他分隔符
-                                            if '~' in specs:
-                                                limits = specs.split('~')
-                                            elif '-' in specs and not specs.startswith('-'):
-                                                limits = specs.split('-', 1)
-                                            elif ' ' in specs:
-                                                limits = specs.split()
-                                            elif ',' in specs:
-                                                limits = specs.split(',')
-                                            else:
-                                                limits = [specs, ""]
-                                                
-                                            lower_limit = limits[0].strip()
-                                            upper_limit = limits[1].strip() if len(limits) > 1 else ""
-                                        
-                                        # 修正规格值
-                                        if standard_type == "U" and upper_limit == "0":
-                                            upper_limit = "100"
-                                        if lower_limit == "-1":
-                                            lower_limit = "0"
-                                        # 对于Uniformity类型，确保上限不超过100
-                                        if standard_type == "U" or "_U" in standard_type or "Uniformity" in standard_type:
-                                            try:
-                                                if upper_limit:
-                                                    upper_num = float(upper_limit)
-                                                    if upper_num > 100.0:
-                                                        upper_limit = "100"
-                                            except ValueError:
-                                                pass
-                                        
-                                        # 获取描述信息
-                                        description = standard_descriptions.get(standard_type, f"{data_type} {standard_type}")
-                                        
-                                        # 添加处理后的数据到列表
-                                        processed_criteria_data.append([
-                                            data_type, 
-                                            standard_type, 
-                                            lower_limit, 
-                                            upper_limit,
-                                            description
-                                        ])
-            
-            # 如果有数据，尝试保存到CSV文件
-            if processed_criteria_data:
-                # 尝试保存文件，如果失败则重试几次
-                max_retries = 3
-                retry_count = 0
-                saved = False
-                
-                while not saved and retry_count < max_retries:
-                    try:
-                        # 先检查文件是否存在，如果存在则尝试删除
-                        if os.path.exists(temp_file_path):
-                            try:
-                                os.remove(temp_file_path)
-                                print(f"Removed existing file: {temp_file_path}")
-                            except Exception as remove_error:
-                                print(f"Warning: Could not remove existing file: {remove_error}")
-                                # 使用不同的文件名重试
-                                temp_file_path = os.path.join(current_dir, f"criteria_temp_data_{timestamp}_{retry_count}.csv")
-                        
-                        # 尝试保存文件
-                        with open(temp_file_path, 'w', newline='', encoding='utf-8') as f:
-                            writer = csv.writer(f)
-                            # 写入表头（包含处理后的上下限和描述）
-                            writer.writerow(["DataType", "StandardType", "LowerLimit", "UpperLimit", "Description"])
-                            # 写入处理后的数据
-                            writer.writerows(processed_criteria_data)
-                        
-                        saved = True
-                        print(f"Successfully saved criteria data to: {temp_file_path}")
-                        
-                    except PermissionError as e:
-                        retry_count += 1
-                        print(f"Permission error saving file (attempt {retry_count}/{max_retries}): {e}")
-                        # 等待一小段时间后重试
-                        if retry_count < max_retries:
-                            time.sleep(1)
-                        # 使用不同的文件名
-                        temp_file_path = os.path.join(current_dir, f"criteria_temp_data_{timestamp}_{retry_count}.csv")
-                    except Exception as e:
-                        print(f"Error saving file: {e}")
-                        break
-                
-                if saved:
-                    self.update_status(f"Processed criteria data saved to CSV file: {temp_file_path}")
-                    return temp_file_path
-                else:
-                    # 如果仍然失败，尝试使用临时目录
-                    import tempfile
-                    try:
-                        with tempfile.NamedTemporaryFile(suffix='.csv', prefix='criteria_temp_', delete=False, mode='w', newline='', encoding='utf-8') as f:
-                            temp_file_path = f.name
-                            writer = csv.writer(f)
-                            writer.writerow(["DataType", "StandardType", "LowerLimit", "UpperLimit", "Description"])
-                            writer.writerows(processed_criteria_data)
-                        
-                        self.update_status(f"Processed criteria data saved to temporary directory: {temp_file_path}")
-                        return temp_file_path
-                    except Exception as temp_error:
-                        print(f"Failed to save to temporary directory: {temp_error}")
-            
-            # 如果没有数据
-            self.update_status("No criteria data to save")
-            return None
-        except Exception as e:
-            self.update_status(f"Error saving criteria data to CSV file: {str(e)}")
-            print(f"Error saving criteria data: {e}")
-            return None
-    
+    @profiled_action("Cpk")
+    @loganalyzer_core.timed_stage("cpk", rows_from='reprocessed_data')
     def show_cpk_tab(self):
         """显示Cpk选项卡并生成Cpk统计表格"""
         try:
@@ -8641,12 +6531,8 @@ class TestLogAnalyzer:
                 hint_label.pack(pady=20)
                 return
             
-            # 优化：先将Criteria标签页的数据保存为临时文件
-            self.update_status("Saving Criteria data to temporary file...")
-            temp_file_path = self._save_criteria_to_temp_file()
-            
-            # 存储临时文件路径供_calculate_cpk_data使用
-            self._criteria_temp_file = temp_file_path
+            # 确保规格数据已整理到criteria_store中（内容改变时才写入临时规格文件）
+            self._save_criteria_to_temp_file()
             
             self.update_status("Generating Cpk Analysis...")
             
@@ -8666,9 +6552,12 @@ class TestLogAnalyzer:
             h_container.grid_columnconfigure(1, weight=1)
             h_container.grid_rowconfigure(0, weight=1)
             
-            # 分别处理White和Mixed数据
-            self._create_cpk_table(h_container, "White", grid_row=0, grid_col=0)
-            self._create_cpk_table(h_container, "Mixed", grid_row=0, grid_col=1)
+            # 分别处理White和Mixed数据（自动分析流程中已在工作线程中计算）
+            precomputed_cpk = self._take_pipeline_result('cpk', self.reprocessed_data) or {}
+            self._create_cpk_table(h_container, "White", grid_row=0, grid_col=0,
+                                   cpk_data=precomputed_cpk.get("White"))
+            self._create_cpk_table(h_container, "Mixed", grid_row=0, grid_col=1,
+                                   cpk_data=precomputed_cpk.get("Mixed"))
             
             # 添加提示信息
             hint_label = tk.Label(self.cpk_tab, text="Tip: Click on column headers to sort data, use Ctrl+C to copy selected content, or right-click menu to copy",
@@ -8680,7 +6569,7 @@ class TestLogAnalyzer:
             error_label = tk.Label(self.cpk_tab, text=f"Error: {str(e)}", font=("SimHei", 10), fg="red")
             error_label.pack(pady=20)
     
-    def _create_cpk_table(self, parent, data_type, grid_row=0, grid_col=0):
+    def _create_cpk_table(self, parent, data_type, grid_row=0, grid_col=0, cpk_data=None):
         """创建Cpk统计表格
         
         Args:
@@ -8688,6 +6577,7 @@ class TestLogAnalyzer:
             data_type: 数据类型 ("White" 或 "Mixed")
             grid_row: grid布局的行号
             grid_col: grid布局的列号
+            cpk_data: 已计算的Cpk数据，为None时调用_calculate_cpk_data计算
         """
         try:
             # 创建选项卡容器
@@ -8807,7 +6697,8 @@ class TestLogAnalyzer:
             style.configure("Treeview.Heading", font=("SimHei", 10, "bold"), relief="solid", borderwidth=1)
             
             # 获取Cpk数据
-            cpk_data = self._calculate_cpk_data(data_type)
+            if cpk_data is None:
+                cpk_data = self._cached_cpk_data(data_type)
             
             # 如果没有数据，只显示提示标签
             if not cpk_data:
@@ -8960,9 +6851,6 @@ class TestLogAnalyzer:
         """
         try:
             import os
-            import glob
-            import csv
-            import json
             import pandas as pd
             import tempfile
             import time
@@ -8970,7 +6858,6 @@ class TestLogAnalyzer:
             # 将reprocessed_data保存到临时文件
             temp_data_file = None
             working_data = None
-            temp_file_path = None  # 初始化temp_file_path变量以避免未定义错误
             
             if hasattr(self, 'reprocessed_data') and self.reprocessed_data is not None and not self.reprocessed_data.empty:
                 try:
@@ -8979,7 +6866,7 @@ class TestLogAnalyzer:
                     temp_data_file = os.path.join(tempfile.gettempdir(), f'TestLogAnalyzer_ReprocessedData_{timestamp}.csv')
                     
                     # 保存reprocessed_data到CSV临时文件
-                    self.reprocessed_data.to_csv(temp_data_file, index=False, encoding='utf-8')
+                    loganalyzer_core.format_datetime_columns(self.reprocessed_data).to_csv(temp_data_file, index=False, encoding='utf-8')
                     self.update_status(f"Reprocessed data saved to temporary file: {temp_data_file}")
                     
                     # 从临时文件读取数据，确保数据一致性
@@ -9022,143 +6909,16 @@ class TestLogAnalyzer:
             cpk_results = []
             std_type_to_specs = {}
             
-            # 从JSON临时文件读取规格数据（优先方式）
-            json_file_loaded = False
-            try:
-                import tempfile
-                # 获取临时目录中的JSON文件路径
-                temp_dir = tempfile.gettempdir()
-                json_file_path = os.path.join(temp_dir, 'TestLogAnalyzer_Criteria.json')
-                
-                # 检查JSON文件是否存在
-                if os.path.exists(json_file_path) and os.path.getsize(json_file_path) > 0:
-                    try:
-                        with open(json_file_path, 'r', encoding='utf-8') as f:
-                            criteria_data = json.load(f)
-                            
-                        # 检查是否有当前数据类型的数据
-                        if isinstance(criteria_data, dict) and data_type in criteria_data:
-                            type_criteria = criteria_data[data_type]
-                            if isinstance(type_criteria, dict):
-                                for std_type, limits in type_criteria.items():
-                                    # 确保limits是一个包含下限和上限的元组或列表
-                                    if isinstance(limits, (list, tuple)) and len(limits) >= 2:
-                                        lower_str = limits[0].strip() if isinstance(limits[0], str) else str(limits[0])
-                                        upper_str = limits[1].strip() if isinstance(limits[1], str) else str(limits[1])
-                                        
-                                        try:
-                                            # 尝试转换为浮点数
-                                            lower = float(lower_str) if lower_str else None
-                                            upper = float(upper_str) if upper_str else None
-                                            
-                                            # 确保有有效的上下限
-                                            if lower is not None and upper is not None:
-                                                # 添加数据类型前缀以区分White和Mixed的规格
-                                                qualified_std_type = f"{data_type}_{std_type}"
-                                                std_type_to_specs[qualified_std_type] = (lower, upper)
-                                                std_type_to_specs[std_type] = (lower, upper)
-                                                
-                                        except (ValueError, TypeError):
-                                            # 解析失败时跳过该规格
-                                            print(f"Failed to parse limits from JSON for {std_type}: Lower={lower_str}, Upper={upper_str}")
-                        
-                        json_file_loaded = True
-                        self.update_status(f"Successfully loaded criteria from JSON file: {json_file_path}")
-                        
-                        # 如果成功从JSON加载了规格数据，则直接继续进行数据处理
-                        if std_type_to_specs:
-                            self.update_status(f"Loaded {len(std_type_to_specs)} criteria items from JSON for {data_type}")
-                        else:
-                            self.update_status(f"No valid criteria found in JSON file for {data_type}")
-                            # 重置json_file_loaded标志，以便后续尝试其他数据源
-                            json_file_loaded = False
-                    except json.JSONDecodeError as json_decode_error:
-                        self.update_status(f"JSON decode error: {str(json_decode_error)}")
-                        print(f"JSON文件格式错误: {str(json_decode_error)}")
-                        # 删除损坏的JSON文件，以便下次重新创建
-                        try:
-                            os.remove(json_file_path)
-                            self.update_status(f"Removed corrupted JSON file: {json_file_path}")
-                        except Exception as remove_error:
-                            print(f"无法删除损坏的JSON文件: {str(remove_error)}")
-                    except Exception as json_file_error:
-                        self.update_status(f"Error reading JSON file: {str(json_file_error)}")
-                        print(f"读取JSON文件时出错: {str(json_file_error)}")
-                else:
-                    self.update_status(f"JSON file not found or empty: {json_file_path}")
-            except Exception as json_error:
-                self.update_status(f"Error loading criteria from JSON file: {str(json_error)}")
-                print(f"JSON加载错误详情: {str(json_error)}")
-                import traceback
-                traceback.print_exc()
-            
-            # 如果JSON文件加载失败或没有数据，则尝试从CSV文件读取（备用方式）
-            if not json_file_loaded or not std_type_to_specs:
-                self.update_status(f"Attempting to load criteria from CSV files for {data_type}")
-                # 获取临时文件路径，支持带时间戳的文件名
-                temp_file_path = None
-                
-                # 1. 首先检查self._criteria_temp_file
-                if hasattr(self, '_criteria_temp_file') and self._criteria_temp_file and os.path.exists(self._criteria_temp_file):
-                    temp_file_path = self._criteria_temp_file
-                    self.update_status(f"Found criteria temp file at: {temp_file_path}")
-                else:
-                    # 2. 搜索当前目录下的所有criteria_temp_data文件（包括带时间戳的）
-                    import glob
-                    current_dir = os.path.dirname(os.path.abspath(__file__))
-                    pattern = os.path.join(current_dir, "criteria_temp_data*.csv")
-                    matching_files = glob.glob(pattern)
-                    
-                    # 按修改时间排序，选择最新的文件
-                    if matching_files:
-                        matching_files.sort(key=os.path.getmtime, reverse=True)
-                        temp_file_path = matching_files[0]
-                        self.update_status(f"Found latest criteria temp file: {temp_file_path}")
-                        # 更新self._criteria_temp_file以便下次使用
-                        if hasattr(self, '_criteria_temp_file'):
-                            self._criteria_temp_file = temp_file_path
-            
-            # 从临时文件读取Criteria数据
-            if temp_file_path and os.path.exists(temp_file_path):
-                try:
-                    import os
-                    import csv
-                    
-                    with open(temp_file_path, 'r', encoding='utf-8') as f:
-                        reader = csv.DictReader(f)
-                        for row in reader:
-                            # 只处理当前数据类型的规格
-                            if row['DataType'] == data_type:
-                                std_type = row['StandardType'].strip()
-                                
-                                # 直接从新格式的CSV中读取上下限
-                                lower_str = row.get('LowerLimit', '').strip()
-                                upper_str = row.get('UpperLimit', '').strip()
-                                
-                                # 尝试将上下限转换为浮点数
-                                try:
-                                    lower = float(lower_str) if lower_str else None
-                                    upper = float(upper_str) if upper_str else None
-                                    
-                                    # 确保有有效的上下限
-                                    if lower is not None and upper is not None:
-                                        # 添加数据类型前缀以区分White和Mixed的规格
-                                        qualified_std_type = f"{data_type}_{std_type}"
-                                        std_type_to_specs[qualified_std_type] = (lower, upper)
-                                        
-                                        # 只在第一次遇到某个标准类型时保存原始映射
-                                        if std_type not in std_type_to_specs:
-                                            std_type_to_specs[std_type] = (lower, upper)
-                                except ValueError:
-                                    # 解析失败时跳过该规格
-                                    print(f"Failed to parse limits for {std_type}: Lower={lower_str}, Upper={upper_str}")
-                    
-                    self.update_status(f"Loaded processed criteria data from CSV file for {data_type}")
-                except Exception as e:
-                    self.update_status(f"Error reading criteria data from CSV file: {str(e)}")
-                    print(f"Error reading criteria CSV file: {e}")
+            # 从criteria_store获取上下限都是数值的规格（按版本缓存，不再读取JSON和CSV临时文件）
+            for std_type, (lower, upper) in self.criteria_store.numeric_limits(data_type).items():
+                # 添加数据类型前缀以区分White和Mixed的规格
+                qualified_std_type = f"{data_type}_{std_type}"
+                std_type_to_specs[qualified_std_type] = (lower, upper)
+                std_type_to_specs[std_type] = (lower, upper)
+            if std_type_to_specs:
+                self.update_status(f"Loaded {len(std_type_to_specs) // 2} criteria items for {data_type}")
             
-            # 如果没有从CSV文件读取到规格数据，尝试从working_data中获取作为后备
+            # 如果criteria_store中没有规格数据，尝试从working_data中获取作为后备
             if not std_type_to_specs:
                 criteria_column = f'{data_type} Pass/Fail Criteria'
                 if working_data is not None and not working_data.empty and criteria_column in working_data.columns:
@@ -9371,13 +7131,8 @@ class TestLogAnalyzer:
                     # 如果没有找到匹配的规格，跳过该列
                     continue
                 
-                # 修正规格值
-                if lower_limit == -1:
-                    lower_limit = 0
-                
-                # 对于Uniformity类型，确保上限不超过100
-                if "U" == matched_std_type or "_U" in matched_std_type or "Uniformity" in matched_std_type:
-                    upper_limit = min(upper_limit, 100.0)
+                # 修正规格值（下限-1视为0，Uniformity类上限不超过100）
+                lower_limit, upper_limit = loganalyzer_core.normalize_cpk_limits(matched_std_type, lower_limit, upper_limit)
                 
                 # 计算统计量
                 mean_value = col_data.mean()
@@ -9400,50 +7155,8 @@ class TestLogAnalyzer:
                 # 计算不良率
                 fail_rate = (fail_count / total_count * 100) if total_count > 0 else 0
                 
-                # 计算Cpk
-                cpk = 0
-                if std_dev_value > 0:
-                    # 特殊处理1：White dL Max和Mixed dL Max类型，强制使用上限，忽略下限
-                    if ('White' in column_name or 'Mixed' in column_name) and ('dL Max' in column_name or 'dL*Max' in column_name):
-                        # 强制使用上限计算CPU
-                        cpu = (upper_limit - mean_value) / (3 * std_dev_value) if upper_limit != float('inf') else float('inf')
-                        cpk = cpu
-                    # 特殊处理2：White L, Mixed L, White U, Mixed U 忽略规格上限，保留规格下限
-                    elif ('White' in column_name or 'Mixed' in column_name) and ('L' in column_name or 'U' in column_name):
-                        # 忽略上限，只使用下限计算Cpk
-                        cpl = (mean_value - lower_limit) / (3 * std_dev_value) if lower_limit != -float('inf') else float('inf')
-                        cpk = cpl
-                    # 根据规格是否为0来决定使用单边规格算法
-                    elif lower_limit == 0 and upper_limit != 0:
-                        # 下限为0，使用单边规格算法（只考虑上限）
-                        cpu = (upper_limit - mean_value) / (3 * std_dev_value) if upper_limit != float('inf') else float('inf')
-                        cpk = cpu
-                    elif upper_limit == 0 and lower_limit != 0:
-                        # 上限为0，使用单边规格算法（只考虑下限）
-                        cpl = (mean_value - lower_limit) / (3 * std_dev_value) if lower_limit != -float('inf') else float('inf')
-                        cpk = cpl
-                    else:
-                        # 对于dL*Max类型，确保正确处理规格
-                        if 'dL*Max' in matched_std_type or 'dL*Max' in column_name:
-                            # 确保只使用非零的规格进行计算
-                            if lower_limit != 0 and upper_limit != 0:
-                                # 双边规格算法
-                                cpl = (mean_value - lower_limit) / (3 * std_dev_value) if lower_limit != -float('inf') else float('inf')
-                                cpu = (upper_limit - mean_value) / (3 * std_dev_value) if upper_limit != float('inf') else float('inf')
-                                cpk = min(cpl, cpu)
-                            elif lower_limit != 0:
-                                # 只有下限非零，使用下限计算
-                                cpl = (mean_value - lower_limit) / (3 * std_dev_value) if lower_limit != -float('inf') else float('inf')
-                                cpk = cpl
-                            elif upper_limit != 0:
-                                # 只有上限非零，使用上限计算
-                                cpu = (upper_limit - mean_value) / (3 * std_dev_value) if upper_limit != float('inf') else float('inf')
-                                cpk = cpu
-                        else:
-                            # 其他类型的双边规格算法
-                            cpl = (mean_value - lower_limit) / (3 * std_dev_value) if lower_limit != -float('inf') else float('inf')
-                            cpu = (upper_limit - mean_value) / (3 * std_dev_value) if upper_limit != float('inf') else float('inf')
-                            cpk = min(cpl, cpu)
+                # 计算Cpk（单边/双边规格的选择规则与分块处理模式共用）
+                cpk = loganalyzer_core.cpk_from_stats(column_name, matched_std_type, mean_value, std_dev_value, lower_limit, upper_limit)
                 
                 # 添加到结果列表
                 cpk_results.append({
@@ -9467,76 +7180,23 @@ class TestLogAnalyzer:
             return []
     
     def _save_criteria_to_temp_file(self):
-        """将White和Mixed的标准数据整合并保存为临时规格文件"""
+        """把Review Criteria的规格数据整理到criteria_store中，内容改变时写入临时规格文件
+        
+        还没有规格数据时从processed_data的Pass/Fail Criteria列解析（与Review Criteria的显示规则一致）。
+        
+        Returns:
+            str: 临时规格文件路径，没有规格数据或保存失败时返回None
+        """
         try:
-            import json
-            import tempfile
-            import os
-            import csv
-            import time
             import logging
             
             # 获取logger实例
             logger = logging.getLogger("TestLogAnalyzer")
+            store = self.criteria_store
             
-            # 创建保存所有标准数据的字典
-            all_criteria = {}
-            processed_criteria_data = []
-            
-            # 定义标准类型的描述映射
-            standard_descriptions = {
-                "L": "Luminance", "U": "Uniformity", "dY": "dY", "u": "u'", "v": "v'",
-                "Ru": "Ru", "Rv": "Rv", "Du": "Du", "Dv": "Dv",
-                "dL*Min": "dL*Min", "dL*Max": "dL*Max", "dEMax": "dEMax",
-                "Metric2": "Metric2", "Metric3": "Metric3", "Metric7": "Metric7",
-                "Metric13": "Metric13", "Metric14": "Metric14", "Metric15": "Metric15",
-                "Metric17": "Metric17"
-            }
-            
-            # 初始化criteria_data字典如果它不存在
-            if not hasattr(self, 'criteria_data'):
-                self.criteria_data = {}
-                logger.warning("初始化新的criteria_data字典")
-            
-            # 优先使用已更新的self.criteria_data（从save_changes函数中获取的用户修改）
-            logger.info("正在保存用户修改的规格数据")
-            
-            # 遍历criteria_data字典生成processed_criteria_data
-            for data_type, types_dict in self.criteria_data.items():
-                for standard_type, limits in types_dict.items():
-                    # 确保limits是有效的列表或元组
-                    if isinstance(limits, (list, tuple)) and len(limits) >= 2:
-                        lower_limit = str(limits[0]) if limits[0] is not None else ""
-                        upper_limit = str(limits[1]) if limits[1] is not None else ""
-                        
-                        # 添加描述
-                        description = standard_descriptions.get(standard_type, f"{data_type} {standard_type}")
-                        
-                        # 添加到processed_criteria_data
-                        processed_criteria_data.append([data_type, standard_type, lower_limit, upper_limit, description])
-            
-            # 如果criteria_data为空，则尝试从Treeview获取数据
-            if not processed_criteria_data and hasattr(self, 'tree_criteria'):
-                logger.info("criteria_data为空，尝试从Treeview获取数据")
-                # 遍历Treeview中的所有项目
-                for item in self.tree_criteria.get_children():
-                    values = self.tree_criteria.item(item, "values")
-                    if len(values) >= 5:
-                        data_type = values[0]  # DataType
-                        standard_type = values[1]  # StandardType
-                        lower_limit = values[2]  # LowerLimit
-                        upper_limit = values[3]  # UpperLimit
-                        
-                        # 添加到processed_criteria_data
-                        processed_criteria_data.append([data_type, standard_type, lower_limit, upper_limit, values[4]])
-                        
-                        # 更新criteria_data字典
-                        if data_type not in self.criteria_data:
-                            self.criteria_data[data_type] = {}
-                        self.criteria_data[data_type][standard_type] = [lower_limit, upper_limit]
-            
-            # 如果没有从Treeview获取到数据，尝试从processed_data中获取
-            if not processed_criteria_data and hasattr(self, 'processed_data') and self.processed_data is not None and not self.processed_data.empty:
+            # 如果还没有规格数据，尝试从processed_data中获取
+            if not len(store) and hasattr(self, 'processed_data') and self.processed_data is not None and not self.processed_data.empty:
+                parsed_criteria = {}
                 for data_type in ["White", "Mixed"]:
                     criteria_column = f'{data_type} Pass/Fail Criteria'
                     if criteria_column in self.processed_data.columns:
@@ -9567,62 +7227,20 @@ class TestLogAnalyzer:
                                         if lower_limit == "-1":
                                             lower_limit = "0"
                                         
-                                        # 添加到processed_criteria_data
-                                        description = standard_descriptions.get(standard_type, f"{data_type} {standard_type}")
-                                        processed_criteria_data.append([data_type, standard_type, lower_limit, upper_limit, description])
-                                        
-                                        # 更新criteria_data字典
-                                        if data_type not in self.criteria_data:
-                                            self.criteria_data[data_type] = {}
-                                        self.criteria_data[data_type][standard_type] = [lower_limit, upper_limit]
-            
-            # 创建临时文件路径
-            temp_dir = tempfile.gettempdir()
-            temp_file_path = os.path.join(temp_dir, 'TestLogAnalyzer_Criteria.json')
+                                        parsed_criteria.setdefault(data_type, {})[standard_type] = (lower_limit, upper_limit)
+                if parsed_criteria:
+                    store.replace(parsed_criteria)
             
-            # 确保criteria_data不为空，包含有效数据
-            if not self.criteria_data:
+            # 确保规格数据不为空
+            if not len(store):
                 logger.warning("criteria_data为空，无法保存有效规格数据")
                 self.update_status("Warning: No criteria data to save")
                 return None
             
-            # 将数据保存为JSON文件，添加更健壮的错误处理
-            try:
-                # 先写入临时文件
-                temp_file_path_temp = f"{temp_file_path}.tmp"
-                with open(temp_file_path_temp, 'w', encoding='utf-8') as f:
-                    json.dump(self.criteria_data, f, indent=4, ensure_ascii=False)
-                
-                # 如果临时文件写入成功，再替换正式文件
-                if os.path.exists(temp_file_path):
-                    os.remove(temp_file_path)
-                os.rename(temp_file_path_temp, temp_file_path)
-                
-                logger.info(f"成功将规格数据保存到临时JSON文件: {temp_file_path}")
-                logger.debug(f"保存的JSON数据内容: {self.criteria_data}")
-            except Exception as json_error:
-                logger.error(f"保存JSON临时文件时出错: {json_error}")
-                raise
-            
-            # 同时创建CSV文件作为备用
-            csv_file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), f"criteria_temp_data_{int(time.time())}.csv")
-            if processed_criteria_data:
-                try:
-                    with open(csv_file_path, 'w', newline='', encoding='utf-8') as f:
-                        writer = csv.writer(f)
-                        writer.writerow(["DataType", "StandardType", "LowerLimit", "UpperLimit", "Description"])
-                        writer.writerows(processed_criteria_data)
-                    logger.info(f"标准数据已保存到CSV文件: {csv_file_path}")
-                except Exception as csv_error:
-                    logger.error(f"保存CSV文件时出错: {csv_error}")
-            
-            # 使用logger替代print输出
-            logger.info(f"标准数据已保存到临时文件: {temp_file_path}")
-            logger.debug(f"保存的数据内容: {self.criteria_data}")
-            self.update_status(f"成功保存规格数据到临时文件")
-            
-            # 返回CSV文件路径用于兼容旧逻辑
-            return csv_file_path if processed_criteria_data else temp_file_path
+            # 内容与临时规格文件相同时不重复写入
+            if store.persist():
+                self.update_status(f"成功保存规格数据到临时文件")
+            return store.path
             
         except Exception as e:
             self.update_status(f"Error saving criteria to temporary file: {str(e)}")
@@ -9631,49 +7249,14 @@ class TestLogAnalyzer:
             traceback.print_exc()
             return None
             
-    def _read_criteria_from_temp_file(self):
-        """从临时文件读取保存的规格数据，如果文件存在且有效则返回数据，否则返回None"""
-        try:
-            import os
-            import json
-            import tempfile
-            import logging
-            logger = logging.getLogger("TestLogAnalyzer")
-            
-            # 构建临时文件路径
-            temp_file_path = os.path.join(tempfile.gettempdir(), "TestLogAnalyzer_Criteria.json")
-            
-            # 检查文件是否存在
-            if not os.path.exists(temp_file_path):
-                logger.info(f"临时规格文件不存在: {temp_file_path}")
-                return None
-            
-            # 读取文件内容
-            with open(temp_file_path, 'r', encoding='utf-8') as f:
-                criteria_data = json.load(f)
-            
-            # 验证数据格式是否正确
-            if isinstance(criteria_data, dict) and ('White' in criteria_data or 'Mixed' in criteria_data):
-                logger.info(f"成功从临时文件读取规格数据: {len(criteria_data)}组数据")
-                return criteria_data
-            else:
-                logger.warning(f"临时规格文件格式不正确，跳过读取")
-                return None
-        except Exception as e:
-            logger.error(f"读取临时规格文件时发生错误: {str(e)}")
-            return None
-    
     def review_criteria(self):
         """从Data PreView中的第一个文件提取标准数据，在Review Criteria选项卡中显示，优先使用已保存的临时规格文件"""
         try:
             import logging
             logger = logging.getLogger("TestLogAnalyzer")
             
-            # 尝试从临时文件读取已保存的规格数据
-            saved_criteria_data = self._read_criteria_from_temp_file()
-            
             # 获取所有选中的文件
-            selected_files = [path for path, var in self.file_vars.items() if var.get()]
+            selected_files = self.file_model.selected_paths()
             
             if not selected_files:
                 self.update_status("No files selected for criteria review.")
@@ -9704,80 +7287,18 @@ class TestLogAnalyzer:
             self.review_criteria_tab.grid_columnconfigure(1, weight=1)
             self.review_criteria_tab.grid_rowconfigure(0, weight=1)
             
-            # 初始化存储标准数据的字典
-            self.criteria_data = {"White": {}, "Mixed": {}}
+            # 检查可能的列名
+            criteria_columns = ['White Pass/Fail Criteria', 'Mixed Pass/Fail Criteria',
+                              'Pass/Fail Criteria', 'Criteria', 'Mixed PassFail Criteria',
+                              'White PassFail Criteria']
             
-            # 智能检测CSV文件中的数据标题行并读取文件
-            with open(first_file_path, 'r', encoding='utf-8') as f:
-                lines = []
-                for i in range(20):
-                    line = f.readline()
-                    if not line:
-                        break
-                    lines.append(line.strip())
-                
-                # 识别元数据行
-                metadata_lines = []
-                non_metadata_lines = []
-                
-                for i, line in enumerate(lines):
-                    is_metadata = False
-                    if ',:' in line or (':' in line and ',' in line):
-                        is_metadata = True
-                    elif line.strip() and i < 10 and not (line.startswith('Model') or line.startswith('Serial Number')):
-                        content_parts = [p.strip() for p in line.split(',') if p.strip()]
-                        if content_parts and ':' in content_parts[0]:
-                            is_metadata = True
-                    
-                    if is_metadata:
-                        metadata_lines.append(i)
-                    else:
-                        non_metadata_lines.append((i, line))
-                
-                # 寻找标题行
-                max_commas = -1
-                header_line_candidates = []
-                header_line_index = 0
-                
-                non_empty_non_metadata = [(i, line) for i, line in non_metadata_lines if line.strip()]
-                
-                if non_empty_non_metadata:
-                    max_commas = max(line.count(',') for i, line in non_empty_non_metadata)
-                    header_line_candidates = [(i, line) for i, line in non_empty_non_metadata if line.count(',') == max_commas]
-                    
-                    if header_line_candidates:
-                        best_score = -1
-                        for i, line in header_line_candidates:
-                            score = 1
-                            if any(c.isalpha() for c in line):
-                                score += 10
-                            content_length = len(line.replace(',', ''))
-                            score += min(content_length, 50)
-                            
-                            if score > best_score:
-                                best_score = score
-                                header_line_index = i
-                
-                # 确定是否使用检测到的标题行
-                if max_commas >= 9:
-                    df = pd.read_csv(first_file_path,
-                                    skiprows=header_line_index,
-                                    on_bad_lines='skip',
-                                    engine='python')
-                else:
-                    df = pd.read_csv(first_file_path,
-                                    on_bad_lines='skip',
-                                    engine='python')
+            # 只需要各标准列的第一个非空值: 读取表头和开头的行，开头的行中没有时才继续读取
+            df = loganalyzer_core.read_preview_with_values(first_file_path, criteria_columns).df
             
             # 尝试从不同的列名中提取标准信息
             white_criteria = None
             mixed_criteria = None
             
-            # 检查可能的列名
-            criteria_columns = ['White Pass/Fail Criteria', 'Mixed Pass/Fail Criteria',
-                              'Pass/Fail Criteria', 'Criteria', 'Mixed PassFail Criteria',
-                              'White PassFail Criteria']
-            
             for col in criteria_columns:
                 if col in df.columns:
                     # 获取第一个非空的值
@@ -9798,6 +7319,7 @@ class TestLogAnalyzer:
             if white_criteria:
                 self._display_criteria_data(left_frame, white_criteria, "White")
             else:
+                self.criteria_store.set_window("White", {})
                 no_data_label = tk.Label(left_frame, text="No White criteria data found in the file.", font=('SimHei', 10))
                 no_data_label.pack(pady=20)
             
@@ -9805,6 +7327,7 @@ class TestLogAnalyzer:
             if mixed_criteria:
                 self._display_criteria_data(right_frame, mixed_criteria, "Mixed")
             else:
+                self.criteria_store.set_window("Mixed", {})
                 no_data_label = tk.Label(right_frame, text="No Mixed criteria data found in the file.", font=('SimHei', 10))
                 no_data_label.pack(pady=20)
             
@@ -9838,7 +7361,7 @@ class TestLogAnalyzer:
                     if success:
                         self.update_status("自动保存Review Criteria设置完成")
                         # 验证文件是否成功创建
-                        temp_file_path = os.path.join(tempfile.gettempdir(), "TestLogAnalyzer_Criteria.json")
+                        temp_file_path = self.criteria_store.path
                         if os.path.exists(temp_file_path):
                             self.update_status(f"确认: 标准数据已成功保存到 {temp_file_path}")
                     else:
@@ -9872,7 +7395,7 @@ class TestLogAnalyzer:
                 self.colorpoint_spec_tab.lift()
             
             # 获取所有选中的文件
-            selected_files = [path for path, var in self.file_vars.items() if var.get()]
+            selected_files = self.file_model.selected_paths()
             
             if not selected_files:
                 self.update_status("No files selected for ColorPointSpec review.")
@@ -9907,68 +7430,10 @@ class TestLogAnalyzer:
             loading_label.pack(pady=20)
             self.root.update_idletasks()
             
-            # 智能检测CSV文件中的数据标题行并读取文件
+            # 只需要规格列的第一个非空值: 读取表头和开头的行，开头的行中没有时才继续读取
             try:
-                with open(first_file_path, 'r', encoding='utf-8') as f:
-                    lines = []
-                    for i in range(20):
-                        line = f.readline()
-                        if not line:
-                            break
-                        lines.append(line.strip())
-                    
-                    # 识别元数据行
-                    metadata_lines = []
-                    non_metadata_lines = []
-                    
-                    for i, line in enumerate(lines):
-                        is_metadata = False
-                        if ',:' in line or (':' in line and ',' in line):
-                            is_metadata = True
-                        elif line.strip() and i < 10 and not (line.startswith('Model') or line.startswith('Serial Number')):
-                            content_parts = [p.strip() for p in line.split(',') if p.strip()]
-                            if content_parts and ':' in content_parts[0]:
-                                is_metadata = True
-                        
-                        if is_metadata:
-                            metadata_lines.append(i)
-                        else:
-                            non_metadata_lines.append((i, line))
-                    
-                    # 寻找标题行
-                    max_commas = -1
-                    header_line_candidates = []
-                    header_line_index = 0
-                    
-                    non_empty_non_metadata = [(i, line) for i, line in non_metadata_lines if line.strip()]
-                    
-                    if non_empty_non_metadata:
-                        max_commas = max(line.count(',') for i, line in non_empty_non_metadata)
-                        header_line_candidates = [(i, line) for i, line in non_empty_non_metadata if line.count(',') == max_commas]
-                        
-                        if header_line_candidates:
-                            best_score = -1
-                            for i, line in header_line_candidates:
-                                score = 1
-                                if any(c.isalpha() for c in line):
-                                    score += 10
-                                content_length = len(line.replace(',', ''))
-                                score += min(content_length, 50)
-                                
-                                if score > best_score:
-                                    best_score = score
-                                    header_line_index = i
-                    
-                    # 确定是否使用检测到的标题行
-                    if max_commas >= 9:
-                        df = pd.read_csv(first_file_path,
-                                        skiprows=header_line_index,
-                                        on_bad_lines='skip',
-                                        engine='python')
-                    else:
-                        df = pd.read_csv(first_file_path,
-                                        on_bad_lines='skip',
-                                        engine='python')
+                df = loganalyzer_core.read_preview_with_values(
+                    first_file_path, ["White Pass/Fail Criteria", "Mixed Pass/Fail Criteria"]).df
             except Exception as e:
                 self.update_status(f"Error reading CSV file: {str(e)}")
                 loading_label.destroy()
@@ -10053,8 +7518,9 @@ class TestLogAnalyzer:
                     self._display_editable_colorpoint_data(coord_frame, valid_points, "White", self.white_frame)
                     self.colorpoint_spec_data["White"] = valid_points
                     
-                    # 只显示坐标框架，取消多边形绘图区
+                    # 坐标框架下方显示多边形预览，编辑坐标时只更新多边形图元
                     coord_frame.pack(fill="both", expand=True, padx=5, pady=5)
+                    self._display_colorpoint_polygon(white_frame, [point for point in valid_points if point[0] is not None], "White")
                 except Exception as e:
                     # 如果解析失败，显示原始数据并使用默认值
                     status_label.config(text="Failed to parse CAFL0 ColorPointSpec, using default values", foreground="red")
@@ -10123,8 +7589,9 @@ class TestLogAnalyzer:
                     self._display_editable_colorpoint_data(coord_frame, valid_points, "Mixed", self.mixed_frame)
                     self.colorpoint_spec_data["Mixed"] = valid_points
                     
-                    # 只显示坐标框架，取消多边形绘图区
+                    # 坐标框架下方显示多边形预览，编辑坐标时只更新多边形图元
                     coord_frame.pack(fill="both", expand=True, padx=5, pady=5)
+                    self._display_colorpoint_polygon(mixed_frame, [point for point in valid_points if point[0] is not None], "Mixed")
                 except Exception as e:
                     # 如果解析失败，显示原始数据并使用默认值
                     status_label.config(text="Failed to parse CALF24 ColorPointSpec, using default values", foreground="red")
@@ -10321,15 +7788,13 @@ class TestLogAnalyzer:
                             anchor="center", padx=10, pady=4).grid(row=0, column=0, sticky="nsew")
                     
                     # u'坐标输入框 - 不再格式化显示，直接显示原始值
-                    u_value = "" if point[0] is None else str(point[0])
-                    u_entry = ttk.Entry(row_frame, font=("SimHei", 10), width=headers[1][1]//6, justify="center")
-                    u_entry.insert(0, u_value)
+                    u_var = tk.StringVar(value="" if point[0] is None else str(point[0]))
+                    u_entry = ttk.Entry(row_frame, textvariable=u_var, font=("SimHei", 10), width=headers[1][1]//6, justify="center")
                     u_entry.grid(row=0, column=1, sticky="nsew", padx=5, pady=3)
                     
                     # v'坐标输入框 - 不再格式化显示，直接显示原始值
-                    v_value = "" if point[1] is None else str(point[1])
-                    v_entry = ttk.Entry(row_frame, font=("SimHei", 10), width=headers[2][1]//6, justify="center")
-                    v_entry.insert(0, v_value)
+                    v_var = tk.StringVar(value="" if point[1] is None else str(point[1]))
+                    v_entry = ttk.Entry(row_frame, textvariable=v_var, font=("SimHei", 10), width=headers[2][1]//6, justify="center")
                     v_entry.grid(row=0, column=2, sticky="nsew", padx=5, pady=3)
                     
                     # 描述标签
@@ -10342,8 +7807,14 @@ class TestLogAnalyzer:
                     original_data[i] = (point[0], point[1])
                     entry_data[i] = {
                         "u": u_entry,
-                        "v": v_entry
+                        "v": v_entry,
+                        "vars": (u_var, v_var)
                     }
+                
+                # 坐标输入改变时只更新多边形预览，并增量估算良率
+                for i in entry_data:
+                    for var in entry_data[i]["vars"]:
+                        var.trace_add("write", lambda *args: self._auto_refresh_polygon(entry_data, type_name, parent_frame))
             else:
                 # 如果没有坐标点数据，显示提示信息
                 no_data_frame = tk.Frame(container, padx=20, pady=20)
@@ -10437,6 +7908,9 @@ class TestLogAnalyzer:
                     
                     # 刷新多边形显示
                     self._refresh_polygon_display(parent_frame, valid_points, type_name)
+                    # 增量估算保存后的良率（只重新计算这个多边形）
+                    numeric_points = [point for point in valid_points if all(isinstance(value, float) for value in point)]
+                    self._schedule_what_if(lambda: self._what_if_polygon(type_name, numeric_points))
                     
                     # 提供详细的成功反馈
                     success_message = f"成功保存{type_name}的ColorPoint规格参数更改，共{len(valid_points)}个有效坐标点到标准文件"
@@ -10529,203 +8003,159 @@ class TestLogAnalyzer:
             # 获取当前所有坐标点的值
             updated_points = []
             for i in sorted(entry_data.keys()):
+                u_text = entry_data[i]["u"].get().strip()
+                v_text = entry_data[i]["v"].get().strip()
+                # 未填写的坐标点不参与多边形（与保存时一致）
+                if not u_text and not v_text:
+                    continue
                 try:
-                    u_var, v_var = entry_data[i]
-                    u_value = float(u_var.get())
-                    v_value = float(v_var.get())
-                    updated_points.append((u_value, v_value))
-                except (ValueError, TypeError):
-                    # 如果有无效值，跳过本次刷新
-                    return
-                    
-            # 不再调用刷新多边形方法，因为多边形绘图区已取消
-            pass
+                    updated_points.append((float(u_text), float(v_text)))
+                except ValueError:
+                    # 如果有无效值（正在输入），跳过本次刷新
+                    return
+            
+            # 只更新已存在多边形的顶点，不重建图形
+            self._refresh_polygon_display(parent_frame, updated_points, type_name)
+            # 增量估算修改后的良率（只重新计算这个多边形）
+            self._schedule_what_if(lambda: self._what_if_polygon(type_name, updated_points))
         except Exception as e:
             # 自动刷新错误不要影响用户使用
             self.logger.debug(f"Auto-refresh error: {str(e)}")
-            
+    
+    def _get_uv_limits(self, points):
+        # 根据多边形顶点计算u'v'坐标轴范围，点数不足时使用默认范围
+        if len(points) >= 3:
+            all_u_values = [p[0] for p in points]
+            all_v_values = [p[1] for p in points]
+            
+            u_margin = (max(all_u_values) - min(all_u_values)) * 0.15 if max(all_u_values) != min(all_u_values) else 0.02
+            v_margin = (max(all_v_values) - min(all_v_values)) * 0.15 if max(all_v_values) != min(all_v_values) else 0.02
+            xlim = [min(all_u_values) - u_margin, max(all_u_values) + u_margin]
+            ylim = [min(all_v_values) - v_margin, max(all_v_values) + v_margin]
+            return xlim, ylim
+        return [0.18, 0.22], [0.48, 0.52]
+    
+    def _colorpoint_note_text(self, colorpoint_items, type_name):
+        # 生成坐标点不足时的提示文本
+        criteria_name = 'CAFL0' if type_name == 'White' else 'CALF24'
+        note_text = f"{type_name} {criteria_name} Standard: "
+        note_text += "No valid polygon" if len(colorpoint_items) == 0 else \
+                     f"{len(colorpoint_items)} point{'s' if len(colorpoint_items) > 1 else ''} (need at least 3 for polygon)"
+        return note_text
+    
     def _display_colorpoint_polygon(self, tab, colorpoint_items, type_name):
         # Display ColorPoint polygon in specified frame
         try:
+            chart_key = f"colorpoint_{type_name}"
+            
             # 添加说明文本
             desc_text = f"基于CIELUV色彩空间的u'v'坐标系，显示{type_name}标准的通过区域"
             desc_label = tk.Label(tab, text=desc_text, font=('SimHei', 9), fg="gray")
             desc_label.pack(pady=2, padx=5, anchor='w')
             
-            # 导入必要的库
-            import matplotlib.pyplot as plt
-            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
             from matplotlib.patches import Polygon
-            import numpy as np
-            
-            # 创建图形
-            fig, ax = plt.subplots(figsize=(6, 5), dpi=100)
-            
-            # 定义函数：将u'v'值转换为RGB颜色
-            def uv_to_rgb(u, v, luminance=100):
-                # CIELUV到XYZ转换
-                u0 = 0.19783000664283681  # D65的u'值
-                v0 = 0.46831999493879114  # D65的v'值
-                
-                # 计算Y（亮度）
-                Y = luminance / 100.0  # 转换为0-1范围
-                
-                # 计算u和v的实际值
-                if v != 0:
-                    d = Y * (5 * v - 12 * v0 * u) / (v * 3)
-                else:
-                    d = 0
-                
-                u_prime = u
-                v_prime = v
-                
-                # 计算XYZ坐标
-                if v_prime > 0:
-                    Y = Y
-                    X = Y * 9 * u_prime / (4 * v_prime)
-                    Z = Y * (12 - 3 * u_prime - 20 * v_prime) / (4 * v_prime)
-                else:
-                    X, Y, Z = 0, Y, 0
-                
-                # XYZ到RGB转换（使用sRGB矩阵）
-                r = X * 3.2406 + Y * -1.5372 + Z * -0.4986
-                g = X * -0.9689 + Y * 1.8758 + Z * 0.0415
-                b = X * 0.0557 + Y * -0.2040 + Z * 1.0570
-                
-                # 应用gamma校正
-                def gamma_correction(x):
-                    if x <= 0.0031308:
-                        return 12.92 * x
-                    else:
-                        return 1.055 * (x ** (1/2.4)) - 0.055
-                
-                r = gamma_correction(r)
-                g = gamma_correction(g)
-                b = gamma_correction(b)
-                
-                # 确保RGB值在0-1范围内
-                r = max(0, min(1, r))
-                g = max(0, min(1, g))
-                b = max(0, min(1, b))
-                
-                return r, g, b
-            
-            # 创建颜色背景
-            def add_color_background(ax, xlim, ylim, resolution=100):
-                # 创建网格
-                u = np.linspace(xlim[0], xlim[1], resolution)
-                v = np.linspace(ylim[0], ylim[1], resolution)
-                u_grid, v_grid = np.meshgrid(u, v)
-                
-                # 创建RGB颜色数组
-                rgb_array = np.zeros((resolution, resolution, 3))
-                
-                # 为每个点计算RGB颜色
-                rgb_flat = np.array([uv_to_rgb(u, v) for u, v in zip(u_grid.flatten(), v_grid.flatten())])
-                rgb_array = rgb_flat.reshape(resolution, resolution, 3)
-                
-                # 显示颜色背景
-                ax.imshow(rgb_array, extent=[xlim[0], xlim[1], ylim[0], ylim[1]], 
-                         origin='lower', aspect='auto', alpha=0.8)
             
-            # 设置坐标轴标签
-            ax.set_xlabel("u'")
-            ax.set_ylabel("v'")
+            # 同一类型只创建一次图形，之后只更新图元
+            fig, axes, canvas, created = self.chart_manager.get_chart(chart_key, tab, figsize=(5, 4), dpi=100)
+            ax = axes[0]
             
-            # 如果有有效的坐标点，绘制多边形
-            if len(colorpoint_items) >= 3:
-                # 调整坐标轴范围以适应多边形点
-                all_u_values = [p[0] for p in colorpoint_items]
-                all_v_values = [p[1] for p in colorpoint_items]
+            if created:
+                # 设置坐标轴标签
+                ax.set_xlabel("u'")
+                ax.set_ylabel("v'")
                 
-                u_margin = (max(all_u_values) - min(all_u_values)) * 0.15 if max(all_u_values) != min(all_u_values) else 0.02
-                v_margin = (max(all_v_values) - min(all_v_values)) * 0.15 if max(all_v_values) != min(all_v_values) else 0.02
-                xlim = [min(all_u_values) - u_margin, max(all_u_values) + u_margin]
-                ylim = [min(all_v_values) - v_margin, max(all_v_values) + v_margin]
-                
-                # 添加基于u'v'的颜色背景
-                add_color_background(ax, xlim, ylim)
-                
-                # 设置坐标轴范围
-                ax.set_xlim(xlim)
-                ax.set_ylim(ylim)
-                
-                # 绘制多边形
+                # 绘制多边形（点数不足时隐藏）
                 color = 'blue' if type_name == 'White' else 'red'
-                polygon = Polygon(colorpoint_items, closed=True, fill=False, 
+                polygon = Polygon([(0, 0), (0, 0), (0, 0)], closed=True, fill=False,
                                 edgecolor=color, linewidth=2, label=f'{type_name} Region')
                 ax.add_patch(polygon)
+                self.chart_manager.set_artist(chart_key, "polygon", polygon)
                 
-                # 添加顶点标签
-                for i, (u, v) in enumerate(colorpoint_items):
-                    ax.text(u, v, f'P{i+1}', fontsize=8, ha='right', va='bottom',
-                           bbox=dict(boxstyle="round,pad=0.3", fc="white", alpha=0.7))
-                
-                # 添加图例
-                ax.legend(loc='upper right')
-            else:
-                # 设置默认范围
-                xlim = [0.18, 0.22]
-                ylim = [0.48, 0.52]
-                
-                # 添加基于u'v'的颜色背景
-                add_color_background(ax, xlim, ylim)
-                
-                # 设置坐标轴范围
-                ax.set_xlim(xlim)
-                ax.set_ylim(ylim)
-                
-                # 根据坐标点数量显示相应提示信息
-                if len(colorpoint_items) == 0:
-                    ax.text(0.5, 0.5, 'No valid polygon data to display', 
-                           ha='center', va='center', transform=ax.transAxes,
-                           fontsize=12, color='red', fontstyle='italic')
-                elif len(colorpoint_items) < 3:
-                    ax.text(0.5, 0.5, f'Need at least 3 points to draw polygon (current: {len(colorpoint_items)})', 
-                           ha='center', va='center', transform=ax.transAxes,
-                           fontsize=10, color='orange', fontstyle='italic')
-                
-                # 添加说明文本在底部
-                if type_name == 'White':
-                    criteria_name = 'CAFL0'
-                else:
-                    criteria_name = 'CALF24'
+                # 提示文本
+                message = ax.text(0.5, 0.5, '', ha='center', va='center', transform=ax.transAxes,
+                                  fontsize=12, color='red', fontstyle='italic')
+                note = ax.text(0.5, 0.01, '', ha='center', va='bottom', transform=ax.transAxes,
+                               fontsize=8, color='gray')
+                self.chart_manager.set_artist(chart_key, "message", message)
+                self.chart_manager.set_artist(chart_key, "note", note)
                 
-                note_text = f"{type_name} {criteria_name} Standard: "
-                note_text += "No valid polygon" if len(colorpoint_items) == 0 else \
-                             f"{len(colorpoint_items)} point{'s' if len(colorpoint_items) > 1 else ''} (need at least 3 for polygon)"
+                # 添加网格线
+                ax.grid(True, linestyle='--', alpha=0.7)
                 
-                ax.text(0.5, 0.01, note_text, 
-                       ha='center', va='bottom', transform=ax.transAxes,
-                       fontsize=8, color='gray')
-            
-            # 添加网格线
-            ax.grid(True, linestyle='--', alpha=0.7)
-            
-            # 调整布局
-            plt.tight_layout()
+                # 添加边框效果
+                canvas_frame = ttk.Frame(tab, relief="sunken")
+                canvas_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+                canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, in_=canvas_frame)
             
-            # 创建画布并添加到Tkinter窗口
-            canvas = FigureCanvasTkAgg(fig, master=tab)
-            canvas.draw()
-            # 添加边框效果
-            canvas_frame = ttk.Frame(tab, relief="sunken")
-            canvas_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-            canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, in_=canvas_frame)
+            self._update_colorpoint_polygon_artists(chart_key, ax, colorpoint_items, type_name)
+            fig.tight_layout()
+            canvas.draw_idle()
             
             # 保存画布引用，用于后续刷新
             if type_name == 'White':
                 self.white_canvas = canvas
             else:
                 self.mixed_canvas = canvas
-                
+        
         except Exception as e:
             error_label = tk.Label(tab, text=f"Error displaying ColorPoint polygon: {str(e)}", fg="red")
             error_label.pack(pady=10)
     
+    def _update_colorpoint_polygon_artists(self, chart_key, ax, colorpoint_items, type_name):
+        # 只更新多边形顶点、顶点标签、背景和提示文本
+        xlim, ylim = self._get_uv_limits(colorpoint_items)
+        self.chart_manager.update_background(chart_key, "background", ax, xlim, ylim)
+        ax.set_xlim(xlim)
+        ax.set_ylim(ylim)
+        
+        self.chart_manager.update_polygon(chart_key, "polygon", colorpoint_items)
+        
+        # 顶点标签数量可能变化，只重建标签文本
+        for text in self.chart_manager.get_artist(chart_key, "vertex_labels") or []:
+            text.remove()
+        vertex_labels = []
+        if len(colorpoint_items) >= 3:
+            for i, (u, v) in enumerate(colorpoint_items):
+                vertex_labels.append(ax.text(u, v, f'P{i+1}', fontsize=8, ha='right', va='bottom',
+                                             bbox=dict(boxstyle="round,pad=0.3", fc="white", alpha=0.7)))
+        self.chart_manager.set_artist(chart_key, "vertex_labels", vertex_labels)
+        
+        message = self.chart_manager.get_artist(chart_key, "message")
+        note = self.chart_manager.get_artist(chart_key, "note")
+        if len(colorpoint_items) >= 3:
+            message.set_visible(False)
+            note.set_visible(False)
+            ax.legend(loc='upper right')
+        else:
+            # 根据坐标点数量显示相应提示信息
+            if len(colorpoint_items) == 0:
+                message.set_text('No valid polygon data to display')
+                message.set_color('red')
+                message.set_fontsize(12)
+            else:
+                message.set_text(f'Need at least 3 points to draw polygon (current: {len(colorpoint_items)})')
+                message.set_color('orange')
+                message.set_fontsize(10)
+            message.set_visible(True)
+            note.set_text(self._colorpoint_note_text(colorpoint_items, type_name))
+            note.set_visible(True)
+            if ax.get_legend() is not None:
+                ax.get_legend().remove()
+    
     def _refresh_polygon_display(self, parent_frame, updated_points, type_name):
-        # 多边形绘图区已取消，此函数不再执行任何操作
-        pass
+        # 多边形图已创建时只更新多边形图元并请求重绘，否则不执行任何操作
+        chart_key = f"colorpoint_{type_name}"
+        if not self.chart_manager.has_chart(chart_key):
+            return
+        try:
+            canvas = self.chart_manager.get_canvas(chart_key)
+            ax = canvas.figure.axes[0]
+            valid_points = [(float(u), float(v)) for u, v in updated_points
+                            if u is not None and v is not None]
+            self._update_colorpoint_polygon_artists(chart_key, ax, valid_points, type_name)
+            self.chart_manager.redraw(chart_key)
+        except (ValueError, TypeError) as e:
+            self.logger.debug(f"Refresh polygon display skipped: {str(e)}")
     
     def _save_colorpoint_spec_to_temp_file(self):
         # Save ColorPoint specification data to a consistent file with validation
@@ -11143,7 +8573,7 @@ class TestLogAnalyzer:
             # 创建数据存储结构
             # 保存原始数据
             original_data = {}
-            # 保存Entry引用和验证状态
+            # 保存Entry引用、绑定的变量和验证状态
             entry_data = {}
             
             # 表头已移至滚动区域外部，保持固定显示
@@ -11185,12 +8615,6 @@ class TestLogAnalyzer:
                     # 保存原始数据
                     original_data[std_type] = (lower_limit, upper_limit)
                     
-                    # 自动保存原始数据到self.criteria_data字典，确保自动保存时有数据
-                    if not hasattr(self, 'criteria_data'):
-                        self.criteria_data = {}
-                    self.criteria_data[type_name] = original_data.copy()
-                    print(f"已自动保存{type_name}标准数据到criteria_data字典")
-                    
                     # 创建行框架
                     row_frame = tk.Frame(scrollable_frame)
                     row_frame.pack(fill="x", padx=0, pady=1)
@@ -11208,24 +8632,16 @@ class TestLogAnalyzer:
                                         anchor="center", padx=10, pady=4)
                     type_label.grid(row=0, column=1, sticky="nsew")
                     
-                    # 创建下限输入框 - 优化配置和显示
-                    lower_entry = ttk.Entry(row_frame, font=("SimHei", 10), width=headers[2][1]//6, justify="center")
-                    lower_entry.insert(0, lower_limit)
+                    # 创建下限输入框 - 绑定StringVar，编辑时通过变量跟踪更新criteria_store
+                    lower_var = tk.StringVar(value=lower_limit)
+                    lower_entry = ttk.Entry(row_frame, textvariable=lower_var, font=("SimHei", 10), width=headers[2][1]//6, justify="center")
                     lower_entry.grid(row=0, column=2, sticky="nsew", padx=5, pady=3)
                     
-                    # 添加输入验证绑定
-                    lower_entry.bind("<FocusOut>", lambda event, std_type=std_type, which="lower": validate_input(event, std_type, which))
-                    lower_entry.bind("<KeyRelease>", lambda event, std_type=std_type, which="lower": reset_status_colors(std_type, which))
-                    
-                    # 创建上限输入框 - 优化配置和显示
-                    upper_entry = ttk.Entry(row_frame, font=("SimHei", 10), width=headers[3][1]//6, justify="center")
-                    upper_entry.insert(0, upper_limit)
+                    # 创建上限输入框
+                    upper_var = tk.StringVar(value=upper_limit)
+                    upper_entry = ttk.Entry(row_frame, textvariable=upper_var, font=("SimHei", 10), width=headers[3][1]//6, justify="center")
                     upper_entry.grid(row=0, column=3, sticky="nsew", padx=5, pady=3)
                     
-                    # 添加输入验证绑定
-                    upper_entry.bind("<FocusOut>", lambda event, std_type=std_type, which="upper": validate_input(event, std_type, which))
-                    upper_entry.bind("<KeyRelease>", lambda event, std_type=std_type, which="upper": reset_status_colors(std_type, which))
-                    
                     # 描述标签 - 优化显示确保内容完整
                     desc_label = tk.Label(row_frame, text=description, font=("SimHei", 10), width=headers[4][1]//6, 
                                         anchor="w", padx=10, pady=4, wraplength=0, justify="left")
@@ -11233,15 +8649,20 @@ class TestLogAnalyzer:
                     
                     # 移除所有提示说明
                     
-                    # 保存Entry引用
+                    # 保存Entry引用和绑定的变量
                     entry_data[std_type] = {
                         "lower": lower_entry,
                         "upper": upper_entry,
+                        "lower_var": lower_var,
+                        "upper_var": upper_var,
                         "valid": True
                     }
                     
                     row_idx += 1
             
+            # 所有行创建完成后一次性保存到criteria_store，确保自动保存时有数据
+            self.criteria_store.set_window(type_name, original_data)
+            
             # 初始化空的grouped_items变量以避免未定义错误
             grouped_items = []
             
@@ -11254,19 +8675,6 @@ class TestLogAnalyzer:
                                      font=("SimHei", 10))
                 no_data_label.pack(anchor="center")
             
-            # 定义验证函数
-            def validate_input(event, std_type, which):
-                pass
-            
-            def reset_status_colors(std_type, which):
-                pass
-            
-            def save_changes():
-                pass
-            
-            def cancel_changes():
-                # 简化函数实现，移除对status_var的引用
-                pass
             def is_valid_number(value):
                 """验证输入值是否为有效的数字格式"""
                 if not value.strip():
@@ -11277,69 +8685,46 @@ class TestLogAnalyzer:
                 except ValueError:
                     return False
             
-            def reset_status_colors():
-                """移除状态标签后的空函数"""
-                pass
-            
-            def validate_input(entry, std_type, is_lower=True):
-                """验证单个输入框的值"""
-                # math模块已在文件顶部导入
-                value = entry.get().strip()
+            def validate_input(std_type):
+                """验证一条规格的上下限，有效时更新criteria_store（由变量跟踪在每次修改后调用）"""
+                data = entry_data[std_type]
+                lower_val = data["lower_var"].get().strip()
+                upper_val = data["upper_var"].get().strip()
                 
                 # 重置样式
-                entry.configure(style="TEntry")
+                data["lower"].configure(style="TEntry")
+                data["upper"].configure(style="TEntry")
                 
                 # 验证数字格式
-                if not is_valid_number(value):
-                    entry.configure(style="Invalid.TEntry")
-                    entry_data[std_type]["valid"] = False
-                    return False
+                for which, value in (("lower", lower_val), ("upper", upper_val)):
+                    if not is_valid_number(value):
+                        data[which].configure(style="Invalid.TEntry")
+                        data["valid"] = False
+                        return False
                 
                 # 如果两个输入框都有值，则验证上下限关系
-                lower_val = entry_data[std_type]["lower"].get().strip()
-                upper_val = entry_data[std_type]["upper"].get().strip()
-                
                 if lower_val and upper_val:
-                    try:
-                        lower_float = float(lower_val)
-                        upper_float = float(upper_val)
+                    lower_float = float(lower_val)
+                    upper_float = float(upper_val)
+                    
+                    # 使用math.isclose处理浮点数精度问题，只有当下限值明显大于上限值时才判定为无效
+                    if not math.isclose(lower_float, upper_float) and lower_float >= upper_float:
+                        data["valid"] = False
                         
-                        # 使用math.isclose处理浮点数精度问题，只有当下限值明显大于上限值时才判定为无效
-                        if not math.isclose(lower_float, upper_float) and lower_float >= upper_float:
-                            entry_data[std_type]["valid"] = False
-                            
-                            # 高亮两个输入框
-                            entry_data[std_type]["lower"].configure(style="Invalid.TEntry")
-                            entry_data[std_type]["upper"].configure(style="Invalid.TEntry")
-                            return False
-                    except ValueError:
-                        # 如果转换失败，已经被前面的验证捕获
-                        pass
-                
-                # 如果通过验证，检查是否所有项都有效
-                all_valid = True
-                for item_data in entry_data.values():
-                    if not item_data["valid"]:
-                        all_valid = False
-                        break
-                
-                if all_valid:
-                    entry_data[std_type]["valid"] = True
+                        # 高亮两个输入框
+                        data["lower"].configure(style="Invalid.TEntry")
+                        data["upper"].configure(style="Invalid.TEntry")
+                        return False
                 
+                data["valid"] = True
+                # 更新数据模型，内容改变时criteria_store发布改变事件（增量估算良率）
+                self.criteria_store.set_limit(type_name, std_type, lower_val, upper_val)
                 return True
             
-            # 为输入框添加验证
+            # 变量跟踪: 输入、粘贴和取消修改都会更新数据模型
             for std_type, data in entry_data.items():
-                lower_entry = data["lower"]
-                upper_entry = data["upper"]
-                
-                # 绑定输入变化事件
-                lower_entry.bind("<FocusOut>", lambda event, st=std_type, low=True: validate_input(event.widget, st, low))
-                upper_entry.bind("<FocusOut>", lambda event, st=std_type, low=False: validate_input(event.widget, st, low))
-                
-                # 绑定按键释放事件进行实时验证
-                lower_entry.bind("<KeyRelease>", lambda event, st=std_type, low=True: validate_input(event.widget, st, low))
-                upper_entry.bind("<KeyRelease>", lambda event, st=std_type, low=False: validate_input(event.widget, st, low))
+                for var in (data["lower_var"], data["upper_var"]):
+                    var.trace_add("write", lambda *args, st=std_type: validate_input(st))
             
             # 配置无效输入的样式
             style = ttk.Style()
@@ -11367,57 +8752,10 @@ class TestLogAnalyzer:
                             logger.error(error_msg)
                             return
                     
-                    # 检查是否有任何输入框的值为无效数字
-                    for std_type, data in entry_data.items():
-                        lower_val = data["lower"].get().strip()
-                        upper_val = data["upper"].get().strip()
-                        
-                        if lower_val and not is_valid_number(lower_val):
-                            error_msg = f"错误: {std_type}下限值的数字格式无效"
-                            self.update_status(error_msg)
-                            data["lower"].configure(style="Invalid.TEntry")
-                            logger.error(error_msg)
-                            return
-                        
-                        if upper_val and not is_valid_number(upper_val):
-                            error_msg = f"错误: {std_type}上限值的数字格式无效"
-                            self.update_status(error_msg)
-                            data["upper"].configure(style="Invalid.TEntry")
-                            logger.error(error_msg)
-                            return
-                        
-                        # 再次验证上下限关系
-                        if lower_val and upper_val:
-                            try:
-                                # math模块已在文件顶部导入
-                                lower_float = float(lower_val)
-                                upper_float = float(upper_val)
-                                
-                                # 使用math.isclose处理浮点数精度问题，只有当下限值明显大于上限值时才判定为无效
-                                if not math.isclose(lower_float, upper_float) and lower_float >= upper_float:
-                                    error_msg = f"错误: {std_type}的下限值必须小于上限值"
-                                    self.update_status(error_msg)
-                                    data["lower"].configure(style="Invalid.TEntry")
-                                    data["upper"].configure(style="Invalid.TEntry")
-                                    logger.error(error_msg)
-                                    return
-                            except ValueError:
-                                pass
-                    
-                    # 更新原始数据
-                    for std_type, data in entry_data.items():
-                        lower_val = data["lower"].get().strip()
-                        upper_val = data["upper"].get().strip()
-                        original_data[std_type] = (lower_val, upper_val)
-                    
-                    # 确保criteria_data字典存在并更新
-                    if not hasattr(self, 'criteria_data'):
-                        self.criteria_data = {}
-                        logger.info("创建新的criteria_data字典")
-                    
-                    # 更新全局标准数据字典
-                    self.criteria_data[type_name] = original_data.copy()  # 使用copy确保数据完整性
-                    logger.info(f"已更新criteria_data[{type_name}]，包含{len(original_data)}项规格参数")
+                    # 编辑框的有效修改已经通过变量跟踪更新到criteria_store，保存后作为取消修改时恢复的数据
+                    original_data.clear()
+                    original_data.update(self.criteria_store.window(type_name))
+                    logger.info(f"{type_name}规格数据包含{len(original_data)}项规格参数，版本{self.criteria_store.version}")
                     
                     # 刷新并保存临时规格文件
                     logger.info("开始调用_save_criteria_to_temp_file保存规格数据")
@@ -11451,12 +8789,11 @@ class TestLogAnalyzer:
             def cancel_changes():
                 """Cancel all unsaved changes and restore original settings"""
                 # 恢复所有输入框的值为原始数据
+                # （变量跟踪同时把恢复的值更新到criteria_store）
                 for std_type, (lower, upper) in original_data.items():
                     if std_type in entry_data:
-                        entry_data[std_type]["lower"].delete(0, tk.END)
-                        entry_data[std_type]["lower"].insert(0, lower)
-                        entry_data[std_type]["upper"].delete(0, tk.END)
-                        entry_data[std_type]["upper"].insert(0, upper)
+                        entry_data[std_type]["lower_var"].set("" if lower is None else lower)
+                        entry_data[std_type]["upper_var"].set("" if upper is None else upper)
                         
                         # 重置验证状态和样式
                         entry_data[std_type]["valid"] = True
@@ -11627,6 +8964,396 @@ class TestLogAnalyzer:
         """计算不良率"""
         pass
         
+    def show_limit_sweep(self):
+        """限值扫描窗口: 选择一条规格的下限或上限，绘制各Config和总体良率随限值变化的曲线
+        
+        使用Data Re-Processing保存的增量判定状态（其它规格和多边形的不良mask固定），数据列只排序一次，
+        修改扫描范围或切换规格时不需要重新处理数据。
+        """
+        evaluator = self.incremental_evaluator
+        if evaluator is None or not evaluator.limit_items():
+            messagebox.showinfo("Limit Sweep", "Please run Data Re-Processing first.")
+            return
+        
+        sweep_window = tk.Toplevel(self.root)
+        sweep_window.title("Limit Sweep")
+        sweep_window.geometry("900x650")
+        
+        control_frame = tk.Frame(sweep_window)
+        control_frame.pack(fill="x", padx=10, pady=5)
+        
+        items = evaluator.limit_items()
+        item_var = tk.StringVar(value=items[0])
+        side_var = tk.StringVar(value="lower")
+        from_var = tk.StringVar()
+        to_var = tk.StringVar()
+        points_var = tk.StringVar(value=str(loganalyzer_core.DEFAULT_SWEEP_POINTS))
+        
+        tk.Label(control_frame, text="Criterion:", font=("SimHei", 10)).pack(side="left", padx=2)
+        ttk.Combobox(control_frame, textvariable=item_var, values=items, width=20, state="readonly").pack(side="left", padx=2)
+        tk.Radiobutton(control_frame, text="Lower", variable=side_var, value="lower").pack(side="left")
+        tk.Radiobutton(control_frame, text="Upper", variable=side_var, value="upper").pack(side="left")
+        for label, var in (("From:", from_var), ("To:", to_var), ("Points:", points_var)):
+            tk.Label(control_frame, text=label, font=("SimHei", 10)).pack(side="left", padx=2)
+            ttk.Entry(control_frame, textvariable=var, width=8).pack(side="left", padx=2)
+        
+        info_var = tk.StringVar()
+        tk.Label(sweep_window, textvariable=info_var, font=("SimHei", 9), fg="gray", anchor="w").pack(fill="x", padx=10)
+        chart_frame = tk.Frame(sweep_window)
+        chart_frame.pack(fill="both", expand=True, padx=10, pady=5)
+        # 每个窗口使用自己的图表，同时打开多个窗口时互不覆盖
+        chart_key = f"limit_sweep:{id(sweep_window)}"
+        
+        def run_sweep(*_):
+            item, side = item_var.get(), side_var.get()
+            try:
+                points = max(2, int(points_var.get() or loganalyzer_core.DEFAULT_SWEEP_POINTS))
+                start = float(from_var.get()) if from_var.get().strip() else None
+                stop = float(to_var.get()) if to_var.get().strip() else None
+            except ValueError:
+                info_var.set("From/To/Points must be numbers")
+                return
+            
+            import numpy as np
+            candidates = None
+            if start is not None and stop is not None:
+                candidates = np.linspace(start, stop, points)
+            started = time.perf_counter()
+            result = loganalyzer_core.limit_sweep(evaluator, item, side, candidates=candidates, points=points)
+            elapsed = time.perf_counter() - started
+            
+            fig, axes, canvas, created = self.chart_manager.get_chart(chart_key, chart_frame, figsize=(8, 5), dpi=100)
+            if created:
+                canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+            ax = axes[0]
+            ax.clear()
+            for group, curve in result.groupby('Group', sort=False):
+                ax.plot(curve['Limit'], curve['Yield (%)'], label=str(group),
+                        linewidth=2.5 if group == 'All' else 1.2, color='black' if group == 'All' else None)
+            current = evaluator.limits_of(item)[0 if side == 'lower' else 1]
+            if current is not None and np.isfinite(current):
+                ax.axvline(current, color='gray', linestyle='--', linewidth=1, label=f"Current {side} = {current:g}")
+            ax.set_title(f"Yield vs {item} {side} limit ({evaluator.column_of(item)})")
+            ax.set_xlabel(f"{side.capitalize()} limit")
+            ax.set_ylabel("Yield (%)")
+            ax.grid(True, linestyle='--', alpha=0.7)
+            ax.legend(loc='best', fontsize=8)
+            fig.tight_layout()
+            canvas.draw_idle()
+            info_var.set(f"{result['Limit'].nunique()} limits x {len(evaluator)} units in {elapsed:.3f} s "
+                         f"(other criteria and polygons fixed at their current values)")
+        
+        def close_window():
+            self.chart_manager.release(chart_key)
+            sweep_window.destroy()
+        
+        ttk.Button(control_frame, text="Sweep", command=run_sweep).pack(side="left", padx=5)
+        sweep_window.bind("<Return>", run_sweep)
+        sweep_window.protocol("WM_DELETE_WINDOW", close_window)
+        run_sweep()
+    
+    def show_color_bins(self):
+        """色点分Bin窗口: 按ColorPointSpec中的Bin多边形对每个单元的u'v'色点分类，显示各Config的Bin分布表和色点图
+        
+        Bin从"Load Bin Spec..."选择的JSON文件或当前ColorPointSpec数据中读取（没有'bins'时使用CAFL0/CAFL24多边形），
+        使用Bin外接矩形的网格索引，每个单元只与候选Bin做多边形判断。
+        """
+        data = getattr(self, 'reprocessed_data', None)
+        if data is None or data.empty:
+            data = self.processed_data
+        if data is None or data.empty:
+            messagebox.showinfo("Color Bins", "Please process data first.")
+            return
+        
+        bins_window = tk.Toplevel(self.root)
+        bins_window.title("Color Bins")
+        bins_window.geometry("1100x750")
+        
+        control_frame = tk.Frame(bins_window)
+        control_frame.pack(fill="x", padx=10, pady=5)
+        source_var = tk.StringVar()
+        tk.Label(bins_window, textvariable=source_var, font=("SimHei", 9), fg="gray", anchor="w").pack(fill="x", padx=10)
+        
+        table_frame = tk.Frame(bins_window)
+        table_frame.pack(fill="x", padx=10, pady=5)
+        tree = ttk.Treeview(table_frame, show="headings", height=8)
+        tree_scroll = ttk.Scrollbar(table_frame, orient="vertical", command=tree.yview)
+        tree.configure(yscrollcommand=tree_scroll.set)
+        tree.pack(side="left", fill="x", expand=True)
+        tree_scroll.pack(side="right", fill="y")
+        chart_frame = tk.Frame(bins_window)
+        chart_frame.pack(fill="both", expand=True, padx=10, pady=5)
+        # 每个窗口使用自己的图表，同时打开多个窗口时互不覆盖
+        chart_key = f"color_bins:{id(bins_window)}"
+        result = {}
+        
+        def run_binning(spec_data, source):
+            import numpy as np
+            from matplotlib.patches import Polygon
+            
+            started = time.perf_counter()
+            bins = loganalyzer_core.colorpoint_bins(spec_data)
+            assignments = loganalyzer_core.classify_color_bins(data, bins)
+            table = loganalyzer_core.color_bin_table(data, assignments)
+            elapsed = time.perf_counter() - started
+            result['table'] = table
+            
+            # Bin分布表
+            tree.delete(*tree.get_children())
+            columns = list(table.columns)
+            tree.configure(columns=columns)
+            for column in columns:
+                tree.heading(column, text=column)
+                tree.column(column, width=90 if column in ('Type', 'Bin') else 70, anchor="center")
+            for row in table.itertuples(index=False):
+                tree.insert("", "end", values=[f"{value:.2f}" if isinstance(value, float) else value for value in row])
+            
+            # 色点图: 按Bin着色的色点和Bin多边形
+            palette = configure_matplotlib().colormaps['tab20'].colors
+            fig, axes, canvas, created = self.chart_manager.get_chart(chart_key, chart_frame, nrows=1, ncols=2,
+                                                                      figsize=(12, 5), dpi=100)
+            if created:
+                canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+            step = max(1, len(data) // COLOR_BIN_CHART_POINTS)
+            for ax, (type_name, (u_column, v_column, display_name)) in zip(axes, loganalyzer_core.COLOR_POINT_COLUMNS.items()):
+                ax.clear()
+                ax.set_title(f"{display_name} Bins")
+                ax.set_xlabel("u'")
+                ax.set_ylabel("v'")
+                ax.grid(True, linestyle='--', alpha=0.7)
+                if type_name not in assignments:
+                    continue
+                index, labels = assignments[type_name]
+                u = loganalyzer_core.numeric_values(data, u_column)[::step]
+                v = loganalyzer_core.numeric_values(data, v_column)[::step]
+                shown = labels[::step]
+                ax.scatter(u[shown < 0], v[shown < 0], s=3, color='lightgray', label='Out of bins')
+                colors = [palette[i % len(palette)] for i in range(len(index.bins))]
+                ax.scatter(u[shown >= 0], v[shown >= 0], s=3, c=np.asarray(colors)[shown[shown >= 0]])
+                for color_bin, color in zip(index.bins, colors):
+                    ax.add_patch(Polygon(color_bin.polygon, closed=True, fill=False, edgecolor=color, linewidth=1, zorder=3))
+                    center = np.mean(color_bin.polygon, axis=0)
+                    ax.text(center[0], center[1], color_bin.name, fontsize=7, ha='center', va='center')
+            fig.tight_layout()
+            canvas.draw_idle()
+            source_var.set(f"{source}: {len(bins)} bins, {len(data)} units classified in {elapsed:.3f} s"
+                           + (f" (chart shows every {step}th unit)" if step > 1 else ""))
+        
+        def load_bin_spec():
+            file_path = filedialog.askopenfilename(title="Select Bin Spec JSON", parent=bins_window,
+                                                   filetypes=[("JSON files", "*.json"), ("All files", "*.*")])
+            if not file_path:
+                return
+            try:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    spec_data = json.load(f)
+            except (OSError, ValueError) as e:
+                messagebox.showerror("Color Bins", f"Failed to read {file_path}: {str(e)}", parent=bins_window)
+                return
+            self.color_bin_spec = spec_data
+            run_binning(spec_data, os.path.basename(file_path))
+        
+        def save_table():
+            file_path = filedialog.asksaveasfilename(title="Save Bin Table", parent=bins_window, defaultextension=".csv",
+                                                     filetypes=[("CSV files", "*.csv")])
+            if file_path and 'table' in result:
+                result['table'].to_csv(file_path, index=False)
+                self.update_status(f"Bin table saved: {file_path}")
+        
+        def close_window():
+            self.chart_manager.release(chart_key)
+            bins_window.destroy()
+        
+        ttk.Button(control_frame, text="Load Bin Spec...", command=load_bin_spec).pack(side="left", padx=5)
+        ttk.Button(control_frame, text="Save Table...", command=save_table).pack(side="left", padx=5)
+        bins_window.protocol("WM_DELETE_WINDOW", close_window)
+        
+        spec_data = getattr(self, 'color_bin_spec', None)
+        if spec_data is not None:
+            run_binning(spec_data, "Loaded bin spec")
+        else:
+            run_binning(getattr(self, 'colorpoint_spec_data', None), "ColorPointSpec")
+    
+    def show_watch_folder(self):
+        """监视目录窗口: 定时轮询目录，只读取新增的日志文件和已有文件新追加的行，增量更新处理结果和Yield/Top Defects
+        
+        轮询和处理在工作线程中进行（loganalyzer_core.FolderWatcher和WatchSession），结果在主线程中写回
+        processed_data/reprocessed_data，之后的Yield Analysis、Top Defects等分析直接使用最新的数据。
+        """
+        # 规格判定与Data Re-Processing一致，需要先设置Review Criteria
+        criteria_dict = self._get_criteria_dict()
+        if not criteria_dict:
+            messagebox.showinfo("提示", "请先设置Review Criteria")
+            return
+        
+        # 加载ColorPointSpec多边形（缺失时使用默认多边形）
+        try:
+            self._load_colorpoint_spec_from_temp_file()
+        except Exception as e:
+            self.logger.warning(f"Failed to load ColorPointSpec for watch mode: {str(e)}")
+        polygons = loganalyzer_core.colorpoint_polygons(getattr(self, 'colorpoint_spec_data', None))
+        
+        def resolve_limits(columns):
+            # 每种表头只匹配一次规格与列
+            return loganalyzer_core.resolve_criteria_columns(criteria_dict, columns)
+        
+        watch_window = tk.Toplevel(self.root)
+        watch_window.title("Watch Folder")
+        watch_window.geometry("900x650")
+        
+        dir_frame = tk.Frame(watch_window)
+        dir_frame.pack(fill="x", padx=10, pady=(10, 5))
+        tk.Label(dir_frame, text="Directory:", width=10).pack(side="left")
+        dir_var = tk.StringVar(value=os.getcwd())
+        tk.Entry(dir_frame, textvariable=dir_var, width=50).pack(side="left", fill="x", expand=True, padx=5)
+        
+        def browse_directory():
+            selected_dir = tk.filedialog.askdirectory(initialdir=dir_var.get(), parent=watch_window)
+            if selected_dir:
+                dir_var.set(selected_dir)
+        
+        browse_button = tk.Button(dir_frame, text="Browse...", command=browse_directory)
+        browse_button.pack(side="left", padx=5)
+        self.add_hover_effect(browse_button)
+        
+        option_frame = tk.Frame(watch_window)
+        option_frame.pack(fill="x", padx=10, pady=5)
+        tk.Label(option_frame, text="Pattern:", width=10).pack(side="left")
+        pattern_var = tk.StringVar(value="*.csv")
+        tk.Entry(option_frame, textvariable=pattern_var, width=20).pack(side="left", padx=5)
+        tk.Label(option_frame, text="Interval (s):").pack(side="left", padx=(10, 2))
+        interval_var = tk.StringVar(value=str(loganalyzer_core.DEFAULT_WATCH_INTERVAL))
+        tk.Entry(option_frame, textvariable=interval_var, width=6).pack(side="left")
+        
+        status_label = tk.Label(watch_window, text="Not watching", anchor="w")
+        status_label.pack(fill="x", padx=10, pady=5)
+        
+        def make_table(title, height):
+            tk.Label(watch_window, text=title, anchor="w", font=("SimHei", 10, "bold")).pack(fill="x", padx=10)
+            frame = tk.Frame(watch_window)
+            frame.pack(fill="both", expand=True, padx=10, pady=(0, 5))
+            tree = ttk.Treeview(frame, show="headings", height=height)
+            scrollbar = ttk.Scrollbar(frame, orient="vertical", command=tree.yview)
+            tree.configure(yscrollcommand=scrollbar.set)
+            tree.pack(side="left", fill="both", expand=True)
+            scrollbar.pack(side="right", fill="y")
+            return tree
+        
+        yield_tree = make_table("Yield", 6)
+        fpy_tree = make_table("FPY", 6)
+        defects_tree = make_table("Top Defects", 10)
+        
+        def fill_table(tree, table):
+            tree.delete(*tree.get_children())
+            columns = list(table.columns)
+            tree.configure(columns=columns)
+            for column in columns:
+                tree.heading(column, text=column)
+                tree.column(column, width=120, anchor="center")
+            for row in table.itertuples(index=False):
+                tree.insert("", "end", values=[f"{value:.2f}" if isinstance(value, float) else value for value in row])
+        
+        # 当前监视状态，没有在监视时session为None；generation用于丢弃停止后才返回的轮询结果
+        watch = {'session': None, 'watcher': None, 'interval': loganalyzer_core.DEFAULT_WATCH_INTERVAL,
+                 'generation': 0, 'after_id': None}
+        
+        def poll(generation):
+            watch['after_id'] = None
+            session, watcher = watch['session'], watch['watcher']
+            
+            def worker():
+                try:
+                    changed = watcher.poll()
+                    result = (changed, session.update(changed))
+                except Exception as e:
+                    result = e
+                self._call_on_main_thread(apply_update, generation, result)
+            
+            threading.Thread(target=worker, daemon=True).start()
+        
+        def apply_update(generation, result):
+            if generation != watch['generation']:
+                return
+            session = watch['session']
+            if isinstance(result, Exception):
+                self.logger.error(f"Watch folder poll failed: {str(result)}")
+                status_label.config(text=f"Poll failed: {str(result)}")
+            else:
+                changed, summary = result
+                if summary['rows']:
+                    # 结果写回主窗口的数据，之后的分析使用最新数据
+                    self.processed_data = session.processed
+                    self.processed_data_key = loganalyzer_core.content_hash('watch', id(session), session.version)
+                    self.reprocessed_data = session.reprocessed
+                    self.reprocessed_data_key = self.analysis_graph.key('reprocessed', self.processed_data_key, 'watch')
+                    self.incremental_evaluator = None
+                    self.format_cells = session.format_cells()
+                    self.hash_cells = {}
+                    self.attempt_history = session.report.attempt_history
+                    new_files = [file_path for file_path in changed
+                                 if file_path in session.files and file_path not in self.file_model]
+                    if new_files:
+                        self._add_loaded_files(new_files)
+                    self.update_menu_status(has_files=True, has_selected_files=bool(self.file_model.selected_paths()),
+                                            has_processed_data=True)
+                    
+                    fill_table(yield_tree, session.report.yield_table())
+                    fill_table(fpy_tree, session.report.fpy_table())
+                    fill_table(defects_tree, session.report.top_defects())
+                    self.update_status(f"Watch folder: {summary['rows']} new rows from {summary['files']} files, "
+                                       f"{summary['added']} units added, {summary['replaced']} retested units replaced")
+                status_label.config(text=f"Watching {len(session.files)} files, {session.report.units} units "
+                                         f"(last poll {datetime.datetime.now().strftime('%H:%M:%S')})")
+            watch['after_id'] = self.root.after(int(watch['interval'] * 1000), poll, generation)
+        
+        def start_watch():
+            directory = dir_var.get().strip()
+            if not os.path.isdir(directory):
+                messagebox.showerror("Watch Folder", f"Directory not found: {directory}", parent=watch_window)
+                return
+            try:
+                interval = float(interval_var.get())
+            except ValueError:
+                messagebox.showerror("Watch Folder", "Interval must be a number of seconds.", parent=watch_window)
+                return
+            stop_watch()
+            watch['interval'] = max(1.0, interval)
+            watch['watcher'] = loganalyzer_core.FolderWatcher(directory, pattern_var.get().strip() or "*.csv")
+            watch['session'] = loganalyzer_core.WatchSession(resolve_limits, polygons)
+            start_button.config(state=tk.DISABLED)
+            stop_button.config(state=tk.NORMAL)
+            status_label.config(text=f"Reading {directory}...")
+            poll(watch['generation'])
+        
+        def stop_watch():
+            # 正在进行的轮询结果到达时按generation丢弃
+            watch['generation'] += 1
+            if watch['after_id'] is not None:
+                self.root.after_cancel(watch['after_id'])
+                watch['after_id'] = None
+            if watch['session'] is not None:
+                status_label.config(text=f"Stopped: {len(watch['session'].files)} files, "
+                                         f"{watch['session'].report.units} units")
+            start_button.config(state=tk.NORMAL)
+            stop_button.config(state=tk.DISABLED)
+        
+        def show_data():
+            if watch['session'] is not None and watch['session'].reprocessed is not None:
+                self.show_reprocessing_result(watch['session'].reprocessed)
+                if hasattr(self, 'tab_control') and hasattr(self, 'data_reprocessing_tab'):
+                    self.tab_control.select(self.data_reprocessing_tab)
+        
+        def close_window():
+            stop_watch()
+            watch_window.destroy()
+        
+        start_button = ttk.Button(option_frame, text="Start", command=start_watch)
+        start_button.pack(side="left", padx=(20, 5))
+        stop_button = ttk.Button(option_frame, text="Stop", command=stop_watch, state=tk.DISABLED)
+        stop_button.pack(side="left", padx=5)
+        ttk.Button(option_frame, text="Show Data", command=show_data).pack(side="left", padx=5)
+        watch_window.protocol("WM_DELETE_WINDOW", close_window)
+    
     # data_distribution_analysis方法已移除，因为Data Distribution功能已被移除
         
     def generate_report(self):
@@ -11658,88 +9385,16 @@ class TestLogAnalyzer:
                 else:
                     extracted_text = "Unknown"
                 
-            # 2. 智能检测CSV文件中的数据标题行
+            # 2. 识别CSV文件中的数据标题行（与Data Processing相同的规则）
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    lines = []
-                    for i in range(20):
-                        line = f.readline()
-                        if not line:
-                            break
-                        lines.append(line.strip())
-                    
-                    # 识别元数据行
-                    metadata_lines = []
-                    non_metadata_lines = []
-                    
-                    for i, line in enumerate(lines):
-                        is_metadata = False
-                        if ',:' in line or (':' in line and ',' in line):
-                            is_metadata = True
-                        elif line.strip() and i < 10 and not (line.startswith('Model') or line.startswith('Serial Number')):
-                            content_parts = [p.strip() for p in line.split(',') if p.strip()]
-                            if content_parts and ':' in content_parts[0]:
-                                is_metadata = True
-                        
-                        if is_metadata:
-                            metadata_lines.append(i)
-                        else:
-                            non_metadata_lines.append((i, line))
-                    
-                    # 寻找标题行
-                    max_commas = -1
-                    header_line_candidates = []
-                    header_line_index = 0
-                    
-                    non_empty_non_metadata = [(i, line) for i, line in non_metadata_lines if line.strip()]
-                    
-                    if non_empty_non_metadata:
-                        max_commas = max(line.count(',') for i, line in non_empty_non_metadata)
-                        header_line_candidates = [(i, line) for i, line in non_empty_non_metadata if line.count(',') == max_commas]
-                        
-                        if header_line_candidates:
-                            best_score = -1
-                            for i, line in header_line_candidates:
-                                score = 1
-                                if any(c.isalpha() for c in line):
-                                    score += 10
-                                content_length = len(line.replace(',', ''))
-                                score += min(content_length, 50)
-                                
-                                if score > best_score:
-                                    best_score = score
-                                    header_line_index = i
-                    elif non_metadata_lines:
-                        for i, line in non_metadata_lines:
-                            comma_count = line.count(',')
-                            if comma_count > max_commas:
-                                max_commas = comma_count
-                                header_line_index = i
-                    else:
-                        for i, line in enumerate(lines):
-                            comma_count = line.count(',')
-                            if comma_count > max_commas:
-                                max_commas = comma_count
-                                header_line_index = i
-                    
-                    # 确保标题行不为空
-                    if header_line_index < len(lines) and lines[header_line_index].strip() == '':
-                        for i in range(header_line_index + 1, min(len(lines), header_line_index + 10)):
-                            if lines[i].strip() != '':
-                                header_line_index = i
-                                max_commas = lines[i].count(',')
-                                break
-                    
+                header = loganalyzer_core.sniff_log_header(file_path)
+                with loganalyzer_core.span("load_file"):
                     # 读取数据
-                    if max_commas >= 9:
-                        df = pd.read_csv(file_path,
-                                        skiprows=header_line_index,
-                                        on_bad_lines='skip',
-                                        engine='python')
-                    else:
-                        df = pd.read_csv(file_path,
-                                        on_bad_lines='skip',
-                                        engine='python')
+                    df = loganalyzer_core.read_log_csv(file_path,
+                                                       skiprows=header.skiprows,
+                                                       on_bad_lines='skip',
+                                                       engine='python',
+                                                       encoding=header.encoding)
                     
                     # 3. 添加Config列（放入第二列）
                     if not df.empty:
@@ -11776,38 +9431,14 @@ class TestLogAnalyzer:
             combined_df = pd.concat([df for _, _, df in processed_files], ignore_index=True)
             
             # 6. 智能去重
-            if 'Serial Number' in combined_df.columns:
-                original_dup_rows = len(combined_df)
-                if 'Pass/Fail' in combined_df.columns:
-                    combined_df['_sort_key'] = combined_df['Pass/Fail'].apply(lambda x: 0 if str(x).strip().upper() == 'PASS' else 1)
-                    combined_df = combined_df.sort_values(by=['Serial Number', '_sort_key'])
-                    combined_df = combined_df.drop_duplicates(subset=['Serial Number'], keep='first')
-                    combined_df = combined_df.drop(columns=['_sort_key'])
-                else:
-                    combined_df = combined_df.drop_duplicates(subset=['Serial Number'], keep='first')
-                
-                deduped_rows = original_dup_rows - len(combined_df)
-                if deduped_rows > 0:
-                    self.update_status(f"Remove {deduped_rows} rows with duplicate Serial Numbers。")
+            combined_df = self._deduplicate_serial_numbers(combined_df)
             
             return combined_df
         elif len(processed_files) == 1:
             _, file_name, df = processed_files[0]
             
             # 对单个文件也进行去重
-            if 'Serial Number' in df.columns:
-                original_dup_rows = len(df)
-                if 'Pass/Fail' in df.columns:
-                    df['_sort_key'] = df['Pass/Fail'].apply(lambda x: 0 if str(x).strip().upper() == 'PASS' else 1)
-                    df = df.sort_values(by=['Serial Number', '_sort_key'])
-                    df = df.drop_duplicates(subset=['Serial Number'], keep='first')
-                    df = df.drop(columns=['_sort_key'])
-                else:
-                    df = df.drop_duplicates(subset=['Serial Number'], keep='first')
-                
-                deduped_rows = original_dup_rows - len(df)
-                if deduped_rows > 0:
-                    self.update_status(f"Remove {deduped_rows} rows with duplicate Serial Numbers from {file_name}。")
+            df = self._deduplicate_serial_numbers(df, file_name)
             
             return df
         else:
@@ -11837,6 +9468,7 @@ class TestLogAnalyzer:
             self.update_status(f"Error: Failed to automatically open save directory: {str(open_dir_error)}")
             self.update_status(f"Full error details: {traceback.format_exc()}")
     
+    @profiled_action("Save as CSV")
     def save_processed_data(self):
         """保存处理后数据为CSV格式 - 使用用户要求的数据处理逻辑"""
         import os
@@ -11911,7 +9543,7 @@ class TestLogAnalyzer:
             # 保存数据为CSV
             try:
                 # 使用utf-8编码并包含BOM，以确保Excel正确识别
-                processed_data.to_csv(file_path, index=False, encoding='utf-8-sig')
+                loganalyzer_core.format_datetime_columns(processed_data).to_csv(file_path, index=False, encoding='utf-8-sig')
                 
                 # 更新状态栏信息
                 self.update_status(f"Data saved successfully to {file_path}")
@@ -11941,6 +9573,7 @@ class TestLogAnalyzer:
             except:
                 pass
         
+    @profiled_action("Save as Excel")
     def save_processed_data_to_excel(self, file_path=None, config=None):
         """将Data Re-Processing选项卡中的数据保存为Excel文件，包含color point、criteria、Cpk、Top Defects、Yield Analysis工作表"""
         import os
@@ -11950,6 +9583,7 @@ class TestLogAnalyzer:
         from tkinter import filedialog
         from tkinter import messagebox
         
+        export_span = None
         try:
             # 记录日志
             self.update_status("开始将Data Re-Processing数据保存为Excel格式...")
@@ -11974,7 +9608,7 @@ class TestLogAnalyzer:
                 default_dir = ""
                 try:
                     # 获取选中的文件列表
-                    selected_files = [path for path, var in self.file_vars.items() if var.get()]
+                    selected_files = self.file_model.selected_paths()
                     if selected_files:
                         # 获取第一个选中文件的目录
                         first_file_path = selected_files[0]
@@ -12034,6 +9668,7 @@ class TestLogAnalyzer:
             # 记录数据基本信息用于调试
             data_shape = self.reprocessed_data.shape
             self.update_status(f"数据形状：{data_shape[0]} 行 x {data_shape[1]} 列")
+            export_span = loganalyzer_core.span("export", rows=data_shape[0]).start()
             
             # 检查format_cells字典（如果存在）
             format_cells_info = ""
@@ -12064,7 +9699,9 @@ class TestLogAnalyzer:
                 ws_reprocessed.cell(row=1, column=col_idx, value=column_name)
             
             # 写入Reprocessed Data工作表的数据，并应用与Data Reprocessing选项卡完全一致的颜色填充
-            for row_idx, (data_index, row_data) in enumerate(self.reprocessed_data.iterrows(), 2):
+            # Date/Time按原始格式导出
+            export_data = loganalyzer_core.format_datetime_columns(self.reprocessed_data)
+            for row_idx, (data_index, row_data) in enumerate(export_data.iterrows(), 2):
                 # 首先检查该行是否包含Fail值
                 is_fail_row = False
                 for col_name, value in row_data.items():
@@ -12181,7 +9818,7 @@ class TestLogAnalyzer:
                         ws = wb.create_sheet(title=sheet_name)
                         
                         # 写入数据到工作表
-                        color_point_df = self.reprocessed_data[color_point_columns]
+                        color_point_df = export_data[color_point_columns]
                         
                         # 写入表头
                         for col_idx, column_name in enumerate(color_point_columns, 1):
@@ -12247,24 +9884,21 @@ class TestLogAnalyzer:
                     # 尝试获取criteria数据
                     criteria_data = None
                     try:
-                        # 使用已有的_save_criteria_to_temp_file方法获取criteria数据
+                        # 使用_save_criteria_to_temp_file整理规格数据，直接从criteria_store获取各行
                         temp_file_path = self._save_criteria_to_temp_file()
                         if temp_file_path:
-                            import csv
                             criteria_data = {}
-                            with open(temp_file_path, 'r', encoding='utf-8') as f:
-                                reader = csv.DictReader(f)
-                                for row in reader:
-                                    data_type = row['DataType']
-                                    if data_type not in criteria_data:
-                                        criteria_data[data_type] = []
-                                    # 将数据添加到对应的数据类型列表中
-                                    criteria_data[data_type].append((
-                                        row['StandardType'],
-                                        row['LowerLimit'],
-                                        row['UpperLimit'],
-                                        row['Description']
-                                    ))
+                            for row in self.criteria_store.rows():
+                                data_type = row['DataType']
+                                if data_type not in criteria_data:
+                                    criteria_data[data_type] = []
+                                # 将数据添加到对应的数据类型列表中
+                                criteria_data[data_type].append((
+                                    row['StandardType'],
+                                    row['LowerLimit'],
+                                    row['UpperLimit'],
+                                    row['Description']
+                                ))
                     except Exception as e:
                         self.update_status(f"加载criteria数据时出错：{str(e)}")
                     
@@ -12326,7 +9960,7 @@ class TestLogAnalyzer:
                         # 分别获取White和Mixed的Cpk数据
                         for data_type in ["White", "Mixed"]:
                             self.update_status(f"正在计算 {data_type} 的Cpk数据...")
-                            cpk_data[data_type] = self._calculate_cpk_data(data_type)
+                            cpk_data[data_type] = self._cached_cpk_data(data_type)
                     except Exception as e:
                         self.update_status(f"加载Cpk数据时出错：{str(e)}")
                     
@@ -12615,8 +10249,8 @@ class TestLogAnalyzer:
                         total_count = len(self.processed_data)
                         fail_count = 0
                         
-                        # 创建一个副本用于标记Pass/Fail状态
-                        df_copy = self.processed_data.copy()
+                        # 创建一个浅副本用于标记Pass/Fail状态（只新增判断结果列，不复制原有数据）
+                        df_copy = self.processed_data.copy(deep=False)
                         
                         # 根据Review Criteria中的阈值判断不良品
                         if criteria_dict:
@@ -12648,7 +10282,7 @@ class TestLogAnalyzer:
                         config_yield_data = []
                         if 'Config' in df_copy.columns:
                             # 按Config分组 - 使用不同的变量名避免冲突
-                            for config_name, group in df_copy.groupby('Config'):
+                            for config_name, group in df_copy.groupby('Config', observed=True):
                                 config_total = len(group)
                                 # 使用基于标准的判断结果统计不良数
                                 config_fail = (group['Criteria_Pass/Fail'] == 'FAIL').sum()
@@ -12687,6 +10321,9 @@ class TestLogAnalyzer:
                             cell = ws.cell(row=row_idx, column=4, value=total_fail_rate/100)  # 存储原始数值
                             cell.number_format = '0.00%'  # 应用Excel百分比格式
                         
+                        # 写入首次通过率（FPY）与最终良率对比表
+                        self._write_fpy_summary_to_sheet(ws, row_idx + 3)
+                        
                         self.update_status(f"成功将Yield Analysis数据写入工作表 '{sheet_name}'")
                     except Exception as e:
                         self.update_status(f"写入Yield Analysis数据时出错：{str(e)}")
@@ -12764,6 +10401,7 @@ class TestLogAnalyzer:
             
             # 保存工作簿
             wb.save(file_path)
+            export_span.stop()
             
             # 更新状态栏信息
             self.update_status(f"数据成功保存到 {file_path}，包含 {len(wb.sheetnames)} 个工作表")
@@ -12772,6 +10410,8 @@ class TestLogAnalyzer:
             self._open_directory(file_path)
                 
         except Exception as e:
+            if export_span is not None:
+                export_span.stop(error=repr(e))
             # 捕获其他所有可能的异常
             error_msg = f"保存重新处理数据时出错：{str(e)}"
             self.update_status(error_msg)
@@ -12791,6 +10431,41 @@ class TestLogAnalyzer:
         """导出报告"""
         pass
         
+    def _profiling_requested(self):
+        # Help菜单中的Profile Next Action已勾选或环境变量要求每次都分析
+        try:
+            return self.profile_all_actions or self.profile_next_var.get()
+        except (AttributeError, tk.TclError):
+            return False
+    
+    def _toggle_profiling(self):
+        if self.profile_next_var.get():
+            self.update_status(f"Profiling enabled: the next processing action will be profiled ({self.profiler_name})")
+        else:
+            self.update_status("Profiling disabled")
+    
+    def _run_profiled_action(self, label, func, args, kwargs):
+        """在性能分析器中执行一次处理操作，结果保存在日志文件所在目录"""
+        if not self.profile_all_actions:
+            self.profile_next_var.set(False)
+        if LogConfig.log_filepath:
+            output_dir = os.path.dirname(LogConfig.log_filepath)
+        else:
+            output_dir = LogConfig._create_log_directory()
+        
+        self._profiling_active = True
+        self.update_status(f"Profiling '{label}'...")
+        try:
+            result, paths = loganalyzer_core.profile_call(func, output_dir, label, args=(self,) + tuple(args),
+                                                          kwargs=kwargs, profiler=self.profiler_name)
+        except Exception as e:
+            self.update_status(f"Error: profiled action '{label}' failed: {str(e)}")
+            raise
+        finally:
+            self._profiling_active = False
+        self.update_status(f"Profile of '{label}' saved: {', '.join(paths)}")
+        return result
+    
     def show_about(self):
         """显示关于信息"""
         about_window = tk.Toplevel(self.root)
@@ -12872,6 +10547,10 @@ TestLogAnalyzer Instructions
         
     def on_closing(self):
         # Close window handler, clean up temp files before exit
+        # 停止自动分析流水线，不再开始新的阶段
+        if self.pipeline_scheduler is not None:
+            self.pipeline_scheduler.cancel()
+        
         try:
             import os, glob
             # 获取当前目录
@@ -12921,7 +10600,11 @@ TestLogAnalyzer Instructions
                     logger.info("Program exited normally")
             except Exception:
                 pass
-                
+            
+            # 释放复用的图表资源
+            if hasattr(self, 'chart_manager'):
+                self.chart_manager.release_all()
+            
             # 无论清理是否成功，都销毁窗口并退出程序
             self.root.destroy()
             
@@ -12985,13 +10668,147 @@ TestLogAnalyzer Instructions
             logging.error(f"[{timestamp}] [Color Point Chart] 失败读取多边形顶点坐标: 其他异常 - {str(e)}")
             return []
     
+    def create_performance_content(self):
+        """创建Performance选项卡的内容: 各处理阶段的耗时、CPU时间、每秒行数和峰值内存"""
+        recorder = loganalyzer_core.performance
+        
+        control_frame = tk.Frame(self.performance_tab)
+        control_frame.pack(fill="x", padx=10, pady=5)
+        
+        self.perf_trace_memory_var = tk.BooleanVar(value=recorder.trace_memory)
+        ttk.Checkbutton(control_frame, text="Track peak memory (tracemalloc, slower)",
+                        variable=self.perf_trace_memory_var,
+                        command=self._toggle_performance_memory_tracing).pack(side="left", padx=5)
+        
+        self.perf_chrome_trace_var = tk.BooleanVar(value=bool(recorder.chrome_trace_dir))
+        ttk.Checkbutton(control_frame, text="Write Chrome trace per run",
+                        variable=self.perf_chrome_trace_var,
+                        command=self._toggle_performance_chrome_trace).pack(side="left", padx=5)
+        
+        ttk.Button(control_frame, text="Clear", command=self.clear_performance_records).pack(side="right", padx=5)
+        ttk.Button(control_frame, text="Save Trace...", command=self.save_performance_trace).pack(side="right", padx=5)
+        ttk.Button(control_frame, text="Refresh", command=self.refresh_performance_tab).pack(side="right", padx=5)
+        
+        self.perf_info_var = tk.StringVar(value="Run a processing step to record stage timings.")
+        tk.Label(self.performance_tab, textvariable=self.perf_info_var, anchor="w", fg="gray").pack(fill="x", padx=10)
+        
+        tree_frame = tk.Frame(self.performance_tab)
+        tree_frame.pack(fill="both", expand=True, padx=10, pady=5)
+        columns = ("Run", "Stage", "Wall (s)", "CPU (s)", "Rows", "Rows/s", "Peak Memory (MB)")
+        self.performance_tree = ttk.Treeview(tree_frame, columns=columns, show="headings", selectmode="extended")
+        for col in columns:
+            self.performance_tree.heading(col, text=col)
+            self.performance_tree.column(col, width=220 if col == "Stage" else 110,
+                                         anchor="w" if col == "Stage" else "center")
+        self.performance_tree.tag_configure('run', background='#EEF3FA')
+        self.performance_tree.tag_configure('error', foreground='red')
+        
+        perf_scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=self.performance_tree.yview)
+        self.performance_tree.configure(yscroll=perf_scrollbar.set)
+        perf_scrollbar.pack(side="right", fill="y")
+        self.performance_tree.pack(fill="both", expand=True)
+        
+        # 每次运行（最外层阶段）结束后刷新表格
+        recorder.add_listener(self._on_performance_run_finished)
+        self.refresh_performance_tab()
+    
+    def _on_performance_run_finished(self, run_records):
+        # 阶段记录可能来自后台线程，统一在主线程刷新表格
+        try:
+            self.root.after(0, self.refresh_performance_tab)
+        except (RuntimeError, tk.TclError):
+            pass
+    
+    def refresh_performance_tab(self):
+        """用阶段记录刷新Performance选项卡的表格"""
+        if not hasattr(self, 'performance_tree'):
+            return
+        try:
+            summary = loganalyzer_core.performance.summary()
+            self.performance_tree.delete(*self.performance_tree.get_children())
+            for row in summary.itertuples(index=False):
+                run, stage, depth, wall, cpu, rows, rows_per_sec, peak_mb, error = row
+                has_error = isinstance(error, str) and bool(error)
+                tags = ('run',) if depth == 0 else ()
+                if has_error:
+                    tags += ('error',)
+                self.performance_tree.insert("", "end", tags=tags, values=(
+                    run,
+                    "    " * int(depth) + stage + (" (error)" if has_error else ""),
+                    f"{wall:.3f}",
+                    f"{cpu:.3f}",
+                    f"{int(rows):,}" if pd.notna(rows) else "",
+                    f"{rows_per_sec:,.0f}" if pd.notna(rows_per_sec) else "",
+                    f"{peak_mb:.1f}" if pd.notna(peak_mb) else ""))
+            children = self.performance_tree.get_children()
+            if children:
+                self.performance_tree.see(children[-1])
+            
+            recorder = loganalyzer_core.performance
+            info = f"{len(summary)} stage records in {summary['Run'].nunique() if len(summary) else 0} runs."
+            if not recorder.trace_memory:
+                info += " Peak memory tracking is off."
+            if recorder.chrome_trace_dir:
+                info += f" Chrome traces: {recorder.chrome_trace_dir}"
+            self.perf_info_var.set(info)
+        except Exception as e:
+            self.logger.debug(f"Refresh performance tab error: {str(e)}")
+    
+    def _toggle_performance_memory_tracing(self):
+        loganalyzer_core.performance.set_trace_memory(self.perf_trace_memory_var.get())
+        state = "enabled" if self.perf_trace_memory_var.get() else "disabled"
+        self.update_status(f"Peak memory tracking (tracemalloc) {state}")
+        self.refresh_performance_tab()
+    
+    def _toggle_performance_chrome_trace(self):
+        # Chrome trace文件写入日志目录
+        if self.perf_chrome_trace_var.get():
+            try:
+                loganalyzer_core.performance.chrome_trace_dir = LogConfig._create_log_directory()
+            except OSError as e:
+                self.perf_chrome_trace_var.set(False)
+                self.update_status(f"Error: cannot create trace directory: {str(e)}")
+                return
+        else:
+            loganalyzer_core.performance.chrome_trace_dir = None
+        self.refresh_performance_tab()
+    
+    def save_performance_trace(self):
+        """把所有阶段记录保存为一个Chrome trace JSON文件"""
+        if not loganalyzer_core.performance.records:
+            messagebox.showinfo("Performance", "No stage records to save yet.")
+            return
+        file_path = filedialog.asksaveasfilename(
+            title="Save Chrome Trace",
+            defaultextension=".json",
+            initialfile=f"trace_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+            filetypes=[("JSON files", "*.json"), ("All files", "*.*")])
+        if not file_path:
+            return
+        try:
+            loganalyzer_core.performance.write_chrome_trace(file_path)
+            self.update_status(f"Chrome trace saved to {file_path}")
+        except OSError as e:
+            messagebox.showerror("Error", f"Failed to save trace: {str(e)}")
+    
+    def clear_performance_records(self):
+        loganalyzer_core.performance.clear()
+        self.refresh_performance_tab()
+    
+    @profiled_action("Color Point Chart")
+    @loganalyzer_core.timed_stage("chart", rows_from='reprocessed_data')
     def show_color_point_chart(self):
         # Display color point chart analysis results
         # 切换到Color Point Chart选项卡
         self.tab_control.select(self.color_point_chart_tab)
         
-        # 清空选项卡内容
+        # 清空选项卡内容，保留已创建的图表画布以便复用
+        chart_canvas = self.chart_manager.get_canvas("color_point_chart")
+        chart_widget = chart_canvas.get_tk_widget() if chart_canvas is not None else None
         for widget in self.color_point_chart_tab.winfo_children():
+            if widget is chart_widget:
+                widget.pack_forget()
+                continue
             widget.destroy()
         
         # 创建图表
@@ -13000,6 +10817,66 @@ TestLogAnalyzer Instructions
         # 更新选项卡状态
         self.update_tab_status("Color Point Chart")
         
+    def _update_color_point_axis(self, chart_key, ax, criteria_name, poly_points, edgecolor, created):
+        # 更新Color Point Chart子图：首次创建时添加图元，之后只更新背景、多边形和提示文本
+        from matplotlib.patches import Polygon
+        
+        if created:
+            # 设置坐标轴标签和标题
+            ax.set_xlabel("u'")
+            ax.set_ylabel("v'")
+            ax.set_title(f"{criteria_name} (u'v' Coordinates)")
+            
+            # 取消多边形填充，只保留边框
+            polygon = Polygon([(0, 0), (0, 0), (0, 0)], closed=True, fill=False,
+                              edgecolor=edgecolor, label=criteria_name)
+            ax.add_patch(polygon)
+            self.chart_manager.set_artist(chart_key, f"{criteria_name}_polygon", polygon)
+            
+            message = ax.text(0.5, 0.5, f'Did not find valid {criteria_name} range data',
+                              horizontalalignment='center', verticalalignment='center',
+                              transform=ax.transAxes, color='gray', fontsize=12)
+            self.chart_manager.set_artist(chart_key, f"{criteria_name}_message", message)
+            
+            # 添加网格线
+            ax.grid(True, linestyle='--', alpha=0.7)
+        
+        # 调整坐标轴范围以适应多边形点，并添加基于u'v'的颜色背景
+        xlim, ylim = self._get_uv_limits(poly_points)
+        self.chart_manager.update_background(chart_key, f"{criteria_name}_background", ax, xlim, ylim)
+        ax.set_xlim(xlim)
+        ax.set_ylim(ylim)
+        
+        has_polygon = len(poly_points) >= 3
+        self.chart_manager.update_polygon(chart_key, f"{criteria_name}_polygon", poly_points)
+        self.chart_manager.get_artist(chart_key, f"{criteria_name}_message").set_visible(not has_polygon)
+        
+        # 添加图例（Avg Points数据点将通过plot_data_points函数绘制）
+        if has_polygon:
+            ax.legend(loc='upper right')
+        elif ax.get_legend() is not None:
+            ax.get_legend().remove()
+    
+    def _extract_color_point_series(self, data):
+        """提取White/Mixed的u'v'数据点（u和v都非空且不为0）和对应的原始行数据，不操作界面控件
+        
+        Returns:
+            {'White': (数据点列表, 行数据列表), 'Mixed': (数据点列表, 行数据列表)}
+        """
+        series = {}
+        for type_name in ("White", "Mixed"):
+            u_column, v_column = f"{type_name} u Avg", f"{type_name} v Avg"
+            points = []
+            row_data = []  # 保存原始行数据用于分组
+            if u_column in data.columns and v_column in data.columns:
+                mask = (data[u_column].notna() & data[v_column].notna() &
+                        (data[u_column] != 0) & (data[v_column] != 0))
+                filtered_data = data[mask]
+                points = list(zip(filtered_data[u_column].astype(float), filtered_data[v_column].astype(float)))
+                row_data = [row for _, row in filtered_data.iterrows()]
+            series[type_name] = (points, row_data)
+        return series
+    
     def create_color_point_chart_content(self):
         # Create color point chart content
         # 创建标题标签
@@ -13082,218 +10959,31 @@ TestLogAnalyzer Instructions
                         if points:  # 如果解析到有效点，则使用这个标准
                             mixed_points = points
                             break
-                            
-            # 提取White u Avg 和 White v Avg 数据点，并保存原始行数据用于分组
-            white_avg_points = []
-            white_row_data = []  # 保存原始行数据用于分组
-            if "White u Avg" in self.processed_data.columns and "White v Avg" in self.processed_data.columns:
-                mask = (self.processed_data['White u Avg'].notna() & 
-                        self.processed_data['White v Avg'].notna() & 
-                        (self.processed_data['White u Avg'] != 0) & 
-                        (self.processed_data['White v Avg'] != 0))
-                filtered_data = self.processed_data[mask]
-                white_avg_points = list(zip(filtered_data['White u Avg'].astype(float), 
-                                           filtered_data['White v Avg'].astype(float)))
-                white_row_data = [row for _, row in filtered_data.iterrows()]
-            
-            # 提取Mixed u Avg 和 Mixed v Avg 数据点，并保存原始行数据用于分组
-            mixed_avg_points = []
-            mixed_row_data = []  # 保存原始行数据用于分组
-            if "Mixed u Avg" in self.processed_data.columns and "Mixed v Avg" in self.processed_data.columns:
-                mask = (self.processed_data['Mixed u Avg'].notna() & 
-                        self.processed_data['Mixed v Avg'].notna() & 
-                        (self.processed_data['Mixed u Avg'] != 0) & 
-                        (self.processed_data['Mixed v Avg'] != 0))
-                filtered_data = self.processed_data[mask]
-                mixed_avg_points = list(zip(filtered_data['Mixed u Avg'].astype(float), 
-                                           filtered_data['Mixed v Avg'].astype(float)))
-                mixed_row_data = [row for _, row in filtered_data.iterrows()]
-            
-            # 创建包含两个子图的图形布局（水平排列）
-            fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
-            
-            # 定义函数：将u'v'值转换为RGB颜色（使用100nit亮度）
-            def uv_to_rgb(u, v, luminance=100):
-                # CIELUV到XYZ转换
-                # 使用D65标准光源
-                u0 = 0.19783000664283681  # D65的u'值
-                v0 = 0.46831999493879114  # D65的v'值
-                
-                # 计算Y（亮度）
-                Y = luminance / 100.0  # 转换为0-1范围
-                
-                # 计算u和v的实际值
-                if v != 0:
-                    d = Y * (5 * v - 12 * v0 * u) / (v * 3)
-                else:
-                    d = 0
-                
-                u_prime = u
-                v_prime = v
-                
-                # 计算XYZ坐标
-                if v_prime > 0:
-                    Y = Y
-                    X = Y * 9 * u_prime / (4 * v_prime)
-                    Z = Y * (12 - 3 * u_prime - 20 * v_prime) / (4 * v_prime)
-                else:
-                    X, Y, Z = 0, Y, 0
-                
-                # XYZ到RGB转换（使用sRGB矩阵）
-                r = X * 3.2406 + Y * -1.5372 + Z * -0.4986
-                g = X * -0.9689 + Y * 1.8758 + Z * 0.0415
-                b = X * 0.0557 + Y * -0.2040 + Z * 1.0570
-                
-                # 应用gamma校正
-                def gamma_correction(x):
-                    if x <= 0.0031308:
-                        return 12.92 * x
-                    else:
-                        return 1.055 * (x ** (1/2.4)) - 0.055
-                
-                r = gamma_correction(r)
-                g = gamma_correction(g)
-                b = gamma_correction(b)
-                
-                # 确保RGB值在0-1范围内
-                r = max(0, min(1, r))
-                g = max(0, min(1, g))
-                b = max(0, min(1, b))
-                
-                return r, g, b
             
-            # 创建颜色背景的通用函数
-            def add_color_background(ax, xlim, ylim, resolution=100):
-                import numpy as np
-                
-                # 创建网格
-                u = np.linspace(xlim[0], xlim[1], resolution)
-                v = np.linspace(ylim[0], ylim[1], resolution)
-                u_grid, v_grid = np.meshgrid(u, v)
-                
-                # 创建RGB颜色数组
-                rgb_array = np.zeros((resolution, resolution, 3))
-                
-                # 为每个点计算RGB颜色
-                rgb_flat = np.array([uv_to_rgb(u, v) for u, v in zip(u_grid.flatten(), v_grid.flatten())])
-                rgb_array = rgb_flat.reshape(resolution, resolution, 3)
-                
-                # 显示颜色背景
-                ax.imshow(rgb_array, extent=[xlim[0], xlim[1], ylim[0], ylim[1]], 
-                         origin='lower', aspect='auto', alpha=0.8)
+            # 提取White/Mixed u Avg和v Avg数据点，并保存原始行数据用于分组（自动分析流程中已在工作线程中提取）
+            series = self._take_pipeline_result('color_point_chart', self.processed_data)
+            if series is None:
+                series = self._cached_color_point_series(self.processed_data)
+            white_avg_points, white_row_data = series['White']
+            mixed_avg_points, mixed_row_data = series['Mixed']
             
-            # ------------------- 第一个子图：White Range -------------------
-            # 设置坐标轴标签和标题
-            ax1.set_xlabel("u'")
-            ax1.set_ylabel("v'")
-            ax1.set_title("CAFL0 (u'v' Coordinates)")
-            
-            # 如果有有效的White坐标点，绘制多边形
-            if len(white_points) >= 3:
-                # 调整坐标轴范围以适应多边形点
-                all_u_values = [p[0] for p in white_points]
-                all_v_values = [p[1] for p in white_points]
-                
-                u_margin = (max(all_u_values) - min(all_u_values)) * 0.15 if max(all_u_values) != min(all_u_values) else 0.02
-                v_margin = (max(all_v_values) - min(all_v_values)) * 0.15 if max(all_v_values) != min(all_v_values) else 0.02
-                xlim = [min(all_u_values) - u_margin, max(all_u_values) + u_margin]
-                ylim = [min(all_v_values) - v_margin, max(all_v_values) + v_margin]
-                
-                # 添加基于u'v'的颜色背景
-                add_color_background(ax1, xlim, ylim)
-                
-                # 设置坐标轴范围
-                ax1.set_xlim(xlim)
-                ax1.set_ylim(ylim)
-                
-                from matplotlib.patches import Polygon
-                # 取消多边形填充，只保留边框
-                white_poly = Polygon(white_points, closed=True, fill=False, 
-                                  edgecolor='blue', label='CAFL0')
-                ax1.add_patch(white_poly)
-                
-                # 添加图例
-                ax1.legend(loc='upper right')
-                
-                # CAFL0 Avg Points数据点将通过plot_data_points函数绘制
-            else:
-                # 设置默认范围并显示无数据提示
-                xlim = [0.18, 0.22]
-                ylim = [0.48, 0.52]
-                
-                # 添加基于u'v'的颜色背景
-                add_color_background(ax1, xlim, ylim)
-                
-                # 设置坐标轴范围
-                ax1.set_xlim(xlim)
-                ax1.set_ylim(ylim)
-                
-                ax1.text(0.5, 0.5, 'Did not find valid CAFL0 range data', 
-                        horizontalalignment='center', verticalalignment='center', 
-                        transform=ax1.transAxes, color='gray', fontsize=12)
+            # 两个子图的图形只创建一次（水平排列），之后只更新图元
+            chart_key = "color_point_chart"
+            fig, axes, canvas, created = self.chart_manager.get_chart(
+                chart_key, self.color_point_chart_tab, nrows=1, ncols=2, figsize=(15, 6))
+            ax1, ax2 = axes[0], axes[1]
             
-            # 添加网格线
-            ax1.grid(True, linestyle='--', alpha=0.7)
+            # ------------------- 第一个子图：White Range -------------------
+            self._update_color_point_axis(chart_key, ax1, "CAFL0", white_points, 'blue', created)
             
             # ------------------- 第二个子图：Mixed Range -------------------
-            # 设置坐标轴标签和标题
-            ax2.set_xlabel("u'")
-            ax2.set_ylabel("v'")
-            ax2.set_title("CALF24 (u'v' Coordinates)")
-            
-            # 如果有有效的Mixed坐标点，绘制多边形
-            if len(mixed_points) >= 3:
-                # 调整坐标轴范围以适应多边形点
-                all_u_values = [p[0] for p in mixed_points]
-                all_v_values = [p[1] for p in mixed_points]
-                
-                u_margin = (max(all_u_values) - min(all_u_values)) * 0.15 if max(all_u_values) != min(all_u_values) else 0.02
-                v_margin = (max(all_v_values) - min(all_v_values)) * 0.15 if max(all_v_values) != min(all_v_values) else 0.02
-                xlim = [min(all_u_values) - u_margin, max(all_u_values) + u_margin]
-                ylim = [min(all_v_values) - v_margin, max(all_v_values) + v_margin]
-                
-                # 添加基于u'v'的颜色背景
-                add_color_background(ax2, xlim, ylim)
-                
-                # 设置坐标轴范围
-                ax2.set_xlim(xlim)
-                ax2.set_ylim(ylim)
-                
-                from matplotlib.patches import Polygon
-                # 取消多边形填充，只保留边框
-                mixed_poly = Polygon(mixed_points, closed=True, fill=False, 
-                                  edgecolor='red', label='CALF24')
-                ax2.add_patch(mixed_poly)
-                
-                # 添加图例
-                ax2.legend(loc='upper right')
-                
-                # CALF24 Avg Points数据点将通过plot_data_points函数绘制
-            else:
-                # 设置默认范围并显示无数据提示
-                xlim = [0.18, 0.22]
-                ylim = [0.48, 0.52]
-                
-                # 添加基于u'v'的颜色背景
-                add_color_background(ax2, xlim, ylim)
-                
-                # 设置坐标轴范围
-                ax2.set_xlim(xlim)
-                ax2.set_ylim(ylim)
-                
-                ax2.text(0.5, 0.5, 'Did not find valid CALF24 range data', 
-                        horizontalalignment='center', verticalalignment='center', 
-                        transform=ax2.transAxes, color='gray', fontsize=12)
-            
-            # 添加网格线
-            ax2.grid(True, linestyle='--', alpha=0.7)
+            self._update_color_point_axis(chart_key, ax2, "CALF24", mixed_points, 'red', created)
             
-            # 调整子图布局
-            plt.tight_layout(pad=3.0)
+            if created:
+                # 调整子图布局
+                fig.tight_layout(pad=3.0)
             
-            # 创建画布并添加到Tkinter窗口
-            canvas = FigureCanvasTkAgg(fig, master=self.color_point_chart_tab)
-            canvas.draw()
+            # 将画布添加到Tkinter窗口
             canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
             
             # 用于存储分组Z轴顺序的全局字典
@@ -13306,30 +10996,41 @@ TestLogAnalyzer Instructions
                 # 保存当前使用的分组列到轴对象，用于右键菜单
                 ax.current_group_column = group_column
                 
-                # 清除现有的散点图
-                for artist in ax.collections[:]:
-                    # 检查是否为散点图类型
-                    if hasattr(artist, '_sizes'):  # 散点图特有的属性
-                        artist.remove()
+                # 清除现有的分组散点图，未分组的散点图图元保留复用
+                for artist in self.chart_manager.get_artist(chart_key, f"{title_prefix}_group_scatters") or []:
+                    artist.remove()
+                self.chart_manager.set_artist(chart_key, f"{title_prefix}_group_scatters", [])
+                scatter = self.chart_manager.get_artist(chart_key, f"{title_prefix}_scatter")
                 
                 # 更新图例
                 ax.legend().set_visible(False)
                 
                 if not group_column or group_column not in row_data[0].index:
-                    # 不分组，使用单一颜色绘制所有点
-                    u_values = [p[0] for p in points]
-                    v_values = [p[1] for p in points]
-                    scatter = ax.scatter(u_values, v_values, color=base_color, 
-                                        s=4, alpha=0.40, label=f'{title_prefix} Avg Points', zorder=10)
+                    # 不分组，使用单一颜色绘制所有点，已有散点图时只更新坐标
+                    if scatter is not None:
+                        self.chart_manager.update_scatter(chart_key, f"{title_prefix}_scatter", points)
+                        scatter.set_visible(True)
+                        scatter.set_label(f'{title_prefix} Avg Points')
+                    else:
+                        u_values = [p[0] for p in points]
+                        v_values = [p[1] for p in points]
+                        scatter = ax.scatter(u_values, v_values, color=base_color,
+                                            s=4, alpha=0.40, label=f'{title_prefix} Avg Points', zorder=10)
+                        self.chart_manager.set_artist(chart_key, f"{title_prefix}_scatter", scatter)
                     ax.legend(loc='upper right')
                 else:
+                    # 分组显示时隐藏未分组的散点图，并从图例中排除
+                    if scatter is not None:
+                        scatter.set_visible(False)
+                        scatter.set_label('_nolegend_')
+                    group_scatters = []
                     # 按指定列分组绘制
                     # 获取唯一分组值
                     groups = sorted(list(set(row[group_column] for row in row_data)))
                     # 生成不同颜色
                     if len(groups) <= 10:
                         # 使用matplotlib默认的分类颜色循环
-                        colors = plt.cm.tab10.colors[:len(groups)]
+                        colors = configure_matplotlib().colormaps['tab10'].colors[:len(groups)]
                     else:
                         # 使用连续颜色映射
                         cmap = LinearSegmentedColormap.from_list('group_colors', [base_color, 'dark' + base_color], N=len(groups))
@@ -13351,28 +11052,44 @@ TestLogAnalyzer Instructions
                             v_values = [p[1] for p in group_points]
                             # 使用存储的zorder值
                             zorder_val = group_z_order_dict[group_column].get(group_val, i + 10)
-                            scatter = ax.scatter(u_values, v_values, color=colors[i], 
-                                                s=4, alpha=0.40, label=f'{str(group_val)}', zorder=zorder_val)
+                            group_scatters.append(ax.scatter(u_values, v_values, color=colors[i],
+                                                s=4, alpha=0.40, label=f'{str(group_val)}', zorder=zorder_val))
+                    self.chart_manager.set_artist(chart_key, f"{title_prefix}_group_scatters", group_scatters)
                     
                     # 添加分组图例
                     handles, labels = ax.get_legend_handles_labels()
                     by_label = dict(zip(labels, handles))
-                    ax.legend(by_label.values(), by_label.keys(), loc='upper right', 
+                    ax.legend(by_label.values(), by_label.keys(), loc='upper right',
                              title=f'Group by {group_column}')
                 
-                canvas.draw()
-            
-            # 初始绘制数据点
-            if white_avg_points:
-                plot_data_points(ax1, white_avg_points, white_row_data, 'green', 'CAFL0', canvas)
-            if mixed_avg_points:
-                plot_data_points(ax2, mixed_avg_points, mixed_row_data, 'purple', 'CALF24', canvas)
+                self.chart_manager.redraw(chart_key)
+            
+            # 初始绘制数据点；复用图表时没有数据的子图清空原有散点
+            for ax, avg_points, row_data, base_color, title_prefix in (
+                    (ax1, white_avg_points, white_row_data, 'green', 'CAFL0'),
+                    (ax2, mixed_avg_points, mixed_row_data, 'purple', 'CALF24')):
+                if avg_points:
+                    plot_data_points(ax, avg_points, row_data, base_color, title_prefix, canvas)
+                elif not created:
+                    ax.current_group_column = None
+                    for artist in self.chart_manager.get_artist(chart_key, f"{title_prefix}_group_scatters") or []:
+                        artist.remove()
+                    self.chart_manager.set_artist(chart_key, f"{title_prefix}_group_scatters", [])
+                    self.chart_manager.update_scatter(chart_key, f"{title_prefix}_scatter", [])
             
             # 创建右键菜单
             # 为CAFL0和CALF24子图创建单独的右键菜单处理
             # 用于跟踪顶点标签是否显示的字典
             vertex_labels_visible = {ax1: False, ax2: False}  # 初始状态为不显示
-            vertex_text_objects = {ax1: [], ax2: []}  # 存储顶点文本对象
+            # 存储顶点文本对象，复用图表时先清除上次显示的顶点标签
+            vertex_text_objects = self.chart_manager.get_artist(chart_key, "vertex_texts") or {}
+            for text_objects in vertex_text_objects.values():
+                for text_obj in text_objects:
+                    text_obj.remove()
+            vertex_text_objects = self.chart_manager.set_artist(chart_key, "vertex_texts", {ax1: [], ax2: []})
+            
+            # 刷新画布
+            self.chart_manager.redraw(chart_key)
             
             # 显示或隐藏顶点坐标的函数
             def toggle_vertex_labels(ax, poly_points):
@@ -13396,7 +11113,7 @@ TestLogAnalyzer Instructions
                         vertex_text_objects[ax].append(text)
                 
                 # 更新画布
-                canvas.draw()
+                self.chart_manager.redraw(chart_key)
                 
             def handle_right_click(ax, points, row_data, base_color, title_prefix, event):
                 # 创建主菜单
@@ -13586,8 +11303,9 @@ TestLogAnalyzer Instructions
             error_label.pack(pady=20)
             logging.error(f"Failed to create Color Point Chart: {str(e)}")
         finally:
-            # 确保释放matplotlib资源
-            plt.close('all')
+            # 确保释放matplotlib资源（只有已经导入pyplot时才需要）
+            if 'matplotlib.pyplot' in sys.modules:
+                sys.modules['matplotlib.pyplot'].close('all')
         
 if __name__ == "__main__":
     root = tk.Tk()
@@ -0,0 +1,14 @@
+"""pDOT Test Log Analyzer 性能基准测试
+
+generate_logs: 生成模拟pDOT测试日志（元数据表头、White/Mixed规格列、Metric列、#单元格、重复SN、色点坐标）
+run_benchmarks: 按数据规模对文件预览、读取、特殊单元格、重新判定、Yield、Top Defects、Cpk、限值扫描、色点图和Excel导出计时，结果保存为JSON
+startup: 用-X importtime测量程序模块的冷启动加载时间，超过预算时报错
+encodings: 生成多种编码的日志，报告编码检测准确率和每个文件的检测开销
+
+用法（在仓库根目录运行）:
+    python -m benchmarks.generate_logs out_dir --rows 100000 --files 4
+    python -m benchmarks.run_benchmarks --sizes 1000 10000 100000 1000000 -o results.json
+    python -m benchmarks.run_benchmarks --sizes 10000 --baseline results.json
+    python -m benchmarks.startup --budget 1.0
+    python -m benchmarks.encodings --rows 10000 -o encoding_results.json
+"""
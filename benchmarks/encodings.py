@@ -0,0 +1,158 @@
+"""编码检测基准测试
+
+把同一份模拟日志写成多种编码（UTF-8、UTF-8 BOM、GBK、UTF-16 BOM、无BOM的UTF-16 LE/BE、Latin-1），
+对每个文件报告:
+    检测准确率  sniff_log_header检测到的编码能否把文件解码为与实际编码相同的文本
+                （用GB18030读GBK文件、用UTF-16读UTF-16 LE文件等视为正确）
+    每个文件的开销  自动检测与指定编码时sniff_log_header的耗时差，以及自动检测时load_log_file的总耗时
+
+gbk-late文件只在检测样本（ENCODING_SAMPLE_BYTES）之后出现非ASCII字符: 表头检测结果为UTF-8（记为检测错误），
+load_log_file解码失败后改用fallback_encodings重新读取，报告中的loaded_encoding为最终使用的编码。
+结果以JSON保存；有文件最终没有按正确的编码读取时退出码为1。
+
+用法（在仓库根目录运行）:
+    python -m benchmarks.encodings --rows 10000 -o encoding_results.json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import loganalyzer_core
+from benchmarks import generate_logs
+
+# (名称, 写入编码, 非ASCII文本的位置: 'header'为元数据和每一行的Operator列, 'late'为只有最后一行)
+ENCODING_CASES = [
+    ('utf-8', 'utf-8', 'header'),
+    ('utf-8-bom', 'utf-8-sig', 'header'),
+    ('gbk', 'gbk', 'header'),
+    ('utf-16-bom', 'utf-16', 'header'),
+    ('utf-16-le', 'utf-16-le', 'header'),
+    ('utf-16-be', 'utf-16-be', 'header'),
+    ('latin-1', 'latin-1', 'header'),
+    ('gbk-late', 'gbk', 'late'),
+]
+
+# 各编码使用的非ASCII文本（测试站名称, 操作员名称）
+NON_ASCII_TEXT = {
+    'latin-1': ('Estação-01', 'José'),
+}
+DEFAULT_NON_ASCII_TEXT = ('测试站01', '张三')
+
+
+def write_case(directory, name, encoding, placement, rows, seed=0):
+    """写出一个编码测试文件，返回文件路径"""
+    station, operator = NON_ASCII_TEXT.get(encoding, DEFAULT_NON_ASCII_TEXT)
+    df = generate_logs.generate_frame(rows, seed=seed)
+    if placement == 'header':
+        df['Operator'] = operator
+    else:
+        station = 'pDOT-01'
+        df.loc[df.index[-1], 'Operator'] = operator
+    path = os.path.join(directory, f'pDOT Log EVT {name}.csv')
+    generate_logs.write_pdot_log(path, df, station=station, encoding=encoding)
+    return path
+
+
+def decodes_same(path, expected_encoding, detected_encoding):
+    """用检测到的编码解码文件得到的文本与实际编码相同"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    try:
+        return data.decode(detected_encoding) == data.decode(expected_encoding)
+    except UnicodeDecodeError:
+        return False
+
+
+def time_sniff(path, encoding, repeat):
+    """sniff_log_header的最短耗时（每次先清空缓存）"""
+    timings = []
+    for _ in range(max(1, repeat)):
+        loganalyzer_core.clear_header_cache()
+        start = time.perf_counter()
+        loganalyzer_core.sniff_log_header(path, encoding=encoding)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run_case(directory, name, encoding, placement, rows, repeat):
+    path = write_case(directory, name, encoding, placement, rows)
+    loganalyzer_core.clear_header_cache()
+    detected = loganalyzer_core.sniff_log_header(path).encoding
+    correct = decodes_same(path, encoding, detected)
+    detect_seconds = time_sniff(path, None, repeat)
+    explicit_seconds = time_sniff(path, encoding, repeat)
+    
+    load_seconds = None
+    load_error = None
+    loaded_encoding = None
+    try:
+        timings = []
+        for _ in range(max(1, repeat)):
+            loganalyzer_core.clear_header_cache()
+            start = time.perf_counter()
+            _, header, _, _ = loganalyzer_core.load_log_file(path)
+            timings.append(time.perf_counter() - start)
+        load_seconds = min(timings)
+        loaded_encoding = header.encoding
+    except (UnicodeDecodeError, ValueError) as e:
+        load_error = f"{type(e).__name__}: {str(e)[:200]}"
+    
+    result = {
+        'case': name,
+        'encoding': encoding,
+        'detected': detected,
+        'correct': correct,
+        'file_bytes': os.path.getsize(path),
+        'sniff_detect_ms': detect_seconds * 1000,
+        'sniff_explicit_ms': explicit_seconds * 1000,
+        'overhead_ms': (detect_seconds - explicit_seconds) * 1000,
+        'load_seconds': load_seconds,
+        'loaded_encoding': loaded_encoding,
+        'loaded_correct': loaded_encoding is not None and decodes_same(path, encoding, loaded_encoding),
+        'load_error': load_error,
+    }
+    print(f"{name:<11} {encoding:<10} -> {detected:<10} {'ok' if correct else 'WRONG':<5} "
+          f"sniff {result['sniff_detect_ms']:7.3f} ms (explicit {result['sniff_explicit_ms']:7.3f} ms, "
+          f"overhead {result['overhead_ms']:+7.3f} ms)"
+          + (f"  load {load_seconds:.3f} s as {loaded_encoding}" if load_seconds is not None
+             else f"  load failed: {load_error}"))
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Encoding detection accuracy and overhead for the pDOT test log analyzer.")
+    parser.add_argument('--rows', type=int, default=10000, help="data rows per file")
+    parser.add_argument('--repeat', type=int, default=5, help="repetitions per timing (best time is reported)")
+    parser.add_argument('--data-dir', help="directory for the generated files")
+    parser.add_argument('-o', '--output', default='encoding_results.json', help="JSON result file")
+    args = parser.parse_args(argv)
+    
+    data_dir = args.data_dir or os.path.join(tempfile.gettempdir(), 'loganalyzer_encodings')
+    os.makedirs(data_dir, exist_ok=True)
+    results = [run_case(data_dir, name, encoding, placement, args.rows, args.repeat)
+               for name, encoding, placement in ENCODING_CASES]
+    
+    accuracy = sum(result['correct'] for result in results) / len(results)
+    load_accuracy = sum(result['loaded_correct'] for result in results) / len(results)
+    median_overhead = statistics.median(result['overhead_ms'] for result in results)
+    print(f"Detection accuracy: {accuracy:.0%} from the header sample, {load_accuracy:.0%} after loading "
+          f"({len(results)} files), median overhead {median_overhead:.3f} ms per file")
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({
+            'rows': args.rows,
+            'sample_bytes': loganalyzer_core.ENCODING_SAMPLE_BYTES,
+            'accuracy': accuracy,
+            'load_accuracy': load_accuracy,
+            'median_overhead_ms': median_overhead,
+            'results': results,
+        }, f, indent=2)
+    print(f"Results saved to {args.output}")
+    return 0 if load_accuracy == 1 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
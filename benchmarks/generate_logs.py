@@ -0,0 +1,226 @@
+"""生成模拟pDOT测试日志（CSV）
+
+生成的文件与实际测试站输出的结构一致:
+- 文件开头为"键:,值"形式的元数据行和一个空行，之后是数据标题行
+- 第二列为Station Cfg（Data Processing时替换为文件名中的Config）
+- COLUMNS_TO_KEEP中的White/Mixed规格列，以及会被删除的其它列
+- 成对的"White MetricN Name"/"White MetricN Value"列（Metric编号乱序，用于测试重命名和排序）
+- 少量带#字符的数值单元格、Serial Number长度异常的行和重复测试的SN
+- White/Mixed u'v'色点分布在默认CAFL0/CAFL24多边形周围，部分落在多边形外
+"""
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+import loganalyzer_core
+
+# 生成规则的版本，规则改变时递增，使generate_log_set不复用旧规则生成的数据
+GENERATOR_VERSION = 2
+
+# 生成文件使用的Config，依次分配给各个文件
+CONFIGS = ['EVT', 'DVT', 'PVT', 'MP']
+
+# 数值列的分布参数 (均值, 标准差, 小数位数)
+METRIC_DISTRIBUTIONS = {
+    'L (cd/m^2)': (450.0, 20.0, 2),
+    'U (%)': (82.0, 4.0, 2),
+    'dY (%/cm)': (1.5, 0.4, 3),
+    'Ru': (0.0020, 0.0007, 5),
+    'Rv': (0.0020, 0.0007, 5),
+    'Du': (0.0030, 0.0010, 5),
+    'Dv': (0.0030, 0.0010, 5),
+    'dL*Min (%/cm)': (-1.0, 0.3, 3),
+    'dL*Max (%/cm)': (1.0, 0.3, 3),
+    'dEMax (%/cm)': (2.0, 0.5, 3),
+}
+
+# Mixed窗口亮度较低
+MIXED_L_DISTRIBUTION = (300.0, 15.0, 2)
+
+# Metric名称列的内容（重命名为W_M<N>_<名称>）
+METRIC_NAMES = ['Grad', 'Mura', 'Spot', 'Line', 'Edge', 'Blob', 'Dot', 'Band']
+
+# 带#字符的单元格所在的列
+HASH_COLUMNS = ['White L (cd/m^2)', 'White u Avg', 'Mixed dY (%/cm)']
+
+# Review Criteria（TestLogAnalyzer_Criteria.json的字典格式），与上面的分布配合产生适量不良
+DEFAULT_CRITERIA = {
+    'White': {
+        'L': {'lower': 420, 'upper': None},
+        'U': {'lower': 75, 'upper': None},
+        'dY': {'lower': None, 'upper': 2.5},
+        'dEMax': {'lower': None, 'upper': 3.2},
+    },
+    'Mixed': {
+        'L': {'lower': 275, 'upper': None},
+        'dY': {'lower': None, 'upper': 2.5},
+    },
+}
+
+
+def _polygon_points(rng, polygon, count, spread=0.3):
+    """在多边形质心附近按多边形尺寸的比例生成正态分布的u'v'点"""
+    vertices = np.asarray(polygon, dtype=np.float64)
+    center = vertices.mean(axis=0)
+    half_range = (vertices.max(axis=0) - vertices.min(axis=0)) / 2
+    points = center + rng.normal(0.0, 1.0, size=(count, 2)) * half_range * spread
+    return np.round(points[:, 0], 4), np.round(points[:, 1], 4)
+
+
+def generate_frame(rows, seed=0, duplicate_rate=0.1, hash_rate=0.002, bad_serial_rate=0.001, metrics=4,
+                   serial_prefix='SN', model='M1', serial_offset=0):
+    """生成一个日志文件的数据行（所有单元格为文本，与CSV文件中的内容一致）
+    
+    Args:
+        rows: 数据行数
+        seed: 随机数种子
+        duplicate_rate: 重复测试行所占比例
+        hash_rate: HASH_COLUMNS中带#字符的单元格比例
+        bad_serial_rate: Serial Number长度异常的行比例
+        metrics: 每个窗口的Metric列组数量
+        serial_prefix: Serial Number前缀
+        model: Model列内容
+        serial_offset: Serial Number编号的起始值（多个文件使用不重叠的编号，重复SN只出现在同一文件的重测中）
+    
+    Returns:
+        DataFrame（列顺序即文件中的列顺序）
+    """
+    rng = np.random.default_rng(seed)
+    units = max(1, int(round(rows / (1 + duplicate_rate))))
+    serial_ids = np.concatenate([np.arange(units), rng.integers(0, units, rows - units)]) if rows > units \
+        else np.arange(rows)
+    rng.shuffle(serial_ids)
+    serials = pd.Series(serial_ids + serial_offset).map(lambda x: f'{serial_prefix}{x:08d}').to_numpy(dtype=object)
+    bad = rng.random(rows) < bad_serial_rate
+    serials[bad] = 'BADSERIALNUMBER' + serials[bad]
+    
+    start = np.datetime64('2024-01-01T00:00:00')
+    seconds = rng.integers(0, 30 * 24 * 3600, rows)
+    timestamps = pd.to_datetime(start + seconds.astype('timedelta64[s]')).strftime('%Y/%m/%d %H:%M:%S')
+    
+    data = {
+        'Model': np.full(rows, model, dtype=object),
+        'Station Cfg': np.full(rows, 'CFG-A', dtype=object),
+        'Serial Number': serials,
+        'Test Station': np.where(rng.random(rows) < 0.5, 'pDOT-01', 'pDOT-02'),
+        'Position ID': rng.integers(1, 5, rows),
+        'Date/Time': np.asarray(timestamps, dtype=object),
+        'Pass/Fail': np.where(rng.random(rows) < 0.9, 'PASS', 'FAIL'),
+        'Operator': np.full(rows, 'OP01', dtype=object),
+        'Fixture Temp (C)': np.round(rng.normal(25.0, 0.5, rows), 2),
+    }
+    
+    metric_order = rng.permutation(np.arange(1, metrics + 1))
+    for window, polygon in (('White', loganalyzer_core.DEFAULT_CAFL0_POLYGON),
+                            ('Mixed', loganalyzer_core.DEFAULT_CAFL24_POLYGON)):
+        u_values, v_values = _polygon_points(rng, polygon, rows)
+        for metric, (mean, std, digits) in METRIC_DISTRIBUTIONS.items():
+            if window == 'Mixed' and metric == 'L (cd/m^2)':
+                mean, std, digits = MIXED_L_DISTRIBUTION
+            data[f'{window} {metric}'] = np.round(rng.normal(mean, std, rows), digits)
+            if metric == 'dY (%/cm)':
+                data[f'{window} u Avg'] = u_values
+                data[f'{window} v Avg'] = v_values
+        data[f'{window} Pass/Fail Criteria'] = np.full(rows, f'{window}_SPEC_V2', dtype=object)
+        data[f'{window} Exposure (ms)'] = np.round(rng.normal(16.0, 0.2, rows), 2)
+        for number in metric_order:
+            data[f'{window} Metric{number} Name'] = np.full(rows, METRIC_NAMES[(number - 1) % len(METRIC_NAMES)],
+                                                           dtype=object)
+            data[f'{window} Metric{number} Value'] = np.round(np.abs(rng.normal(0.3, 0.2, rows)), 3)
+    
+    df = pd.DataFrame(data)
+    for column in HASH_COLUMNS:
+        flagged = rng.random(rows) < hash_rate
+        if flagged.any():
+            text = df[column].astype(str).astype(object)
+            text[flagged] = '#' + text[flagged]
+            df[column] = text
+    return df
+
+
+def write_pdot_log(file_path, df, station='pDOT-01', software_version='1.50', encoding='utf-8'):
+    """把数据行写成带元数据表头的pDOT日志文件（encoding为文件编码）"""
+    metadata = [
+        f'Station ID:,{station}',
+        f'Software Version:,{software_version}',
+        'Recipe:,pDOT_Default',
+        f'Start Time:,{df["Date/Time"].iloc[0] if len(df) else ""}',
+        '',
+    ]
+    with open(file_path, 'w', encoding=encoding, newline='') as f:
+        f.write('\n'.join(metadata) + '\n')
+        df.to_csv(f, index=False, lineterminator='\n')
+    return file_path
+
+
+def generate_log_set(directory, rows, files=1, seed=0, **kwargs):
+    """在directory中生成共rows行、分为files个文件的日志，参数相同的已有数据直接复用
+    
+    文件名为"pDOT Log <Config> Line<N>.csv"，Config可由文件名解析。
+    
+    Returns:
+        文件路径列表
+    """
+    os.makedirs(directory, exist_ok=True)
+    manifest_path = os.path.join(directory, 'manifest.json')
+    settings = {'rows': rows, 'files': files, 'seed': seed, 'version': GENERATOR_VERSION, **kwargs}
+    if os.path.exists(manifest_path):
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            paths = [os.path.join(directory, name) for name in manifest.get('files', [])]
+            if manifest.get('settings') == settings and paths and all(os.path.exists(p) for p in paths):
+                return paths
+        except (OSError, ValueError):
+            pass
+    
+    paths = []
+    base_rows, extra = divmod(rows, files)
+    serial_offset = 0
+    for i in range(files):
+        file_rows = base_rows + (1 if i < extra else 0)
+        config = CONFIGS[i % len(CONFIGS)]
+        df = generate_frame(file_rows, seed=seed + i, serial_offset=serial_offset, **kwargs)
+        serial_offset += file_rows
+        path = os.path.join(directory, f'pDOT Log {config} Line{i + 1}.csv')
+        write_pdot_log(path, df)
+        paths.append(path)
+    
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump({'settings': settings, 'files': [os.path.basename(p) for p in paths]}, f, indent=2)
+    return paths
+
+
+def write_default_criteria(file_path):
+    """写出与生成数据配合使用的Review Criteria JSON文件"""
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(DEFAULT_CRITERIA, f, indent=2)
+    return file_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic pDOT test logs.")
+    parser.add_argument('directory', help="output directory")
+    parser.add_argument('--rows', type=int, default=10000, help="total data rows")
+    parser.add_argument('--files', type=int, default=1, help="number of log files")
+    parser.add_argument('--seed', type=int, default=0, help="random seed")
+    parser.add_argument('--duplicate-rate', type=float, default=0.1, help="fraction of retest rows")
+    parser.add_argument('--hash-rate', type=float, default=0.002, help="fraction of #-flagged cells")
+    parser.add_argument('--criteria', action='store_true', help="also write criteria.json for the generated data")
+    args = parser.parse_args(argv)
+    
+    paths = generate_log_set(args.directory, args.rows, files=args.files, seed=args.seed,
+                             duplicate_rate=args.duplicate_rate, hash_rate=args.hash_rate)
+    if args.criteria:
+        paths.append(write_default_criteria(os.path.join(args.directory, 'criteria.json')))
+    for path in paths:
+        print(path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
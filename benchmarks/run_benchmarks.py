@@ -0,0 +1,289 @@
+"""pDOT Test Log Analyzer端到端性能基准测试
+
+对每个数据规模依次计时以下阶段（使用与界面和批处理模式相同的loganalyzer_core函数）:
+    preview        File PreView的读取（每个文件只读取表头和前3行）
+    ingest         读取日志、合并、SN去重和列结构处理
+    special_cells  处理含#字符的单元格并生成标记单元格的位置（与界面的process_special_cells相同）
+    reprocessing   按Review Criteria和色点多边形重新判定Pass/Fail和Fail_Reason并生成不良单元格的位置
+                   （与Data Re-Processing相同，每次使用新的AnalysisGraph，不计入缓存命中）
+    yield          按Config统计不良率以及FPY、最终良率和重测率
+    top_defects    统计不良项目（总体和按Config）
+    cpk            计算各规格列的Cpk
+    limit_sweep    一条规格的下限取DEFAULT_SWEEP_POINTS个候选值时的各Config良率（包含首次排序）
+    chart          绘制CAFL0/CAFL24色点分布图（Agg后端）
+    excel          导出Excel报告（包含Reprocessed Data工作表）
+
+结果以JSON保存；指定--baseline时与之前的结果比较，耗时超过容差的阶段记为性能退化（退出码1）。
+"""
+import argparse
+import datetime
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import loganalyzer_core
+from benchmarks import generate_logs
+
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+
+STAGES = ['preview', 'ingest', 'special_cells', 'reprocessing', 'yield', 'top_defects', 'cpk', 'limit_sweep', 'chart', 'excel']
+
+
+def measure(func, setup=None, repeat=1):
+    """重复执行func并计时，setup的返回值作为func的参数（不计入耗时）
+    
+    Returns:
+        (最后一次的返回值, 每次耗时列表)
+    """
+    timings = []
+    result = None
+    for _ in range(max(1, repeat)):
+        args = setup() if setup is not None else ()
+        start = time.perf_counter()
+        result = func(*args)
+        timings.append(time.perf_counter() - start)
+    return result, timings
+
+
+def stage_preview(paths, rows=3):
+    return [loganalyzer_core.read_log_preview(path, rows) for path in paths]
+
+
+def stage_ingest(paths):
+    frames = [loganalyzer_core.load_log_file(path)[0] for path in paths]
+    df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+    loganalyzer_core.convert_datetime_column(df)
+    df, attempt_history = loganalyzer_core.dedup_by_serial(df)
+    df = loganalyzer_core.get_schema_plan(df).apply(df)
+    return df, attempt_history
+
+
+def stage_special_cells(df):
+    cell_masks = {}
+    df, _, _, _ = loganalyzer_core.clean_special_cells(df, cell_masks)
+    loganalyzer_core.special_cell_positions(cell_masks)
+    return df
+
+
+def stage_reprocessing(df, criteria_dict, polygons):
+    limits = loganalyzer_core.resolve_criteria_columns(criteria_dict, list(df.columns))
+    verdict = loganalyzer_core.AnalysisGraph().verdict(df, 'benchmark', limits, polygons)
+    result = df.copy(deep=False)
+    result['Pass/Fail'] = np.where(verdict.row_fail, 'Fail', 'Pass')
+    result['Fail_Reason'] = verdict.reasons.copy()
+    loganalyzer_core.format_cells_from_verdict(result, verdict)
+    return result
+
+
+def stage_yield(verdict_df, attempt_history):
+    fails = verdict_df['Pass/Fail'] == 'Fail'
+    counts = fails.groupby(verdict_df['Config'], observed=True).agg(['size', 'sum'])
+    fpy = pd.concat([loganalyzer_core.yield_summary(attempt_history, 'Config'),
+                     loganalyzer_core.yield_summary(attempt_history)], ignore_index=True)
+    return counts, fpy
+
+
+def stage_top_defects(df, limits, polygons):
+    report = loganalyzer_core.AnalysisReport()
+    report.add_chunk(df, limits, polygons)
+    return report.top_defects(), report.top_defects(by_config=True)
+
+
+def stage_cpk(df, limits):
+    report = loganalyzer_core.AnalysisReport()
+    for column, entries in limits.items():
+        moments = loganalyzer_core.RunningMoments()
+        moments.update(pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=np.float64))
+        report.limits[column] = entries
+        report.moments[column] = moments
+    return report.cpk_table()
+
+
+def stage_limit_sweep(evaluator):
+    """扫描第一条规格的下限（evaluator为新建的增量判定状态，计时包含首次排序）"""
+    items = evaluator.limit_items()
+    if not items:
+        return None
+    return loganalyzer_core.limit_sweep(evaluator, items[0], 'lower')
+
+
+def _import_pyplot():
+    """使用无界面的Agg后端导入pyplot（在计时之前调用，不把导入时间计入chart阶段）"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def stage_chart(df, polygons):
+    """与Color Point Chart选项卡相同的两个子图（散点和规格多边形），渲染为PNG"""
+    from matplotlib.patches import Polygon
+    
+    plt = _import_pyplot()
+    fig, axes = plt.subplots(1, 2, figsize=(15, 6))
+    for ax, (type_name, (u_column, v_column, display_name)) in zip(axes, loganalyzer_core.COLOR_POINT_COLUMNS.items()):
+        u = pd.to_numeric(df[u_column], errors='coerce').to_numpy(dtype=np.float64)
+        v = pd.to_numeric(df[v_column], errors='coerce').to_numpy(dtype=np.float64)
+        ax.scatter(u, v, s=4, alpha=0.5, color='blue' if type_name == 'White' else 'red')
+        ax.add_patch(Polygon(polygons[type_name], closed=True, fill=False, edgecolor='black', linewidth=2))
+        ax.set_title(display_name)
+        ax.set_xlabel("u'")
+        ax.set_ylabel("v'")
+        ax.grid(True, linestyle='--', alpha=0.7)
+    fig.tight_layout(pad=3.0)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png')
+    plt.close(fig)
+    return buffer.getbuffer().nbytes
+
+
+def stage_excel(report, output_path):
+    report.to_excel(output_path)
+    return os.path.getsize(output_path)
+
+
+def run_size(rows, data_dir, criteria_dict, polygons, files=4, repeat=1, stages=STAGES, seed=0):
+    """生成（或复用）rows行的日志并对各阶段计时
+    
+    Returns:
+        [{'rows', 'stage', 'seconds', 'timings', 'rows_per_sec'}, ...]
+    """
+    paths = generate_logs.generate_log_set(os.path.join(data_dir, f'rows_{rows}'), rows,
+                                           files=min(files, rows), seed=seed)
+    results = []
+    
+    def record(stage, timings, stage_rows):
+        best = min(timings)
+        results.append({
+            'rows': rows,
+            'stage': stage,
+            'stage_rows': stage_rows,
+            'seconds': best,
+            'median_seconds': statistics.median(timings),
+            'timings': timings,
+            'rows_per_sec': stage_rows / best if best > 0 else None,
+        })
+        print(f"{rows:>9} rows  {stage:<14} {best:9.4f} s  ({stage_rows / best if best > 0 else 0:,.0f} rows/s)")
+    
+    if 'preview' in stages:
+        _, timings = measure(lambda: stage_preview(paths), repeat=repeat)
+        record('preview', timings, rows)
+    
+    # 之后的阶段都需要前面阶段的结果，未选中的阶段仍然执行但不记录
+    (df, attempt_history), timings = measure(lambda: stage_ingest(paths), repeat=repeat)
+    if 'ingest' in stages:
+        record('ingest', timings, rows)
+    
+    df, timings = measure(stage_special_cells, setup=lambda: (df.copy(),), repeat=repeat)
+    if 'special_cells' in stages:
+        record('special_cells', timings, len(df))
+    df, _ = loganalyzer_core.optimize_dtypes(df)
+    limits = loganalyzer_core.resolve_criteria_columns(criteria_dict, list(df.columns))
+    
+    verdict_df, timings = measure(lambda: stage_reprocessing(df, criteria_dict, polygons), repeat=repeat)
+    if 'reprocessing' in stages:
+        record('reprocessing', timings, len(df))
+    
+    if 'chart' in stages:
+        _import_pyplot()
+    for stage, func in (('yield', lambda: stage_yield(verdict_df, attempt_history)),
+                        ('top_defects', lambda: stage_top_defects(df, limits, polygons)),
+                        ('cpk', lambda: stage_cpk(df, limits)),
+                        ('chart', lambda: stage_chart(df, polygons))):
+        if stage in stages:
+            _, timings = measure(func, repeat=repeat)
+            record(stage, timings, len(df))
+    
+    if 'limit_sweep' in stages:
+        # 增量判定状态在setup中新建（不计时）
+        _, timings = measure(stage_limit_sweep, setup=lambda: (
+            loganalyzer_core.IncrementalEvaluator(df, 'benchmark', limits, polygons),), repeat=repeat)
+        record('limit_sweep', timings, len(df))
+    
+    if 'excel' in stages:
+        report = loganalyzer_core.AnalysisReport()
+        report.attempt_history = attempt_history
+        report.add_chunk(df, limits, polygons)
+        report.data = verdict_df
+        output_path = os.path.join(data_dir, f'report_{rows}.xlsx')
+        _, timings = measure(lambda: stage_excel(report, output_path), repeat=repeat)
+        record('excel', timings, len(df))
+    return results
+
+
+def environment_info():
+    """记录运行环境，便于比较不同机器上的结果"""
+    return {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+    }
+
+
+def compare_results(results, baseline, tolerance):
+    """与基准结果比较，返回耗时增加超过tolerance比例的 [(rows, stage, 基准耗时, 当前耗时), ...]"""
+    baseline_seconds = {(item['rows'], item['stage']): item['seconds'] for item in baseline.get('results', [])}
+    regressions = []
+    for item in results:
+        previous = baseline_seconds.get((item['rows'], item['stage']))
+        if previous is None or previous <= 0:
+            continue
+        ratio = item['seconds'] / previous
+        print(f"{item['rows']:>9} rows  {item['stage']:<14} {previous:9.4f} s -> {item['seconds']:9.4f} s  (x{ratio:.2f})")
+        if ratio > 1 + tolerance:
+            regressions.append((item['rows'], item['stage'], previous, item['seconds']))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="End-to-end benchmarks for the pDOT test log analyzer.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="row counts to benchmark")
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES, help="stages to record")
+    parser.add_argument('--files', type=int, default=4, help="number of log files per data set")
+    parser.add_argument('--repeat', type=int, default=1, help="repetitions per stage (best time is reported)")
+    parser.add_argument('--seed', type=int, default=0, help="random seed for the generated logs")
+    parser.add_argument('--data-dir', help="directory for generated logs (reused between runs)")
+    parser.add_argument('-o', '--output', default='benchmark_results.json', help="JSON result file")
+    parser.add_argument('--baseline', help="previous JSON result file to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="allowed slowdown relative to the baseline before a stage is reported as a regression")
+    args = parser.parse_args(argv)
+    
+    data_dir = args.data_dir or os.path.join(tempfile.gettempdir(), 'loganalyzer_benchmarks')
+    criteria_dict = loganalyzer_core.parse_criteria_data(generate_logs.DEFAULT_CRITERIA)
+    polygons = loganalyzer_core.colorpoint_polygons(None)
+    
+    results = []
+    for rows in args.sizes:
+        results.extend(run_size(rows, data_dir, criteria_dict, polygons, files=args.files,
+                                repeat=args.repeat, stages=args.stages, seed=args.seed))
+    
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({'environment': environment_info(), 'results': results}, f, indent=2)
+    print(f"Results saved to {args.output}")
+    
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_results(results, baseline, args.tolerance)
+        for rows, stage, previous, current in regressions:
+            print(f"REGRESSION: {stage} at {rows} rows: {previous:.4f} s -> {current:.4f} s")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
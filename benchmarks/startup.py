@@ -0,0 +1,138 @@
+"""启动时间基准测试（python -X importtime）
+
+在新的Python进程中加载TestLogAnalyzer-1.50.py（不创建窗口），解析-X importtime输出，
+报告模块加载总时间、耗时最多的顶层导入以及启动时是否导入了应延迟加载的重量级模块。
+指定--gui且有图形界面时，同时测量创建主窗口（TestLogAnalyzer(root)并完成一次界面刷新）的时间。
+
+模块加载时间超过--budget时退出码为1。
+
+用法（在仓库根目录运行）:
+    python -m benchmarks.startup --budget 1.0 -o startup_results.json
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPO_ROOT, 'TestLogAnalyzer-1.50.py')
+
+# 启动时不应导入、应在第一次使用时才导入的模块
+DEFERRED_MODULES = ['matplotlib', 'openpyxl', 'plotly', 'scipy']
+
+# 默认的模块加载时间预算（秒）
+DEFAULT_BUDGET = 1.0
+
+_LOAD_SCRIPT = r'''
+import importlib.util, json, sys, time
+start = time.perf_counter()
+spec = importlib.util.spec_from_file_location("testloganalyzer_app", {app_path!r})
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+load_seconds = time.perf_counter() - start
+gui_seconds = None
+if {gui!r}:
+    import tkinter as tk
+    start = time.perf_counter()
+    root = tk.Tk()
+    app = module.TestLogAnalyzer(root)
+    root.update()
+    gui_seconds = time.perf_counter() - start
+    root.destroy()
+print(json.dumps({{"load_seconds": load_seconds, "gui_seconds": gui_seconds,
+                  "modules": sorted(name for name in sys.modules)}}))
+'''
+
+_IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S.*)$')
+
+
+def parse_importtime(stderr_text):
+    """解析-X importtime输出
+    
+    Returns:
+        [{'module', 'self_us', 'cumulative_us', 'depth'}, ...]（按输出顺序）
+    """
+    entries = []
+    for line in stderr_text.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        entries.append({
+            'module': module.strip(),
+            'self_us': int(self_us),
+            'cumulative_us': int(cumulative_us),
+            'depth': (len(indent) - 1) // 2,
+        })
+    return entries
+
+
+def measure_startup(app_path=APP_PATH, gui=False):
+    """在新进程中加载程序模块并返回一次测量结果"""
+    env = dict(os.environ)
+    env['PYTHONPATH'] = REPO_ROOT + os.pathsep + env.get('PYTHONPATH', '')
+    script = _LOAD_SCRIPT.format(app_path=app_path, gui=gui)
+    # 程序加载时会在当前目录创建logs目录，使用临时目录避免污染仓库
+    with tempfile.TemporaryDirectory() as work_dir:
+        completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', script], cwd=work_dir, env=env,
+                                   capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"Loading {os.path.basename(app_path)} failed:\n{completed.stderr[-2000:]}")
+    
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    entries = parse_importtime(completed.stderr)
+    top_level = [entry for entry in entries if entry['depth'] == 0]
+    loaded = set(result.pop('modules'))
+    result['import_seconds'] = sum(entry['cumulative_us'] for entry in top_level) / 1e6
+    result['top_imports'] = sorted(top_level, key=lambda entry: entry['cumulative_us'], reverse=True)
+    result['eager_heavy_modules'] = [name for name in DEFERRED_MODULES if name in loaded]
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cold-start import time report for the pDOT test log analyzer.")
+    parser.add_argument('--repeat', type=int, default=3, help="number of fresh processes to measure")
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET, help="module load budget in seconds")
+    parser.add_argument('--top', type=int, default=15, help="number of top-level imports to list")
+    parser.add_argument('--gui', action='store_true', help="also time TestLogAnalyzer(root) (needs a display)")
+    parser.add_argument('-o', '--output', default='startup_results.json', help="JSON result file")
+    args = parser.parse_args(argv)
+    
+    runs = [measure_startup(gui=args.gui) for _ in range(max(1, args.repeat))]
+    best = min(runs, key=lambda run: run['load_seconds'])
+    
+    load_times = ', '.join(f"{run['load_seconds']:.3f}" for run in runs)
+    print(f"Module load: {load_times} s "
+          f"(best {best['load_seconds']:.3f} s, budget {args.budget:.3f} s)")
+    if best['gui_seconds'] is not None:
+        print(f"Main window construction: {best['gui_seconds']:.3f} s")
+    print(f"Top-level imports ({best['import_seconds']:.3f} s in total):")
+    for entry in best['top_imports'][:args.top]:
+        print(f"  {entry['cumulative_us'] / 1000:9.1f} ms  {entry['module']}")
+    if best['eager_heavy_modules']:
+        print(f"Imported at startup but expected to load lazily: {', '.join(best['eager_heavy_modules'])}")
+    
+    within_budget = best['load_seconds'] <= args.budget
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({
+            'budget_seconds': args.budget,
+            'within_budget': within_budget,
+            'load_seconds': [run['load_seconds'] for run in runs],
+            'gui_seconds': [run['gui_seconds'] for run in runs],
+            'import_seconds': best['import_seconds'],
+            'eager_heavy_modules': best['eager_heavy_modules'],
+            'top_imports': best['top_imports'][:args.top],
+        }, f, indent=2)
+    print(f"Results saved to {args.output}")
+    
+    if not within_budget:
+        print(f"OVER BUDGET: module load {best['load_seconds']:.3f} s > {args.budget:.3f} s")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,290 @@
+"""pDOT Test Log Analyzer 命令行批处理模式
+
+用法:
+    python TestLogAnalyzer-1.50.py --batch --criteria crit.json --colorpoint spec.json logs/*.csv -o report.xlsx
+    python TestLogAnalyzer-1.50.py --batch --criteria crit.json lotA/ lotB/ -o report.xlsx --jobs 2
+    python TestLogAnalyzer-1.50.py --batch --criteria crit.json logs.zip lotC/ -o report.xlsx
+
+不导入tkinter，使用与界面相同的loganalyzer_core处理流程:
+读取日志 -> 合并 -> SN去重 -> 列结构处理 -> 特殊单元格 -> 按Review Criteria和色点多边形重新判定
+-> Yield、FPY、Top Defects、Cpk -> Excel。
+
+命令行中的每个目录作为一个批次（lot），直接给出的文件和通配符合并为一个批次；压缩的CSV（.gz/.bz2/.xz）
+流式解压读取，zip归档展开为其中的CSV成员；
+多个批次时输出文件名加上批次名后缀，--jobs N 时批次并行处理（只有一个批次时并行读取文件）。
+
+退出码: 0 成功；1 处理失败；2 参数错误；3 没有可处理的数据。
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+import loganalyzer_core
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_NO_DATA = 3
+
+logger = logging.getLogger("TestLogAnalyzer")
+
+
+def build_parser():
+    """创建命令行参数解析器"""
+    parser = argparse.ArgumentParser(
+        prog="TestLogAnalyzer-1.50.py --batch",
+        description="Run the pDOT test log analysis pipeline without the GUI and export an Excel report.")
+    parser.add_argument('--batch', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('inputs', nargs='+',
+                        help="log files (.csv, .csv.gz, .zip), glob patterns or directories "
+                             "(each directory is processed as one lot)")
+    parser.add_argument('--criteria', required=True,
+                        help="Review Criteria JSON file (same format as TestLogAnalyzer_Criteria.json)")
+    parser.add_argument('--colorpoint',
+                        help="ColorPointSpec JSON file; the default CAFL0/CAFL24 polygons are used when omitted")
+    parser.add_argument('-o', '--output', required=True,
+                        help="output Excel report; a lot suffix is added when several lots are processed")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help="number of worker processes for lots (or for files when there is a single lot)")
+    parser.add_argument('--chunked', action='store_true',
+                        help="use the chunked out-of-core pipeline (bounded memory, no Reprocessed Data sheet)")
+    parser.add_argument('--chunksize', type=int, default=loganalyzer_core.DEFAULT_CHUNKSIZE,
+                        help="rows per chunk in chunked mode")
+    parser.add_argument('--trace', metavar='DIR',
+                        help="write a Chrome-trace JSON file with per-stage timings for each lot into DIR")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="record peak memory per stage with tracemalloc (slower)")
+    parser.add_argument('-v', '--verbose', action='store_true', help="log debug messages")
+    return parser
+
+
+def _is_log_input(file_path):
+    """目录中作为日志读取的文件: CSV（包括.gz/.bz2/.xz压缩的CSV）和zip归档"""
+    name = os.path.basename(file_path).lower()
+    return (loganalyzer_core.log_file_name(name).endswith('.csv')
+            or name.endswith(loganalyzer_core.ARCHIVE_LOG_EXTENSIONS))
+
+
+def expand_inputs(inputs):
+    """展开命令行输入，返回 [(批次名, [文件路径, ...]), ...]
+    
+    目录作为单独的批次（取目录中的CSV、压缩CSV和zip归档），文件和通配符匹配到的文件合并为一个批次；
+    zip归档展开为其中的CSV成员（"归档.zip/成员.csv"），文件按给出顺序排列并去重。
+    """
+    lots = []
+    loose_files = []
+    seen = set()
+    
+    def add(paths, target):
+        paths = [path for path in paths
+                 if os.path.isfile(path) or loganalyzer_core.split_archive_path(path)[1] is not None]
+        for path in loganalyzer_core.expand_log_paths(paths):
+            key = os.path.abspath(path)
+            if key not in seen:
+                seen.add(key)
+                target.append(path)
+    
+    for item in inputs:
+        if os.path.isdir(item):
+            lot_files = []
+            add([path for path in sorted(glob.glob(os.path.join(item, '*'))) if _is_log_input(path)], lot_files)
+            lot_name = os.path.basename(os.path.normpath(item)) or item
+            lots.append((lot_name, lot_files))
+        elif os.path.isfile(item) or loganalyzer_core.split_archive_path(item)[1] is not None:
+            add([item], loose_files)
+        else:
+            add(sorted(glob.glob(item)), loose_files)
+    
+    if loose_files:
+        lots.insert(0, ("files", loose_files))
+    return [(name, files) for name, files in lots if files]
+
+
+def load_criteria(file_path):
+    """读取Review Criteria JSON文件，返回 {std_type: (lower_limit, upper_limit)}"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return loganalyzer_core.parse_criteria_data(json.load(f))
+
+
+def load_polygons(file_path=None):
+    """读取ColorPointSpec JSON文件并提取White/Mixed多边形（缺失时使用默认多边形）"""
+    spec_data = None
+    if file_path:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            spec_data = json.load(f)
+    return loganalyzer_core.colorpoint_polygons(spec_data)
+
+
+def _load_file(file_path):
+    """读取单个日志文件（供进程池调用），失败时返回None"""
+    try:
+        df, _, filtered_rows, _ = loganalyzer_core.load_log_file(file_path)
+        return file_path, df, filtered_rows
+    except Exception as e:
+        logger.error(f"Error processing file {os.path.basename(file_path)}: {str(e)}")
+        return file_path, None, 0
+
+
+def analyze_files(file_paths, criteria_dict, polygons, jobs=1):
+    """在内存中按界面的处理流程分析一组日志文件
+    
+    Args:
+        file_paths: 日志文件路径列表
+        criteria_dict: {std_type: (lower_limit, upper_limit)}
+        polygons: {'White': 顶点列表, 'Mixed': 顶点列表}
+        jobs: 并行读取文件的进程数
+    
+    Returns:
+        AnalysisReport（data为重新判定后的完整数据），没有成功读取任何文件时返回None
+    """
+    if jobs > 1 and len(file_paths) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            loaded = list(executor.map(_load_file, file_paths))
+    else:
+        loaded = [_load_file(path) for path in file_paths]
+    frames = [df for _, df, _ in loaded if df is not None]
+    if not frames:
+        return None
+    
+    report = loganalyzer_core.AnalysisReport()
+    report.files = len(frames)
+    report.rows_filtered = sum(filtered for _, df, filtered in loaded if df is not None)
+    df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+    report.rows_read = len(df) + report.rows_filtered
+    
+    with loganalyzer_core.span("dedup", rows=len(df)):
+        loganalyzer_core.convert_datetime_column(df)
+        df, report.attempt_history = loganalyzer_core.dedup_by_serial(df)
+    with loganalyzer_core.span("schema_plan", rows=len(df)):
+        df = loganalyzer_core.get_schema_plan(df).apply(df)
+    with loganalyzer_core.span("special_cells", rows=len(df)):
+        df, report.hash_cells, report.fail_cells, _ = loganalyzer_core.clean_special_cells(df)
+        df, _ = loganalyzer_core.optimize_dtypes(df)
+    report.units = len(df)
+    
+    limits = loganalyzer_core.resolve_criteria_columns(criteria_dict, list(df.columns))
+    with loganalyzer_core.span("reprocessing", rows=len(df)):
+        report.data = loganalyzer_core.apply_verdict(df, limits, polygons)
+    with loganalyzer_core.span("yield_top_defects_cpk", rows=len(df)):
+        report.add_chunk(df, limits, polygons)
+    report.preview = df.head(17)
+    return report
+
+
+def lot_output_path(output, lot_name, lot_count):
+    """多个批次时在输出文件名后加上批次名"""
+    if lot_count <= 1:
+        return output
+    base, ext = os.path.splitext(output)
+    safe_name = re.sub(r'[^A-Za-z0-9._-]+', '_', lot_name)
+    return f"{base}_{safe_name}{ext or '.xlsx'}"
+
+
+def run_lot(lot_name, file_paths, output_path, criteria_dict, polygons, jobs=1, chunked=False,
+            chunksize=loganalyzer_core.DEFAULT_CHUNKSIZE):
+    """处理一个批次并导出Excel报告
+    
+    Returns:
+        (批次名, 退出码, 说明文本)
+    """
+    try:
+        with loganalyzer_core.span(f"lot {lot_name}") as stage:
+            report = _analyze_lot(file_paths, criteria_dict, polygons, jobs, chunked, chunksize)
+            if report is None or report.units == 0:
+                return lot_name, EXIT_NO_DATA, "no data could be processed"
+            stage.rows = report.rows_read
+            with loganalyzer_core.span("export", rows=report.units):
+                report.to_excel(output_path)
+        failed_units = sum(report.config_fails.values())
+        return lot_name, EXIT_OK, (f"{report.files} files, {report.rows_read} rows, {report.units} units, "
+                                   f"{failed_units} failed criteria -> {output_path}")
+    except Exception as e:
+        logger.error(f"Lot {lot_name} failed: {str(e)}", exc_info=True)
+        return lot_name, EXIT_FAILED, str(e)
+
+
+def _analyze_lot(file_paths, criteria_dict, polygons, jobs, chunked, chunksize):
+    """按处理模式分析一个批次，没有数据时返回None"""
+    if chunked:
+        resolve_limits = lambda columns: loganalyzer_core.resolve_criteria_columns(criteria_dict, columns)
+        report = loganalyzer_core.run_chunked_pipeline(file_paths, resolve_limits=resolve_limits,
+                                                       polygons=polygons, chunksize=chunksize)
+        return report if report.files else None
+    return analyze_files(file_paths, criteria_dict, polygons, jobs=jobs)
+
+
+def _run_lot_worker(lot_name, file_paths, output_path, criteria_dict, polygons, chunked, chunksize,
+                    trace_dir=None, trace_memory=False):
+    """在工作进程中处理一个批次（工作进程需要重新设置阶段记录选项）"""
+    loganalyzer_core.performance.chrome_trace_dir = trace_dir
+    loganalyzer_core.performance.set_trace_memory(trace_memory)
+    return run_lot(lot_name, file_paths, output_path, criteria_dict, polygons, 1, chunked, chunksize)
+
+
+def main(argv=None):
+    """命令行入口，返回退出码"""
+    parser = build_parser()
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as e:
+        return EXIT_OK if e.code == 0 else EXIT_USAGE
+    
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO,
+                        format='%(asctime)s %(levelname)s: %(message)s')
+    loganalyzer_core.performance.chrome_trace_dir = args.trace
+    loganalyzer_core.performance.set_trace_memory(args.trace_memory)
+    if args.jobs < 1:
+        logger.error("--jobs must be at least 1")
+        return EXIT_USAGE
+    
+    try:
+        criteria_dict = load_criteria(args.criteria)
+        polygons = load_polygons(args.colorpoint)
+    except (OSError, ValueError) as e:
+        logger.error(f"Failed to read criteria/ColorPointSpec: {str(e)}")
+        return EXIT_USAGE
+    if not criteria_dict:
+        logger.error(f"No valid Review Criteria found in {args.criteria}")
+        return EXIT_USAGE
+    
+    lots = expand_inputs(args.inputs)
+    if not lots:
+        logger.error("No log files matched the given inputs")
+        return EXIT_NO_DATA
+    
+    tasks = [(name, files, lot_output_path(args.output, name, len(lots))) for name, files in lots]
+    if len(tasks) == 1 or args.jobs == 1:
+        # 单个批次时把并行度用于读取文件
+        file_jobs = args.jobs if len(tasks) == 1 else 1
+        results = [run_lot(name, files, output, criteria_dict, polygons, file_jobs, args.chunked, args.chunksize)
+                   for name, files, output in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+            futures = [executor.submit(_run_lot_worker, name, files, output, criteria_dict, polygons,
+                                       args.chunked, args.chunksize, args.trace, args.trace_memory)
+                       for name, files, output in tasks]
+            results = [future.result() for future in futures]
+    
+    for lot_name, status, message in results:
+        if status == EXIT_OK:
+            logger.info(f"Lot {lot_name}: {message}")
+        else:
+            logger.error(f"Lot {lot_name}: {message}")
+    
+    statuses = [status for _, status, _ in results]
+    if any(status == EXIT_FAILED for status in statuses):
+        return EXIT_FAILED
+    if all(status == EXIT_NO_DATA for status in statuses):
+        return EXIT_NO_DATA
+    return EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
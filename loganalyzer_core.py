@@ -0,0 +1,4494 @@
+"""pDOT Test Log Analyzer 数据处理核心
+
+与界面无关的数据处理函数，供TestLogAnalyzer界面和批处理模式共用。
+本模块不导入tkinter。
+"""
+import codecs
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import tracemalloc
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger("TestLogAnalyzer")
+
+
+def pass_priority_key(results):
+    """向量化计算去重优先级: PASS为0，其他结果为1
+    
+    Args:
+        results: Pass/Fail列（Series）
+    
+    Returns:
+        numpy int8数组，与results逐行对应
+    """
+    normalized = results.astype(str).str.strip().str.upper()
+    return (normalized != 'PASS').to_numpy(dtype=np.int8)
+
+
+def parse_datetime_column(values):
+    """将Date/Time列解析为datetime64，无法解析的值记为NaT
+    
+    Args:
+        values: Date/Time列（Series）
+    
+    Returns:
+        datetime64类型的Series
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    import warnings
+    with warnings.catch_warnings():
+        # 日期格式无法统一推断时pandas会给出警告，逐个解析的结果仍然有效
+        warnings.simplefilter("ignore", UserWarning)
+        return pd.to_datetime(values, errors='coerce')
+
+
+def dedup_by_serial(df, serial_column='Serial Number', result_column='Pass/Fail',
+                    time_column='Date/Time', group_columns=('Config', 'Test Station')):
+    """按Serial Number去重，每个SN优先保留第一条PASS记录，没有PASS时保留第一条记录
+    
+    使用哈希分组（groupby().idxmin()）选出保留行，不对整个数据集排序，
+    结果保持原始行顺序，并重置为连续索引（行标签与行位置一致）。
+    在同一次分组中生成每个SN的测试历史，用于首次通过率（FPY）和最终良率统计。
+    
+    Args:
+        df: 待去重的DataFrame
+        serial_column: Serial Number列名
+        result_column: Pass/Fail列名，不存在时直接保留每个SN的第一条记录
+        time_column: 测试时间列名，用于确定首次测试记录和时间跨度；不存在时按行顺序
+        group_columns: 需要记录到测试历史中的分组列（取首次测试记录的值）
+    
+    Returns:
+        (去重后的DataFrame, 每个SN的测试历史DataFrame)
+        测试历史以SN为索引，包含Attempts（测试次数）、Retests（重测次数）、
+        First Result（首次测试结果）、Final Result（最终结果，任意一次PASS即为PASS，
+        与去重保留的记录一致）、First Time/Last Time（测试时间跨度）以及group_columns中存在的列
+    """
+    history_columns = ['Attempts', 'Retests', 'First Result', 'Final Result', 'First Time', 'Last Time']
+    if df is None or serial_column not in df.columns:
+        return df, pd.DataFrame(columns=history_columns)
+    
+    serials = df[serial_column].to_numpy()
+    positions = np.arange(len(df))
+    
+    if result_column in df.columns:
+        priority = pass_priority_key(df[result_column])
+    else:
+        priority = np.zeros(len(df), dtype=np.int8)
+    
+    # 首次/最后一次测试的排序依据: 优先使用测试时间，无法解析的时间排在最后
+    if time_column in df.columns:
+        times = parse_datetime_column(df[time_column])
+        valid_times = times.notna().to_numpy()
+    else:
+        times = pd.Series(pd.NaT, index=df.index, dtype='datetime64[ns]')
+        valid_times = np.zeros(len(df), dtype=bool)
+    
+    if valid_times.any():
+        time_values = times.to_numpy(dtype='datetime64[ns]').astype(np.int64)
+        first_order = np.where(valid_times, time_values, np.iinfo(np.int64).max)
+    else:
+        first_order = positions
+    
+    frame = pd.DataFrame({
+        'priority': priority,
+        'first_order': first_order,
+        'time': times.to_numpy(),
+    }, index=positions)
+    
+    # 哈希分组: idxmin返回每组第一个最小值的位置，即第一条PASS记录（或第一条记录）
+    grouped = frame.groupby(serials, sort=False, dropna=False)
+    keep_positions = grouped['priority'].idxmin()
+    first_positions = grouped['first_order'].idxmin()
+    attempts = grouped.size()
+    
+    deduped = df.iloc[np.sort(keep_positions.to_numpy())].reset_index(drop=True)
+    
+    first_priority = priority[first_positions.to_numpy()]
+    final_priority = priority[keep_positions.to_numpy()]
+    attempt_history = pd.DataFrame({
+        'Attempts': attempts.astype(np.int64),
+        'Retests': (attempts - 1).astype(np.int64),
+        'First Result': np.where(first_priority == 0, 'PASS', 'FAIL'),
+        'Final Result': np.where(final_priority == 0, 'PASS', 'FAIL'),
+        'First Time': grouped['time'].min(),
+        'Last Time': grouped['time'].max(),
+    }, index=attempts.index)
+    for column in group_columns:
+        if column in df.columns:
+            attempt_history[column] = df[column].to_numpy()[first_positions.to_numpy()]
+    attempt_history.index.name = serial_column
+    
+    return deduped, attempt_history
+
+
+def yield_summary(attempt_history, group_column=None):
+    """根据SN测试历史统计首次通过率（FPY）、最终良率和重测率
+    
+    Args:
+        attempt_history: dedup_by_serial返回的测试历史
+        group_column: 分组列（如Config、Test Station），为None时只统计总体
+    
+    Returns:
+        DataFrame，每行一个分组（总体统计时分组名为"Total"），包含
+        Units、First Pass、Final Pass、Retested Units、FPY (%)、Final Yield (%)、Retest Rate (%)
+    """
+    columns = ['Group', 'Units', 'First Pass', 'Final Pass', 'Retested Units',
+               'FPY (%)', 'Final Yield (%)', 'Retest Rate (%)']
+    if attempt_history is None or attempt_history.empty:
+        return pd.DataFrame(columns=columns)
+    if group_column is not None and group_column not in attempt_history.columns:
+        return pd.DataFrame(columns=columns)
+    
+    flags = pd.DataFrame({
+        'Units': 1,
+        'First Pass': (attempt_history['First Result'] == 'PASS').astype(np.int64),
+        'Final Pass': (attempt_history['Final Result'] == 'PASS').astype(np.int64),
+        'Retested Units': (attempt_history['Retests'] > 0).astype(np.int64),
+    }, index=attempt_history.index)
+    
+    if group_column is None:
+        summary = flags.sum().to_frame().T
+        summary.insert(0, 'Group', 'Total')
+    else:
+        keys = attempt_history[group_column].astype(str).to_numpy()
+        summary = flags.groupby(keys, sort=False).sum()
+        summary = summary.loc[sorted(summary.index, key=str)]
+        summary.insert(0, 'Group', summary.index)
+        summary = summary.reset_index(drop=True)
+    
+    units = summary['Units'].astype(float)
+    summary['FPY (%)'] = summary['First Pass'] / units * 100
+    summary['Final Yield (%)'] = summary['Final Pass'] / units * 100
+    summary['Retest Rate (%)'] = summary['Retested Units'] / units * 100
+    return summary[columns]
+
+
+# 数据处理后需要保留的特定列（其余列只保留W_M/M_M开头的列和包含点号的列）
+COLUMNS_TO_KEEP = [
+    "Model",
+    "Config",
+    "Serial Number",
+    "Test Station",
+    "Position ID",
+    "Date/Time",
+    "Pass/Fail",
+    "White L (cd/m^2)",
+    "White U (%)",
+    "White dY (%/cm)",
+    "White u Avg",
+    "White v Avg",
+    "White Ru",
+    "White Rv",
+    "White Du",
+    "White Dv",
+    "White dL*Min (%/cm)",
+    "White dL*Max (%/cm)",
+    "White dEMax (%/cm)",
+    "White Pass/Fail Criteria",
+    "Mixed L (cd/m^2)",
+    "Mixed U (%)",
+    "Mixed dY (%/cm)",
+    "Mixed u Avg",
+    "Mixed v Avg",
+    "Mixed Ru",
+    "Mixed Rv",
+    "Mixed Du",
+    "Mixed Dv",
+    "Mixed dL*Min (%/cm)",
+    "Mixed dL*Max (%/cm)",
+    "Mixed dEMax (%/cm)",
+    "Mixed Pass/Fail Criteria"
+]
+
+_METRIC_VALUE_PATTERN = re.compile(r'(White|Mixed)\s+Metric(\d+)\s+Value')
+_METRIC_GROUP_PATTERN = re.compile(r'(W_M|M_M)(\d+)')
+
+
+class ColumnSchemaPlan:
+    """列结构处理计划: 一次性编译的列重命名、保留和W_M/M_M排序结果
+    
+    Attributes:
+        positions: 输出列在原始DataFrame中的位置（已按保留规则过滤并排序）
+        columns: 输出列名，与positions一一对应
+        renamed_count: 重命名的Metric列数量
+        specific_count: 保留的特定列数量
+        pattern_count: 保留的W_M/M_M列和包含点号的列数量
+        wm_count / mm_count: 输出中W_M/M_M列的数量
+    """
+    
+    def __init__(self, positions, columns, renamed_count, specific_count, pattern_count):
+        self.positions = positions
+        self.columns = columns
+        self.renamed_count = renamed_count
+        self.specific_count = specific_count
+        self.pattern_count = pattern_count
+        self.wm_count = sum(1 for col in columns if col.startswith('W_M'))
+        self.mm_count = sum(1 for col in columns if col.startswith('M_M'))
+    
+    def apply(self, df):
+        """按计划一次性选择、排序并重命名列（单次列选取，不产生中间副本）"""
+        result = df.iloc[:, self.positions]
+        result.columns = self.columns
+        return result
+
+
+# 按表头签名缓存的列结构处理计划（Metric标签随数据变化时签名也会变化，按最近使用淘汰）
+_SCHEMA_PLAN_CACHE_SIZE = 256
+_schema_plan_cache = OrderedDict()
+_schema_plan_cache_lock = threading.Lock()
+
+
+def metric_label_positions(columns):
+    """返回需要重命名的Metric列位置及其前一列位置 [(列位置, 前一列位置或None), ...]"""
+    return [(i, i - 1 if i > 0 else None) for i, col in enumerate(columns)
+            if _METRIC_VALUE_PATTERN.match(str(col))]
+
+
+def compile_schema_plan(columns, metric_labels):
+    """编译列结构处理计划
+    
+    重命名规则: "White Metric2 Value" -> "W_M2_<前一列第一行文本>"，"Mixed Metric2 Value" -> "M_M2_<...>"，
+    前一列第一行文本只保留字母和数字；保留规则: COLUMNS_TO_KEEP中的列、W_M/M_M开头的列以及包含点号的列，
+    保持原始列顺序；排序规则: 连续的W_M、M_M列组内按编号从小到大排序，列组整体位置不变。
+    
+    Args:
+        columns: 原始列名列表
+        metric_labels: {Metric列位置: 前一列第一行文本}
+    
+    Returns:
+        ColumnSchemaPlan
+    """
+    names = [str(col) for col in columns]
+    renamed_count = 0
+    for i, col in enumerate(names):
+        match = _METRIC_VALUE_PATTERN.match(col)
+        if match:
+            prefix = 'W_M' if match.group(1) == 'White' else 'M_M'
+            label = re.sub(r'[^a-zA-Z0-9]', '', str(metric_labels.get(i, '')).strip())
+            names[i] = f'{prefix}{match.group(2)}_{label}'
+            renamed_count += 1
+    
+    # 按原始顺序筛选需要保留的列
+    keep_set = set(COLUMNS_TO_KEEP)
+    kept = []
+    specific_count = 0
+    pattern_count = 0
+    for i, col in enumerate(names):
+        if col in keep_set:
+            kept.append(i)
+            specific_count += 1
+        elif col.startswith("W_M") or col.startswith("M_M") or "." in col:
+            kept.append(i)
+            pattern_count += 1
+    
+    # W_M/M_M连续列组内按编号排序
+    def group_of(col):
+        if col.startswith('W_M'):
+            return 'W_M'
+        if col.startswith('M_M'):
+            return 'M_M'
+        return 'OTHER'
+    
+    def extract_number(position):
+        match = _METRIC_GROUP_PATTERN.search(names[position])
+        return int(match.group(2)) if match else float('inf')
+    
+    positions = []
+    run = []
+    run_group = None
+    for position in kept + [None]:
+        current_group = group_of(names[position]) if position is not None else None
+        if run and current_group != run_group:
+            if run_group in ('W_M', 'M_M'):
+                run.sort(key=extract_number)
+            positions.extend(run)
+            run = []
+        if position is not None:
+            run.append(position)
+            run_group = current_group
+    
+    return ColumnSchemaPlan(positions, [names[p] for p in positions], renamed_count, specific_count, pattern_count)
+
+
+def get_schema_plan(df):
+    """获取DataFrame对应的列结构处理计划，相同表头签名只编译一次
+    
+    表头签名由列名和Metric列前一列的第一行文本组成（重命名依赖这些文本）。
+    """
+    columns = tuple(str(col) for col in df.columns)
+    metric_labels = {}
+    if not df.empty:
+        first_row = df.iloc[0]
+        for position, prev_position in metric_label_positions(columns):
+            if prev_position is not None:
+                metric_labels[position] = str(first_row.iloc[prev_position]).strip()
+    signature = (columns, tuple(sorted(metric_labels.items())))
+    
+    with _schema_plan_cache_lock:
+        if signature in _schema_plan_cache:
+            _schema_plan_cache.move_to_end(signature)
+            return _schema_plan_cache[signature]
+    plan = compile_schema_plan(columns, metric_labels)
+    with _schema_plan_cache_lock:
+        _schema_plan_cache[signature] = plan
+        while len(_schema_plan_cache) > _SCHEMA_PLAN_CACHE_SIZE:
+            _schema_plan_cache.popitem(last=False)
+    return plan
+
+
+# 重复文本较多、适合以分类类型存储的列
+CATEGORY_COLUMNS = ('Model', 'Config', 'Test Station', 'Position ID', 'Pass/Fail', 'Fail_Reason')
+
+# 记录datetime64列原始文本格式的DataFrame.attrs键 {列名: strftime格式}
+DATETIME_FORMATS_ATTR = 'datetime_formats'
+
+# 没有记录原始格式时还原Date/Time使用的格式（与测试日志一致）
+DEFAULT_DATETIME_FORMAT = '%Y/%m/%d %H:%M:%S'
+
+
+def convert_datetime_column(df, column='Date/Time'):
+    """将时间列原地转换为datetime64（只解析一次，已转换的列直接跳过）
+    
+    只有当所有值都能按同一格式解析、且按该格式可以还原出原始文本时才替换原列，
+    避免把无法识别的时间文本变成NaT，或在显示和导出时改变日期格式。原始格式记录在
+    df.attrs[DATETIME_FORMATS_ATTR]中，由format_datetime_columns还原。
+    
+    Args:
+        df: DataFrame（原地替换该列，不复制其他列）
+        column: 时间列名
+    
+    Returns:
+        bool，该列当前是否为datetime64类型
+    """
+    if df is None or column not in df.columns:
+        return False
+    position = df.columns.get_loc(column)
+    if not isinstance(position, int):
+        return False
+    values = df.iloc[:, position]
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return True
+    if values.empty or values.isna().any():
+        return False
+    from pandas.tseries.api import guess_datetime_format
+    text = values.astype(str)
+    time_format = guess_datetime_format(text.iloc[0])
+    if time_format is None:
+        return False
+    try:
+        parsed = pd.to_datetime(text, format=time_format)
+    except (ValueError, TypeError):
+        return False
+    # 按格式输出的文本长度固定（数字补零），首行可以还原且所有文本长度一致时，整列都可以还原
+    first_text = parsed.iloc[0].strftime(time_format)
+    if first_text != text.iloc[0] or not (text.str.len() == len(first_text)).all():
+        return False
+    df.isetitem(position, parsed)
+    df.attrs.setdefault(DATETIME_FORMATS_ATTR, {})[column] = time_format
+    return True
+
+
+def format_datetime_columns(df):
+    """将datetime64列按解析前的原始文本格式还原为文本，用于数据预览和导出
+    
+    Args:
+        df: DataFrame（不修改）
+    
+    Returns:
+        没有datetime64列时返回df本身，否则返回替换了这些列的浅副本
+    """
+    if df is None:
+        return df
+    positions = [position for position, dtype in enumerate(df.dtypes)
+                 if pd.api.types.is_datetime64_any_dtype(dtype)]
+    if not positions:
+        return df
+    formats = df.attrs.get(DATETIME_FORMATS_ATTR, {})
+    result = df.copy(deep=False)
+    for position in positions:
+        time_format = formats.get(df.columns[position], DEFAULT_DATETIME_FORMAT)
+        result.isetitem(position, result.iloc[:, position].dt.strftime(time_format))
+    return result
+
+
+def optimize_dtypes(df, category_columns=CATEGORY_COLUMNS, time_column='Date/Time', max_category_ratio=0.5):
+    """原地优化DataFrame列类型以降低内存占用
+    
+    - category_columns中的文本列在重复值较多时（不同值数量不超过行数的max_category_ratio）转换为category
+    - 数值列保持float64: 日志中的小数（如0.1）在float32中没有精确表示，而规格判断使用rel_tol=1e-9的近似比较，
+      降为float32（相对误差约6e-8）会改变边界值的判定结果
+    - 时间列解析为datetime64（原始文本格式记录在df.attrs中，显示和导出时由format_datetime_columns还原）
+    
+    Args:
+        df: 待优化的DataFrame（逐列替换，不复制整个数据集）
+        category_columns: 需要尝试转换为category的列名
+        time_column: 时间列名
+        max_category_ratio: 转换为category的最大不同值比例
+    
+    Returns:
+        (df, 优化报告字典)，报告包含before/after（字节数）以及categorical、datetime列名列表
+    """
+    report = {'before': 0, 'after': 0, 'categorical': [], 'datetime': []}
+    if df is None or df.empty:
+        return df, report
+    
+    report['before'] = int(df.memory_usage(deep=True).sum())
+    category_set = set(category_columns)
+    
+    if convert_datetime_column(df, time_column):
+        report['datetime'].append(time_column)
+    
+    for position, column in enumerate(df.columns):
+        if column not in category_set:
+            continue
+        values = df.iloc[:, position]
+        dtype = values.dtype
+        if isinstance(dtype, pd.CategoricalDtype) or pd.api.types.is_numeric_dtype(dtype) \
+                or pd.api.types.is_datetime64_any_dtype(dtype):
+            continue
+        if values.nunique(dropna=False) > max(1, len(values) * max_category_ratio):
+            continue
+        try:
+            df.isetitem(position, values.astype('category'))
+            report['categorical'].append(column)
+        except (TypeError, ValueError):
+            # 混合类型无法排序等情况保持原样
+            pass
+    
+    report['after'] = int(df.memory_usage(deep=True).sum())
+    return df, report
+
+
+# 未配置ColorPointSpec时使用的默认CAFL0（White）和CAFL24（Mixed）多边形
+DEFAULT_CAFL0_POLYGON = [
+    (0.183000, 0.461000),
+    (0.193500, 0.455000),
+    (0.196780, 0.461590),
+    (0.203090, 0.458130),
+    (0.209100, 0.469180),
+    (0.189200, 0.478400)
+]
+DEFAULT_CAFL24_POLYGON = [
+    (0.242700, 0.513900),
+    (0.222600, 0.522200),
+    (0.234200, 0.539600),
+    (0.253900, 0.532500)
+]
+
+# 色点多边形判定使用的u/v列及对应的Top Defects显示名称
+COLOR_POINT_COLUMNS = {
+    'White': ('White u Avg', 'White v Avg', 'CAFL0 Color Point'),
+    'Mixed': ('Mixed u Avg', 'Mixed v Avg', 'CAFL24 Color Point'),
+}
+
+
+# 流式解压读取的压缩日志扩展名
+COMPRESSED_LOG_EXTENSIONS = ('.gz', '.bz2', '.xz')
+
+# 日志归档扩展名，其中的CSV成员以"归档.zip/成员.csv"形式的路径表示
+ARCHIVE_LOG_EXTENSIONS = ('.zip',)
+
+# 并行解压读取压缩日志和归档成员的线程数
+DEFAULT_DECOMPRESS_WORKERS = 4
+
+_ARCHIVE_MEMBER_PATH = re.compile(r'\.zip[\\/]', re.IGNORECASE)
+
+# 归档成员列表缓存 {归档路径: ((大小, 修改时间ns), {成员名: (解压后大小, CRC)})}
+_archive_members_cache = {}
+_archive_members_cache_lock = threading.Lock()
+
+
+def split_archive_path(file_path):
+    """拆分zip成员路径
+    
+    Returns:
+        (归档路径, 成员名)，file_path不是zip成员路径时为 (file_path, None)
+    """
+    for match in _ARCHIVE_MEMBER_PATH.finditer(file_path):
+        archive_path = file_path[:match.end() - 1]
+        if os.path.isfile(archive_path):
+            return archive_path, file_path[match.end():].replace('\\', '/')
+    return file_path, None
+
+
+def archive_members(archive_path):
+    """zip归档中的文件成员（按归档的大小和修改时间缓存）
+    
+    Returns:
+        {成员名: (解压后大小, CRC)}
+    """
+    import zipfile
+    
+    stat = os.stat(archive_path)
+    state = (stat.st_size, stat.st_mtime_ns)
+    with _archive_members_cache_lock:
+        cached = _archive_members_cache.get(archive_path)
+    if cached is not None and cached[0] == state:
+        return cached[1]
+    # 读取归档目录时不持有锁，其它线程可以同时读取别的归档
+    with zipfile.ZipFile(archive_path) as archive:
+        members = {info.filename: (info.file_size, info.CRC) for info in archive.infolist() if not info.is_dir()}
+    with _archive_members_cache_lock:
+        _archive_members_cache[archive_path] = (state, members)
+    return members
+
+
+def log_file_name(file_name):
+    """去掉压缩扩展名后的日志文件名（"x.csv.gz" -> "x.csv"），用于按扩展名和通配符匹配"""
+    lower = file_name.lower()
+    for extension in COMPRESSED_LOG_EXTENSIONS:
+        if lower.endswith(extension):
+            return file_name[:-len(extension)]
+    return file_name
+
+
+def is_compressed_log(file_path):
+    """文件是否需要解压读取（.gz/.bz2/.xz文件或zip成员）"""
+    return file_path.lower().endswith(COMPRESSED_LOG_EXTENSIONS) or split_archive_path(file_path)[1] is not None
+
+
+def expand_log_paths(file_paths, extensions=('.csv',)):
+    """把zip归档展开为其中日志成员的路径（"归档.zip/成员.csv"，按成员名排序），其它路径不变
+    
+    Args:
+        file_paths: 文件路径列表
+        extensions: 归档中作为日志读取的成员扩展名（去掉压缩扩展名后比较，不区分大小写）
+    
+    Returns:
+        路径列表（无法读取的归档记录警告后跳过）
+    """
+    extensions = tuple(extension.lower() for extension in extensions)
+    expanded = []
+    for file_path in file_paths:
+        if not file_path.lower().endswith(ARCHIVE_LOG_EXTENSIONS) or not os.path.isfile(file_path):
+            expanded.append(file_path)
+            continue
+        try:
+            members = archive_members(file_path)
+        except Exception as e:
+            logger.warning(f"读取归档{file_path}时出错: {str(e)}")
+            continue
+        expanded.extend(os.path.join(file_path, name) for name in sorted(members)
+                        if log_file_name(name).lower().endswith(extensions))
+    return expanded
+
+
+def open_log_file(file_path, mode='rb', encoding='utf-8', errors=None):
+    """打开日志文件: .gz/.bz2/.xz文件和zip成员流式解压，不需要先解压到磁盘
+    
+    Args:
+        file_path: 文件路径或zip成员路径
+        mode: 'rb'（字节）或'r'（按encoding解码的文本）
+        encoding / errors: 文本模式的编码和错误处理方式
+    
+    Returns:
+        文件对象
+    """
+    import io
+    
+    archive_path, member = split_archive_path(file_path)
+    lower = file_path.lower()
+    if member is not None:
+        import zipfile
+        
+        # 成员文件关闭时才关闭归档文件
+        with zipfile.ZipFile(archive_path) as archive:
+            raw = archive.open(member)
+    elif lower.endswith('.gz'):
+        import gzip
+        raw = gzip.open(file_path, 'rb')
+    elif lower.endswith('.bz2'):
+        import bz2
+        raw = bz2.open(file_path, 'rb')
+    elif lower.endswith('.xz'):
+        import lzma
+        raw = lzma.open(file_path, 'rb')
+    elif mode == 'r':
+        return open(file_path, 'r', encoding=encoding, errors=errors)
+    else:
+        return open(file_path, 'rb')
+    return io.TextIOWrapper(raw, encoding=encoding, errors=errors) if mode == 'r' else raw
+
+
+def read_log_csv(file_path, encoding='utf-8', **kwargs):
+    """pd.read_csv的包装，读取压缩日志和zip成员（参数与pd.read_csv相同，不支持chunksize）
+    
+    压缩内容先一次解压到内存再解析: 整块解压比解析器逐行读取解压流快，
+    并且解压时释放GIL，多个文件在线程中并行读取时解压与其它文件的解析重叠。
+    """
+    import io
+    
+    if not is_compressed_log(file_path):
+        return pd.read_csv(file_path, encoding=encoding, **kwargs)
+    with open_log_file(file_path) as f:
+        data = f.read()
+    return pd.read_csv(io.BytesIO(data), encoding=encoding, **kwargs)
+
+
+class LogHeader:
+    """CSV测试日志的表头探测结果
+    
+    Attributes:
+        header_line_index: 数据标题行所在行号（从0开始）
+        max_commas: 标题行的逗号数量
+        metadata_count: 标题行之前识别出的元数据行数量
+        encoding: 文件编码（sniff_log_header检测或指定的编码）
+    """
+    
+    def __init__(self, header_line_index, max_commas, metadata_count, encoding='utf-8'):
+        self.header_line_index = header_line_index
+        self.max_commas = max_commas
+        self.metadata_count = metadata_count
+        self.encoding = encoding
+    
+    @property
+    def has_header(self):
+        """逗号数足够多（至少10列）时认为找到了明显的标题行"""
+        return self.max_commas >= 9
+    
+    @property
+    def skiprows(self):
+        """read_csv需要跳过的说明性行数"""
+        return self.header_line_index if self.has_header else 0
+
+
+def detect_header_line(lines):
+    """在文件开头的若干行中识别数据标题行
+    
+    元数据行（"键:,值"形式）被排除，在剩余的非空行中选择逗号最多、
+    包含字母且内容最长的行作为标题行。
+    
+    Args:
+        lines: 文件开头的文本行（已去除首尾空白）
+    
+    Returns:
+        LogHeader
+    """
+    metadata_lines = []
+    non_metadata_lines = []
+    for i, line in enumerate(lines):
+        is_metadata = False
+        if ',:' in line or (':' in line and ',' in line):
+            is_metadata = True
+        elif line.strip() and i < 10 and not (line.startswith('Model') or line.startswith('Serial Number')):
+            content_parts = [p.strip() for p in line.split(',') if p.strip()]
+            if content_parts and ':' in content_parts[0]:
+                is_metadata = True
+        if is_metadata:
+            metadata_lines.append(i)
+        else:
+            non_metadata_lines.append((i, line))
+    
+    max_commas = -1
+    header_line_index = 0
+    non_empty_non_metadata = [(i, line) for i, line in non_metadata_lines if line.strip()]
+    if non_empty_non_metadata:
+        max_commas = max(line.count(',') for i, line in non_empty_non_metadata)
+        best_score = -1
+        for i, line in non_empty_non_metadata:
+            if line.count(',') != max_commas:
+                continue
+            score = 1
+            if any(c.isalpha() for c in line):
+                score += 10
+            score += min(len(line.replace(',', '')), 50)
+            if score > best_score:
+                best_score = score
+                header_line_index = i
+    else:
+        candidates = non_metadata_lines if non_metadata_lines else list(enumerate(lines))
+        for i, line in candidates:
+            comma_count = line.count(',')
+            if comma_count > max_commas:
+                max_commas = comma_count
+                header_line_index = i
+    
+    # 标题行为空时使用后续第一个非空行
+    if header_line_index < len(lines) and lines[header_line_index].strip() == '':
+        for i in range(header_line_index + 1, min(len(lines), header_line_index + 10)):
+            if lines[i].strip() != '':
+                header_line_index = i
+                max_commas = lines[i].count(',')
+                break
+    
+    return LogHeader(header_line_index, max_commas, len(metadata_lines))
+
+
+# 编码检测和表头识别读取的文件开头字节数（不足max_lines行时继续读取）
+ENCODING_SAMPLE_BYTES = 64 * 1024
+
+# 没有BOM时依次尝试的编码（GB18030兼容GBK），都不能解码时使用ENCODING_FALLBACK
+ENCODING_CANDIDATES = ('utf-8', 'gb18030')
+ENCODING_FALLBACK = 'latin-1'
+
+# BOM及对应的编码（UTF-32 LE的BOM以UTF-16 LE的BOM开头，需要先判断）
+_ENCODING_BOMS = (
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+# sniff_log_header的结果缓存 {(文件签名, max_lines, 指定的编码): LogHeader}
+_HEADER_CACHE_SIZE = 1024
+_header_cache = OrderedDict()
+_header_cache_lock = threading.Lock()
+
+
+def clear_header_cache():
+    """清空sniff_log_header的结果缓存（基准测试计时，或文件在签名不变的情况下被替换时使用）"""
+    with _header_cache_lock:
+        _header_cache.clear()
+
+
+def detect_encoding(sample):
+    """由文件开头的字节判断编码
+    
+    依次使用: BOM；零字节集中在奇数或偶数位置时为无BOM的UTF-16；能完整解码样本的第一个ENCODING_CANDIDATES
+    （样本末尾被截断的多字节字符不算解码错误）；最后为ENCODING_FALLBACK。
+    
+    Args:
+        sample: 文件开头的字节
+    
+    Returns:
+        编码名称
+    """
+    for bom, encoding in _ENCODING_BOMS:
+        if sample.startswith(bom):
+            return encoding
+    if len(sample) >= 4:
+        half = len(sample) // 2
+        even_zeros = sample[0::2].count(0)
+        odd_zeros = sample[1::2].count(0)
+        if odd_zeros > half * 0.3 and even_zeros < half * 0.05:
+            return 'utf-16-le'
+        if even_zeros > half * 0.3 and odd_zeros < half * 0.05:
+            return 'utf-16-be'
+    for encoding in ENCODING_CANDIDATES:
+        try:
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return ENCODING_FALLBACK
+
+
+def fallback_encodings(encoding):
+    """检测到的编码在文件后部解码失败时依次尝试的编码（检测样本之后才出现的非ASCII字符可能不符合检测结果）
+    
+    Returns:
+        ENCODING_CANDIDATES中encoding之后的编码和ENCODING_FALLBACK；encoding不是候选编码（BOM或UTF-16）时为空列表
+    """
+    if encoding not in ENCODING_CANDIDATES:
+        return []
+    return list(ENCODING_CANDIDATES[ENCODING_CANDIDATES.index(encoding) + 1:]) + [ENCODING_FALLBACK]
+
+
+def read_log_text(file_path, candidates):
+    """读取整个日志，用candidates中第一个能解码全部内容的编码解码
+    
+    文件只读取一次，逐个编码解码内存中的字节（解码失败在第一个无效字节处停止），不需要按每个编码重新解析CSV。
+    
+    Returns:
+        (文本, 使用的编码)
+    
+    Raises:
+        UnicodeDecodeError: 所有编码都无法解码
+    """
+    with open_log_file(file_path) as f:
+        data = f.read()
+    for i, candidate in enumerate(candidates):
+        try:
+            return data.decode(candidate), candidate
+        except UnicodeDecodeError:
+            if i == len(candidates) - 1:
+                raise
+            logger.warning(f"{os.path.basename(file_path)}: {candidate}解码失败，改用{candidates[i + 1]}")
+
+
+def is_wide_encoding(encoding):
+    """编码的换行符不是单字节（UTF-16/UTF-32），不能按字节行读取"""
+    return codecs.lookup(encoding).name.startswith(('utf-16', 'utf-32'))
+
+
+def _read_head_lines(file_path, count, encoding=None):
+    """读取文件开头count行（一次读取，编码检测和行解码使用同一份字节）
+    
+    Args:
+        encoding: 文件编码，为None时由开头的字节检测
+    
+    Returns:
+        (去除首尾空白的行列表, 编码)
+    """
+    with open_log_file(file_path) as f:
+        chunk = f.read(ENCODING_SAMPLE_BYTES)
+        encoding = encoding or detect_encoding(chunk)
+        decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        text = ''
+        while chunk:
+            text += decoder.decode(chunk)
+            if text.count('\n') >= count or text.count('\r') >= count:
+                break
+            chunk = f.read(ENCODING_SAMPLE_BYTES)
+        else:
+            text += decoder.decode(b'', final=True)
+    lines = text.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+    if lines and lines[-1] == '':
+        lines.pop()
+    return [line.strip() for line in lines[:count]], encoding
+
+
+def sniff_log_header(file_path, max_lines=20, encoding=None):
+    """读取文件开头max_lines行，检测编码并识别数据标题行
+    
+    编码和标题行由同一次读取的开头字节得到，结果按文件签名缓存，同一文件的预览、元数据和读取只检测一次。
+    
+    Args:
+        encoding: 文件编码，为None时检测（见detect_encoding）
+    
+    Returns:
+        LogHeader（encoding为之后读取文件使用的编码）
+    """
+    key = (file_signature(file_path), max_lines, encoding)
+    with _header_cache_lock:
+        if key in _header_cache:
+            _header_cache.move_to_end(key)
+            return _header_cache[key]
+    with span("header_sniff"):
+        lines, encoding = _read_head_lines(file_path, max_lines, encoding)
+        header = detect_header_line(lines)
+        header.encoding = encoding
+    with _header_cache_lock:
+        _header_cache[key] = header
+        while len(_header_cache) > _HEADER_CACHE_SIZE:
+            _header_cache.popitem(last=False)
+    return header
+
+
+# 文件预览默认读取的数据行数
+DEFAULT_PREVIEW_ROWS = 5
+
+
+class LogPreview:
+    """只读取表头和开头若干行（或随机抽样行）的日志预览
+    
+    Attributes:
+        file_path: 文件路径
+        header: sniff_log_header的结果
+        df: 已读取的数据行（与load_log_file相同的读取参数，未做Config和Serial Number处理）
+        complete: 是否已读到文件末尾
+        offset: 下一次继续读取的字节位置
+        sampled: df是否为随机抽样的行
+        signature: 读取时的file_signature，文件改变后预览失效
+        total_rows: 抽样时扫描得到的非空数据行数，其它情况为None
+        encoding: 解析已读取字节使用的编码（UTF-16/UTF-32日志转码为UTF-8后读取，见_open_log_lines）
+    """
+    
+    def __init__(self, file_path, header, header_line, df, offset, complete, data_start, signature, sampled=False,
+                 total_rows=None, encoding='utf-8'):
+        self.file_path = file_path
+        self.header = header
+        self.header_line = header_line
+        self.df = df
+        self.offset = offset
+        self.complete = complete
+        self.data_start = data_start
+        self.signature = signature
+        self.sampled = sampled
+        self.total_rows = total_rows
+        self.encoding = encoding
+    
+    @property
+    def estimated_rows(self):
+        """文件的数据行数: 已读到末尾时为实际行数，抽样时为扫描得到的行数，否则按已读行的平均字节数估算"""
+        if self.sampled:
+            return self.total_rows
+        if self.complete:
+            return len(self.df)
+        read_rows = len(self.df)
+        read_bytes = self.offset - self.data_start
+        # 压缩文件的大小不是解压后的大小，无法估算
+        if read_rows == 0 or read_bytes <= 0 or self.file_path.lower().endswith(COMPRESSED_LOG_EXTENSIONS):
+            return None
+        return int(round((self.signature[1] - self.data_start) / (read_bytes / read_rows)))
+    
+    def is_current(self):
+        """文件自读取后没有改变"""
+        try:
+            return file_signature(self.file_path) == self.signature
+        except OSError:
+            return False
+
+
+def _open_log_lines(file_path, encoding):
+    """以字节方式打开日志，用于按行读取和按字节位置定位
+    
+    UTF-16/UTF-32日志的换行不是单字节，一次转码为内存中的UTF-8字节后读取。
+    
+    Returns:
+        (文件对象, 解析这些字节使用的编码)
+    """
+    import io
+    
+    if is_wide_encoding(encoding):
+        with open_log_file(file_path, 'r', encoding=encoding) as f:
+            return io.BytesIO(f.read().encode('utf-8')), 'utf-8'
+    return open_log_file(file_path), encoding
+
+
+def _parse_preview_lines(header_line, lines, encoding):
+    """用与load_log_file相同的参数解析表头行和数据行"""
+    import io
+    
+    return pd.read_csv(io.BytesIO(header_line + b''.join(lines)),
+                       on_bad_lines='skip',
+                       engine='python',
+                       encoding=encoding)
+
+
+def _read_lines(f, count):
+    """从f读取最多count行（count为None时读到末尾），返回 (行列表, 是否到达末尾)"""
+    lines = []
+    while count is None or len(lines) < count:
+        line = f.readline()
+        if not line:
+            return lines, True
+        lines.append(line if line.endswith(b'\n') else line + b'\n')
+    # 下一个字节为空说明刚好读完
+    position = f.tell()
+    at_end = not f.read(1)
+    f.seek(position)
+    return lines, at_end
+
+
+def read_log_preview(file_path, rows=DEFAULT_PREVIEW_ROWS, sample=False, header=None, encoding=None, seed=None):
+    """只读取表头和前rows行（或均匀随机抽样的rows行），读取时间取决于rows而不是文件大小
+    
+    Args:
+        file_path: 日志文件路径
+        rows: 读取的数据行数，为None时读取全部
+        sample: 为True时对数据行的起始字节位置做蓄水池抽样（需要扫描一遍文件，但只解析抽中的行）
+        header: 已识别的LogHeader，为None时调用sniff_log_header
+        encoding: 文件编码，为None时检测（header已给出时使用header.encoding）
+        seed: 抽样的随机数种子
+    
+    Returns:
+        LogPreview
+    """
+    signature = file_signature(file_path)
+    if header is None:
+        header = sniff_log_header(file_path, encoding=encoding)
+    with span("preview_read") as stage:
+        f, encoding = _open_log_lines(file_path, header.encoding)
+        with f:
+            for _ in range(header.skiprows):
+                f.readline()
+            header_line = f.readline()
+            if not header_line.endswith(b'\n'):
+                header_line += b'\n'
+            data_start = f.tell()
+            total_rows = None
+            if sample and rows is not None:
+                lines, total_rows = _reservoir_sample_lines(f, rows, seed)
+                offset, complete = f.tell(), True
+            else:
+                lines, complete = _read_lines(f, rows)
+                offset = f.tell()
+        df = _parse_preview_lines(header_line, lines, encoding)
+        stage.rows = len(df)
+    return LogPreview(file_path, header, header_line, df, offset, complete, data_start, signature,
+                      sampled=total_rows is not None, total_rows=total_rows, encoding=encoding)
+
+
+def _reservoir_sample_lines(f, count, seed=None):
+    """蓄水池抽样: 扫描f剩余的行，只保留抽中行的起始字节位置，最后按文件顺序读取这些行
+    
+    Returns:
+        (抽中的行列表, 非空数据行总数)
+    """
+    import random
+    
+    rng = random.Random(seed)
+    offsets = []
+    seen = 0
+    position = f.tell()
+    for line in f:
+        if line.strip():
+            if seen < count:
+                offsets.append(position)
+            else:
+                slot = rng.randrange(seen + 1)
+                if slot < count:
+                    offsets[slot] = position
+            seen += 1
+        position += len(line)
+    
+    lines = []
+    for offset in sorted(offsets):
+        f.seek(offset)
+        line = f.readline()
+        lines.append(line if line.endswith(b'\n') else line + b'\n')
+    f.seek(0, 2)
+    return lines, seen
+
+
+def read_more_preview_rows(preview, rows=None):
+    """从上次读取的位置继续读取rows行（None为读到末尾）并追加到preview.df
+    
+    抽样预览或已读到末尾时不做处理。文件已改变时抛出ValueError（需要重新调用read_log_preview）。
+    
+    Returns:
+        追加的行数
+    """
+    if preview.complete or preview.sampled:
+        return 0
+    if not preview.is_current():
+        raise ValueError(f"{preview.file_path} changed since it was previewed")
+    with span("preview_read") as stage:
+        f, _ = _open_log_lines(preview.file_path, preview.header.encoding)
+        with f:
+            f.seek(preview.offset)
+            lines, preview.complete = _read_lines(f, rows)
+            preview.offset = f.tell()
+        if lines:
+            more = _parse_preview_lines(preview.header_line, lines, preview.encoding)
+            more.index = more.index + len(preview.df)
+            preview.df = pd.concat([preview.df, more]) if len(preview.df) else more
+        stage.rows = len(lines)
+    return len(lines)
+
+
+def _stream_decompressor(file_path):
+    """可以分段输入压缩数据的解压器（.gz/.bz2/.xz），其它文件返回None"""
+    lower = file_path.lower()
+    if lower.endswith('.gz'):
+        import zlib
+        return zlib.decompressobj(zlib.MAX_WBITS | 16)
+    if lower.endswith('.bz2'):
+        import bz2
+        return bz2.BZ2Decompressor()
+    if lower.endswith('.xz'):
+        import lzma
+        return lzma.LZMADecompressor()
+    return None
+
+
+class LogTail:
+    """持续追加的日志文件的增量读取状态（类似tail -f）
+    
+    表头只识别一次，之后每次从上次读取的字节位置继续读取，只解析以换行结束的完整行；
+    最后一行还没有写完时先缓存，下次读取时与后续内容拼接。解析参数与文件预览相同。
+    
+    每次只读取文件新增的原始字节: .gz/.bz2/.xz日志保留解压器的状态继续解压追加的数据（多个gzip成员依次解压），
+    UTF-16/UTF-32日志保留增量解码器的状态（行可能在多字节字符中间断开），转码为UTF-8后按字节行解析。
+    zip成员不能追加写入，成员改变即视为重写。
+    
+    Attributes:
+        file_path: 文件路径
+        encoding: 指定的文件编码，为None时检测
+        header: sniff_log_header的结果，还没有写入标题行时为None
+        header_line: 标题行原始内容（bytes，UTF-16/UTF-32日志为转码后的UTF-8）
+        offset: 下一次读取的文件字节位置（压缩文件为压缩数据的位置）
+        partial: 已读取但还没有换行结束的最后一行（bytes）
+        rows: 已解析的数据行数
+    """
+    
+    def __init__(self, file_path, encoding=None):
+        self.file_path = file_path
+        self.encoding = encoding
+        self.header = None
+        self.header_line = b''
+        self.offset = 0
+        self.partial = b''
+        self.rows = 0
+        self._decompressor = None
+        self._decoder = None
+        self._signature = None
+    
+    def _start(self, header):
+        """从文件开头重新读取（标题行还没有完整写入时每次都从头读取）"""
+        self.offset = 0
+        self.partial = b''
+        self._signature = None
+        self._decompressor = _stream_decompressor(self.file_path)
+        self._decoder = codecs.getincrementaldecoder(header.encoding)() if is_wide_encoding(header.encoding) else None
+    
+    def _read_header(self, data, header):
+        """从开头的内容中取出标题行，返回其后的内容；标题行还没有完整写入时返回None"""
+        start = 0
+        for _ in range(header.skiprows + 1):
+            end = data.find(b'\n', start) + 1
+            if not end:
+                return None
+            line_start, start = start, end
+        self.header = header
+        self.header_line = data[line_start:start]
+        return data[start:]
+    
+    def _decompress(self, data):
+        """解压新读取的压缩数据，一个gzip成员（或bz2/xz流）结束后用新的解压器继续解压后面的数据"""
+        out = []
+        while data:
+            out.append(self._decompressor.decompress(data))
+            if not self._decompressor.eof:
+                break
+            data = self._decompressor.unused_data
+            self._decompressor = _stream_decompressor(self.file_path)
+        return b''.join(out)
+    
+    def _read_new_bytes(self):
+        """读取上次读取之后追加的内容（已解压，UTF-16/UTF-32已转码为UTF-8）"""
+        if split_archive_path(self.file_path)[1] is not None:
+            signature = file_signature(self.file_path)
+            if self._signature is None:
+                with open_log_file(self.file_path) as f:
+                    data = f.read()
+                self._signature = signature
+            elif signature != self._signature:
+                raise ValueError(f"{self.file_path} changed since it was read")
+            else:
+                data = b''
+        else:
+            with open(self.file_path, 'rb') as f:
+                if f.seek(0, 2) < self.offset:
+                    raise ValueError(f"{self.file_path} is shorter than the position already read")
+                f.seek(self.offset)
+                data = f.read()
+            self.offset += len(data)
+            if self._decompressor is not None:
+                data = self._decompress(data)
+        if self._decoder is not None:
+            data = self._decoder.decode(data).encode('utf-8')
+        return data
+    
+    def read_new_rows(self):
+        """读取上次读取之后追加的完整行
+        
+        Returns:
+            新行的DataFrame（没有新的完整行时为空DataFrame，列与标题行一致）
+        
+        Raises:
+            ValueError: 文件比已读取的位置短或zip成员已改变（被截断或重写）
+        """
+        with span("tail_read") as stage:
+            header = self.header or sniff_log_header(self.file_path, encoding=self.encoding)
+            if not header.has_header:
+                return pd.DataFrame()
+            if self.header is None:
+                self._start(header)
+            data = self.partial + self._read_new_bytes()
+            if self.header is None:
+                data = self._read_header(data, header)
+                if data is None:
+                    return pd.DataFrame()
+            end = data.rfind(b'\n') + 1
+            self.partial = data[end:]
+            encoding = 'utf-8' if self._decoder is not None else header.encoding
+            df = _parse_preview_lines(self.header_line, [data[:end]], encoding)
+            self.rows += len(df)
+            stage.rows = len(df)
+        return df
+
+
+def read_preview_with_values(file_path, columns, rows=100, encoding=None):
+    """读取开头rows行的预览，columns中存在的列在这些行中全为空时继续读取到文件末尾
+    （只需要各列第一个非空值时使用，例如规格字符串列）
+    
+    Returns:
+        LogPreview
+    """
+    preview = read_log_preview(file_path, rows, encoding=encoding)
+    present = [column for column in columns if column in preview.df.columns]
+    if any(preview.df[column].isna().all() for column in present):
+        read_more_preview_rows(preview)
+    return preview
+
+
+def config_from_file_name(file_name):
+    """从文件名解析Config: 优先识别MP/PVT标识，否则取第二和第三个空格之间的文本"""
+    if "MP" in file_name:
+        return "MP"
+    if "PVT" in file_name:
+        return "PVT"
+    parts = file_name.split(' ')
+    return parts[2] if len(parts) >= 4 else "Unknown"
+
+
+def apply_file_config(df, config):
+    """将第二列替换为文件名解析出的Config并将标题改为"Config"（第二列标题已是Config时保留原数据）"""
+    if df.empty:
+        return df
+    if len(df.columns) >= 2:
+        if df.columns[1] != 'Config':
+            df.isetitem(1, pd.Series(config, index=df.index, dtype=object))
+        columns = list(df.columns)
+        columns[1] = 'Config'
+        df.columns = columns
+    else:
+        df['Config'] = config
+    return df
+
+
+def read_log_metadata(file_path, max_lines=20, encoding=None):
+    """读取日志开头的元数据（"键:,值"行）以及标题行后第一条数据的Test Station和Date/Time
+    
+    Returns:
+        {'metadata': {键: 值}, 'station': 测试站或None, 'date': datetime.date或None}
+        （元数据和第一条数据都没有日期时使用文件修改时间）
+    """
+    import csv
+    import datetime
+    
+    lines, _ = _read_head_lines(file_path, max_lines + 1, encoding)
+    header = detect_header_line(lines[:max_lines])
+    
+    metadata = {}
+    for line in lines[:header.skiprows]:
+        key, _, value = line.partition(',')
+        if key.strip().endswith(':'):
+            metadata[key.strip().rstrip(':').strip()] = value.strip().strip(',').strip()
+    first_row = {}
+    if header.has_header:
+        rows = [line for line in lines[header.header_line_index:] if line]
+        if len(rows) >= 2:
+            columns, values = list(csv.reader(rows[:2]))
+            first_row = dict(zip((column.strip() for column in columns), values))
+    
+    station = next((value for key, value in metadata.items() if 'station' in key.lower() and value), None)
+    station = station or first_row.get('Test Station') or None
+    date_text = next((value for key, value in metadata.items()
+                      if ('time' in key.lower() or 'date' in key.lower()) and value), None)
+    date_text = date_text or first_row.get('Date/Time')
+    date = pd.to_datetime(date_text, errors='coerce') if date_text else pd.NaT
+    if pd.isna(date):
+        date = datetime.datetime.fromtimestamp(file_signature(file_path)[2] / 1e9)
+    return {'metadata': metadata, 'station': station, 'date': date.date()}
+
+
+class FileListModel:
+    """已加载文件列表的数据模型（与界面无关）
+    
+    按加载顺序保存文件路径和勾选状态，编号为在列表中的位置（从1开始）。
+    测试站和日期在第一次需要时才读取文件开头（read_log_metadata）并缓存，
+    按通配符/测试站/日期筛选和批量勾选只操作Python数据，界面只刷新可见的行。
+    """
+    
+    def __init__(self):
+        self._checked = {}
+        self._metadata = {}
+        self._numbers = None
+        self.version = 0
+    
+    def __len__(self):
+        return len(self._checked)
+    
+    def __contains__(self, file_path):
+        return file_path in self._checked
+    
+    def paths(self):
+        return list(self._checked)
+    
+    def selected_paths(self):
+        return [path for path, checked in self._checked.items() if checked]
+    
+    def is_checked(self, file_path):
+        return self._checked.get(file_path, False)
+    
+    def number(self, file_path):
+        """文件在列表中的编号（从1开始），不在列表中时为None"""
+        if self._numbers is None:
+            self._numbers = {path: i for i, path in enumerate(self._checked, 1)}
+        return self._numbers.get(file_path)
+    
+    def add(self, file_paths, checked=True):
+        """追加文件（已在列表中的跳过）
+        
+        Returns:
+            新加入的文件路径列表
+        """
+        added = []
+        for file_path in file_paths:
+            if file_path not in self._checked:
+                self._checked[file_path] = checked
+                added.append(file_path)
+        if added:
+            self._numbers = None
+            self.version += 1
+        return added
+    
+    def remove(self, file_paths):
+        """移除文件，返回移除的数量"""
+        removed = 0
+        for file_path in file_paths:
+            if self._checked.pop(file_path, None) is not None:
+                self._metadata.pop(file_path, None)
+                removed += 1
+        if removed:
+            self._numbers = None
+            self.version += 1
+        return removed
+    
+    def clear(self):
+        self._checked.clear()
+        self._metadata.clear()
+        self._numbers = None
+        self.version += 1
+    
+    def set_checked(self, file_paths, checked):
+        """设置勾选状态，返回状态改变的文件数量"""
+        changed = 0
+        for file_path in file_paths:
+            if file_path in self._checked and self._checked[file_path] != checked:
+                self._checked[file_path] = checked
+                changed += 1
+        if changed:
+            self.version += 1
+        return changed
+    
+    def toggle(self, file_path):
+        self.set_checked([file_path], not self.is_checked(file_path))
+        return self.is_checked(file_path)
+    
+    def all_checked(self, file_paths=None):
+        file_paths = self._checked if file_paths is None else file_paths
+        return all(self._checked.get(path, False) for path in file_paths)
+    
+    def metadata(self, file_path):
+        """文件的测试站和日期（read_log_metadata的结果），读取失败时为空值"""
+        info = self._metadata.get(file_path)
+        if info is None:
+            try:
+                info = read_log_metadata(file_path)
+            except (OSError, ValueError) as e:
+                logger.warning(f"读取{file_path}的元数据时出错: {str(e)}")
+                info = {'metadata': {}, 'station': None, 'date': None}
+            self._metadata[file_path] = info
+        return info
+    
+    def match(self, pattern=None, station=None, date_from=None, date_to=None):
+        """按条件筛选文件，返回按列表顺序的文件路径
+        
+        Args:
+            pattern: 文件名通配符（不区分大小写，如"*DVT*.csv"），为空时不筛选
+            station: 测试站（不区分大小写的子串），为空时不筛选
+            date_from: 起始日期（datetime.date，包含），为None时不限制
+            date_to: 结束日期（datetime.date，包含），为None时不限制
+        """
+        import fnmatch
+        
+        paths = list(self._checked)
+        if pattern:
+            regex = re.compile(fnmatch.translate(pattern.lower()))
+            paths = [path for path in paths if regex.match(os.path.basename(path).lower())]
+        if station:
+            station = station.lower()
+            paths = [path for path in paths if station in (self.metadata(path)['station'] or '').lower()]
+        if date_from is not None or date_to is not None:
+            def in_range(path):
+                date = self.metadata(path)['date']
+                return date is not None and (date_from is None or date >= date_from) \
+                    and (date_to is None or date <= date_to)
+            paths = [path for path in paths if in_range(path)]
+        return paths
+
+
+# 当前用户的应用缓存目录名
+APP_CACHE_DIR_NAME = 'TestLogAnalyzer'
+
+# 目录扫描索引文件名（保存在当前用户的应用缓存目录中）
+SCAN_INDEX_FILE_NAME = 'TestLogAnalyzer_ScanIndex.json'
+
+# 目录扫描的线程数（网络共享目录的耗时主要是等待I/O）
+DEFAULT_SCAN_WORKERS = 8
+
+# 目录扫描每批交给回调的文件数
+DEFAULT_SCAN_BATCH = 200
+
+
+def app_cache_dir():
+    """当前用户的应用缓存目录（只返回路径，写入文件时才创建）
+    
+    Windows为%LOCALAPPDATA%\\TestLogAnalyzer，其它系统为$XDG_CACHE_HOME（默认~/.cache）下的TestLogAnalyzer。
+    """
+    if os.name == 'nt':
+        base = os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), 'AppData', 'Local')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, APP_CACHE_DIR_NAME)
+
+
+class DirectoryIndex:
+    """已扫描目录的磁盘索引: {目录: (目录修改时间ns, [(文件名, 大小, 修改时间)], [子目录名])}
+    
+    目录的修改时间没有改变（没有增删或重命名文件）时直接使用索引中的列表，不再读取目录和文件属性。
+    原地改写文件不会改变目录的修改时间，这种情况下索引中的大小和修改时间可能过期。
+    """
+    
+    def __init__(self, path=None):
+        self.path = path or os.path.join(app_cache_dir(), SCAN_INDEX_FILE_NAME)
+        self._entries = None
+        self._dirty = False
+        self._lock = threading.Lock()
+    
+    def _ensure_loaded(self):
+        if self._entries is not None:
+            return
+        self._entries = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                self._entries = {directory: (entry[0], [tuple(item) for item in entry[1]], entry[2])
+                                 for directory, entry in data.items()}
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, TypeError, IndexError) as e:
+            logger.warning(f"读取扫描索引{self.path}时出错: {str(e)}")
+    
+    def lookup(self, directory, mtime_ns):
+        """目录修改时间与索引一致时返回 (文件列表, 子目录列表)，否则为None"""
+        with self._lock:
+            self._ensure_loaded()
+            entry = self._entries.get(directory)
+        if entry is None or entry[0] != mtime_ns:
+            return None
+        return entry[1], entry[2]
+    
+    def store(self, directory, mtime_ns, files, subdirectories):
+        with self._lock:
+            self._ensure_loaded()
+            previous = self._entries.get(directory)
+            # 已删除的子目录不再保留在索引中
+            if previous is not None:
+                for name in set(previous[2]) - set(subdirectories):
+                    self._entries.pop(os.path.join(directory, name), None)
+            self._entries[directory] = (mtime_ns, files, subdirectories)
+            self._dirty = True
+    
+    def save(self):
+        """索引有变化时以原子方式写入JSON文件"""
+        with self._lock:
+            if not self._dirty:
+                return False
+            # 索引包含目录和文件名，缓存目录只允许当前用户访问
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), mode=0o700, exist_ok=True)
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({directory: [entry[0], entry[1], entry[2]] for directory, entry in self._entries.items()},
+                          f, separators=(',', ':'))
+            os.replace(temp_path, self.path)
+            self._dirty = False
+        return True
+
+
+def scan_directory(directory, pattern='*.csv', extensions=('.csv',), min_size=None, max_size=None,
+                   modified_after=None, modified_before=None, on_batch=None, cancel_event=None, index=None,
+                   workers=DEFAULT_SCAN_WORKERS, batch_size=DEFAULT_SCAN_BATCH):
+    """在线程池中用os.scandir递归扫描目录，按文件名通配符、扩展名、大小和修改时间筛选文件
+    
+    Args:
+        directory: 起始目录
+        pattern: 文件名通配符（与fnmatch相同，区分大小写），为空时不筛选
+        extensions: 允许的扩展名（不区分大小写），为None时不筛选
+            （压缩日志去掉.gz/.bz2/.xz后匹配；zip归档中的成员按成员名匹配，以"归档.zip/成员"路径返回）
+        min_size / max_size: 文件大小范围（字节，包含），为None时不限制
+        modified_after / modified_before: 修改时间范围（时间戳秒，包含），为None时不限制
+        on_batch: 每找到batch_size个文件（以及扫描结束时）在工作线程中调用on_batch([(路径, 大小, 修改时间), ...])
+        cancel_event: threading.Event，设置后不再扫描新的目录
+        index: DirectoryIndex，目录未改变时使用索引中的列表；为None时不使用索引
+        workers: 线程数
+        batch_size: 每批的文件数
+    
+    Returns:
+        {'files': 按路径排序的[(路径, 大小, 修改时间)], 'directories': 扫描的目录数,
+         'indexed_directories': 使用索引的目录数, 'errors': 无法读取的目录数, 'cancelled': 是否被取消,
+         'seconds': 耗时}
+    """
+    import fnmatch
+    
+    started = time.perf_counter()
+    regex = re.compile(fnmatch.translate(pattern)) if pattern else None
+    extensions = tuple(extension.lower() for extension in extensions) if extensions else None
+    lock = threading.Lock()
+    finished = threading.Event()
+    state = {'pending': 1, 'directories': 0, 'indexed_directories': 0, 'errors': 0}
+    found = []
+    batch = []
+    
+    def accept(name, size, mtime):
+        # 压缩日志按去掉压缩扩展名后的文件名匹配
+        name = log_file_name(name)
+        return (regex is None or regex.match(name)) \
+            and (extensions is None or name.lower().endswith(extensions)) \
+            and (min_size is None or size >= min_size) and (max_size is None or size <= max_size) \
+            and (modified_after is None or mtime >= modified_after) \
+            and (modified_before is None or mtime <= modified_before)
+    
+    def list_directory(path, mtime_ns):
+        """读取目录，返回 (文件列表, [(子目录名, 子目录修改时间ns或None)], 是否来自索引)
+        
+        使用索引时目录的修改时间来自上一级目录的scandir（Windows上不需要额外读取属性）；
+        上一级目录来自索引时没有这个时间，只在这时读取目录属性后与索引比较。
+        """
+        if index is not None:
+            if mtime_ns is None:
+                mtime_ns = os.stat(path).st_mtime_ns
+            cached = index.lookup(path, mtime_ns)
+            if cached is not None:
+                return cached[0], [(name, None) for name in cached[1]], True
+        files = []
+        subdirectories = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirectories.append((entry.name, entry.stat(follow_symlinks=False).st_mtime_ns
+                                               if index is not None else None))
+                    elif entry.is_file():
+                        stat = entry.stat()
+                        files.append((entry.name, stat.st_size, stat.st_mtime))
+                except OSError:
+                    continue
+        if index is not None:
+            index.store(path, mtime_ns, files, [name for name, _ in subdirectories])
+        return files, subdirectories, False
+    
+    def archive_hits(archive_path, mtime):
+        """zip归档中符合条件的成员（大小为解压后的大小，修改时间为归档的修改时间）"""
+        try:
+            members = archive_members(archive_path)
+        except Exception as e:
+            logger.warning(f"读取归档{archive_path}时出错: {str(e)}")
+            return []
+        return [(os.path.join(archive_path, name), size, mtime) for name, (size, _) in sorted(members.items())
+                if accept(name.rsplit('/', 1)[-1], size, mtime)]
+    
+    def visit(path, executor, mtime_ns=None):
+        try:
+            if cancel_event is not None and cancel_event.is_set():
+                return
+            try:
+                files, subdirectories, indexed = list_directory(path, mtime_ns)
+            except OSError as e:
+                logger.warning(f"扫描{path}时出错: {str(e)}")
+                with lock:
+                    state['errors'] += 1
+                return
+            hits = [(os.path.join(path, name), size, mtime) for name, size, mtime in files
+                    if accept(name, size, mtime)]
+            for name, size, mtime in files:
+                if name.lower().endswith(ARCHIVE_LOG_EXTENSIONS):
+                    hits.extend(archive_hits(os.path.join(path, name), mtime))
+            with lock:
+                state['directories'] += 1
+                state['indexed_directories'] += indexed
+                state['pending'] += len(subdirectories)
+                found.extend(hits)
+                batch.extend(hits)
+                ready = batch[:] if len(batch) >= batch_size else None
+                if ready is not None:
+                    batch.clear()
+            for name, subdirectory_mtime_ns in subdirectories:
+                executor.submit(visit, os.path.join(path, name), executor, subdirectory_mtime_ns)
+            if ready and on_batch is not None:
+                on_batch(ready)
+        finally:
+            with lock:
+                state['pending'] -= 1
+                if state['pending'] == 0:
+                    finished.set()
+    
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='scan') as executor:
+        executor.submit(visit, os.path.abspath(directory), executor)
+        finished.wait()
+    if batch and on_batch is not None:
+        on_batch(batch[:])
+    if index is not None:
+        try:
+            index.save()
+        except OSError as e:
+            logger.warning(f"保存扫描索引{index.path}时出错: {str(e)}")
+    
+    return {
+        'files': sorted(found),
+        'directories': state['directories'],
+        'indexed_directories': state['indexed_directories'],
+        'errors': state['errors'],
+        'cancelled': cancel_event is not None and cancel_event.is_set(),
+        'seconds': time.perf_counter() - started,
+    }
+
+
+def serial_length_mask(serials, median_length):
+    """Serial Number文本长度与中位数相差小于5的行为True"""
+    lengths = serials.astype(str).str.len()
+    return (abs(lengths - median_length) < 5).to_numpy()
+
+
+def clean_special_cells(df, cell_masks=None):
+    """向量化处理特殊单元格（界面和批处理模式共用）: 去除含#单元格中的#字符，并尝试将含#字符的列整体转换为数字
+    
+    Pass/Fail列（列名完全匹配，不区分大小写）中的FAIL单元格需要格式化；其它含#字符的单元格（包括Pass/Fail列中的）
+    去除#字符后也需要格式化。
+    
+    Args:
+        df: DataFrame（逐列原地替换）
+        cell_masks: 传入dict时填入有标记单元格的列 {列位置: (需要格式化的bool数组, 含#字符的bool数组)}（按行位置）
+    
+    Returns:
+        (df, 含#字符的单元格数量, Pass/Fail列中FAIL单元格数量, 含#字符的列名列表)
+    """
+    hash_cells = 0
+    fail_cells = 0
+    hash_columns = []
+    for position, column in enumerate(df.columns):
+        values = df.iloc[:, position]
+        if pd.api.types.is_numeric_dtype(values.dtype) or pd.api.types.is_datetime64_any_dtype(values.dtype):
+            continue
+        text = values.astype(str)
+        has_hash = text.str.contains('#', regex=False).to_numpy()
+        count = int(has_hash.sum())
+        if str(column).lower().strip() == 'pass/fail':
+            fail = (text.str.strip().str.upper() == 'FAIL').to_numpy()
+            fail_cells += int(fail.sum())
+            if cell_masks is not None and (fail.any() or count):
+                cell_masks[position] = (fail | has_hash, has_hash)
+        elif cell_masks is not None and count:
+            cell_masks[position] = (has_hash, has_hash)
+        if count == 0:
+            continue
+        hash_cells += count
+        hash_columns.append(column)
+        cleaned = values.astype(object).where(~has_hash, text.str.replace('#', '', regex=False))
+        try:
+            cleaned = pd.to_numeric(cleaned)
+        except (ValueError, TypeError):
+            # 不能转换为数字时保持原来的文本类型
+            if isinstance(values.dtype, pd.StringDtype):
+                cleaned = cleaned.astype(values.dtype)
+        df.isetitem(position, cleaned)
+    return df, hash_cells, fail_cells, hash_columns
+
+
+def special_cell_positions(cell_masks):
+    """由clean_special_cells填入的cell_masks生成界面使用的单元格位置
+    
+    Returns:
+        (需要格式化的单元格 {行位置: [列位置, ...]}, 含#字符的单元格 {行位置: [列位置, ...]}, 含#字符的列位置集合)
+    """
+    format_cells = {}
+    hash_cells = {}
+    for position in sorted(cell_masks):
+        format_mask, hash_mask = cell_masks[position]
+        for row in np.flatnonzero(format_mask).tolist():
+            format_cells.setdefault(row, []).append(position)
+        for row in np.flatnonzero(hash_mask).tolist():
+            hash_cells.setdefault(row, []).append(position)
+    hash_columns = {position for position, (_, hash_mask) in cell_masks.items() if hash_mask.any()}
+    return format_cells, hash_cells, hash_columns
+
+
+def points_in_polygon(u, v, polygon):
+    """向量化Ray Casting判断点是否在多边形内部（与逐点判断的边界处理一致）
+    
+    Args:
+        u, v: 坐标数组
+        polygon: 多边形顶点列表 [(x1, y1), ...]，少于3个点时所有点都视为不在多边形内
+    
+    Returns:
+        bool数组
+    """
+    u = np.asarray(u, dtype=np.float64)
+    v = np.asarray(v, dtype=np.float64)
+    if len(polygon) < 3:
+        return np.zeros(u.shape, dtype=bool)
+    xs = np.array([p[0] for p in polygon], dtype=np.float64)
+    ys = np.array([p[1] for p in polygon], dtype=np.float64)
+    inside = np.zeros(u.shape, dtype=bool)
+    j = len(polygon) - 1
+    for i in range(len(polygon)):
+        xi, yi, xj, yj = xs[i], ys[i], xs[j], ys[j]
+        dy = yj - yi
+        if abs(dy) >= 1e-10:
+            crosses = (yi > v) != (yj > v)
+            x_intersect = xi + (v - yi) * (xj - xi) / dy
+            inside ^= crosses & (u < x_intersect)
+        j = i
+    in_box = (u >= xs.min()) & (u <= xs.max()) & (v >= ys.min()) & (v <= ys.max())
+    return inside & in_box
+
+
+def colorpoint_polygons(spec_data):
+    """从ColorPointSpec数据中提取White/Mixed多边形，缺失或少于3个有效点时使用默认多边形
+    
+    Args:
+        spec_data: ColorPointSpec JSON数据（{'White': {'coordinates': [...]}, ...}、{'White': [...]}或嵌套在'data'中）
+    
+    Returns:
+        {'White': [(u, v), ...], 'Mixed': [(u, v), ...]}
+    """
+    defaults = {'White': DEFAULT_CAFL0_POLYGON, 'Mixed': DEFAULT_CAFL24_POLYGON}
+    polygons = {}
+    for type_name, default in defaults.items():
+        raw = None
+        if isinstance(spec_data, dict):
+            source = spec_data
+            if type_name not in source and isinstance(spec_data.get('data'), dict):
+                source = spec_data['data']
+            entry = source.get(type_name)
+            if isinstance(entry, dict):
+                raw = entry.get('coordinates')
+            elif isinstance(entry, list):
+                raw = entry
+        points = _polygon_points(raw)
+        polygons[type_name] = points if len(points) >= 3 else list(default)
+    return polygons
+
+
+def _polygon_points(raw):
+    """把 [[u, v], ...] 转换为 [(u, v), ...]，跳过无效的点"""
+    return [(float(p[0]), float(p[1])) for p in (raw or [])
+            if isinstance(p, (list, tuple)) and len(p) >= 2 and p[0] is not None and p[1] is not None]
+
+
+class ColorBin:
+    """一个u'v'色点Bin: 名称、窗口类型（White/Mixed）、多边形顶点和适用的Config（None表示所有Config）"""
+    
+    __slots__ = ('name', 'type_name', 'polygon', 'config')
+    
+    def __init__(self, name, type_name, polygon, config=None):
+        self.name = name
+        self.type_name = type_name
+        self.polygon = list(polygon)
+        self.config = config
+    
+    def __repr__(self):
+        return f"ColorBin({self.name!r}, {self.type_name!r}, {len(self.polygon)} points, config={self.config!r})"
+
+
+def colorpoint_bins(spec_data):
+    """从ColorPointSpec数据中读取色点Bin
+    
+    支持 'bins': [{'name', 'type', 'coordinates', 'config'(可选)}, ...] 列表，
+    以及 'bins': {'White': {Bin名称: [[u, v], ...] 或 {'coordinates', 'config'}}, 'Mixed': {...}} 字典
+    （可以嵌套在'data'中）。少于3个有效点或窗口类型未知的Bin记录警告后跳过。
+    没有'bins'时White/Mixed多边形（CAFL0/CAFL24）各作为一个Bin。
+    
+    Returns:
+        [ColorBin, ...]（按文件中的顺序，重叠时排在前面的Bin优先）
+    """
+    source = spec_data if isinstance(spec_data, dict) else {}
+    raw_bins = source.get('bins')
+    if raw_bins is None and isinstance(source.get('data'), dict):
+        raw_bins = source['data'].get('bins')
+    
+    entries = []
+    if isinstance(raw_bins, dict):
+        for type_name, type_bins in raw_bins.items():
+            for name, entry in (type_bins or {}).items():
+                if isinstance(entry, dict):
+                    entries.append((name, type_name, entry.get('coordinates'), entry.get('config')))
+                else:
+                    entries.append((name, type_name, entry, None))
+    elif isinstance(raw_bins, list):
+        for idx, entry in enumerate(raw_bins):
+            if isinstance(entry, dict):
+                entries.append((entry.get('name', f'Bin{idx + 1}'), entry.get('type'), entry.get('coordinates'),
+                                entry.get('config')))
+    
+    bins = []
+    for name, type_name, raw, config in entries:
+        points = _polygon_points(raw)
+        if type_name not in COLOR_POINT_COLUMNS or len(points) < 3:
+            logger.warning(f"色点Bin {name} 的窗口类型或顶点无效（{type_name}, {len(points)}个点），已跳过")
+            continue
+        bins.append(ColorBin(str(name), type_name, points, config))
+    if not bins:
+        for type_name, polygon in colorpoint_polygons(spec_data).items():
+            bins.append(ColorBin(COLOR_POINT_COLUMNS[type_name][2].split()[0], type_name, polygon))
+    return bins
+
+
+class ColorBinIndex:
+    """一个窗口类型的色点Bin多边形外接矩形的均匀网格索引
+    
+    网格覆盖所有Bin的外接矩形，每个Bin记录它覆盖的网格范围。分类时把点按网格编号排序一次，
+    每个Bin只取出覆盖范围内各网格行中连续的一段点，对这些候选点做向量化的点在多边形内判断。
+    """
+    
+    def __init__(self, bins, grid_size=None):
+        self.bins = list(bins)
+        boxes = np.array([[min(p[0] for p in b.polygon), min(p[1] for p in b.polygon),
+                           max(p[0] for p in b.polygon), max(p[1] for p in b.polygon)] for b in self.bins],
+                         dtype=np.float64).reshape(-1, 4)
+        self.boxes = boxes
+        # 默认每行/列约为2倍sqrt(Bin数)个网格，每个网格平均只与少数几个Bin重叠
+        self.grid_size = grid_size or max(1, int(np.ceil(np.sqrt(max(len(self.bins), 1)))) * 2)
+        if len(self.bins):
+            self.origin = boxes[:, :2].min(axis=0)
+            self.extent = boxes[:, 2:].max(axis=0) - self.origin
+        else:
+            self.origin = np.zeros(2)
+            self.extent = np.zeros(2)
+        self.cell_size = np.where(self.extent > 0, self.extent / self.grid_size, 1.0)
+        # 各Bin覆盖的网格范围 (x0, y0, x1, y1)
+        self.bin_cells = np.concatenate([self._cells(boxes[:, 0], boxes[:, 1]),
+                                         self._cells(boxes[:, 2], boxes[:, 3])], axis=1).reshape(-1, 4)
+    
+    def __len__(self):
+        return len(self.bins)
+    
+    def _cells(self, u, v):
+        cells = np.floor((np.column_stack([u, v]) - self.origin) / self.cell_size).astype(np.int64)
+        return np.clip(cells, 0, self.grid_size - 1)
+    
+    def classify(self, u, v, configs=None):
+        """把每个点分到第一个包含它的Bin
+        
+        Args:
+            u, v: 坐标数组（NaN表示没有色点数据）
+            configs: 与点对应的Config数组，指定了config的Bin只判定该Config的点
+        
+        Returns:
+            int32数组，Bin在self.bins中的位置，不在任何Bin内（或没有数据）为-1
+        """
+        u = np.asarray(u, dtype=np.float64)
+        v = np.asarray(v, dtype=np.float64)
+        result = np.full(len(u), -1, dtype=np.int32)
+        if not self.bins or not len(u):
+            return result
+        
+        upper = self.origin + self.extent
+        valid = (u >= self.origin[0]) & (u <= upper[0]) & (v >= self.origin[1]) & (v <= upper[1])
+        points = np.flatnonzero(valid)
+        cells = self._cells(u[points], v[points])
+        cell_ids = cells[:, 1] * self.grid_size + cells[:, 0]
+        order = np.argsort(cell_ids, kind='stable')
+        points = points[order]
+        cell_ids = cell_ids[order]
+        
+        for position, (color_bin, (x0, y0, x1, y1)) in enumerate(zip(self.bins, self.bin_cells)):
+            rows = np.arange(y0, y1 + 1) * self.grid_size
+            starts = np.searchsorted(cell_ids, rows + x0, side='left')
+            ends = np.searchsorted(cell_ids, rows + x1, side='right')
+            candidates = np.concatenate([points[start:end] for start, end in zip(starts, ends)])
+            candidates = candidates[result[candidates] < 0]
+            if color_bin.config is not None and configs is not None:
+                candidates = candidates[configs[candidates] == color_bin.config]
+            if candidates.size:
+                inside = points_in_polygon(u[candidates], v[candidates], color_bin.polygon)
+                result[candidates[inside]] = position
+        return result
+
+
+def classify_color_bins(df, bins, group_column='Config', grid_size=None):
+    """按窗口类型对每个单元的u'v'色点分Bin
+    
+    Returns:
+        {type_name: (ColorBinIndex, Bin编号数组)}，缺少色点列或没有该类型Bin的窗口不包含在内
+    """
+    configs = np.asarray(df[group_column], dtype=object) if group_column in df.columns else None
+    assignments = {}
+    for type_name, (u_column, v_column, _) in COLOR_POINT_COLUMNS.items():
+        type_bins = [b for b in bins if b.type_name == type_name]
+        if not type_bins or u_column not in df.columns or v_column not in df.columns:
+            continue
+        index = ColorBinIndex(type_bins, grid_size)
+        assignments[type_name] = (index, index.classify(numeric_values(df, u_column), numeric_values(df, v_column),
+                                                        configs))
+    return assignments
+
+
+def color_bin_table(df, assignments, group_column='Config'):
+    """Bin分布表
+    
+    每个窗口类型的每个Bin一行，最后是"Out of bins"（有色点数据但不在任何Bin内）和"No data"（没有色点数据）。
+    
+    Returns:
+        DataFrame，列为 Type, Bin, <各Config的数量>..., All, All (%)
+    """
+    if group_column in df.columns:
+        group_codes, groups = pd.factorize(df[group_column].astype(str), sort=True)
+    else:
+        group_codes, groups = np.zeros(len(df), dtype=np.int64), pd.Index(['All'])
+    group_codes = np.where(group_codes < 0, 0, group_codes)
+    frames = []
+    for type_name, (index, labels) in assignments.items():
+        u_column, v_column, _ = COLOR_POINT_COLUMNS[type_name]
+        has_data = ~(np.isnan(numeric_values(df, u_column)) | np.isnan(numeric_values(df, v_column)))
+        rows = np.where(labels >= 0, labels, np.where(has_data, len(index), len(index) + 1))
+        counts = np.bincount(rows * len(groups) + group_codes,
+                             minlength=(len(index) + 2) * len(groups)).reshape(len(index) + 2, len(groups))
+        table = pd.DataFrame(counts, columns=[str(g) for g in groups])
+        table.insert(0, 'Bin', [b.name for b in index.bins] + ['Out of bins', 'No data'])
+        table.insert(0, 'Type', type_name)
+        table['All'] = counts.sum(axis=1)
+        table['All (%)'] = table['All'] / max(len(df), 1) * 100
+        if not table['All'].iloc[-1]:
+            table = table.iloc[:-1]
+        frames.append(table)
+    if not frames:
+        return pd.DataFrame(columns=['Type', 'Bin', 'All', 'All (%)'])
+    return pd.concat(frames, ignore_index=True)
+
+
+def normalize_cpk_limits(std_type, lower_limit, upper_limit):
+    """修正Cpk计算使用的规格: 下限-1视为0，Uniformity类规格上限不超过100"""
+    if lower_limit == -1:
+        lower_limit = 0
+    if "U" == std_type or "_U" in std_type or "Uniformity" in std_type:
+        upper_limit = min(upper_limit, 100.0)
+    return lower_limit, upper_limit
+
+
+def cpk_from_stats(column_name, std_type, mean_value, std_dev_value, lower_limit, upper_limit):
+    """根据均值、标准差和规格上下限计算Cpk
+    
+    - White/Mixed dL Max类只使用上限（CPU）
+    - White/Mixed L、U类忽略上限，只使用下限（CPL）
+    - 下限为0时只考虑上限，上限为0时只考虑下限
+    - 其余情况使用双边规格 min(CPL, CPU)
+    
+    Returns:
+        Cpk值，标准差不大于0时为0
+    """
+    if not std_dev_value > 0:
+        return 0
+    
+    def cpl():
+        return (mean_value - lower_limit) / (3 * std_dev_value) if lower_limit != -float('inf') else float('inf')
+    
+    def cpu():
+        return (upper_limit - mean_value) / (3 * std_dev_value) if upper_limit != float('inf') else float('inf')
+    
+    is_window_column = 'White' in column_name or 'Mixed' in column_name
+    if is_window_column and ('dL Max' in column_name or 'dL*Max' in column_name):
+        return cpu()
+    if is_window_column and ('L' in column_name or 'U' in column_name):
+        return cpl()
+    if lower_limit == 0 and upper_limit != 0:
+        return cpu()
+    if upper_limit == 0 and lower_limit != 0:
+        return cpl()
+    if 'dL*Max' in std_type or 'dL*Max' in column_name:
+        if lower_limit != 0 and upper_limit != 0:
+            return min(cpl(), cpu())
+        if lower_limit != 0:
+            return cpl()
+        if upper_limit != 0:
+            return cpu()
+        return 0
+    return min(cpl(), cpu())
+
+
+class RunningMoments:
+    """可合并的流式统计量: 数量、均值、二阶中心矩（Welford/Chan合并算法）、最小值和最大值"""
+    
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.minimum = float('inf')
+        self.maximum = -float('inf')
+    
+    def update(self, values):
+        """加入一批数值（忽略NaN）"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        batch = RunningMoments()
+        batch.count = len(values)
+        batch.mean = float(values.mean())
+        batch.m2 = float(((values - batch.mean) ** 2).sum())
+        batch.minimum = float(values.min())
+        batch.maximum = float(values.max())
+        self.merge(batch)
+    
+    def merge(self, other):
+        """合并另一组统计量（结果与一次性计算全部数据一致）"""
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.minimum, self.maximum = other.minimum, other.maximum
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+    
+    def remove(self, values):
+        """减去之前加入的一批数值（忽略NaN），数量、均值和二阶中心矩按合并公式反推
+        
+        Returns:
+            最小值和最大值是否仍然有效（被减去的数值包含当前最小值或最大值时为False，需要由剩余数据重新计算）
+        """
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return True
+        count = self.count - len(values)
+        if count <= 0:
+            self.__init__()
+            return True
+        batch_mean = float(values.mean())
+        batch_m2 = float(((values - batch_mean) ** 2).sum())
+        mean = (self.mean * self.count - batch_mean * len(values)) / count
+        delta = batch_mean - mean
+        self.m2 = max(0.0, self.m2 - batch_m2 - delta * delta * count * len(values) / self.count)
+        self.mean = mean
+        self.count = count
+        return self.minimum < values.min() and values.max() < self.maximum
+    
+    @property
+    def std(self):
+        """样本标准差（与pandas Series.std()一致，ddof=1）"""
+        return float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else float('nan')
+
+
+class StreamingDedupIndex:
+    """流式Serial Number去重索引
+    
+    逐块加入关键列（Serial Number、Pass/Fail、Date/Time、Config、Test Station）和全局行号，
+    每个SN只保留一条汇总记录: 保留行（第一条PASS记录，没有PASS时为第一条记录）、首次测试记录、
+    测试次数和时间跨度。块内汇总结果可以任意合并，累计的汇总行数超过compact_rows时合并压缩，
+    内存占用与SN数量成正比，与原始行数无关。去重结果与dedup_by_serial一致。
+    """
+    
+    _INT64_MAX = np.iinfo(np.int64).max
+    
+    def __init__(self, compact_rows=500000, serial_column='Serial Number', result_column='Pass/Fail',
+                 time_column='Date/Time', group_columns=('Config', 'Test Station')):
+        self.compact_rows = compact_rows
+        self.serial_column = serial_column
+        self.result_column = result_column
+        self.time_column = time_column
+        self.group_columns = tuple(group_columns)
+        self.rows = 0
+        self._seen_group_columns = set()
+        self._partials = []
+        self._pending_rows = 0
+        self._state = None
+    
+    def update(self, chunk, row_ids):
+        """加入一个数据块
+        
+        Args:
+            chunk: 包含关键列的DataFrame
+            row_ids: 与chunk逐行对应的全局行号（int64，决定"第一条"记录的先后顺序）
+        """
+        if chunk.empty or self.serial_column not in chunk.columns:
+            return
+        count = len(chunk)
+        row_ids = np.asarray(row_ids, dtype=np.int64)
+        if self.result_column in chunk.columns:
+            priority = pass_priority_key(chunk[self.result_column])
+        else:
+            priority = np.zeros(count, dtype=np.int8)
+        if self.time_column in chunk.columns:
+            times = parse_datetime_column(chunk[self.time_column]).to_numpy(dtype='datetime64[ns]')
+        else:
+            times = np.full(count, np.datetime64('NaT'), dtype='datetime64[ns]')
+        valid = ~np.isnat(times)
+        partial = {
+            'sn': chunk[self.serial_column].to_numpy(dtype=object),
+            'kept_row': row_ids,
+            'kept_priority': priority,
+            'first_row': row_ids,
+            'first_key': np.where(valid, times.astype(np.int64), self._INT64_MAX),
+            'first_priority': priority,
+            'attempts': np.ones(count, dtype=np.int64),
+            'min_time': times,
+            'max_time': times,
+        }
+        for column in self.group_columns:
+            if column in chunk.columns:
+                self._seen_group_columns.add(column)
+                partial[column] = chunk[column].to_numpy(dtype=object)
+            else:
+                partial[column] = np.full(count, None, dtype=object)
+        reduced = self._reduce(pd.DataFrame(partial))
+        self.rows += count
+        self._partials.append(reduced)
+        self._pending_rows += len(reduced)
+        if self._pending_rows >= self.compact_rows:
+            self._compact()
+    
+    def merge(self, other, keep_serials=None):
+        """合并另一个索引（例如按文件建立的索引）的汇总结果
+        
+        Args:
+            other: StreamingDedupIndex
+            keep_serials: 可选回调 keep_serials(SN的Series) -> bool数组，只合并返回True的SN
+        
+        Returns:
+            keep_serials过滤掉的原始行数
+        """
+        other._compact()
+        state = other._state
+        if state is None:
+            return 0
+        filtered_rows = 0
+        if keep_serials is not None:
+            mask = np.asarray(keep_serials(state['sn']), dtype=bool)
+            filtered_rows = int(state['attempts'].to_numpy()[~mask].sum())
+            state = state[mask].reset_index(drop=True)
+        self._seen_group_columns |= other._seen_group_columns
+        self.rows += other.rows - filtered_rows
+        if not state.empty:
+            self._partials.append(state)
+            self._pending_rows += len(state)
+            if self._pending_rows >= self.compact_rows:
+                self._compact()
+        return filtered_rows
+    
+    def _reduce(self, frame):
+        """把汇总行按SN合并为每个SN一行（可结合、可交换顺序地合并多个块的汇总结果）"""
+        codes, uniques = pd.factorize(frame['sn'], use_na_sentinel=False)
+        
+        def first_per_code(order):
+            sorted_codes = codes[order]
+            starts = np.r_[True, sorted_codes[1:] != sorted_codes[:-1]]
+            return order[starts]
+        
+        kept = first_per_code(np.lexsort((frame['kept_row'].to_numpy(), frame['kept_priority'].to_numpy(), codes)))
+        first = first_per_code(np.lexsort((frame['first_row'].to_numpy(), frame['first_key'].to_numpy(), codes)))
+        grouped = frame.groupby(codes, sort=True)
+        
+        reduced = {
+            'sn': np.asarray(uniques, dtype=object),
+            'kept_row': frame['kept_row'].to_numpy()[kept],
+            'kept_priority': frame['kept_priority'].to_numpy()[kept],
+            'first_row': frame['first_row'].to_numpy()[first],
+            'first_key': frame['first_key'].to_numpy()[first],
+            'first_priority': frame['first_priority'].to_numpy()[first],
+            'attempts': grouped['attempts'].sum().to_numpy(),
+            'min_time': grouped['min_time'].min().to_numpy(),
+            'max_time': grouped['max_time'].max().to_numpy(),
+        }
+        for column in self.group_columns:
+            reduced[column] = frame[column].to_numpy()[first]
+        return pd.DataFrame(reduced)
+    
+    def _compact(self):
+        frames = ([self._state] if self._state is not None else []) + self._partials
+        if frames:
+            self._state = self._reduce(pd.concat(frames, ignore_index=True))
+        self._partials = []
+        self._pending_rows = 0
+    
+    @property
+    def units(self):
+        self._compact()
+        return 0 if self._state is None else len(self._state)
+    
+    def kept_row_ids(self):
+        """去重后保留行的全局行号（升序）"""
+        self._compact()
+        if self._state is None:
+            return np.array([], dtype=np.int64)
+        return np.sort(self._state['kept_row'].to_numpy(dtype=np.int64))
+    
+    def attempt_history(self):
+        """每个SN的测试历史，格式与dedup_by_serial返回的测试历史一致"""
+        self._compact()
+        history_columns = ['Attempts', 'Retests', 'First Result', 'Final Result', 'First Time', 'Last Time']
+        if self._state is None:
+            return pd.DataFrame(columns=history_columns)
+        state = self._state
+        attempts = state['attempts'].to_numpy(dtype=np.int64)
+        history = pd.DataFrame({
+            'Attempts': attempts,
+            'Retests': attempts - 1,
+            'First Result': np.where(state['first_priority'].to_numpy() == 0, 'PASS', 'FAIL'),
+            'Final Result': np.where(state['kept_priority'].to_numpy() == 0, 'PASS', 'FAIL'),
+            'First Time': state['min_time'].to_numpy(),
+            'Last Time': state['max_time'].to_numpy(),
+        }, index=pd.Index(state['sn'].to_numpy(), name=self.serial_column))
+        for column in self.group_columns:
+            if column in self._seen_group_columns:
+                history[column] = state[column].to_numpy()
+        return history
+
+
+class AnalysisReport:
+    """分析汇总结果（分块处理模式和批处理模式共用），所有统计量都由可合并的计数、求和与Welford矩累计得到
+    
+    Attributes:
+        files: 成功处理的文件数量
+        rows_read / rows_filtered / units: 读取的行数、Serial Number长度异常被过滤的行数、去重后的单元数
+        hash_cells / fail_cells: 含#字符的单元格数量、Pass/Fail列中FAIL单元格数量
+        attempt_history: 每个SN的测试历史（用于FPY统计）
+        config_totals / config_fails: 每个Config的单元数和判定为Fail的单元数
+        defect_counts: {(Config, 不良项目): 数量}
+        moments: {列名: RunningMoments}
+        limits: {列名: [(标准类型, 下限, 上限), ...]}
+        preview: 去重后处理结果的前若干行
+    """
+    
+    def __init__(self):
+        self.files = 0
+        self.rows_read = 0
+        self.rows_filtered = 0
+        self.units = 0
+        self.hash_cells = 0
+        self.fail_cells = 0
+        self.attempt_history = None
+        self.config_totals = {}
+        self.config_fails = {}
+        self.defect_counts = {}
+        self.moments = {}
+        self.column_fail_counts = {}
+        self.limits = {}
+        self.preview = None
+        self.data = None
+    
+    def add_chunk(self, chunk, limits, polygons):
+        """判定一个已处理的数据块并累计Yield、不良项目和Cpk统计量
+        
+        Args:
+            chunk: 去重、列结构处理和特殊单元格清理后的数据块
+            limits: {列名: [(标准类型, 下限, 上限), ...]}
+            polygons: {'White': 顶点列表, 'Mixed': 顶点列表}
+        
+        Returns:
+            (行不良mask, {列名: 单元格不良mask})
+        """
+        row_fail, column_fails = evaluate_chunk(chunk, limits, polygons)
+        self._count_fails(chunk, row_fail, column_fails, 1)
+        
+        for column in limits:
+            if column in chunk.columns:
+                self.limits.setdefault(column, limits[column])
+                moments = self.moments.setdefault(column, RunningMoments())
+                moments.update(pd.to_numeric(chunk[column], errors='coerce').to_numpy(dtype=np.float64))
+        return row_fail, column_fails
+    
+    def remove_chunk(self, chunk, limits, polygons, remaining=None):
+        """从Yield、不良项目和Cpk统计中减去一个之前加入的数据块（监视目录模式中被去重替换的行）
+        
+        Args:
+            chunk: 之前加入的数据块（列与加入时相同）
+            limits: 加入时使用的规格
+            polygons: {'White': 顶点列表, 'Mixed': 顶点列表}
+            remaining: 减去后仍计入统计的数据 [(数据块, 加入时使用的规格), ...]，被减去的数值包含最小值或最大值时
+                由其中规格包含该列的数据块重新计算（为None时保留原来的值）
+        
+        Returns:
+            (行不良mask, {列名: 单元格不良mask})
+        """
+        row_fail, column_fails = evaluate_chunk(chunk, limits, polygons)
+        self._count_fails(chunk, row_fail, column_fails, -1)
+        
+        for column in limits:
+            moments = self.moments.get(column)
+            if moments is None or column not in chunk.columns:
+                continue
+            extremes_valid = moments.remove(pd.to_numeric(chunk[column], errors='coerce').to_numpy(dtype=np.float64))
+            if extremes_valid or remaining is None:
+                continue
+            values = [pd.to_numeric(rows[column], errors='coerce').to_numpy(dtype=np.float64)
+                      for rows, rows_limits in remaining if column in rows_limits and column in rows.columns]
+            values = np.concatenate(values) if values else np.zeros(0)
+            values = values[~np.isnan(values)]
+            if len(values):
+                moments.minimum, moments.maximum = float(values.min()), float(values.max())
+        return row_fail, column_fails
+    
+    def _count_fails(self, chunk, row_fail, column_fails, sign):
+        """把一个数据块的单元数、不良数和不良项目数量乘以sign（1或-1）累计到按Config的统计中"""
+        configs = chunk['Config'].astype(str).to_numpy() if 'Config' in chunk.columns \
+            else np.full(len(chunk), 'Unknown', dtype=object)
+        config_values, config_codes = np.unique(configs, return_inverse=True)
+        totals = np.bincount(config_codes, minlength=len(config_values))
+        fails = np.bincount(config_codes, weights=row_fail, minlength=len(config_values))
+        for i, value in enumerate(config_values):
+            self.config_totals[value] = self.config_totals.get(value, 0) + sign * int(totals[i])
+            self.config_fails[value] = self.config_fails.get(value, 0) + sign * int(fails[i])
+        
+        for column, mask in column_fails.items():
+            self.column_fail_counts[column] = self.column_fail_counts.get(column, 0) + sign * int(mask.sum())
+            item = column
+            for _, (u_column, v_column, display_name) in COLOR_POINT_COLUMNS.items():
+                if column == u_column:
+                    item = display_name
+                elif column == v_column:
+                    item = None
+            if item is None:
+                continue
+            counts = np.bincount(config_codes, weights=mask, minlength=len(config_values))
+            for i, value in enumerate(config_values):
+                if counts[i]:
+                    key = (value, item)
+                    self.defect_counts[key] = self.defect_counts.get(key, 0) + sign * int(counts[i])
+    
+    def yield_table(self):
+        """按Config统计的不良率（与Yield Analysis选项卡的列一致）"""
+        rows = []
+        for config in sorted(self.config_totals, key=str):
+            total = self.config_totals[config]
+            fail = self.config_fails.get(config, 0)
+            rows.append((config, total, fail, fail / total * 100 if total else 0))
+        total = sum(self.config_totals.values())
+        fail = sum(self.config_fails.values())
+        rows.append(('Total', total, fail, fail / total * 100 if total else 0))
+        return pd.DataFrame(rows, columns=['Config', 'Total Count', 'Fail Count', 'Fail Rate (%)'])
+    
+    def top_defects(self, by_config=False):
+        """按不良数量降序排列的不良项目统计（与Top Defects选项卡一致，u/v Avg合并为色点不良项目）"""
+        if by_config:
+            rows = [(config, item, count, self.config_totals.get(config, 0),
+                     count / self.config_totals[config] * 100 if self.config_totals.get(config) else 0)
+                    for (config, item), count in self.defect_counts.items() if count > 0]
+            rows.sort(key=lambda x: (str(x[0]), -x[4]))
+            return pd.DataFrame(rows, columns=['Config', 'Fail Item', 'Fail Count', 'Total Count', 'Fail Rate (%)'])
+        totals = {}
+        for (config, item), count in self.defect_counts.items():
+            totals[item] = totals.get(item, 0) + count
+        total_count = sum(self.config_totals.values())
+        rows = [(item, count, total_count, count / total_count * 100 if total_count else 0)
+                for item, count in totals.items() if count > 0]
+        rows.sort(key=lambda x: x[1], reverse=True)
+        return pd.DataFrame(rows, columns=['Fail Item', 'Fail Count', 'Total Count', 'Fail Rate (%)'])
+    
+    def cpk_table(self):
+        """根据累计的均值和标准差计算每个已匹配规格列的Cpk"""
+        rows = []
+        for column, entries in self.limits.items():
+            moments = self.moments.get(column)
+            if moments is None or moments.count < 3:
+                continue
+            for std_type, lower, upper in entries:
+                lower_limit = lower if lower is not None else -float('inf')
+                upper_limit = upper if upper is not None else float('inf')
+                lower_limit, upper_limit = normalize_cpk_limits(std_type, lower_limit, upper_limit)
+                cpk = cpk_from_stats(column, std_type, moments.mean, moments.std, lower_limit, upper_limit)
+                fail_count = self.column_fail_counts.get(column, 0)
+                rows.append((std_type, column, lower_limit, upper_limit, moments.count, moments.mean, moments.std,
+                             moments.minimum, moments.maximum, cpk, fail_count, fail_count / moments.count * 100))
+        return pd.DataFrame(rows, columns=['Standard Type', 'Column', 'Lower Limit', 'Upper Limit', 'Count', 'Mean',
+                                           'Std Dev', 'Min', 'Max', 'Cpk', 'Fail Count', 'Fail Rate (%)'])
+    
+    def fpy_table(self):
+        """FPY、最终良率和重测率（按Config和总体）"""
+        frames = [yield_summary(self.attempt_history, 'Config'), yield_summary(self.attempt_history)]
+        return pd.concat(frames, ignore_index=True)
+    
+    def to_excel(self, file_path):
+        """把汇总结果写入Excel文件（Yield Analysis、FPY、Top Defects、Config Top Defects、Cpk工作表，
+        有完整数据时再加上Reprocessed Data工作表）"""
+        with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
+            self.yield_table().to_excel(writer, sheet_name='Yield Analysis', index=False)
+            self.fpy_table().to_excel(writer, sheet_name='FPY', index=False)
+            self.top_defects().to_excel(writer, sheet_name='Top Defects', index=False)
+            self.top_defects(by_config=True).to_excel(writer, sheet_name='Config Top Defects', index=False)
+            self.cpk_table().to_excel(writer, sheet_name='Cpk', index=False)
+            if self.data is not None:
+                format_datetime_columns(self.data).to_excel(writer, sheet_name='Reprocessed Data', index=False)
+
+
+def numeric_values(chunk, column):
+    """把数据列转换为float64数组，无法转换的值为NaN"""
+    return pd.to_numeric(chunk[column], errors='coerce').to_numpy(dtype=np.float64)
+
+
+def limit_fail_mask(values, lower, upper, rule='isclose'):
+    """单条规格的不良mask，NaN不判为不良
+    
+    Args:
+        values: float64数组
+        lower / upper: 下限/上限，None表示不判定
+        rule: 'isclose'为Data Re-Processing规则（与限值近似相等时不判为不良，math.isclose默认容差）；
+              'strict'为Yield Analysis规则（严格小于下限或大于上限时不良）
+    """
+    out = np.zeros(len(values), dtype=bool)
+    if lower is not None:
+        below = values < lower
+        out |= below & ~np.isclose(values, lower, rtol=1e-9, atol=0) if rule == 'isclose' else below
+    if upper is not None:
+        above = values > upper
+        out |= above & ~np.isclose(values, upper, rtol=1e-9, atol=0) if rule == 'isclose' else above
+    return out
+
+
+def polygon_fail_mask(u, v, polygon):
+    """色点不良mask: u/v都有效且不在多边形内"""
+    valid = ~np.isnan(u) & ~np.isnan(v)
+    return valid & ~points_in_polygon(u, v, polygon)
+
+
+def criteria_fail_masks(chunk, limits, polygons, rule='isclose'):
+    """按判定顺序生成每条规格和每个色点多边形的不良mask（默认与Data Re-Processing的判定规则一致）
+    
+    规格判定: 数值不在下限/上限的近似相等范围内（math.isclose默认容差）且小于下限或大于上限时不良；
+    色点判定: u/v都有效且不在对应多边形内时，u Avg和v Avg列都记为不良。
+    
+    Args:
+        chunk: 处理后的数据块
+        limits: {列名: [(标准类型, 下限或None, 上限或None), ...]}
+        polygons: {'White': 顶点列表, 'Mixed': 顶点列表}，为None时不做色点判定
+        rule: 规格判定规则，见limit_fail_mask
+    
+    Returns:
+        [(Fail_Reason文本, 不良列名元组, 行不良mask), ...]
+    """
+    masks = []
+    for column, entries in (limits or {}).items():
+        if column not in chunk.columns:
+            continue
+        values = numeric_values(chunk, column)
+        for _, lower, upper in entries:
+            masks.append((column, (column,), limit_fail_mask(values, lower, upper, rule)))
+    
+    for type_name, (u_column, v_column, _) in COLOR_POINT_COLUMNS.items():
+        polygon = (polygons or {}).get(type_name)
+        if not polygon or len(polygon) < 3 or u_column not in chunk.columns or v_column not in chunk.columns:
+            continue
+        out = polygon_fail_mask(numeric_values(chunk, u_column), numeric_values(chunk, v_column), polygon)
+        masks.append((f"{u_column}; {v_column}", (u_column, v_column), out))
+    return masks
+
+
+def evaluate_chunk(chunk, limits, polygons):
+    """向量化判定一个数据块
+    
+    Returns:
+        (行不良mask, {列名: 单元格不良mask})
+    """
+    row_fail = np.zeros(len(chunk), dtype=bool)
+    column_fails = {}
+    for _, columns, mask in criteria_fail_masks(chunk, limits, polygons):
+        row_fail |= mask
+        for column in columns:
+            if column in column_fails:
+                column_fails[column] = column_fails[column] | mask
+            else:
+                column_fails[column] = mask.copy()
+    return row_fail, column_fails
+
+
+def apply_verdict(df, limits, polygons):
+    """按Review Criteria和色点多边形重新判定每一行，生成Pass/Fail和Fail_Reason列
+    
+    与Data Re-Processing一致: Pass/Fail为'Pass'/'Fail'，Fail_Reason按判定顺序列出不良项目，以"; "分隔。
+    
+    Args:
+        df: 处理后的DataFrame（不修改）
+    
+    Returns:
+        新增/替换了Pass/Fail和Fail_Reason列的浅副本
+    """
+    result = df.copy(deep=False)
+    row_fail, reasons = combine_fail_masks(len(df), criteria_fail_masks(df, limits, polygons))
+    result['Pass/Fail'] = np.where(row_fail, 'Fail', 'Pass')
+    result['Fail_Reason'] = reasons
+    return result
+
+
+def combine_fail_masks(count, masks):
+    """合并各项不良mask，生成行不良mask和按判定顺序以"; "分隔的Fail_Reason
+    
+    Args:
+        count: 行数
+        masks: criteria_fail_masks格式的 [(Fail_Reason文本, 列名元组, mask), ...]（可带更多元素）
+    
+    Returns:
+        (行不良mask, Fail_Reason object数组)
+    """
+    reasons = np.full(count, '', dtype=object)
+    row_fail = np.zeros(count, dtype=bool)
+    for label, _, mask, *_ in masks:
+        if not mask.any():
+            continue
+        row_fail |= mask
+        current = reasons[mask]
+        reasons[mask] = np.where(current == '', label, current + '; ' + label)
+    return row_fail, reasons
+
+
+def format_cells_from_verdict(df, verdict):
+    """由判定结果生成format_cells字典 {行索引: [列位置, ...]}
+    
+    顺序与逐行判定一致: 超限的规格列、多边形外的u/v Avg列，最后是值为Fail的Pass/Fail类列。
+    
+    Args:
+        df: 判定后的DataFrame（Pass/Fail列已更新）
+        verdict: AnalysisGraph.verdict的结果
+    """
+    format_cells = {}
+    index = df.index.to_numpy()
+    marks = [(mask, [df.columns.get_loc(column) for column in columns]) for _, columns, mask, _ in verdict.masks]
+    for col_idx, col_name in enumerate(df.columns):
+        if 'Pass/Fail' in str(col_name):
+            # 只有当值为'Fail'时才记录单元格位置，确保仅Fail值单元格被着色
+            marks.append(((df.iloc[:, col_idx].astype(str).str.strip().str.lower() == 'fail').to_numpy(), [col_idx]))
+    for mask, positions in marks:
+        for row in index[mask]:
+            cells = format_cells.setdefault(row, [])
+            for position in positions:
+                if position not in cells:
+                    cells.append(position)
+    return format_cells
+
+
+def format_cell_fail_counts(format_cells, df, start_column=7, group_column='Config'):
+    """统计Data Re-Processing标记为不良（淡黄色）的单元格数量，供Top Defects使用
+    
+    与逐行逐列遍历format_cells的结果一致: 每行的同一列只计一次；按分组统计时只计入行号在df范围内的单元格，
+    分组列为空的行不计入任何分组。
+    
+    Args:
+        format_cells: {行位置: [列位置, ...]}
+        df: 标记所对应的DataFrame
+        start_column: 从该列位置开始统计（Top Defects从第8列开始）
+        group_column: 分组列名，不存在时不做分组统计
+    
+    Returns:
+        (column_counts, group_counts, group_totals)
+        column_counts: 长度为列数的int64数组，start_column之前的列为0
+        group_counts: {分组值: 长度为列数的int64数组}
+        group_totals: {分组值: 行数}
+    """
+    column_count = len(df.columns)
+    pairs = {(row, col) for row, cols in (format_cells or {}).items() for col in cols
+             if start_column <= col < column_count}
+    if pairs:
+        rows, cols = np.array(sorted(pairs), dtype=np.int64).T
+    else:
+        rows = cols = np.zeros(0, dtype=np.int64)
+    column_counts = np.bincount(cols, minlength=column_count).astype(np.int64)
+    
+    group_counts = {}
+    group_totals = {}
+    if group_column in df.columns:
+        codes, groups = pd.factorize(df[group_column])
+        in_range = (rows >= 0) & (rows < len(df))
+        row_codes = codes[rows[in_range]]
+        grouped_cols = cols[in_range]
+        totals = np.bincount(codes[codes >= 0], minlength=len(groups))
+        for code, group in enumerate(groups):
+            selected = row_codes == code
+            group_counts[group] = np.bincount(grouped_cols[selected], minlength=column_count).astype(np.int64)
+            group_totals[group] = int(totals[code])
+    return column_counts, group_counts, group_totals
+
+
+# 分块读取的默认行数
+DEFAULT_CHUNKSIZE = 100000
+
+# 全局行号中文件序号的位移（每个文件最多2^40行）
+_ROW_ID_SHIFT = 40
+
+
+def add_serial_lengths(length_counts, serials):
+    """把一批Serial Number的文本长度加入长度直方图（按长度计数的int64数组），返回新的直方图"""
+    counts = np.bincount(serials.astype(str).str.len().dropna().to_numpy(dtype=np.int64))
+    if len(counts) > len(length_counts):
+        counts[:len(length_counts)] += length_counts
+        return counts
+    length_counts = length_counts.copy()
+    length_counts[:len(counts)] += counts
+    return length_counts
+
+
+def serial_length_median(length_counts):
+    """长度直方图的中位数（与Series.median一致），没有数据时为None"""
+    total_lengths = int(length_counts.sum())
+    if total_lengths == 0:
+        return None
+    cumulative = np.cumsum(length_counts)
+    low = int(np.searchsorted(cumulative, (total_lengths - 1) // 2 + 1))
+    high = int(np.searchsorted(cumulative, total_lengths // 2 + 1))
+    return (low + high) / 2
+
+
+def _iter_csv_chunks(file_path, header, chunksize):
+    """按块读取CSV日志（压缩日志流式解压，按header.encoding边读边解码），跳过说明性行和有问题的行
+    
+    两遍处理使用完全相同的读取参数: 有问题的行在两遍中跳过得一致，第一遍的行号才能对应到第二遍的行
+    （只读取部分列时，pandas不会跳过字段过多的行）。
+    """
+    with open_log_file(file_path) as f:
+        yield from pd.read_csv(f, skiprows=header.skiprows, on_bad_lines='skip', chunksize=chunksize,
+                               encoding=header.encoding, low_memory=False)
+
+
+def run_chunked_pipeline(file_paths, resolve_limits=None, polygons=None, chunksize=DEFAULT_CHUNKSIZE,
+                         progress=None, preview_rows=17, encoding=None):
+    """分块（out-of-core）处理测试日志，内存占用与块大小和SN数量相关，与日志总大小无关
+    
+    第一遍逐块取出关键列: 按文件建立流式SN去重索引并统计Serial Number长度中位数，文件读完后过滤长度异常的SN
+    （过滤只取决于SN文本，同一SN的所有行一起保留或过滤），再合并到全局去重索引；
+    第二遍逐块读取全部列: 只保留去重索引选中的行，应用列结构处理计划和特殊单元格清理，
+    判定规格和色点，并把结果累计到可合并的计数、求和与Welford矩中。
+    
+    Args:
+        file_paths: 日志文件路径列表（按此顺序决定"第一条"记录）
+        resolve_limits: 可选回调 resolve_limits(列名列表) -> {列名: [(标准类型, 下限, 上限), ...]}，
+            每种表头只调用一次
+        polygons: {'White': 顶点列表, 'Mixed': 顶点列表}，为None时不做色点判定
+        chunksize: 每块读取的行数
+        progress: 可选回调 progress(阶段描述, 已完成文件数, 文件总数)
+        preview_rows: 保留用于预览的处理结果行数
+        encoding: 文件编码，为None时按文件检测
+    
+    Returns:
+        AnalysisReport
+    """
+    report = AnalysisReport()
+    dedup_index = StreamingDedupIndex()
+    key_columns = ('Serial Number', 'Pass/Fail', 'Date/Time', 'Test Station')
+    
+    # 第一遍: 关键列 -> Serial Number长度过滤 -> 流式去重索引
+    file_infos = []
+    for file_index, file_path in enumerate(file_paths):
+        file_name = os.path.basename(file_path)
+        if progress:
+            progress(f"Indexing {file_name}", file_index, len(file_paths))
+        try:
+            header = sniff_log_header(file_path, encoding=encoding)
+            with open_log_file(file_path) as f:
+                columns = list(pd.read_csv(f, skiprows=header.skiprows, nrows=0, encoding=header.encoding).columns)
+        except Exception as e:
+            logger.warning(f"分块处理跳过了{file_name}: {str(e)}")
+            continue
+        if len(columns) < 2:
+            logger.warning(f"分块处理跳过了{file_name}: 列数不足")
+            continue
+        config = config_from_file_name(file_name)
+        config_from_data = columns[1] == 'Config'
+        positions = sorted({columns.index(c) for c in key_columns if c in columns} | {1})
+        
+        file_dedup_index = StreamingDedupIndex(compact_rows=dedup_index.compact_rows)
+        length_counts = np.zeros(0, dtype=np.int64)
+        rows_in_file = 0
+        for chunk in _iter_csv_chunks(file_path, header, chunksize):
+            chunk = chunk.iloc[:, positions].reset_index(drop=True)
+            if not config_from_data:
+                chunk.isetitem(list(chunk.columns).index(columns[1]), pd.Series(config, index=chunk.index, dtype=object))
+            chunk = chunk.rename(columns={columns[1]: 'Config'})
+            row_ids = (np.int64(file_index) << _ROW_ID_SHIFT) + np.arange(rows_in_file, rows_in_file + len(chunk), dtype=np.int64)
+            rows_in_file += len(chunk)
+            if 'Serial Number' in chunk.columns:
+                length_counts = add_serial_lengths(length_counts, chunk['Serial Number'])
+            file_dedup_index.update(chunk, row_ids)
+        
+        # 按文件的Serial Number长度中位数过滤坏行（与数据处理模式一致）
+        median_length = serial_length_median(length_counts)
+        keep_serials = None
+        if median_length is not None:
+            keep_serials = lambda serials: serial_length_mask(serials, median_length)
+        report.rows_filtered += dedup_index.merge(file_dedup_index, keep_serials)
+        report.rows_read += rows_in_file
+        file_infos.append((file_index, file_path, header, config))
+    
+    kept_ids = dedup_index.kept_row_ids()
+    report.attempt_history = dedup_index.attempt_history()
+    report.units = len(kept_ids)
+    
+    # 第二遍: 全部列 -> 去重 -> 列结构处理 -> 特殊单元格 -> 判定 -> 可合并统计量
+    plans = {}
+    limits_by_header = {}
+    preview_parts = []
+    preview_count = 0
+    for done, (file_index, file_path, header, config) in enumerate(file_infos):
+        file_name = os.path.basename(file_path)
+        if progress:
+            progress(f"Aggregating {file_name}", done, len(file_infos))
+        base = np.int64(file_index) << _ROW_ID_SHIFT
+        file_ids = kept_ids[(kept_ids >= base) & (kept_ids < base + (np.int64(1) << _ROW_ID_SHIFT))] - base
+        rows_in_file = 0
+        for chunk in _iter_csv_chunks(file_path, header, chunksize):
+            start = rows_in_file
+            rows_in_file += len(chunk)
+            lo, hi = np.searchsorted(file_ids, [start, rows_in_file])
+            if hi <= lo:
+                continue
+            chunk = chunk.iloc[file_ids[lo:hi] - start].reset_index(drop=True)
+            chunk = apply_file_config(chunk, config)
+            
+            signature = tuple(str(c) for c in chunk.columns)
+            plan = plans.get(signature)
+            if plan is None:
+                # 同一种表头只编译一次计划，前缀文本取该表头第一条保留记录
+                plan = get_schema_plan(chunk)
+                plans[signature] = plan
+            chunk = plan.apply(chunk)
+            chunk, hash_cells, fail_cells, _ = clean_special_cells(chunk)
+            report.hash_cells += hash_cells
+            report.fail_cells += fail_cells
+            
+            output_signature = tuple(chunk.columns)
+            if output_signature not in limits_by_header:
+                limits = resolve_limits(list(chunk.columns)) if resolve_limits else {}
+                limits_by_header[output_signature] = limits
+            limits = limits_by_header[output_signature]
+            
+            report.add_chunk(chunk, limits, polygons)
+            
+            if preview_count < preview_rows:
+                preview_parts.append(chunk.head(preview_rows - preview_count))
+                preview_count += len(preview_parts[-1])
+        report.files += 1
+    
+    if preview_parts:
+        report.preview = pd.concat(preview_parts, ignore_index=True)
+    if progress:
+        progress("Completed", len(file_infos), len(file_infos))
+    return report
+
+
+# 监视目录模式默认的轮询间隔（秒）
+DEFAULT_WATCH_INTERVAL = 10
+
+
+class FolderWatcher:
+    """轮询目录（os.scandir + 文件大小和修改时间），找出新增或改变的日志文件，不依赖操作系统的文件通知接口"""
+    
+    def __init__(self, directory, pattern='*.csv', recursive=False):
+        self.directory = directory
+        self.pattern = pattern
+        self.recursive = recursive
+        self._seen = {}
+    
+    def poll(self):
+        """扫描一次目录
+        
+        Returns:
+            自上次扫描以来新增或大小/修改时间改变的文件路径列表（按修改时间排序）；目录无法读取时为空列表
+        """
+        import fnmatch
+        
+        regex = re.compile(fnmatch.translate(self.pattern)) if self.pattern else None
+        current = {}
+        directories = [self.directory]
+        while directories:
+            path = directories.pop()
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if self.recursive:
+                                    directories.append(entry.path)
+                            elif entry.is_file() and (regex is None or regex.match(log_file_name(entry.name))):
+                                stat = entry.stat()
+                                current[entry.path] = (stat.st_size, stat.st_mtime_ns)
+                        except OSError:
+                            continue
+            except OSError as e:
+                logger.warning(f"扫描{path}时出错: {str(e)}")
+                if path == self.directory:
+                    # 目录暂时无法访问时保留上次的状态，恢复后不会把所有文件当作新文件
+                    return []
+        changed = [path for path, state in current.items() if self._seen.get(path) != state]
+        self._seen = current
+        changed.sort(key=lambda path: (current[path][1], path))
+        return changed
+
+
+class _WatchedFile:
+    """监视目录模式中一个文件的读取状态"""
+    
+    __slots__ = ('index', 'tail', 'config', 'length_counts')
+    
+    def __init__(self, index, tail, config):
+        self.index = index
+        self.tail = tail
+        self.config = config
+        self.length_counts = np.zeros(0, dtype=np.int64)
+
+
+class WatchSession:
+    """监视目录模式的增量处理状态
+    
+    每个文件用LogTail记录读取位置，文件新增或追加时只解析新的完整行: 与Data Processing相同的表头识别、Config填入和
+    Serial Number长度过滤（长度中位数按文件累计）之后，新行加入流式SN去重索引；只有成为去重保留行的新行才做
+    列结构处理、特殊单元格清理和判定，被新行替换的旧保留行（重测通过的SN）从结果和统计中移除。
+    Yield、FPY和Top Defects统计量只加减改变的行，不重新计算全部数据。
+    
+    Attributes:
+        processed: 去重后的处理结果（对应processed_data，按读取顺序）
+        reprocessed: processed加上判定后的Pass/Fail和Fail_Reason列（对应reprocessed_data）
+        report: AnalysisReport（Yield、不良项目和FPY统计）
+        version: 结果每次改变时加1
+    """
+    
+    def __init__(self, resolve_limits=None, polygons=None, encoding=None):
+        """
+        Args:
+            resolve_limits: 可选回调 resolve_limits(列名列表) -> {列名: [(标准类型, 下限, 上限), ...]}，每种表头只调用一次
+            polygons: {'White': 顶点列表, 'Mixed': 顶点列表}，为None时不做色点判定
+            encoding: 文件编码，为None时按文件检测
+        """
+        self.resolve_limits = resolve_limits
+        self.polygons = polygons
+        self.encoding = encoding
+        self.files = {}
+        self._next_index = 0
+        self.report = AnalysisReport()
+        self.dedup_index = StreamingDedupIndex()
+        self.processed = None
+        self.reprocessed = None
+        self.row_ids = np.zeros(0, dtype=np.int64)
+        self.version = 0
+        self._limits = {}
+        # 加入时的列结构，每个保留行记录其编号（替换时按加入时的列和规格减去统计量）
+        self._signatures = []
+        self._signature_index = {}
+        self._signature_ids = np.zeros(0, dtype=np.int32)
+        # 每个保留行中含#字符的单元格数量和Pass/Fail列中FAIL单元格数量
+        self._hash_counts = np.zeros(0, dtype=np.int32)
+        self._fail_counts = np.zeros(0, dtype=np.int32)
+        # 判定为不良的单元格: 全局行号和列名（生成format_cells）
+        self._fail_ids = np.zeros(0, dtype=np.int64)
+        self._fail_columns = np.zeros(0, dtype=object)
+    
+    def update(self, file_paths):
+        """读取文件的新行并增量更新结果
+        
+        Returns:
+            {'files': 有新行的文件数, 'rows': 读取的新行数, 'added': 新增的保留行数, 'replaced': 被替换的保留行数}
+        """
+        summary = {'files': 0, 'rows': 0, 'added': 0, 'replaced': 0}
+        parts = []
+        for file_path in file_paths:
+            try:
+                chunk, row_ids, rows = self._read_new_rows(file_path)
+            except Exception as e:
+                # 文件可能正在写入，下次轮询时重试
+                logger.warning(f"监视模式跳过了{os.path.basename(file_path)}: {str(e)}")
+                continue
+            if rows == 0:
+                continue
+            summary['files'] += 1
+            summary['rows'] += rows
+            if len(chunk):
+                self.dedup_index.update(chunk, row_ids)
+                parts.append((chunk, row_ids))
+        if not parts:
+            return summary
+        
+        kept = self.dedup_index.kept_row_ids()
+        keep_old = np.isin(self.row_ids, kept, assume_unique=True)
+        if not keep_old.all():
+            # 重测通过的SN: 旧的保留行被新行替换，按加入时的列结构分组减去统计量
+            removed_ids = self.row_ids[~keep_old]
+            removed = self.processed[~keep_old]
+            removed_signatures = self._signature_ids[~keep_old]
+            remaining = self.processed[keep_old]
+            remaining_signatures = self._signature_ids[keep_old]
+            remaining_groups = [(remaining[remaining_signatures == signature_id],
+                                 self._limits_for(self._signatures[signature_id]))
+                                for signature_id in np.unique(remaining_signatures).tolist()]
+            for signature_id in np.unique(removed_signatures).tolist():
+                signature = self._signatures[signature_id]
+                self.report.remove_chunk(removed[removed_signatures == signature_id][list(signature)],
+                                         self._limits_for(signature), self.polygons, remaining_groups)
+            self.report.hash_cells -= int(self._hash_counts[~keep_old].sum())
+            self.report.fail_cells -= int(self._fail_counts[~keep_old].sum())
+            self.processed = remaining.reset_index(drop=True)
+            self.reprocessed = self.reprocessed[keep_old].reset_index(drop=True)
+            self.row_ids = self.row_ids[keep_old]
+            self._signature_ids = self._signature_ids[keep_old]
+            self._hash_counts = self._hash_counts[keep_old]
+            self._fail_counts = self._fail_counts[keep_old]
+            keep_cells = ~np.isin(self._fail_ids, removed_ids)
+            self._fail_ids = self._fail_ids[keep_cells]
+            self._fail_columns = self._fail_columns[keep_cells]
+            summary['replaced'] = len(removed_ids)
+        
+        processed_parts = [self.processed] if self.processed is not None else []
+        reprocessed_parts = [self.reprocessed] if self.reprocessed is not None else []
+        id_parts = [self.row_ids]
+        row_state_parts = [(self._signature_ids, self._hash_counts, self._fail_counts)]
+        for chunk, row_ids in parts:
+            selected = np.isin(row_ids, kept, assume_unique=True)
+            if not selected.any():
+                continue
+            processed, reprocessed, row_state = self._process_rows(chunk[selected].reset_index(drop=True),
+                                                                   row_ids[selected])
+            processed_parts.append(processed)
+            reprocessed_parts.append(reprocessed)
+            id_parts.append(row_ids[selected])
+            row_state_parts.append(row_state)
+            summary['added'] += int(selected.sum())
+        self.processed = pd.concat(processed_parts, ignore_index=True) if len(processed_parts) > 1 \
+            else processed_parts[0]
+        self.reprocessed = pd.concat(reprocessed_parts, ignore_index=True) if len(reprocessed_parts) > 1 \
+            else reprocessed_parts[0]
+        self.row_ids = np.concatenate(id_parts)
+        self._signature_ids, self._hash_counts, self._fail_counts = (np.concatenate(arrays)
+                                                                     for arrays in zip(*row_state_parts))
+        
+        self.report.units = len(kept)
+        self.report.files = len(self.files)
+        self.report.attempt_history = self.dedup_index.attempt_history()
+        self.version += 1
+        return summary
+    
+    def _read_new_rows(self, file_path):
+        """读取文件中新追加的完整数据行
+        
+        文件变短（被截断或重写）时从头作为新文件读取，之前读取的行保留在去重索引中。
+        
+        Returns:
+            (新行DataFrame（已填入Config并过滤Serial Number长度异常的行）, 全局行号, 读取的原始行数)
+        """
+        state = self.files.get(file_path)
+        if state is None:
+            state = self._watch_file(file_path)
+        start = state.tail.rows
+        try:
+            df = state.tail.read_new_rows()
+        except ValueError:
+            logger.warning(f"{os.path.basename(file_path)}被截断或重写，从头重新读取")
+            state = self._watch_file(file_path)
+            start = 0
+            df = state.tail.read_new_rows()
+        return self._filter_new_rows(state, df, start)
+    
+    def _watch_file(self, file_path):
+        state = _WatchedFile(self._next_index, LogTail(file_path, encoding=self.encoding),
+                             config_from_file_name(os.path.basename(file_path)))
+        self._next_index += 1
+        self.files[file_path] = state
+        return state
+    
+    def _filter_new_rows(self, state, df, start):
+        """填入Config、分配全局行号并按文件累计的Serial Number长度中位数过滤新行"""
+        rows = len(df)
+        row_ids = (np.int64(state.index) << _ROW_ID_SHIFT) + np.arange(start, start + rows, dtype=np.int64)
+        df = apply_file_config(df, state.config)
+        self.report.rows_read += rows
+        if rows and 'Serial Number' in df.columns:
+            state.length_counts = add_serial_lengths(state.length_counts, df['Serial Number'])
+            mask = serial_length_mask(df['Serial Number'], serial_length_median(state.length_counts))
+            self.report.rows_filtered += int((~mask).sum())
+            df, row_ids = df[mask].reset_index(drop=True), row_ids[mask]
+        return df, row_ids, rows
+    
+    def _limits_for(self, columns):
+        signature = tuple(columns)
+        if signature not in self._limits:
+            self._limits[signature] = self.resolve_limits(list(columns)) if self.resolve_limits else {}
+        return self._limits[signature]
+    
+    def _signature_id(self, columns):
+        signature = tuple(columns)
+        if signature not in self._signature_index:
+            self._signature_index[signature] = len(self._signatures)
+            self._signatures.append(signature)
+        return self._signature_index[signature]
+    
+    def _process_rows(self, chunk, row_ids):
+        """对新的保留行做列结构处理、特殊单元格清理和判定，并累计统计量
+        
+        Returns:
+            (处理结果, 判定结果, (每行的列结构编号, 含#字符的单元格数量, FAIL单元格数量))
+        """
+        convert_datetime_column(chunk)
+        chunk = get_schema_plan(chunk).apply(chunk)
+        cell_masks = {}
+        chunk, hash_cells, fail_cells, _ = clean_special_cells(chunk, cell_masks)
+        self.report.hash_cells += hash_cells
+        self.report.fail_cells += fail_cells
+        hash_counts = np.zeros(len(chunk), dtype=np.int32)
+        fail_counts = np.zeros(len(chunk), dtype=np.int32)
+        for format_mask, hash_mask in cell_masks.values():
+            hash_counts += hash_mask
+            # FAIL单元格不含#字符，需要格式化但不含#字符的单元格即为FAIL单元格
+            fail_counts += format_mask & ~hash_mask
+        signature_ids = np.full(len(chunk), self._signature_id(chunk.columns), dtype=np.int32)
+        limits = self._limits_for(chunk.columns)
+        _, column_fails = self.report.add_chunk(chunk, limits, self.polygons)
+        for column, mask in column_fails.items():
+            ids = row_ids[mask]
+            self._fail_ids = np.concatenate([self._fail_ids, ids])
+            self._fail_columns = np.concatenate([self._fail_columns, np.full(len(ids), column, dtype=object)])
+        return chunk, apply_verdict(chunk, limits, self.polygons), (signature_ids, hash_counts, fail_counts)
+    
+    def format_cells(self):
+        """reprocessed中需要标记的单元格 {行位置: [列位置, ...]}（与Data Re-Processing的format_cells格式相同）"""
+        if self.reprocessed is None:
+            return {}
+        positions = pd.Index(self.row_ids).get_indexer(self._fail_ids)
+        column_positions = {column: i for i, column in enumerate(self.reprocessed.columns)}
+        cells = {}
+        for row, column in zip(positions.tolist(), self._fail_columns.tolist()):
+            if row >= 0 and column in column_positions:
+                cells.setdefault(row, []).append(column_positions[column])
+        for position, column in enumerate(self.reprocessed.columns):
+            if 'Pass/Fail' in str(column):
+                failed = self.reprocessed.iloc[:, position].astype(str).str.strip().str.lower() == 'fail'
+                for row in np.flatnonzero(failed.to_numpy()).tolist():
+                    cells.setdefault(row, []).append(position)
+        return cells
+
+
+def standardize_criteria_type(std_type):
+    """标准化标准类型名称，保留窗口类型信息
+    
+    Args:
+        std_type: 原始标准类型名称
+        
+    Returns:
+        tuple: (window_type, metric_type) - 窗口类型和度量类型
+    """
+    std_type_lower = std_type.strip().lower()
+    window_type = None
+    metric_type = std_type
+    
+    # 检查是否包含窗口类型前缀
+    if 'white' in std_type_lower:
+        window_type = 'white'
+        # 移除窗口类型前缀，提取度量类型
+        metric_type = std_type_lower.replace('white', '').strip()
+    elif 'mixed' in std_type_lower:
+        window_type = 'mixed'
+        # 移除窗口类型前缀，提取度量类型
+        metric_type = std_type_lower.replace('mixed', '').strip()
+    
+    # 度量类型标准化
+    metric_mapping = {
+        'l': 'L', 'l value': 'L', 'lightness': 'L',
+        'u': 'U', 'uniformity': 'U',
+        'dy': 'dY', 'delta y': 'dY', 'ydelta': 'dY',
+        'ru': 'Ru', 'r uniformity': 'Ru',
+        'rv': 'Rv', 'v uniformity': 'Rv',
+        'du': 'Du', 'd uniformity': 'Du',
+        'dv': 'Dv', 'v delta uniformity': 'Dv',
+        'dl*min': 'dL*Min', 'dl min': 'dL*Min', 'delta l min': 'dL*Min',
+        'dl*max': 'dL*Max', 'dl max': 'dL*Max', 'delta l max': 'dL*Max',
+        'demax': 'dEMax', 'de max': 'dEMax', 'delta e max': 'dEMax'
+    }
+    
+    # 标准化度量类型
+    metric_type = metric_mapping.get(metric_type, metric_type)
+    
+    return window_type, metric_type
+
+
+def best_matching_column(std_type_info, available_columns):
+    """智能匹配标准类型到最合适的列名，考虑窗口类型和带单位的名称
+    
+    Args:
+        std_type_info: 标准类型信息，格式为(window_type, metric_type)
+        available_columns: 可用的列名列表
+        
+    Returns:
+        str or None: 最佳匹配的列名，如果没有匹配则返回None
+    """
+    # 如果传入的是字符串而不是元组（兼容旧代码）
+    if isinstance(std_type_info, str):
+        window_type = None
+        metric_type = std_type_info
+    else:
+        window_type, metric_type = std_type_info
+    
+    # 预处理文本，移除特殊字符、单位并转换为小写
+    def preprocess_text(text):
+        # 移除括号中的单位信息，如 (cd/m^2), (%), (%/cm) 等
+        text = re.sub(r'\([^)]*\)', '', text)
+        # 移除特殊字符，只保留字母、数字和空格
+        text = re.sub(r'[^a-zA-Z0-9\s]', '', text)
+        # 标准化空格
+        text = re.sub(r'\s+', ' ', text).strip().lower()
+        return text
+    
+    # 定义窗口类型到前缀的映射
+    window_prefix_mapping = {
+        'white': ['white', 'w_'],
+        'mixed': ['mixed', 'm_']
+    }
+    
+    # 定义度量类型到关键词的映射
+    metric_keywords = {
+        'L': ['l', 'lightness'],
+        'U': ['u', 'uniformity'],
+        'dY': ['dy', 'ydelta', 'ydiff'],
+        'Ru': ['ru', 'runiformity'],
+        'Rv': ['rv', 'rvuniformity'],
+        'Du': ['du', 'duuniformity'],
+        'Dv': ['dv', 'dvuniformity'],
+        'dL*Min': ['dl*min', 'dlmin', 'dl_min'],
+        'dL*Max': ['dl*max', 'dlmax', 'dl_max'],
+        'dEMax': ['demax', 'de_max', 'deltemax']
+    }
+    
+    # 特殊处理Metric类型（如Metric1, Metric2等）
+    metric_match = re.match(r'metric(\d+)', metric_type.lower())
+    if metric_match:
+        metric_num = metric_match.group(1)
+        if window_type:
+            # 根据窗口类型选择对应的前缀
+            if window_type == 'white':
+                target_pattern = f'w_m{metric_num}'  # White窗口的Metric对应W_M1, W_M2等
+            else:  # mixed
+                target_pattern = f'm_m{metric_num}'  # Mixed窗口的Metric对应M_M1, M_M2等
+            
+            # 查找匹配的列
+            for col in available_columns:
+                col_lower = col.lower()
+                if target_pattern in col_lower:
+                    return col
+        return None
+    
+    # 预处理标准类型信息
+    processed_metric_type = preprocess_text(metric_type)
+    
+    # 为每个列计算匹配分数
+    best_score = 0
+    best_match = None
+    
+    for col in available_columns:
+        # 原始列名和处理后的列名
+        original_col = col
+        col_lower = preprocess_text(col)
+        score = 0
+        
+        # 1. 检查窗口类型匹配（最高优先级）
+        if window_type and window_type in window_prefix_mapping:
+            for prefix in window_prefix_mapping[window_type]:
+                if col_lower.startswith(prefix) or f' {prefix}' in col_lower:
+                    score += 5  # 窗口类型匹配（权重最高）
+                    break
+        
+        # 2. 检查度量类型匹配
+        # 首先尝试精确匹配处理后的完整度量类型
+        if processed_metric_type in col_lower:
+            score += 10  # 完整度量类型匹配给较高分数
+        else:
+            # 然后尝试使用关键词列表匹配
+            base_metric_type = metric_type.split('(')[0].strip()  # 提取不带单位的基本类型
+            metric_keywords_list = metric_keywords.get(base_metric_type, [base_metric_type.lower()])
+            for keyword in metric_keywords_list:
+                if keyword in col_lower:
+                    score += 5  # 度量类型关键词匹配
+                    
+                    # 如果关键词是列名的主要部分，额外加分
+                    if col_lower.endswith(keyword) or keyword + ' ' in col_lower:
+                        score += 3
+                    break
+        
+        # 3. 完全匹配检查（同时考虑原始名称和处理后名称）
+        if (metric_type.lower() == original_col.lower() or 
+            processed_metric_type == col_lower):
+            score += 20  # 完全匹配给最高分
+        
+        # 更新最佳匹配
+        if score > best_score:
+            best_score = score
+            best_match = col
+    
+    # 只有当匹配分数足够高时才返回匹配结果
+    if best_score >= 9:  # 阈值保持不变
+        return best_match
+    
+    return None
+
+
+def resolve_criteria_columns(criteria_dict, columns):
+    """把Review Criteria标准匹配到数据列（与Data Re-Processing的匹配规则一致），每种表头只需匹配一次
+    
+    Args:
+        criteria_dict: {std_type: (lower_limit, upper_limit)}
+        columns: 数据列名列表
+    
+    Returns:
+        {列名: [(标准类型, 下限或None, 上限或None), ...]}，空值或0的下限/上限不参与判定
+    """
+    def parse_limit(value):
+        if not value:
+            return None
+        try:
+            return float(value)
+        except (ValueError, TypeError):
+            return None
+    
+    available_columns = pd.Index(columns)
+    limits = {}
+    for std_type, values in criteria_dict.items():
+        if not isinstance(values, (list, tuple)) or len(values) < 2:
+            continue
+        column_name = best_matching_column(standardize_criteria_type(std_type), available_columns)
+        if column_name is None:
+            column_name = best_matching_column(std_type, available_columns)
+        if column_name is None:
+            continue
+        limits.setdefault(column_name, []).append((std_type, parse_limit(values[0]), parse_limit(values[1])))
+    return limits
+
+
+def parse_criteria_data(criteria_data):
+    """把TestLogAnalyzer_Criteria.json的内容转换为 {std_type: (lower_limit, upper_limit)}
+    
+    支持两种格式: [{'std_type': ..., 'lower': ..., 'upper': ...}, ...] 列表，
+    以及 {'White': {std_type: {'lower': ..., 'upper': ...} 或 [lower, upper]}, 'Mixed': {...}} 字典
+    （字典格式的标准类型加上"White "/"Mixed "前缀）。缺失的下限记为0，缺失的上限记为无穷大。
+    
+    Returns:
+        标准字典，无法解析的条目记录警告后跳过
+    """
+    criteria_dict = {}
+    if isinstance(criteria_data, list):
+        for idx, item in enumerate(criteria_data):
+            if not isinstance(item, dict) or not {'std_type', 'lower', 'upper'} <= set(item):
+                logger.warning(f"list元素[{idx}]缺少必要字段: {item}")
+                continue
+            try:
+                lower = float(item['lower']) if item['lower'] is not None else 0
+                upper = float(item['upper']) if item['upper'] is not None else float('inf')
+                criteria_dict[item['std_type']] = (lower, upper)
+            except (ValueError, TypeError) as e:
+                logger.warning(f"处理list元素[{idx}]时出错: {str(e)}")
+    elif isinstance(criteria_data, dict):
+        for window_type in ('White', 'Mixed'):
+            for std_type, values in (criteria_data.get(window_type) or {}).items():
+                try:
+                    if isinstance(values, dict):
+                        lower = float(values.get('lower', 0)) if values.get('lower') is not None else 0
+                        upper = float(values.get('upper', float('inf'))) if values.get('upper') is not None else float('inf')
+                    elif isinstance(values, (list, tuple)) and len(values) >= 2:
+                        lower = float(values[0]) if values[0] is not None else 0
+                        upper = float(values[1]) if values[1] is not None else float('inf')
+                    else:
+                        logger.warning(f"{window_type}窗口中的{std_type}规格数据格式不支持: {values}")
+                        continue
+                    criteria_dict[f"{window_type} {std_type}"] = (lower, upper)
+                except (ValueError, TypeError) as e:
+                    logger.warning(f"无法解析{window_type}窗口中的{std_type}规格数据: {values}, 错误: {str(e)}")
+    else:
+        logger.warning(f"规格数据格式不支持，数据类型: {type(criteria_data).__name__}")
+    return criteria_dict
+
+
+# Review Criteria临时规格文件名（保存在系统临时目录中）
+CRITERIA_FILE_NAME = 'TestLogAnalyzer_Criteria.json'
+
+# 标准类型的描述（criteria工作表的Description列）
+CRITERIA_DESCRIPTIONS = {
+    "L": "Luminance", "U": "Uniformity", "dY": "dY", "u": "u'", "v": "v'",
+    "Ru": "Ru", "Rv": "Rv", "Du": "Du", "Dv": "Dv",
+    "dL*Min": "dL*Min", "dL*Max": "dL*Max", "dEMax": "dEMax",
+    "Metric2": "Metric2", "Metric3": "Metric3", "Metric7": "Metric7",
+    "Metric13": "Metric13", "Metric14": "Metric14", "Metric15": "Metric15",
+    "Metric17": "Metric17"
+}
+
+
+def _criteria_limit_value(value):
+    """规格上下限原样保存（文本去掉首尾空格），None表示缺失"""
+    return value.strip() if isinstance(value, str) else value
+
+
+def _criteria_float(value):
+    """把规格上下限转换为浮点数，缺失或无法转换时返回None"""
+    if value is None or value == '':
+        return None
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+
+class CriteriaStore:
+    """Review Criteria规格数据的内存存储
+    
+    内容为 {'White': {std_type: (lower, upper)}, 'Mixed': {...}}，与TestLogAnalyzer_Criteria.json一致，
+    上下限保留编辑框中的文本。内容改变时version加1，可作为缓存键；标准字典和数值上下限按version缓存。
+    subscribe()注册的回调在内容改变后收到 (version, [(window_type, std_type), ...])。
+    第一次访问时读取一次规格文件（保留上次运行保存的规格），persist()只在内容与文件不同时写入，
+    先写入临时文件再用os.replace替换，不会留下写了一半的文件。
+    """
+    
+    WINDOW_TYPES = ('White', 'Mixed')
+    
+    def __init__(self, path=None):
+        import tempfile
+        
+        self.path = path or os.path.join(tempfile.gettempdir(), CRITERIA_FILE_NAME)
+        self.version = 0
+        self._data = {}
+        self._persisted = {}
+        self._loaded = False
+        self._derived = {}
+        self._subscribers = []
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def _normalize(cls, data):
+        """把字典格式或列表格式的规格数据转换为 {window_type: {std_type: (lower, upper)}}"""
+        normalized = {}
+        if isinstance(data, list):
+            # 列表格式的标准类型带有"White "/"Mixed "前缀
+            for item in data:
+                if not isinstance(item, dict) or 'std_type' not in item:
+                    continue
+                window_type, _, std_type = str(item['std_type']).partition(' ')
+                if window_type in cls.WINDOW_TYPES and std_type:
+                    normalized.setdefault(window_type, {})[std_type] = (
+                        _criteria_limit_value(item.get('lower')), _criteria_limit_value(item.get('upper')))
+            return normalized
+        for window_type, items in (data or {}).items():
+            window = {}
+            for std_type, values in (items or {}).items():
+                if isinstance(values, dict):
+                    lower, upper = values.get('lower'), values.get('upper')
+                elif isinstance(values, (list, tuple)) and len(values) >= 2:
+                    lower, upper = values[0], values[1]
+                else:
+                    logger.warning(f"{window_type}窗口中的{std_type}规格数据格式不支持: {values}")
+                    continue
+                window[std_type] = (_criteria_limit_value(lower), _criteria_limit_value(upper))
+            normalized[window_type] = window
+        return normalized
+    
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"读取规格文件{self.path}时出错: {e}")
+            return
+        if not isinstance(data, (dict, list)):
+            logger.warning(f"规格文件格式不支持，数据类型: {type(data).__name__}")
+            return
+        self._data = self._normalize(data)
+        self._persisted = self._data
+        self.version += 1
+        logger.info(f"从规格文件读取了{len(self)}条规格: {self.path}")
+    
+    def __len__(self):
+        self._ensure_loaded()
+        return sum(len(items) for items in self._data.values())
+    
+    def data(self):
+        """当前规格数据的副本 {window_type: {std_type: (lower, upper)}}"""
+        with self._lock:
+            self._ensure_loaded()
+            return {window_type: dict(items) for window_type, items in self._data.items()}
+    
+    def window(self, window_type):
+        """一个窗口的规格 {std_type: (lower, upper)}"""
+        with self._lock:
+            self._ensure_loaded()
+            return dict(self._data.get(window_type, {}))
+    
+    def replace(self, data):
+        """替换全部规格数据，内容改变时version加1
+        
+        Returns:
+            内容是否改变
+        """
+        normalized = self._normalize(data)
+        with self._lock:
+            self._ensure_loaded()
+            if normalized == self._data:
+                return False
+            changes = [(window_type, std_type)
+                       for window_type in sorted(set(self._data) | set(normalized))
+                       for std_type in sorted(set(self._data.get(window_type, {})) | set(normalized.get(window_type, {})))
+                       if self._data.get(window_type, {}).get(std_type) != normalized.get(window_type, {}).get(std_type)]
+            self._data = normalized
+            self.version += 1
+            self._derived = {}
+            version = self.version
+        self._publish(version, changes)
+        return True
+    
+    def subscribe(self, callback):
+        """注册内容改变事件的回调 callback(version, changes)
+        
+        Returns:
+            取消注册的函数
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+        
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+        return unsubscribe
+    
+    def _publish(self, version, changes):
+        # 回调在锁外调用（回调中可以读取规格），遍历加锁时取得的列表副本
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(version, changes)
+            except Exception:
+                logger.exception("规格数据改变事件的回调出错")
+    
+    def set_window(self, window_type, items):
+        """替换一个窗口的规格，内容改变时version加1"""
+        data = self.data()
+        data[window_type] = items
+        return self.replace(data)
+    
+    def set_limit(self, window_type, std_type, lower, upper):
+        """修改一条规格的上下限，内容改变时version加1"""
+        data = self.data()
+        data.setdefault(window_type, {})[std_type] = (lower, upper)
+        return self.replace(data)
+    
+    def _cached(self, name, compute):
+        with self._lock:
+            self._ensure_loaded()
+            key = (name, self.version)
+            if key not in self._derived:
+                self._derived[key] = compute(self._data)
+            return self._derived[key]
+    
+    def criteria_dict(self):
+        """重新判定使用的标准字典 {"White L": (lower, upper), ...}（同parse_criteria_data，按version缓存）"""
+        return dict(self._cached('criteria_dict', parse_criteria_data))
+    
+    def numeric_limits(self, window_type):
+        """一个窗口中上下限都是数值的规格 {std_type: (lower, upper)}（Cpk使用，按version缓存）"""
+        def compute(data):
+            limits = {}
+            for std_type, (lower, upper) in data.get(window_type, {}).items():
+                lower, upper = _criteria_float(lower), _criteria_float(upper)
+                if lower is not None and upper is not None:
+                    limits[std_type] = (lower, upper)
+            return limits
+        return dict(self._cached(('numeric_limits', window_type), compute))
+    
+    def rows(self):
+        """criteria工作表的行 [{'DataType', 'StandardType', 'LowerLimit', 'UpperLimit', 'Description'}, ...]"""
+        rows = []
+        for window_type, items in self.data().items():
+            for std_type, (lower, upper) in items.items():
+                rows.append({
+                    'DataType': window_type,
+                    'StandardType': std_type,
+                    'LowerLimit': '' if lower is None else str(lower),
+                    'UpperLimit': '' if upper is None else str(upper),
+                    'Description': CRITERIA_DESCRIPTIONS.get(std_type, f"{window_type} {std_type}"),
+                })
+        return rows
+    
+    def persist(self):
+        """内容与规格文件不同时以原子方式写入JSON文件
+        
+        Returns:
+            是否写入了文件
+        """
+        with self._lock:
+            self._ensure_loaded()
+            # 规格文件被删除时重新写入
+            if self._data == self._persisted and (not self._data or os.path.exists(self.path)):
+                return False
+            data = self._data
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({window_type: {std_type: list(limits) for std_type, limits in items.items()}
+                           for window_type, items in data.items()}, f, indent=4, ensure_ascii=False)
+            os.replace(temp_path, self.path)
+            self._persisted = data
+        logger.info(f"规格数据已保存到临时JSON文件: {self.path}（版本{self.version}）")
+        return True
+
+
+def load_log_file(file_path, config=None, encoding=None):
+    """读取单个测试日志（与Data Processing一致）: 识别标题行、填入Config、过滤Serial Number长度异常的行
+    
+    Args:
+        file_path: 日志文件路径
+        config: Config文本，为None时从文件名解析
+        encoding: 文件编码，为None时检测
+    
+    Returns:
+        (DataFrame, LogHeader, 过滤掉的行数, Serial Number长度中位数或None)
+    """
+    import io
+    
+    header = sniff_log_header(file_path, encoding=encoding)
+    candidates = [header.encoding] + (fallback_encodings(header.encoding) if encoding is None else [])
+    with span("read_csv") as stage:
+        read_args = {'skiprows': header.skiprows, 'on_bad_lines': 'skip', 'engine': 'python'}
+        if len(candidates) == 1:
+            df = read_log_csv(file_path, encoding=header.encoding, **read_args)
+        else:
+            # 检测样本之后可能出现不符合检测结果的字符: 先确定能解码全文的编码，只解析一次
+            text, header.encoding = read_log_text(file_path, candidates)
+            df = pd.read_csv(io.StringIO(text), **read_args)
+        stage.rows = len(df)
+    if config is None:
+        config = config_from_file_name(os.path.basename(file_path))
+    df = apply_file_config(df, config)
+    
+    filtered_rows = 0
+    median_length = None
+    if 'Serial Number' in df.columns:
+        median_length = df['Serial Number'].astype(str).str.len().median()
+        original_rows = len(df)
+        df = df[serial_length_mask(df['Serial Number'], median_length)]
+        filtered_rows = original_rows - len(df)
+    return df, header, filtered_rows, median_length
+
+
+class StageSpan:
+    """一个流水线阶段的计时记录（上下文管理器），退出时把耗时、CPU时间、行数和峰值内存写入PerformanceRecorder
+    
+    在with块内可以设置rows属性，用于计算每秒处理行数。
+    """
+    
+    def __init__(self, recorder, name, rows=None):
+        self.recorder = recorder
+        self.name = name
+        self.rows = rows
+        self.run = None
+        self.depth = 0
+        self.start_time = None
+        self.wall = None
+        self.cpu = None
+        self.peak_bytes = None
+        self._start_cpu = None
+        self._start_memory = 0
+        self._peak_seen = 0
+    
+    def start(self):
+        self.recorder._enter(self)
+        self.start_time = time.perf_counter()
+        self._start_cpu = time.process_time()
+        return self
+    
+    def stop(self, error=None):
+        if self.start_time is None or self.wall is not None:
+            return self
+        self.wall = time.perf_counter() - self.start_time
+        self.cpu = time.process_time() - self._start_cpu
+        self.recorder._exit(self, error)
+        return self
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop(error=repr(exc_value) if exc_value is not None else None)
+        return False
+
+
+class PerformanceRecorder:
+    """记录流水线各阶段的耗时、CPU时间、每秒行数和峰值内存（tracemalloc）
+    
+    最外层的阶段视为一次运行（run），设置chrome_trace_dir后每次运行结束时写出一个Chrome trace JSON文件
+    （可在chrome://tracing或Perfetto中打开）。
+    
+    Attributes:
+        records: 已完成阶段的记录字典列表（按完成顺序）
+        chrome_trace_dir: Chrome trace文件保存目录，为None时不写出
+        max_records: 最多保留的记录数量
+    """
+    
+    def __init__(self, max_records=5000):
+        self.records = []
+        self.chrome_trace_dir = None
+        self.max_records = max_records
+        self.run_count = 0
+        self._origin = time.perf_counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._started_tracemalloc = False
+        self._listeners = []
+    
+    @property
+    def trace_memory(self):
+        return tracemalloc.is_tracing()
+    
+    def set_trace_memory(self, enabled):
+        """开启/关闭tracemalloc峰值内存记录（开启后所有内存分配都会变慢）"""
+        if enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        elif not enabled and self._started_tracemalloc and tracemalloc.is_tracing():
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+    
+    def span(self, name, rows=None):
+        """创建一个阶段记录，用法: with recorder.span("read_csv") as stage: ...; stage.rows = len(df)"""
+        return StageSpan(self, name, rows)
+    
+    def add_listener(self, callback):
+        """注册运行结束回调 callback(run_records)"""
+        self._listeners.append(callback)
+    
+    def clear(self):
+        with self._lock:
+            self.records = []
+    
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+    
+    def _enter(self, span):
+        stack = self._stack()
+        if stack:
+            span.run = stack[0].run
+        else:
+            with self._lock:
+                self.run_count += 1
+                span.run = self.run_count
+        span.depth = len(stack)
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            for parent in stack:
+                parent._peak_seen = max(parent._peak_seen, peak)
+            tracemalloc.reset_peak()
+            span._start_memory = current
+            span._peak_seen = current
+        stack.append(span)
+    
+    def _exit(self, span, error):
+        stack = self._stack()
+        if span in stack:
+            # 未正常结束的子阶段随父阶段一起出栈
+            while stack and stack[-1] is not span:
+                stack.pop()
+            stack.pop()
+        if tracemalloc.is_tracing():
+            _, peak = tracemalloc.get_traced_memory()
+            for parent in stack:
+                parent._peak_seen = max(parent._peak_seen, peak)
+            span.peak_bytes = max(span._peak_seen, peak) - span._start_memory
+        
+        rows_per_sec = span.rows / span.wall if span.rows and span.wall > 0 else None
+        record = {
+            'run': span.run,
+            'name': span.name,
+            'depth': span.depth,
+            'start': span.start_time - self._origin,
+            'wall': span.wall,
+            'cpu': span.cpu,
+            'rows': span.rows,
+            'rows_per_sec': rows_per_sec,
+            'peak_bytes': span.peak_bytes,
+            'thread': threading.get_ident(),
+            'error': error,
+        }
+        with self._lock:
+            self.records.append(record)
+            if len(self.records) > self.max_records:
+                del self.records[:len(self.records) - self.max_records]
+        
+        if span.depth == 0:
+            run_records = self.run_records(span.run)
+            if self.chrome_trace_dir:
+                try:
+                    self.write_chrome_trace(self.chrome_trace_path(span), run_records)
+                except OSError as e:
+                    logger.warning(f"写入Chrome trace时出错: {str(e)}")
+            for callback in list(self._listeners):
+                try:
+                    callback(run_records)
+                except Exception as e:
+                    logger.debug(f"性能监听回调出错: {str(e)}")
+    
+    def run_records(self, run):
+        with self._lock:
+            return [record for record in self.records if record['run'] == run]
+    
+    def chrome_trace_path(self, span):
+        import datetime
+        
+        os.makedirs(self.chrome_trace_dir, exist_ok=True)
+        safe_name = re.sub(r'[^A-Za-z0-9._-]+', '_', span.name)
+        file_name = f"trace_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}_run{span.run}_{safe_name}.json"
+        return os.path.join(self.chrome_trace_dir, file_name)
+    
+    def write_chrome_trace(self, file_path, records=None):
+        """把记录写成Chrome trace事件格式（完整事件"X"，时间单位为微秒）"""
+        import json
+        
+        events = []
+        for record in (self.records if records is None else records):
+            args = {'cpu_ms': round(record['cpu'] * 1000, 3)}
+            if record['rows'] is not None:
+                args['rows'] = int(record['rows'])
+            if record['rows_per_sec'] is not None:
+                args['rows_per_sec'] = round(record['rows_per_sec'], 1)
+            if record['peak_bytes'] is not None:
+                args['peak_mb'] = round(record['peak_bytes'] / (1024 * 1024), 3)
+            if record['error']:
+                args['error'] = record['error']
+            events.append({
+                'name': record['name'],
+                'cat': 'pipeline',
+                'ph': 'X',
+                'ts': round(record['start'] * 1e6, 1),
+                'dur': round(record['wall'] * 1e6, 1),
+                'pid': os.getpid(),
+                'tid': record['thread'],
+                'args': args,
+            })
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f, indent=1)
+        return file_path
+    
+    def summary(self, run=None):
+        """阶段记录表（run为None时包含所有运行），按开始时间排序"""
+        columns = ['Run', 'Stage', 'Depth', 'Wall (s)', 'CPU (s)', 'Rows', 'Rows/s', 'Peak Memory (MB)', 'Error']
+        with self._lock:
+            records = [r for r in self.records if run is None or r['run'] == run]
+        records.sort(key=lambda r: (r['run'], r['start']))
+        rows = [(r['run'], r['name'], r['depth'], r['wall'], r['cpu'], r['rows'], r['rows_per_sec'],
+                 r['peak_bytes'] / (1024 * 1024) if r['peak_bytes'] is not None else None, r['error'])
+                for r in records]
+        return pd.DataFrame(rows, columns=columns)
+
+
+# 全局阶段记录器，界面、批处理模式和核心函数共用
+performance = PerformanceRecorder()
+
+
+def span(name, rows=None):
+    """在全局记录器中创建一个阶段记录"""
+    return performance.span(name, rows)
+
+
+def timed_stage(name, rows_from=None):
+    """把整个方法记录为一个阶段的装饰器
+    
+    Args:
+        name: 阶段名称
+        rows_from: 方法结束后从self读取行数的属性名；为None时返回值为DataFrame则使用其行数
+    """
+    import functools
+    
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name) as stage:
+                result = func(*args, **kwargs)
+                data = getattr(args[0], rows_from, None) if rows_from and args else result
+                if isinstance(data, pd.DataFrame):
+                    stage.rows = len(data)
+                return result
+        return wrapper
+    return decorator
+
+
+# 性能分析摘要中列出的函数数量
+DEFAULT_PROFILE_TOP_N = 30
+
+
+def profile_call(func, output_dir, label, args=(), kwargs=None, top_n=DEFAULT_PROFILE_TOP_N, profiler='cprofile'):
+    """在性能分析器中运行func，保存分析结果和热点函数摘要（func抛出异常时同样保存后再抛出）
+    
+    cprofile: 保存.prof文件（可用snakeviz/pstats打开）以及按累计耗时和自身耗时排序的前top_n个函数；
+    pyinstrument: 已安装时保存.html调用树和文本摘要，未安装时退回cprofile。
+    
+    Args:
+        func: 要分析的可调用对象
+        output_dir: 结果保存目录
+        label: 文件名中使用的操作名称
+        top_n: 摘要中列出的函数数量
+        profiler: 'cprofile'或'pyinstrument'
+    
+    Returns:
+        (func返回值, [保存的文件路径])
+    """
+    import datetime
+    import io
+    
+    kwargs = kwargs or {}
+    os.makedirs(output_dir, exist_ok=True)
+    safe_label = re.sub(r'[^A-Za-z0-9._-]+', '_', label)
+    base_path = os.path.join(output_dir, f"profile_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}_{safe_label}")
+    
+    if profiler == 'pyinstrument':
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            logger.warning("未安装pyinstrument，改用cProfile")
+            profiler = 'cprofile'
+    
+    start = time.perf_counter()
+    if profiler == 'pyinstrument':
+        session = Profiler()
+        session.start()
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            session.stop()
+            paths = _save_pyinstrument_profile(session, base_path)
+        return result, paths
+    
+    import cProfile
+    import pstats
+    
+    session = cProfile.Profile()
+    result = None
+    error = None
+    try:
+        result = session.runcall(func, *args, **kwargs)
+    except BaseException as e:
+        error = e
+    wall = time.perf_counter() - start
+    
+    prof_path = base_path + '.prof'
+    txt_path = base_path + '.txt'
+    session.dump_stats(prof_path)
+    buffer = io.StringIO()
+    stats = pstats.Stats(session, stream=buffer)
+    stats.strip_dirs()
+    buffer.write(f"Action: {label}\n")
+    buffer.write(f"Wall time: {wall:.3f} s\n")
+    if error is not None:
+        buffer.write(f"Raised: {error!r}\n")
+    buffer.write(f"\n=== Top {top_n} functions by cumulative time ===\n")
+    stats.sort_stats('cumulative').print_stats(top_n)
+    buffer.write(f"\n=== Top {top_n} functions by own time ===\n")
+    stats.sort_stats('tottime').print_stats(top_n)
+    with open(txt_path, 'w', encoding='utf-8') as f:
+        f.write(buffer.getvalue())
+    
+    if error is not None:
+        raise error
+    return result, [prof_path, txt_path]
+
+
+def _save_pyinstrument_profile(session, base_path):
+    """保存pyinstrument会话的.html调用树和.txt摘要"""
+    html_path = base_path + '.html'
+    txt_path = base_path + '.txt'
+    with open(html_path, 'w', encoding='utf-8') as f:
+        f.write(session.output_html())
+    with open(txt_path, 'w', encoding='utf-8') as f:
+        f.write(session.output_text(unicode=True, color=False))
+    return [html_path, txt_path]
+
+
+# 流水线线程池的默认线程数（各阶段的计算主要在pandas/numpy中进行，线程数不必超过可并行的阶段数）
+DEFAULT_PIPELINE_WORKERS = 4
+
+
+class PipelineStage:
+    """PipelineScheduler中的一个阶段
+    
+    Attributes:
+        name: 阶段名称
+        depends: 依赖的阶段名称元组
+        state: 'pending' / 'running' / 'done' / 'failed' / 'skipped'
+        result: compute的返回值
+        error: 失败时的异常
+        wall: 从开始执行到完成的耗时（秒）
+    """
+    
+    def __init__(self, name, compute=None, render=None, depends=()):
+        self.name = name
+        self.compute = compute
+        self.render = render
+        self.depends = tuple(depends)
+        self.state = 'pending'
+        self.result = None
+        self.error = None
+        self.wall = None
+        self._start_time = None
+
+
+class PipelineScheduler:
+    """按阶段依赖关系驱动的分析流水线：依赖的阶段全部完成后立即开始，不使用固定延时
+    
+    compute(results)在线程池中执行，参数为{依赖阶段名称: 结果}，不能操作界面控件；
+    render(result)通过dispatch回到调用方的线程执行（界面程序传入把回调交给Tk主线程的函数），
+    只有render的阶段也通过dispatch执行。互不依赖的阶段的compute并行执行。
+    阶段出错时记录错误，依赖它的阶段标记为skipped，其它阶段继续执行。
+    
+    不指定dispatch时直接在完成compute的线程中执行render（批处理和测试使用）。
+    """
+    
+    def __init__(self, dispatch=None, max_workers=None, on_stage_finished=None):
+        self.stages = {}
+        self.dispatch = dispatch or (lambda callback, *args: callback(*args))
+        self.max_workers = max_workers or DEFAULT_PIPELINE_WORKERS
+        self.on_stage_finished = on_stage_finished
+        self.cancelled = False
+        self._on_finished = None
+        self._executor = None
+        self._lock = threading.RLock()
+        self._finished = threading.Event()
+    
+    def add_stage(self, name, compute=None, render=None, depends=()):
+        """添加阶段，依赖的阶段必须已经添加（因此不会出现循环依赖）"""
+        if name in self.stages:
+            raise ValueError(f"Duplicate pipeline stage: {name}")
+        missing = [dependency for dependency in depends if dependency not in self.stages]
+        if missing:
+            raise ValueError(f"Stage {name} depends on unknown stages: {', '.join(missing)}")
+        self.stages[name] = PipelineStage(name, compute, render, depends)
+        return self.stages[name]
+    
+    @property
+    def finished(self):
+        return self._finished.is_set()
+    
+    def start(self, on_finished=None):
+        """开始执行没有依赖的阶段，全部阶段结束后调用on_finished(scheduler)"""
+        self._on_finished = on_finished
+        if any(stage.compute is not None for stage in self.stages.values()):
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='pipeline')
+        self._advance()
+        return self
+    
+    def cancel(self):
+        """不再开始新的阶段，正在执行的compute完成后其render不再执行"""
+        self.cancelled = True
+        self._advance()
+    
+    def wait(self, timeout=None):
+        """等待全部阶段结束（dispatch在其它线程执行回调时使用）"""
+        return self._finished.wait(timeout)
+    
+    def results(self):
+        return {name: stage.result for name, stage in self.stages.items() if stage.state == 'done'}
+    
+    def _advance(self):
+        with self._lock:
+            ready = []
+            changed = True
+            while changed:
+                changed = False
+                for stage in self.stages.values():
+                    if stage.state != 'pending':
+                        continue
+                    states = [self.stages[dependency].state for dependency in stage.depends]
+                    if self.cancelled or any(state in ('failed', 'skipped') for state in states):
+                        stage.state = 'skipped'
+                        changed = True
+                    elif all(state == 'done' for state in states):
+                        stage.state = 'running'
+                        stage._start_time = time.perf_counter()
+                        ready.append(stage)
+            finished = (not ready and not self._finished.is_set()
+                        and all(stage.state not in ('pending', 'running') for stage in self.stages.values()))
+            if finished:
+                self._finished.set()
+        
+        for stage in ready:
+            if stage.compute is not None:
+                inputs = {dependency: self.stages[dependency].result for dependency in stage.depends}
+                self._executor.submit(self._run_compute, stage, inputs)
+            else:
+                self.dispatch(self._run_render, stage, None)
+        if finished:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+            if self._on_finished is not None:
+                self._on_finished(self)
+    
+    def _run_compute(self, stage, inputs):
+        try:
+            result = stage.compute(inputs)
+        except Exception as e:
+            logger.exception(f"流水线阶段{stage.name}出错")
+            self.dispatch(self._complete, stage, None, e)
+            return
+        self.dispatch(self._run_render, stage, result)
+    
+    def _run_render(self, stage, result):
+        if self.cancelled:
+            self._complete(stage, result, None, state='skipped')
+            return
+        try:
+            if stage.render is not None:
+                stage.render(result)
+        except Exception as e:
+            logger.exception(f"流水线阶段{stage.name}出错")
+            self._complete(stage, result, e)
+            return
+        self._complete(stage, result, None)
+    
+    def _complete(self, stage, result, error, state=None):
+        with self._lock:
+            stage.result = result
+            stage.error = error
+            stage.state = state or ('failed' if error is not None else 'done')
+            stage.wall = time.perf_counter() - stage._start_time
+        if self.on_stage_finished is not None:
+            self.on_stage_finished(stage)
+        self._advance()
+
+
+def content_hash(*parts):
+    """计算分析节点输入的内容哈希
+    
+    parts可以是字符串、数值、None、列表/元组/字典（按JSON规范化，字典按键排序）或numpy数组。
+    
+    Returns:
+        十六进制哈希文本
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            digest.update(b'ndarray')
+            digest.update(str(part.dtype).encode())
+            digest.update(np.ascontiguousarray(part).tobytes())
+        else:
+            digest.update(json.dumps(part, sort_keys=True, default=str, separators=(',', ':')).encode('utf-8'))
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+
+def file_signature(file_path):
+    """文件内容的快速签名: (绝对路径, 大小, 修改时间ns)，文件内容改变时签名随之改变
+    
+    zip成员使用成员解压后的大小和归档的修改时间，另加成员的CRC。
+    """
+    archive_path, member = split_archive_path(file_path)
+    if member is not None:
+        size, crc = archive_members(archive_path)[member]
+        return os.path.abspath(file_path), size, os.stat(archive_path).st_mtime_ns, crc
+    stat = os.stat(file_path)
+    return os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns
+
+
+def _estimated_size(value):
+    """估算缓存结果占用的内存（字节），只统计DataFrame、Series和numpy数组"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=False).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=False))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (list, tuple)):
+        if value and isinstance(value[0], (pd.Series, pd.DataFrame, np.ndarray)):
+            return _estimated_size(value[0]) * len(value)
+        return sum(_estimated_size(item) for item in value[:16])
+    if isinstance(value, dict):
+        return sum(_estimated_size(item) for item in list(value.values())[:16])
+    return 0
+
+
+# AnalysisGraph默认缓存的内存上限
+DEFAULT_GRAPH_MAX_BYTES = 1024 * 1024 * 1024
+
+
+class Verdict:
+    """AnalysisGraph.verdict的结果
+    
+    Attributes:
+        key: verdict节点的键（下游节点的输入）
+        row_fail: 行不良mask
+        reasons: Fail_Reason object数组
+        masks: [(Fail_Reason文本, 列名元组, mask, mask节点键), ...]
+    """
+    
+    def __init__(self, key, row_fail, reasons, masks):
+        self.key = key
+        self.row_fail = row_fail
+        self.reasons = reasons
+        self.masks = masks
+
+
+class AnalysisGraph:
+    """按内容哈希缓存结果的分析DAG
+    
+    节点及其输入:
+        ingest      文件签名（路径、大小、修改时间）和Config
+        processed   各ingest节点的键（合并、去重、列结构和特殊单元格处理是确定的），即数据版本
+        mask        数据版本 + 一条规格（列、下限、上限、判定规则）或一个多边形的顶点
+        verdict     各mask节点的键
+        yield / top_defects / cpk / chart / export  verdict节点或数据版本 + 各自参数
+    
+    节点的键由输入的键计算，修改一条规格或一个多边形时只有对应mask节点及其下游的键改变，
+    其它节点直接使用缓存。缓存按最近使用顺序淘汰，估算内存超过max_bytes或条目数超过max_entries时淘汰最旧的条目。
+    """
+    
+    def __init__(self, max_entries=256, max_bytes=DEFAULT_GRAPH_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = Counter()
+        self.misses = Counter()
+        self._cache = OrderedDict()
+        self._sizes = {}
+        self._total_bytes = 0
+        self._lock = threading.RLock()
+    
+    @staticmethod
+    def key(node, *inputs):
+        return content_hash(node, *inputs)
+    
+    def get(self, node, key, compute):
+        """返回节点结果，缓存中没有时调用compute()计算并缓存"""
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits[node] += 1
+                return self._cache[key]
+        self.misses[node] += 1
+        with span(f"graph:{node}"):
+            value = compute()
+        with self._lock:
+            self._store(key, value)
+        return value
+    
+    def cached(self, key):
+        return key in self._cache
+    
+    def _store(self, key, value):
+        if key in self._cache:
+            self._total_bytes -= self._sizes.pop(key, 0)
+        size = _estimated_size(value)
+        self._cache[key] = value
+        self._sizes[key] = size
+        self._total_bytes += size
+        while self._cache and (len(self._cache) > self.max_entries or self._total_bytes > self.max_bytes):
+            old_key, _ = self._cache.popitem(last=False)
+            self._total_bytes -= self._sizes.pop(old_key, 0)
+            if old_key == key:
+                break
+    
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._sizes.clear()
+            self._total_bytes = 0
+            self.hits.clear()
+            self.misses.clear()
+    
+    def stats(self):
+        """{节点: (命中次数, 计算次数)}和缓存占用"""
+        nodes = sorted(set(self.hits) | set(self.misses))
+        return {'nodes': {node: (self.hits[node], self.misses[node]) for node in nodes},
+                'entries': len(self._cache), 'bytes': self._total_bytes}
+    
+    def ingest(self, file_path, config=None, loader=None):
+        """ingest节点: 读取一个日志文件（默认load_log_file），文件未修改时直接返回缓存结果
+        
+        Returns:
+            (节点键, loader的返回值)
+        """
+        loader = loader or load_log_file
+        key = self.key('ingest', file_signature(file_path), config)
+        return key, self.get('ingest', key, lambda: loader(file_path, config))
+    
+    def prefetch_ingest(self, file_paths, configs, workers=DEFAULT_DECOMPRESS_WORKERS):
+        """在线程池中并行执行多个ingest节点，结果进入缓存（解压时释放GIL，多个压缩日志或归档成员可以同时解压）
+        
+        读取失败的文件在这里跳过，之后逐个调用ingest时再次读取并抛出异常。
+        """
+        def load(item):
+            try:
+                self.ingest(*item)
+            except Exception:
+                pass
+        
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='ingest') as executor:
+            list(executor.map(load, zip(file_paths, configs)))
+    
+    def processed_key(self, ingest_keys):
+        """processed节点（数据版本）的键"""
+        return self.key('processed', list(ingest_keys))
+    
+    def limit_mask(self, df, data_key, column, lower, upper, rule='isclose'):
+        """mask节点: 一条规格的不良mask
+        
+        Returns:
+            (节点键, mask)
+        """
+        key = self.key('mask', data_key, column, lower, upper, rule)
+        return key, self.get('mask', key, lambda: limit_fail_mask(numeric_values(df, column), lower, upper, rule))
+    
+    def polygon_mask(self, df, data_key, type_name, polygon):
+        """mask节点: 一个色点多边形的不良mask
+        
+        Returns:
+            (节点键, mask)
+        """
+        u_column, v_column, _ = COLOR_POINT_COLUMNS[type_name]
+        vertices = [[float(point[0]), float(point[1])] for point in polygon]
+        key = self.key('mask', data_key, type_name, vertices)
+        return key, self.get('mask', key, lambda: polygon_fail_mask(
+            numeric_values(df, u_column), numeric_values(df, v_column), polygon))
+    
+    def fail_masks(self, df, data_key, limits, polygons, rule='isclose'):
+        """与criteria_fail_masks相同顺序的各项不良mask，每项由mask节点缓存
+        
+        Returns:
+            [(Fail_Reason文本, 列名元组, mask, mask节点键), ...]
+        """
+        masks = []
+        for column, entries in (limits or {}).items():
+            if column not in df.columns:
+                continue
+            for _, lower, upper in entries:
+                key, mask = self.limit_mask(df, data_key, column, lower, upper, rule)
+                masks.append((column, (column,), mask, key))
+        
+        for type_name, (u_column, v_column, _) in COLOR_POINT_COLUMNS.items():
+            polygon = (polygons or {}).get(type_name)
+            if not polygon or len(polygon) < 3 or u_column not in df.columns or v_column not in df.columns:
+                continue
+            key, mask = self.polygon_mask(df, data_key, type_name, polygon)
+            masks.append((f"{u_column}; {v_column}", (u_column, v_column), mask, key))
+        return masks
+    
+    def verdict(self, df, data_key, limits, polygons, rule='isclose'):
+        """verdict节点: 合并各mask节点得到行判定和Fail_Reason，只有改变的mask节点重新计算"""
+        masks = self.fail_masks(df, data_key, limits, polygons, rule)
+        key = self.key('verdict', [mask_key for *_, mask_key in masks], len(df))
+        row_fail, reasons = self.get('verdict', key, lambda: combine_fail_masks(len(df), masks))
+        return Verdict(key, row_fail, reasons, masks)
+
+
+class IncrementalEvaluator:
+    """增量判定: 保存每条规格和每个色点多边形的不良mask以及每行的不良项数
+    
+    修改一条规格或一个多边形时只重新计算该项的mask（由AnalysisGraph缓存），行判定、按分组的良率和
+    按项目的不良统计（Pareto）通过加减该项mask的贡献更新，不需要重新判定其它项目。
+    项目顺序与criteria_fail_masks一致，reasons()生成的Fail_Reason与apply_verdict相同。
+    """
+    
+    def __init__(self, df, data_key, limits=None, polygons=None, graph=None, rule='isclose', group_column='Config'):
+        """
+        Args:
+            df: 处理后的数据（不修改）
+            data_key: 数据版本（mask节点的输入）
+            limits: resolve_criteria_columns的结果
+            polygons: {'White': 顶点列表, 'Mixed': 顶点列表}
+            graph: 共用的AnalysisGraph，为None时新建
+            rule: 规格判定规则，见limit_fail_mask
+            group_column: 良率分组列，不存在时只统计总体
+        """
+        self.df = df
+        self.data_key = data_key
+        self.graph = graph if graph is not None else AnalysisGraph()
+        self.rule = rule
+        self.items = OrderedDict()  # 项目 -> (Fail_Reason文本, 列名元组, mask, (下限, 上限)或多边形顶点)
+        self.fail_count = np.zeros(len(df), dtype=np.int32)
+        
+        if group_column in df.columns:
+            codes, groups = pd.factorize(df[group_column])
+        else:
+            codes, groups = np.zeros(len(df), dtype=np.intp), pd.Index(['All'])
+        self.groups = list(groups)
+        self._group_codes = codes
+        self._grouped = codes >= 0
+        self.group_totals = np.bincount(codes[self._grouped], minlength=len(self.groups))
+        self.group_fails = np.zeros(len(self.groups), dtype=np.int64)
+        self.total_fails = 0
+        
+        for column, entries in (limits or {}).items():
+            for std_type, lower, upper in entries:
+                self.set_limit(std_type, column, lower, upper)
+        for type_name, polygon in (polygons or {}).items():
+            self.set_polygon(type_name, polygon)
+    
+    def __len__(self):
+        return len(self.fail_count)
+    
+    @property
+    def row_fail(self):
+        return self.fail_count > 0
+    
+    def column_of(self, item):
+        """规格项目对应的数据列，项目不存在或为多边形时返回None"""
+        entry = self.items.get(item)
+        if entry is None or len(entry[1]) != 1:
+            return None
+        return entry[1][0]
+    
+    def limit_items(self):
+        """所有规格项目（不含多边形）"""
+        return [item for item, entry in self.items.items() if len(entry[1]) == 1]
+    
+    def limits_of(self, item):
+        """规格项目当前的 (下限, 上限)"""
+        return self.items[item][3]
+    
+    @property
+    def group_codes(self):
+        """每行的分组编号（self.groups中的位置），分组列为空时为-1"""
+        return self._group_codes
+    
+    def set_limit(self, item, column, lower, upper):
+        """设置（或修改）一条规格，只重新计算该规格的mask
+        
+        Returns:
+            该项目改变判定结果的行数
+        """
+        if column not in self.df.columns:
+            return 0
+        _, mask = self.graph.limit_mask(self.df, self.data_key, column, lower, upper, self.rule)
+        return self._replace(item, column, (column,), mask, (lower, upper))
+    
+    def set_polygon(self, type_name, polygon):
+        """设置（或修改）一个色点多边形（项目名为"<类型> polygon"），顶点不足3个时移除该项"""
+        u_column, v_column, _ = COLOR_POINT_COLUMNS[type_name]
+        item = f"{type_name} polygon"
+        if not polygon or len(polygon) < 3 or u_column not in self.df.columns or v_column not in self.df.columns:
+            return self.remove(item)
+        _, mask = self.graph.polygon_mask(self.df, self.data_key, type_name, polygon)
+        return self._replace(item, f"{u_column}; {v_column}", (u_column, v_column), mask, polygon)
+    
+    def remove(self, item):
+        entry = self.items.pop(item, None)
+        if entry is None:
+            return 0
+        return self._apply_delta(-entry[2].astype(np.int32))
+    
+    def _replace(self, item, label, columns, mask, bounds):
+        previous = self.items.get(item)
+        self.items[item] = (label, columns, mask, bounds)
+        if previous is None:
+            return self._apply_delta(mask.astype(np.int32))
+        if previous[2] is mask:
+            return 0
+        return self._apply_delta(mask.astype(np.int32) - previous[2].astype(np.int32))
+    
+    def _apply_delta(self, delta):
+        """把一项mask的变化加到每行不良项数上，只对判定结果改变的行更新分组不良数"""
+        rows = np.flatnonzero(delta)
+        if len(rows) == 0:
+            return 0
+        before = self.fail_count[rows] > 0
+        self.fail_count[rows] += delta[rows]
+        after = self.fail_count[rows] > 0
+        flipped = rows[before != after]
+        if len(flipped) == 0:
+            return 0
+        sign = np.where(after[before != after], 1, -1)
+        self.total_fails += int(sign.sum())
+        grouped = self._grouped[flipped]
+        self.group_fails += np.bincount(self._group_codes[flipped][grouped], weights=sign[grouped],
+                                        minlength=len(self.groups)).astype(np.int64)
+        return len(flipped)
+    
+    def yield_summary(self):
+        """总体和按分组的良率
+        
+        Returns:
+            DataFrame，列为Group、Total、Fail、Yield (%)，最后一行为All
+        """
+        totals = np.append(self.group_totals, len(self))
+        fails = np.append(self.group_fails, self.total_fails)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            yields = np.where(totals > 0, (totals - fails) / totals * 100, np.nan)
+        return pd.DataFrame({'Group': self.groups + ['All'], 'Total': totals, 'Fail': fails,
+                             'Yield (%)': np.round(yields, 2)})
+    
+    def pareto(self, top=None):
+        """按项目的不良行数（降序），同一行的多个不良项目分别计数
+        
+        Returns:
+            DataFrame，列为Item、Fail_Reason、Fail、Fail Rate (%)
+        """
+        rows = [(item, label, int(mask.sum())) for item, (label, _, mask, _) in self.items.items()]
+        table = pd.DataFrame(rows, columns=['Item', 'Fail_Reason', 'Fail'])
+        table['Fail Rate (%)'] = np.round(table['Fail'] / max(len(self), 1) * 100, 2)
+        table = table.sort_values('Fail', ascending=False, kind='stable').reset_index(drop=True)
+        return table.head(top) if top else table
+    
+    def reasons(self):
+        """(行不良mask, Fail_Reason)，与apply_verdict的结果一致"""
+        return combine_fail_masks(len(self), list(self.items.values()))
+
+
+# 限值扫描默认的候选限值数量
+DEFAULT_SWEEP_POINTS = 200
+
+
+def limit_sweep(evaluator, item, side, candidates=None, points=DEFAULT_SWEEP_POINTS):
+    """限值扫描: 一条规格的下限或上限取一组候选值时的总体和各分组良率
+    
+    数据列按（分组, 数值）只排序一次（由evaluator.graph缓存），其它规格/多边形和该规格另一侧限值的不良mask固定，
+    每个候选限值的不良数由searchsorted和累计计数得到，1M行、数百个候选值时只需一次排序。
+    候选限值按严格比较判定（小于下限或大于上限为不良），与限值近似相等（相对误差1e-9以内）的值不做特殊处理。
+    
+    Args:
+        evaluator: IncrementalEvaluator（其它项目使用其当前状态）
+        item: 规格项目（如"White dY"）
+        side: 'lower'或'upper'
+        candidates: 候选限值，为None时在该列0.5%~99.5%分位数之间取points个值（包含当前限值）
+        points: 默认候选限值数量
+    
+    Returns:
+        DataFrame，列为Limit、Group、Total、Fail、Yield (%)（Group包含各分组和All）
+    """
+    if side not in ('lower', 'upper'):
+        raise ValueError(f"side must be 'lower' or 'upper', got {side!r}")
+    column = evaluator.column_of(item)
+    if column is None:
+        raise KeyError(f"{item} is not a limit criterion of this evaluator")
+    _, _, mask, (lower, upper) = evaluator.items[item]
+    values = numeric_values(evaluator.df, column)
+    
+    # 固定部分: 其它项目的不良，以及该规格另一侧限值的不良
+    fixed = (evaluator.fail_count - mask) > 0
+    fixed |= limit_fail_mask(values, None, upper, evaluator.rule) if side == 'lower' \
+        else limit_fail_mask(values, lower, None, evaluator.rule)
+    
+    if candidates is None:
+        finite = values[np.isfinite(values)]
+        if len(finite) == 0:
+            candidates = np.array([], dtype=np.float64)
+        else:
+            low, high = np.percentile(finite, [0.5, 99.5])
+            candidates = np.linspace(low, high, max(2, points))
+            current = lower if side == 'lower' else upper
+            if current is not None and np.isfinite(current):
+                candidates = np.append(candidates, current)
+    candidates = np.unique(np.asarray(candidates, dtype=np.float64))
+    
+    codes = evaluator.group_codes
+    order = evaluator.graph.get('sorted', evaluator.graph.key('sorted', evaluator.data_key, column),
+                                lambda: np.lexsort((values, codes)))
+    sorted_values = values[order]
+    sorted_codes = codes[order]
+    # 可能因该限值不良的行（未被固定部分判为不良且数值有效）的累计数
+    eligible = (~fixed & ~np.isnan(values))[order]
+    cumulative = np.concatenate([[0], np.cumsum(eligible)])
+    
+    group_count = len(evaluator.groups)
+    block_edges = np.searchsorted(sorted_codes, np.arange(-1, group_count + 1))
+    fails = np.zeros((group_count + 1, len(candidates)), dtype=np.int64)
+    for code in range(-1, group_count):
+        start, end = block_edges[code + 1], block_edges[code + 2]
+        block = sorted_values[start:end]
+        if side == 'lower':
+            swept = cumulative[start + np.searchsorted(block, candidates, side='left')] - cumulative[start]
+        else:
+            swept = cumulative[end] - cumulative[start + np.searchsorted(block, candidates, side='right')]
+        fixed_fails = int(fixed[order[start:end]].sum())
+        if code >= 0:
+            fails[code] = swept + fixed_fails
+        fails[-1] += swept + fixed_fails
+    
+    totals = np.append(evaluator.group_totals, len(evaluator))
+    groups = evaluator.groups + ['All']
+    with np.errstate(invalid='ignore', divide='ignore'):
+        yields = np.where(totals[:, None] > 0, (totals[:, None] - fails) / totals[:, None] * 100, np.nan)
+    return pd.DataFrame({
+        'Limit': np.tile(candidates, len(groups)),
+        'Group': np.repeat(groups, len(candidates)),
+        'Total': np.repeat(totals, len(candidates)),
+        'Fail': fails.ravel(),
+        'Yield (%)': np.round(yields.ravel(), 2),
+    })
@@ -0,0 +1,43 @@
+"""pytest配置: 把仓库根目录加入导入路径，并提供由模拟日志生成的共用数据"""
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import loganalyzer_core  # noqa: E402
+from benchmarks import generate_logs  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def criteria():
+    """生成数据使用的Review Criteria {std_type: (lower, upper)}"""
+    return loganalyzer_core.parse_criteria_data(generate_logs.DEFAULT_CRITERIA)
+
+
+@pytest.fixture(scope='session')
+def polygons():
+    return loganalyzer_core.colorpoint_polygons(None)
+
+
+@pytest.fixture(scope='session')
+def log_files(tmp_path_factory):
+    """三个模拟日志文件（不同Config，SN有重复测试，第三个文件重测前两个文件中的部分SN）"""
+    directory = tmp_path_factory.mktemp('logs')
+    frames = [generate_logs.generate_frame(2000, seed=i, duplicate_rate=0.2, serial_offset=i * 1500) for i in range(3)]
+    frames[2]['Serial Number'] = frames[0]['Serial Number'].sample(2000, replace=True, random_state=1).to_numpy()
+    return [generate_logs.write_pdot_log(str(directory / f'pDOT Log {config} Line{i + 1}.csv'), frame)
+            for i, (config, frame) in enumerate(zip(generate_logs.CONFIGS, frames))]
+
+
+@pytest.fixture(scope='session')
+def processed_data(log_files):
+    """按Data Processing流程处理的数据: 读取、合并、SN去重、列结构处理、特殊单元格清理"""
+    df = pd.concat([loganalyzer_core.load_log_file(path)[0] for path in log_files], ignore_index=True)
+    df, _ = loganalyzer_core.dedup_by_serial(df)
+    df = loganalyzer_core.get_schema_plan(df).apply(df)
+    df, _, _, _ = loganalyzer_core.clean_special_cells(df)
+    return df
+
@@ -0,0 +1,84 @@
+"""命令行批处理模式: 输入展开（目录、压缩CSV、zip归档）以及压缩日志与普通CSV的处理结果一致"""
+import gzip
+import os
+import zipfile
+
+import pandas.testing as pdt
+import pytest
+
+import loganalyzer_batch
+import loganalyzer_core
+from benchmarks import generate_logs
+
+
+def _write_logs(directory, files=3, rows=400):
+    """生成files个普通CSV日志，返回路径列表"""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(files):
+        df = generate_logs.generate_frame(rows, seed=i, serial_offset=i * rows)
+        config = generate_logs.CONFIGS[i % len(generate_logs.CONFIGS)]
+        paths.append(generate_logs.write_pdot_log(os.path.join(directory, f'pDOT Log {config} Line{i + 1}.csv'), df))
+    return paths
+
+
+@pytest.fixture
+def lots(tmp_path):
+    """同一组日志的普通CSV批次和压缩批次（第一个文件为CSV，第二个为.csv.gz，第三个在zip归档中）"""
+    plain = _write_logs(str(tmp_path / 'plain'))
+    packed = tmp_path / 'packed'
+    packed.mkdir()
+    with open(plain[0], 'rb') as f:
+        (packed / os.path.basename(plain[0])).write_bytes(f.read())
+    with open(plain[1], 'rb') as f, gzip.open(packed / (os.path.basename(plain[1]) + '.gz'), 'wb') as out:
+        out.write(f.read())
+    with zipfile.ZipFile(packed / 'archive.zip', 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.write(plain[2], os.path.basename(plain[2]))
+        archive.writestr('notes.txt', 'not a log')
+    (packed / 'readme.txt').write_text('not a log')
+    return str(tmp_path / 'plain'), str(packed)
+
+
+def test_expand_inputs_reads_compressed_logs_and_archive_members(lots):
+    _, packed = lots
+    [(lot_name, files)] = loganalyzer_batch.expand_inputs([packed])
+    assert lot_name == 'packed'
+    names = [os.path.relpath(path, packed).replace('\\', '/') for path in files]
+    assert names == ['archive.zip/pDOT Log PVT Line3.csv', 'pDOT Log DVT Line2.csv.gz', 'pDOT Log EVT Line1.csv']
+
+
+def test_expand_inputs_expands_archive_given_directly(lots):
+    _, packed = lots
+    archive = os.path.join(packed, 'archive.zip')
+    [(lot_name, files)] = loganalyzer_batch.expand_inputs([archive, archive])
+    assert lot_name == 'files'
+    assert files == [os.path.join(archive, 'pDOT Log PVT Line3.csv')]
+
+
+@pytest.mark.parametrize('chunked', [False, True])
+def test_compressed_lot_matches_plain_lot(lots, chunked):
+    plain, packed = lots
+    criteria = loganalyzer_core.parse_criteria_data(generate_logs.DEFAULT_CRITERIA)
+    polygons = loganalyzer_core.colorpoint_polygons(None)
+    reports = []
+    for directory in (plain, packed):
+        [(_, files)] = loganalyzer_batch.expand_inputs([directory])
+        # 按Config排序，使两个批次中"第一条"记录的文件顺序相同
+        files.sort(key=lambda path: loganalyzer_core.log_file_name(os.path.basename(path)))
+        reports.append(loganalyzer_batch._analyze_lot(files, criteria, polygons, 1, chunked, 500))
+    expected, actual = reports
+    assert actual.files == expected.files == 3
+    assert (actual.rows_read, actual.units, actual.rows_filtered) == \
+        (expected.rows_read, expected.units, expected.rows_filtered)
+    assert actual.config_fails == expected.config_fails
+    pdt.assert_frame_equal(actual.yield_table(), expected.yield_table())
+    pdt.assert_frame_equal(actual.cpk_table(), expected.cpk_table())
+
+
+def test_batch_run_over_compressed_lot(lots, tmp_path):
+    _, packed = lots
+    criteria_path = generate_logs.write_default_criteria(str(tmp_path / 'criteria.json'))
+    output = str(tmp_path / 'report.xlsx')
+    status = loganalyzer_batch.main(['--criteria', criteria_path, packed, '-o', output])
+    assert status == loganalyzer_batch.EXIT_OK
+    assert os.path.exists(output)
@@ -0,0 +1,52 @@
+"""Review Criteria存储: 版本号、改变事件、只在内容改变时写入以及重新读取"""
+import json
+import os
+
+import pytest
+
+import loganalyzer_core
+from benchmarks import generate_logs
+
+
+@pytest.fixture
+def store(tmp_path):
+    return loganalyzer_core.CriteriaStore(str(tmp_path / 'criteria.json'))
+
+
+def test_persist_round_trip(store):
+    assert store.replace(generate_logs.DEFAULT_CRITERIA)
+    assert store.persist()
+    assert not store.persist()
+    with open(store.path, 'r', encoding='utf-8') as f:
+        assert loganalyzer_core.parse_criteria_data(json.load(f)) == \
+            loganalyzer_core.parse_criteria_data(generate_logs.DEFAULT_CRITERIA)
+    
+    reloaded = loganalyzer_core.CriteriaStore(store.path)
+    assert reloaded.data() == store.data()
+    assert reloaded.criteria_dict() == loganalyzer_core.parse_criteria_data(generate_logs.DEFAULT_CRITERIA)
+    assert not reloaded.persist()
+
+
+def test_persist_rewrites_deleted_file(store):
+    store.replace(generate_logs.DEFAULT_CRITERIA)
+    store.persist()
+    os.remove(store.path)
+    assert store.persist()
+    assert os.path.exists(store.path)
+    assert not os.path.exists(store.path + '.tmp')
+
+
+def test_version_and_change_events(store):
+    events = []
+    unsubscribe = store.subscribe(lambda version, changes: events.append((version, changes)))
+    store.replace(generate_logs.DEFAULT_CRITERIA)
+    assert not store.replace(generate_logs.DEFAULT_CRITERIA)
+    store.set_limit('White', 'L', '400', None)
+    assert store.version == 2
+    assert events[-1] == (2, [('White', 'L')])
+    assert store.criteria_dict()['White L'] == (400.0, float('inf'))
+    
+    unsubscribe()
+    store.set_limit('Mixed', 'dY', None, '3')
+    assert len(events) == 2
+    assert store.numeric_limits('Mixed') == {}
@@ -0,0 +1,87 @@
+"""SN去重: dedup_by_serial与排序+drop_duplicates的参考实现一致，流式去重索引与dedup_by_serial一致"""
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+
+import loganalyzer_core
+from benchmarks import generate_logs
+
+
+@pytest.fixture(scope='module')
+def raw():
+    """重复测试较多的原始数据行（文本列），部分测试时间缺失"""
+    df = generate_logs.generate_frame(3000, seed=7, duplicate_rate=0.4)
+    df.loc[df.sample(frac=0.02, random_state=3).index, 'Date/Time'] = 'not a time'
+    return df
+
+
+def _reference_dedup(df):
+    """参考实现: 按(是否非PASS, 行号)稳定排序后每个SN取第一行，再恢复原始行顺序"""
+    frame = df.assign(_position=np.arange(len(df)),
+                      _priority=df['Pass/Fail'].astype(str).str.strip().str.upper() != 'PASS')
+    kept = frame.sort_values(['_priority', '_position'], kind='stable').drop_duplicates('Serial Number')
+    return kept.sort_values('_position')['_position'].to_numpy()
+
+
+def _reference_first_results(df):
+    """参考实现: 每个SN按(测试时间，无法解析的排在最后, 行号)排序的第一条记录的结果"""
+    times = pd.to_datetime(df['Date/Time'], errors='coerce', format='%Y/%m/%d %H:%M:%S')
+    frame = pd.DataFrame({'sn': df['Serial Number'], 'missing': times.isna(), 'time': times,
+                          'position': np.arange(len(df)), 'result': df['Pass/Fail'].str.upper()})
+    first = frame.sort_values(['missing', 'time', 'position'], kind='stable').drop_duplicates('sn')
+    return first.set_index('sn')['result'].map(lambda result: 'PASS' if result == 'PASS' else 'FAIL')
+
+
+def _history(history):
+    """按SN排序，时间列统一为纳秒精度（pandas解析的时间精度与流式索引的datetime64[ns]可能不同）"""
+    history = history.sort_index()
+    return history.astype({'First Time': 'datetime64[ns]', 'Last Time': 'datetime64[ns]'})
+
+
+def test_dedup_by_serial_matches_sort_and_drop_duplicates(raw):
+    deduped, history = loganalyzer_core.dedup_by_serial(raw)
+    expected = raw.iloc[_reference_dedup(raw)].reset_index(drop=True)
+    pdt.assert_frame_equal(deduped, expected)
+    
+    counts = raw['Serial Number'].value_counts()
+    assert history['Attempts'].sort_index().tolist() == counts.sort_index().tolist()
+    assert (history['Retests'] == history['Attempts'] - 1).all()
+    has_pass = raw['Pass/Fail'].str.upper().eq('PASS').groupby(raw['Serial Number']).any()
+    assert history['Final Result'].eq('PASS').sort_index().tolist() == has_pass.sort_index().tolist()
+    pdt.assert_series_equal(history['First Result'].sort_index(), _reference_first_results(raw).sort_index(),
+                            check_names=False, check_index_type=False)
+
+
+@pytest.mark.parametrize('chunksize, compact_rows', [(61, 10 ** 6), (257, 300), (1000, 50)])
+def test_streaming_index_matches_dedup_by_serial(raw, chunksize, compact_rows):
+    deduped, history = loganalyzer_core.dedup_by_serial(raw)
+    index = loganalyzer_core.StreamingDedupIndex(compact_rows=compact_rows)
+    for start in range(0, len(raw), chunksize):
+        chunk = raw.iloc[start:start + chunksize]
+        index.update(chunk, np.arange(start, start + len(chunk), dtype=np.int64))
+    
+    kept = index.kept_row_ids()
+    pdt.assert_frame_equal(raw.iloc[kept].reset_index(drop=True), deduped)
+    assert index.units == len(deduped)
+    pdt.assert_frame_equal(_history(index.attempt_history()), _history(history))
+
+
+def test_merged_per_file_indexes_match_single_index(raw):
+    """按文件建立的索引合并（带SN过滤）与过滤后一次建立的索引一致"""
+    keep = lambda serials: ~serials.astype(str).str.endswith('7')
+    single = loganalyzer_core.StreamingDedupIndex()
+    merged = loganalyzer_core.StreamingDedupIndex(compact_rows=100)
+    filtered_rows = 0
+    for start in range(0, len(raw), 700):
+        chunk = raw.iloc[start:start + 700]
+        row_ids = np.arange(start, start + len(chunk), dtype=np.int64)
+        mask = keep(chunk['Serial Number']).to_numpy()
+        single.update(chunk[mask], row_ids[mask])
+        file_index = loganalyzer_core.StreamingDedupIndex()
+        file_index.update(chunk, row_ids)
+        filtered_rows += merged.merge(file_index, keep)
+    
+    assert filtered_rows == int((~keep(raw['Serial Number'])).sum())
+    np.testing.assert_array_equal(merged.kept_row_ids(), single.kept_row_ids())
+    pdt.assert_frame_equal(_history(merged.attempt_history()), _history(single.attempt_history()))
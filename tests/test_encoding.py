@@ -0,0 +1,43 @@
+"""编码检测: 各种编码的日志读取结果与UTF-8日志一致"""
+import codecs
+
+import pandas.testing as pdt
+import pytest
+
+import loganalyzer_core
+from benchmarks import encodings
+
+
+@pytest.mark.parametrize('sample, expected', [
+    (codecs.BOM_UTF8 + 'a,b'.encode('utf-8'), 'utf-8-sig'),
+    ('a,b'.encode('utf-16'), 'utf-16'),
+    ('a,b'.encode('utf-32'), 'utf-32'),
+    ('Station,测试站'.encode('utf-16-le'), 'utf-16-le'),
+    ('Station,测试站'.encode('utf-16-be'), 'utf-16-be'),
+    ('Station,测试站'.encode('utf-8'), 'utf-8'),
+    ('Station,测试站'.encode('gbk'), 'gb18030'),
+    ('Station,测试站'.encode('utf-8')[:-1], 'utf-8'),
+    (b'Station,\x81\xff', 'latin-1'),
+])
+def test_detect_encoding(sample, expected):
+    assert loganalyzer_core.detect_encoding(sample) == expected
+
+
+@pytest.fixture(scope='module')
+def expected_frames(tmp_path_factory):
+    """按实际编码读取的结果 {名称: DataFrame}"""
+    directory = str(tmp_path_factory.mktemp('encodings'))
+    frames = {}
+    for name, encoding, placement in encodings.ENCODING_CASES:
+        path = encodings.write_case(directory, name, encoding, placement, 1000)
+        frames[name] = (path, loganalyzer_core.load_log_file(path, encoding=encoding)[0])
+    return frames
+
+
+@pytest.mark.parametrize('name', [case[0] for case in encodings.ENCODING_CASES])
+def test_load_log_file_detects_encoding(expected_frames, name):
+    path, expected = expected_frames[name]
+    loganalyzer_core.clear_header_cache()
+    actual = loganalyzer_core.load_log_file(path)[0]
+    pdt.assert_frame_equal(actual, expected)
+    assert actual['Operator'].notna().any()
@@ -0,0 +1,86 @@
+"""增量判定和限值扫描与完整重新判定、逐个限值的暴力计算一致"""
+import numpy as np
+import pandas.testing as pdt
+import pytest
+
+import loganalyzer_core
+
+
+@pytest.fixture
+def limits(processed_data, criteria):
+    return loganalyzer_core.resolve_criteria_columns(criteria, list(processed_data.columns))
+
+
+@pytest.fixture
+def evaluator(processed_data, limits, polygons):
+    return loganalyzer_core.IncrementalEvaluator(processed_data, 'data', limits, polygons)
+
+
+def _assert_matches_full_evaluation(evaluator, df, limits, polygons):
+    verdict = loganalyzer_core.apply_verdict(df, limits, polygons)
+    row_fail, reasons = evaluator.reasons()
+    np.testing.assert_array_equal(row_fail, verdict['Pass/Fail'].eq('Fail').to_numpy())
+    np.testing.assert_array_equal(reasons, verdict['Fail_Reason'].to_numpy())
+    
+    fails = verdict['Pass/Fail'].eq('Fail')
+    summary = evaluator.yield_summary().set_index('Group')
+    by_config = fails.groupby(df['Config'], sort=False).agg(['size', 'sum'])
+    for config, (total, fail) in by_config.iterrows():
+        assert (summary.loc[config, 'Total'], summary.loc[config, 'Fail']) == (total, fail)
+    assert (summary.loc['All', 'Total'], summary.loc['All', 'Fail']) == (len(df), fails.sum())
+
+
+def test_initial_state_matches_apply_verdict(evaluator, processed_data, limits, polygons):
+    _assert_matches_full_evaluation(evaluator, processed_data, limits, polygons)
+
+
+def test_what_if_edits_match_full_reevaluation(evaluator, processed_data, limits, polygons):
+    limits = {column: list(entries) for column, entries in limits.items()}
+    polygons = dict(polygons)
+    column = 'White L (cd/m^2)'
+    [(item, lower, upper)] = limits[column]
+    for new_lower in (lower + 15, lower - 30, None):
+        evaluator.set_limit(item, column, new_lower, upper)
+        limits[column] = [(item, new_lower, upper)]
+        _assert_matches_full_evaluation(evaluator, processed_data, limits, polygons)
+    
+    # 缩小CAFL0多边形，再移除CAFL24多边形
+    white = np.asarray(polygons['White'])
+    polygons['White'] = [tuple(point) for point in white.mean(axis=0) + (white - white.mean(axis=0)) * 0.8]
+    evaluator.set_polygon('White', polygons['White'])
+    _assert_matches_full_evaluation(evaluator, processed_data, limits, polygons)
+    polygons['Mixed'] = []
+    evaluator.set_polygon('Mixed', [])
+    _assert_matches_full_evaluation(evaluator, processed_data, limits, polygons)
+
+
+@pytest.mark.parametrize('item, side', [('White L', 'lower'), ('White dY', 'upper'), ('Mixed L', 'lower')])
+def test_limit_sweep_matches_brute_force(evaluator, processed_data, item, side):
+    column = evaluator.column_of(item)
+    lower, upper = evaluator.limits_of(item)
+    values = loganalyzer_core.numeric_values(processed_data, column)
+    candidates = np.unique(np.append(np.percentile(values[~np.isnan(values)], [1, 25, 50, 75, 99]),
+                                     lower if side == 'lower' else upper))
+    result = loganalyzer_core.limit_sweep(evaluator, item, side, candidates=candidates)
+    
+    # 暴力计算: 其它项目的不良加上该规格在每个候选限值下的不良（严格比较）
+    other_fail = (evaluator.fail_count - evaluator.items[item][2]) > 0
+    configs = processed_data['Config'].to_numpy()
+    for candidate in candidates:
+        if side == 'lower':
+            fail = other_fail | (values < candidate) | loganalyzer_core.limit_fail_mask(values, None, upper)
+        else:
+            fail = other_fail | (values > candidate) | loganalyzer_core.limit_fail_mask(values, lower, None)
+        rows = result[result['Limit'] == candidate].set_index('Group')
+        assert rows.loc['All', 'Fail'] == fail.sum()
+        for config in evaluator.groups:
+            assert rows.loc[config, 'Fail'] == fail[configs == config].sum()
+
+
+def test_limit_sweep_at_current_limit_matches_evaluator(evaluator):
+    """候选值取当前限值时的不良数与当前判定一致（生成的数据没有与限值近似相等的值）"""
+    lower, _ = evaluator.limits_of('White L')
+    result = loganalyzer_core.limit_sweep(evaluator, 'White L', 'lower', candidates=[lower])
+    summary = evaluator.yield_summary()
+    pdt.assert_series_equal(result.set_index('Group')['Fail'], summary.set_index('Group')['Fail'],
+                            check_dtype=False)
@@ -0,0 +1,87 @@
+"""分块处理和监视目录模式与内存中一次性处理的结果一致"""
+import os
+
+import pandas.testing as pdt
+import pytest
+
+import loganalyzer_batch
+import loganalyzer_core
+from benchmarks import generate_logs
+
+
+def _assert_reports_equal(actual, expected):
+    assert (actual.hash_cells, actual.fail_cells) == (expected.hash_cells, expected.fail_cells)
+    pdt.assert_frame_equal(actual.yield_table(), expected.yield_table())
+    # 不良数相同的项目按加入顺序排列，与行的读取顺序有关，比较前按全部列排序
+    sort = lambda table: table.sort_values(list(table.columns)).reset_index(drop=True)
+    pdt.assert_frame_equal(sort(actual.top_defects()), sort(expected.top_defects()))
+    pdt.assert_frame_equal(sort(actual.top_defects(by_config=True)), sort(expected.top_defects(by_config=True)))
+    pdt.assert_frame_equal(sort(actual.cpk_table()), sort(expected.cpk_table()), check_exact=False, rtol=1e-9)
+
+
+def _chunked(file_paths, criteria, polygons, chunksize):
+    resolve_limits = lambda columns: loganalyzer_core.resolve_criteria_columns(criteria, columns)
+    return loganalyzer_core.run_chunked_pipeline(file_paths, resolve_limits=resolve_limits, polygons=polygons,
+                                                 chunksize=chunksize)
+
+
+@pytest.mark.parametrize('chunksize', [250, 100000])
+def test_chunked_pipeline_matches_in_memory_batch(log_files, criteria, polygons, chunksize):
+    expected = loganalyzer_batch.analyze_files(log_files, criteria, polygons)
+    actual = _chunked(log_files, criteria, polygons, chunksize)
+    assert (actual.files, actual.rows_read, actual.rows_filtered, actual.units) == \
+        (expected.files, expected.rows_read, expected.rows_filtered, expected.units)
+    _assert_reports_equal(actual, expected)
+    pdt.assert_frame_equal(actual.fpy_table(), expected.fpy_table())
+
+
+def test_chunked_pipeline_skips_malformed_lines_like_in_memory_batch(log_files, criteria, polygons, tmp_path):
+    """字段过多的行在两遍读取中都被跳过，第一遍选出的行号与第二遍的行对应"""
+    path = str(tmp_path / os.path.basename(log_files[0]))
+    with open(log_files[0], 'r', encoding='utf-8') as f:
+        lines = f.read().split('\n')
+    lines.insert(40, lines[40] + ',x,y,z')
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write('\n'.join(lines))
+    expected = loganalyzer_batch.analyze_files([path], criteria, polygons)
+    actual = _chunked([path], criteria, polygons, 300)
+    assert (actual.rows_read, actual.units) == (expected.rows_read, expected.units)
+    _assert_reports_equal(actual, expected)
+
+
+def _watch_session(criteria, polygons):
+    return loganalyzer_core.WatchSession(
+        lambda columns: loganalyzer_core.resolve_criteria_columns(criteria, columns), polygons)
+
+
+def test_watch_session_appends_match_batch(criteria, polygons, tmp_path):
+    """文件分三次追加（重测的SN替换之前保留的行）后，增量结果与一次性批处理一致"""
+    frame = generate_logs.generate_frame(3000, seed=3, duplicate_rate=0.3)
+    path = str(tmp_path / 'pDOT Log EVT Line1.csv')
+    session = _watch_session(criteria, polygons)
+    replaced = 0
+    for rows in (1000, 2000, 3000):
+        generate_logs.write_pdot_log(path, frame.iloc[:rows])
+        replaced += session.update([path])['replaced']
+    assert replaced > 0
+    
+    expected = loganalyzer_batch.analyze_files([path], criteria, polygons)
+    assert len(session.processed) == expected.units
+    _assert_reports_equal(session.report, expected)
+
+
+def test_watch_session_mixed_headers_match_single_update(criteria, polygons, tmp_path):
+    """表头不同的文件交替追加、SN在文件之间重测时，增量结果与一次读取全部文件一致"""
+    frames = [generate_logs.generate_frame(1500, seed=i, duplicate_rate=0.3) for i in range(3)]
+    frames[1] = frames[1].drop(columns=['White dEMax (%/cm)'])
+    frames[2]['Serial Number'] = frames[0]['Serial Number'].sample(1500, replace=True, random_state=1).to_numpy()
+    paths = [str(tmp_path / f'pDOT Log {config} Line{i + 1}.csv') for i, config in enumerate(generate_logs.CONFIGS[:3])]
+    session = _watch_session(criteria, polygons)
+    for index, rows in [(0, 500), (1, 250), (0, 1000), (2, 750), (1, 1500), (2, 1500), (0, 1500)]:
+        generate_logs.write_pdot_log(paths[index], frames[index].iloc[:rows])
+        session.update([paths[index]])
+    
+    expected = _watch_session(criteria, polygons)
+    expected.update(paths)
+    assert len(session.processed) == len(expected.processed)
+    _assert_reports_equal(session.report, expected.report)
@@ -0,0 +1,44 @@
+"""目录扫描索引: 使用索引的扫描结果与直接扫描一致"""
+import os
+
+import pytest
+
+import loganalyzer_core
+
+
+@pytest.fixture
+def log_tree(tmp_path):
+    root = tmp_path / 'logs'
+    for directory in ('a', 'a/b', 'c'):
+        os.makedirs(root / directory, exist_ok=True)
+        for i in range(3):
+            (root / directory / f'log{i}.csv').write_text('x\n')
+    return root
+
+
+def test_scan_index_matches_direct_scan(log_tree, monkeypatch):
+    index = loganalyzer_core.DirectoryIndex(str(log_tree.parent / 'cache' / 'index.json'))
+    expected = loganalyzer_core.scan_directory(str(log_tree))
+    first = loganalyzer_core.scan_directory(str(log_tree), index=index)
+    assert os.path.exists(index.path)
+    
+    # 目录未改变时只读取目录属性，不再读取目录内容
+    scanned = []
+    real_scandir = os.scandir
+    monkeypatch.setattr(os, 'scandir', lambda path: scanned.append(path) or real_scandir(path))
+    second = loganalyzer_core.scan_directory(str(log_tree), index=loganalyzer_core.DirectoryIndex(index.path))
+    assert scanned == []
+    assert second['indexed_directories'] == second['directories'] == expected['directories']
+    assert first['files'] == second['files'] == expected['files']
+    
+    (log_tree / 'a' / 'b' / 'new.csv').write_text('x\n')
+    third = loganalyzer_core.scan_directory(str(log_tree), index=index)
+    assert scanned == [str(log_tree / 'a' / 'b')]
+    assert third['files'] == loganalyzer_core.scan_directory(str(log_tree))['files']
+
+
+def test_app_cache_dir_is_per_user(monkeypatch, tmp_path):
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
+    monkeypatch.setenv('LOCALAPPDATA', str(tmp_path))
+    assert loganalyzer_core.DirectoryIndex().path == \
+        os.path.join(str(tmp_path), 'TestLogAnalyzer', loganalyzer_core.SCAN_INDEX_FILE_NAME)
@@ -0,0 +1,78 @@
+"""可合并统计量: RunningMoments的分块累计、合并和减去与一次性计算全部数据一致"""
+import numpy as np
+import pandas as pd
+import pytest
+
+import loganalyzer_core
+
+
+@pytest.fixture
+def values():
+    rng = np.random.default_rng(5)
+    data = rng.normal(450.0, 20.0, 5000)
+    data[rng.choice(len(data), 50, replace=False)] = np.nan
+    return data
+
+
+def _moments(chunks):
+    moments = loganalyzer_core.RunningMoments()
+    for chunk in chunks:
+        moments.update(chunk)
+    return moments
+
+
+def _assert_matches(moments, data):
+    finite = data[~np.isnan(data)]
+    assert moments.count == len(finite)
+    assert moments.mean == pytest.approx(finite.mean(), rel=1e-12)
+    assert moments.std == pytest.approx(pd.Series(finite).std(), rel=1e-9)
+    assert (moments.minimum, moments.maximum) == (finite.min(), finite.max())
+
+
+@pytest.mark.parametrize('chunksize', [1, 97, 5000])
+def test_update_in_chunks_matches_full_data(values, chunksize):
+    _assert_matches(_moments(np.array_split(values, max(1, len(values) // chunksize))), values)
+
+
+def test_merge_matches_full_data(values):
+    moments = _moments([values[:1234]])
+    moments.merge(_moments([values[1234:3000]]))
+    moments.merge(_moments([values[3000:]]))
+    moments.merge(loganalyzer_core.RunningMoments())
+    _assert_matches(moments, values)
+
+
+def test_remove_matches_remaining_data(values):
+    moments = _moments(np.array_split(values, 10))
+    removed = np.r_[0:700, 2500:2600]
+    extremes_valid = moments.remove(values[removed])
+    remaining = np.delete(values, removed)
+    finite = remaining[~np.isnan(remaining)]
+    assert moments.count == len(finite)
+    assert moments.mean == pytest.approx(finite.mean(), rel=1e-12)
+    assert moments.std == pytest.approx(finite.std(ddof=1), rel=1e-9)
+    all_finite = values[~np.isnan(values)]
+    assert extremes_valid == (finite.min() == all_finite.min() and finite.max() == all_finite.max())
+
+
+def test_remove_everything_resets(values):
+    moments = _moments([values])
+    assert moments.remove(values)
+    assert moments.count == 0 and np.isnan(moments.std)
+
+
+def test_report_moments_match_full_frame(processed_data, criteria, polygons):
+    """分块累计的Cpk统计量与整个数据集的均值、标准差一致"""
+    limits = loganalyzer_core.resolve_criteria_columns(criteria, list(processed_data.columns))
+    report = loganalyzer_core.AnalysisReport()
+    for start in range(0, len(processed_data), 333):
+        report.add_chunk(processed_data.iloc[start:start + 333], limits, polygons)
+    
+    table = report.cpk_table()
+    assert set(table['Column']) == set(limits)
+    for row in table.to_dict('records'):
+        column = pd.to_numeric(processed_data[row['Column']], errors='coerce').dropna()
+        assert row['Count'] == len(column)
+        assert row['Mean'] == pytest.approx(column.mean(), rel=1e-12)
+        assert row['Std Dev'] == pytest.approx(column.std(), rel=1e-9)
+        assert (row['Min'], row['Max']) == (column.min(), column.max())
@@ -0,0 +1,79 @@
+"""增量读取: 分段追加写入的日志逐次读取的结果与一次读取完整文件一致"""
+import gzip
+import os
+
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+
+import loganalyzer_core
+from benchmarks import generate_logs
+
+
+def _encoded_log(tmp_path, encoding, rows=600):
+    """按encoding写出的完整日志内容（bytes）及标题行在其中的字节位置
+    
+    不生成"#"开头的单元格，各段读取的数值列都解析为float，可以与一次读取的结果直接比较。
+    """
+    path = str(tmp_path / 'full.csv')
+    generate_logs.write_pdot_log(path, generate_logs.generate_frame(rows, seed=5, hash_rate=0), encoding=encoding)
+    with open(path, 'rb') as f:
+        data = f.read()
+    os.remove(path)
+    text = data.decode(encoding)
+    return data, len(text[:text.index('Serial Number')].encode(encoding))
+
+
+def _tail_in_pieces(path, data, cuts):
+    """在cuts给出的字节位置把data分段追加写入path，每次写入后读取新行"""
+    tail = loganalyzer_core.LogTail(path)
+    frames = []
+    start = 0
+    for end in list(cuts) + [len(data)]:
+        with open(path, 'ab') as f:
+            f.write(data[start:end])
+        start = end
+        frames.append(tail.read_new_rows())
+    return tail, pd.concat([frame for frame in frames if len(frame.columns)], ignore_index=True)
+
+
+@pytest.mark.parametrize('encoding', ['utf-8', 'utf-16'])
+def test_tail_matches_full_read(tmp_path, encoding):
+    """切分位置落在标题行中间和多字节字符中间时，只读取新增字节并得到完整文件的全部行"""
+    data, header_start = _encoded_log(tmp_path, encoding)
+    path = str(tmp_path / 'pDOT Log EVT Line1.csv')
+    cuts = [header_start + 7, header_start + 4001, len(data) // 2 + 1, len(data) - 3]
+    tail, actual = _tail_in_pieces(path, data, cuts)
+    assert tail.offset == len(data)
+    loganalyzer_core.clear_header_cache()
+    expected = loganalyzer_core.read_log_preview(path, rows=None).df
+    # 分段读取的各部分列类型可能不同（例如某段中全为空的列），只比较值
+    pdt.assert_frame_equal(actual, expected, check_dtype=False)
+    assert tail.rows == len(expected) == 600
+
+
+def test_tail_gzip_members_match_full_read(tmp_path):
+    """逐个追加gzip成员（包括只写了一半的成员）时继续解压新增的压缩数据"""
+    data, _ = _encoded_log(tmp_path, 'utf-8')
+    pieces = [data[:len(data) // 3], data[len(data) // 3:len(data) // 2], data[len(data) // 2:]]
+    members = [gzip.compress(piece) for piece in pieces]
+    compressed = b''.join(members)
+    path = str(tmp_path / 'pDOT Log EVT Line1.csv.gz')
+    cuts = [len(members[0]), len(members[0]) + len(members[1]) // 2, len(members[0]) + len(members[1]) + 10]
+    tail, actual = _tail_in_pieces(path, compressed, cuts)
+    assert tail.offset == len(compressed)
+    loganalyzer_core.clear_header_cache()
+    expected = loganalyzer_core.read_log_preview(path, rows=None).df
+    # 分段读取的各部分列类型可能不同（例如某段中全为空的列），只比较值
+    pdt.assert_frame_equal(actual, expected, check_dtype=False)
+    assert tail.rows == 600
+
+
+def test_tail_detects_truncated_file(tmp_path):
+    data, header_start = _encoded_log(tmp_path, 'utf-16')
+    path = str(tmp_path / 'pDOT Log EVT Line1.csv')
+    tail, _ = _tail_in_pieces(path, data, [len(data) // 2])
+    with open(path, 'wb') as f:
+        f.write(data[:header_start + 100])
+    with pytest.raises(ValueError):
+        tail.read_new_rows()